@@ -710,6 +710,8 @@ CREATE NONCLUSTERED INDEX IX_Contract_BillingCycleID ON Finance.Contract(Billing
 CREATE NONCLUSTERED INDEX IX_Invoice_InvoiceID ON Finance.Invoice(InvoiceID);
 CREATE NONCLUSTERED INDEX IX_Invoice_ContractID ON Finance.Invoice(ContractID);
 CREATE NONCLUSTERED INDEX IX_Invoice_InvoiceNumber ON Finance.Invoice(InvoiceNumber);
+-- بازه ماه در بازمحاسبه افزایشی FactCustomerBillingMonthlySnapshot
+CREATE NONCLUSTERED INDEX IX_Invoice_InvoiceDate ON Finance.Invoice(InvoiceDate) INCLUDE (InvoiceID, ContractID);
 
 -- Indexes for Finance.InvoiceLine
 CREATE NONCLUSTERED INDEX IX_InvoiceLine_InvoiceID ON Finance.InvoiceLine(InvoiceID);
@@ -725,3 +727,481 @@ CREATE NONCLUSTERED INDEX IX_RevenueRecognition_InvoiceID ON Finance.RevenueReco
 
 -- Index for Finance.ETLLog
 CREATE NONCLUSTERED INDEX IX_ETLLog_TableName ON Finance.ETLLog(TableName);
+GO
+
+
+--------------------------------------------------------------------------------
+-- Incremental Staging: جدول کنترل watermark هر جدول Staging
+-- (مشابه DataWarehouse.Audit.ETL_Control؛ رویه‌های Load* در 5 - SAProcedure.sql
+--  بر اساس LoadMode بین بارگذاری کامل و افزایشی انتخاب می‌کنند)
+--   WatermarkType = 'Key'        : فقط سطرهای با کلید بزرگ‌تر از LastKey (جدول‌های فقط-درج)
+--   WatermarkType = 'RowVersion' : سطرهای درج یا تغییر یافته بر اساس ستون rowversion منبع
+--                                  (با Audit.EnableRowVersionCapture فعال می‌شود)
+--------------------------------------------------------------------------------
+IF OBJECT_ID('Audit.ETL_Watermark','U') IS NULL
+CREATE TABLE Audit.ETL_Watermark (
+    TableName        NVARCHAR(128) NOT NULL PRIMARY KEY,          -- Schema.Table (هم‌نام در TradePortDB و StagingDB)
+    KeyColumn        SYSNAME       NOT NULL,                      -- کلید یکتای سطر
+    LoadMode         NVARCHAR(20)  NOT NULL DEFAULT 'Incremental',-- 'Incremental' | 'Full'
+    WatermarkType    NVARCHAR(20)  NOT NULL DEFAULT 'Key',        -- 'Key' | 'RowVersion'
+    WatermarkColumn  SYSNAME       NULL,                          -- ستون rowversion منبع
+    LastKey          BIGINT        NULL,                          -- بیشترین کلید بارگذاری‌شده
+    LastRowVersion   BINARY(8)     NULL,                          -- مرز بالای (انحصاری) آخرین delta
+    LastLoadMode     NVARCHAR(20)  NULL,
+    LastDeltaRows    INT           NULL,
+    LastRunStart     DATETIME      NULL,
+    LastRunEnd       DATETIME      NULL,
+    CONSTRAINT CK_ETL_Watermark_LoadMode CHECK (LoadMode IN ('Incremental','Full')),
+    CONSTRAINT CK_ETL_Watermark_Type CHECK (WatermarkType IN ('Key','RowVersion'))
+);
+GO
+
+-- جدول‌های بزرگ که به صورت افزایشی بارگذاری می‌شوند
+-- (watermark خالی است؛ اولین اجرا بارگذاری کامل است و watermark را مقداردهی می‌کند)
+MERGE Audit.ETL_Watermark AS tgt
+USING (VALUES
+    ('Finance.InvoiceLine',                  'InvoiceLineID'),
+    ('Finance.Payment',                      'PaymentID'),
+    ('Finance.RevenueRecognition',           'RecognitionID'),
+    ('HumanResources.Attendance',            'AttendanceID'),
+    ('HumanResources.SalaryPayment',         'SalaryPaymentID'),
+    ('PortOperations.ContainerYardMovement', 'MovementID'),
+    ('PortOperations.CargoOperation',        'CargoOpID')
+) AS src (TableName, KeyColumn)
+ON tgt.TableName = src.TableName
+WHEN NOT MATCHED THEN
+    INSERT (TableName, KeyColumn) VALUES (src.TableName, src.KeyColumn);
+GO
+
+-- ایندکس کلید برای upsert و NOT EXISTS بارگذاری افزایشی
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_InvoiceLine_InvoiceLineID' AND object_id = OBJECT_ID('Finance.InvoiceLine'))
+    CREATE NONCLUSTERED INDEX IX_InvoiceLine_InvoiceLineID ON Finance.InvoiceLine(InvoiceLineID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Payment_PaymentID' AND object_id = OBJECT_ID('Finance.Payment'))
+    CREATE NONCLUSTERED INDEX IX_Payment_PaymentID ON Finance.Payment(PaymentID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_RevenueRecognition_RecognitionID' AND object_id = OBJECT_ID('Finance.RevenueRecognition'))
+    CREATE NONCLUSTERED INDEX IX_RevenueRecognition_RecognitionID ON Finance.RevenueRecognition(RecognitionID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Attendance_AttendanceID' AND object_id = OBJECT_ID('HumanResources.Attendance'))
+    CREATE NONCLUSTERED INDEX IX_Attendance_AttendanceID ON HumanResources.Attendance(AttendanceID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_SalaryPayment_SalaryPaymentID' AND object_id = OBJECT_ID('HumanResources.SalaryPayment'))
+    CREATE NONCLUSTERED INDEX IX_SalaryPayment_SalaryPaymentID ON HumanResources.SalaryPayment(SalaryPaymentID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_CYM_MovementID' AND object_id = OBJECT_ID('PortOperations.ContainerYardMovement'))
+    CREATE NONCLUSTERED INDEX IX_CYM_MovementID ON PortOperations.ContainerYardMovement(MovementID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_CO_CargoOpID' AND object_id = OBJECT_ID('PortOperations.CargoOperation'))
+    CREATE NONCLUSTERED INDEX IX_CO_CargoOpID ON PortOperations.CargoOperation(CargoOpID);
+GO
+
+
+--------------------------------------------------------------------------------
+-- ETL Telemetry: سطح واحد زمان‌بندی و تعداد سطر هر مرحله ETL
+--   همه لایه‌ها (Staging، Dim، Fact و loaderهای Python) در Audit.ETLStepMetric
+--   می‌نویسند. جدول‌های لاگ قبلی (Finance/Audit/PortOperations.ETLLog و در DW
+--   dbo.ETLLog و Audit.DW_ETL_Log) با trigger به این جدول منتقل می‌شوند.
+--   RunID از SESSION_CONTEXT(N'ETLRunID') خوانده می‌شود که اسکریپت‌های Run*
+--   و etl_orchestrator.py در ابتدای اجرا تنظیم می‌کنند.
+--------------------------------------------------------------------------------
+IF OBJECT_ID('Audit.ETLStepMetric','U') IS NULL
+CREATE TABLE Audit.ETLStepMetric (
+    MetricID     BIGINT IDENTITY(1,1) PRIMARY KEY,
+    RunID        NVARCHAR(64)   NULL,                -- شناسه اجرا (NULL = اجرای دستی)
+    Source       NVARCHAR(64)   NOT NULL,            -- جدول لاگ مبدأ یا 'Python' / 'Orchestrator'
+    ProcessName  NVARCHAR(256)  NULL,                -- رویه یا ماژول
+    TargetTable  NVARCHAR(256)  NULL,
+    Step         NVARCHAR(50)   NOT NULL,            -- 'Truncate' / 'Validate' / 'Insert' / ...
+    StartTime    DATETIME2(3)   NOT NULL,
+    EndTime      DATETIME2(3)   NULL,
+    DurationMs   AS DATEDIFF(MILLISECOND, StartTime, EndTime) PERSISTED,
+    RowsRead     BIGINT         NULL,
+    RowsWritten  BIGINT         NULL,
+    RowsPerSec   AS CAST(CASE WHEN DATEDIFF(MILLISECOND, StartTime, EndTime) > 0
+                              THEN RowsWritten * 1000.0 / DATEDIFF(MILLISECOND, StartTime, EndTime) END AS DECIMAL(18,2)),
+    Status       NVARCHAR(20)   NOT NULL DEFAULT 'Success',
+    [Message]    NVARCHAR(2000) NULL
+);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ETLStepMetric_Step' AND object_id = OBJECT_ID('Audit.ETLStepMetric'))
+    CREATE NONCLUSTERED INDEX IX_ETLStepMetric_Step ON Audit.ETLStepMetric(ProcessName, TargetTable, Step, StartTime)
+    INCLUDE (RunID, DurationMs, RowsWritten);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ETLStepMetric_RunID' AND object_id = OBJECT_ID('Audit.ETLStepMetric'))
+    CREATE NONCLUSTERED INDEX IX_ETLStepMetric_RunID ON Audit.ETLStepMetric(RunID);
+GO
+
+-- ثبت مستقیم یک مرحله (برای رویه‌هایی که تعداد سطر خوانده‌شده را هم دارند)
+CREATE OR ALTER PROCEDURE Audit.LogETLStep
+    @ProcessName NVARCHAR(256),
+    @Step        NVARCHAR(50),
+    @TargetTable NVARCHAR(256) = NULL,
+    @StartTime   DATETIME2(3),
+    @EndTime     DATETIME2(3)  = NULL,
+    @RowsRead    BIGINT        = NULL,
+    @RowsWritten BIGINT        = NULL,
+    @Status      NVARCHAR(20)  = 'Success',
+    @Message     NVARCHAR(2000) = NULL,
+    @Source      NVARCHAR(64)  = N'SQL'
+AS
+BEGIN
+    SET NOCOUNT ON;
+    INSERT INTO StagingDB.Audit.ETLStepMetric
+        (RunID, Source, ProcessName, TargetTable, Step, StartTime, EndTime, RowsRead, RowsWritten, Status, [Message])
+    VALUES
+        (CONVERT(NVARCHAR(64), SESSION_CONTEXT(N'ETLRunID')), @Source, @ProcessName, @TargetTable, @Step,
+         @StartTime, ISNULL(@EndTime, SYSDATETIME()), @RowsRead, @RowsWritten, @Status, @Message);
+END;
+GO
+
+-- شروع یک اجرا: RunID در SESSION_CONTEXT ذخیره می‌شود و همه مراحل همین session
+-- (از جمله triggerهای لاگ) با آن ثبت می‌شوند. بدون @NewRun شناسه موجود حفظ می‌شود
+-- تا اسکریپت‌های Staging / Dim / Fact اجراشده پشت سر هم یک اجرا حساب شوند.
+CREATE OR ALTER PROCEDURE Audit.BeginETLRun
+    @RunID  NVARCHAR(64) = NULL,
+    @NewRun BIT = 0
+AS
+BEGIN
+    SET NOCOUNT ON;
+    IF @RunID IS NULL AND @NewRun = 0
+        SET @RunID = CONVERT(NVARCHAR(64), SESSION_CONTEXT(N'ETLRunID'));
+    IF @RunID IS NULL
+        SET @RunID = LOWER(LEFT(REPLACE(CONVERT(NVARCHAR(36), NEWID()), N'-', N''), 12));
+    EXEC sp_set_session_context @key = N'ETLRunID', @value = @RunID;
+    PRINT CONCAT('ETL run ', @RunID);
+END;
+GO
+
+-- تعداد سطر نوشته‌شده از پیام لاگ‌های متنی ('Inserted N rows', 'Updated N ...')؛
+-- اولین عدد پیام برای مراحل نوشتن، و NULL برای Truncate / Validate / Error / Skip.
+-- پیام Incremental (Audit.LoadStagingIncremental) کلید/rowversion watermark را هم دارد، پس فقط
+-- عدد بلافاصله پس از 'Written ' خوانده می‌شود و پیام با قالب دیگر NULL می‌دهد.
+CREATE OR ALTER FUNCTION Audit.fn_MessageRowCount (@OperationType NVARCHAR(50), @Message NVARCHAR(2000))
+RETURNS TABLE
+AS
+RETURN
+    SELECT TRY_CONVERT(BIGINT, LEFT(t.Tail, PATINDEX(N'%[^0-9]%', t.Tail + N'x') - 1)) AS RowsWritten
+    FROM (
+        SELECT CASE WHEN @OperationType IN ('Truncate', 'Validate', 'Error', 'Skip') THEN NULL
+                    WHEN @OperationType = 'Incremental'
+                    THEN CASE WHEN @Message LIKE N'Written [0-9]%' THEN SUBSTRING(@Message, 9, 20) END
+                    WHEN PATINDEX(N'%[0-9]%', @Message) > 0
+                    THEN SUBSTRING(@Message, PATINDEX(N'%[0-9]%', @Message), 20) END AS Tail
+    ) AS t;
+GO
+
+-- انتقال لاگ‌های Staging به Audit.ETLStepMetric
+CREATE OR ALTER TRIGGER Finance.TR_ETLLog_StepMetric ON Finance.ETLLog
+AFTER INSERT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    INSERT INTO Audit.ETLStepMetric (RunID, Source, TargetTable, Step, StartTime, EndTime, RowsWritten, Status, [Message])
+    SELECT CONVERT(NVARCHAR(64), SESSION_CONTEXT(N'ETLRunID')), N'Finance.ETLLog', i.TableName, i.OperationType,
+           i.StartTime, i.EndTime, rc.RowsWritten,
+           CASE WHEN i.OperationType = 'Error' THEN 'Failed' ELSE 'Success' END, i.[Message]
+    FROM inserted AS i
+    CROSS APPLY Audit.fn_MessageRowCount(i.OperationType, i.[Message]) AS rc;
+END;
+GO
+
+CREATE OR ALTER TRIGGER Audit.TR_ETLLog_StepMetric ON Audit.ETLLog
+AFTER INSERT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    INSERT INTO Audit.ETLStepMetric (RunID, Source, TargetTable, Step, StartTime, EndTime, RowsWritten, Status, [Message])
+    SELECT CONVERT(NVARCHAR(64), SESSION_CONTEXT(N'ETLRunID')), N'Audit.ETLLog', i.TableName, i.OperationType,
+           i.StartTime, i.EndTime, rc.RowsWritten,
+           CASE WHEN i.OperationType = 'Error' THEN 'Failed' ELSE 'Success' END, LEFT(i.[Message], 2000)
+    FROM inserted AS i
+    CROSS APPLY Audit.fn_MessageRowCount(i.OperationType, LEFT(i.[Message], 2000)) AS rc;
+END;
+GO
+
+CREATE OR ALTER TRIGGER PortOperations.TR_ETLLog_StepMetric ON PortOperations.ETLLog
+AFTER INSERT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    INSERT INTO Audit.ETLStepMetric (RunID, Source, TargetTable, Step, StartTime, EndTime, RowsWritten, Status, [Message])
+    SELECT CONVERT(NVARCHAR(64), SESSION_CONTEXT(N'ETLRunID')), N'PortOperations.ETLLog', i.TableName, i.OperationType,
+           i.StartTime, i.EndTime, rc.RowsWritten,
+           CASE WHEN i.OperationType = 'Error' THEN 'Failed' ELSE 'Success' END, i.[Message]
+    FROM inserted AS i
+    CROSS APPLY Audit.fn_MessageRowCount(i.OperationType, i.[Message]) AS rc;
+END;
+GO
+
+
+--------------------------------------------------------------------------------
+-- Staging Validation: قواعد اعتبارسنجی اعلانی هر جدول Staging
+--   رویه‌های Load* در 5 - SAProcedure.sql همه قواعد فعال یک جدول را در یک پیمایش
+--   منبع (Audit.LoadStagingValidated / Audit.LoadStagingIncremental) اجرا می‌کنند:
+--     NotNull    : ستون NULL نباشد
+--     NotBlank   : ستون رشته‌ای NULL یا '' نباشد
+--     Unique     : کلید (یک یا چند ستون جداشده با کاما) در داده خوانده‌شده تکراری نباشد
+--                  (همه نسخه‌های کلید تکراری رد می‌شوند)
+--     ForeignKey : مقدار غیر NULL در RefTable.RefColumn (در TradePortDB) وجود داشته باشد
+--     Range      : MinValue <= ستون <= MaxValue (هر کدام NULL = بدون حد)
+--   Severity = 'Reject' : سطر بارگذاری نمی‌شود و به Audit.QuarantineRow می‌رود
+--   Severity = 'Warn'   : سطر بارگذاری و فقط در Audit.ValidationResult شمرده می‌شود
+--------------------------------------------------------------------------------
+IF OBJECT_ID('Audit.ValidationRule','U') IS NULL
+CREATE TABLE Audit.ValidationRule (
+    RuleID      INT IDENTITY(1,1) PRIMARY KEY,
+    TableName   NVARCHAR(128)  NOT NULL,                  -- Schema.Table (هم‌نام در TradePortDB و StagingDB)
+    RuleType    NVARCHAR(20)   NOT NULL,
+    ColumnName  NVARCHAR(400)  NOT NULL,                  -- Unique: چند ستون با کاما
+    RefTable    NVARCHAR(256)  NULL,                      -- ForeignKey: Schema.Table در TradePortDB
+    RefColumn   SYSNAME        NULL,
+    MinValue    NVARCHAR(100)  NULL,                      -- Range: به نوع ستون تبدیل می‌شود
+    MaxValue    NVARCHAR(100)  NULL,
+    Severity    NVARCHAR(10)   NOT NULL DEFAULT 'Reject',
+    IsActive    BIT            NOT NULL DEFAULT 1,
+    CONSTRAINT UQ_ValidationRule UNIQUE (TableName, RuleType, ColumnName),
+    CONSTRAINT CK_ValidationRule_Type CHECK (RuleType IN ('NotNull','NotBlank','Unique','ForeignKey','Range')),
+    CONSTRAINT CK_ValidationRule_Severity CHECK (Severity IN ('Reject','Warn')),
+    CONSTRAINT CK_ValidationRule_Ref CHECK (RuleType <> 'ForeignKey' OR (RefTable IS NOT NULL AND RefColumn IS NOT NULL))
+);
+GO
+
+-- نتیجه هر قاعده در هر اجرا (یک سطر برای هر قاعده فعال، حتی بدون خطا)
+IF OBJECT_ID('Audit.ValidationResult','U') IS NULL
+CREATE TABLE Audit.ValidationResult (
+    ResultID     BIGINT IDENTITY(1,1) PRIMARY KEY,
+    RunID        NVARCHAR(64)   NULL,                     -- SESSION_CONTEXT(N'ETLRunID')
+    TableName    NVARCHAR(128)  NOT NULL,
+    RuleID       INT            NOT NULL,
+    RuleType     NVARCHAR(20)   NOT NULL,
+    ColumnName   NVARCHAR(400)  NOT NULL,
+    Severity     NVARCHAR(10)   NOT NULL,
+    LoadMode     NVARCHAR(20)   NOT NULL,                 -- 'Full' | 'Incremental'
+    CheckedRows  BIGINT         NOT NULL,
+    FailedRows   BIGINT         NOT NULL,
+    CheckTime    DATETIME2(3)   NOT NULL DEFAULT SYSDATETIME()
+);
+GO
+
+-- سطرهای ردشده با مقدار کامل سطر (JSON) برای بررسی و بارگذاری مجدد دستی
+IF OBJECT_ID('Audit.QuarantineRow','U') IS NULL
+CREATE TABLE Audit.QuarantineRow (
+    QuarantineID  BIGINT IDENTITY(1,1) PRIMARY KEY,
+    RunID         NVARCHAR(64)   NULL,
+    TableName     NVARCHAR(128)  NOT NULL,
+    KeyValue      NVARCHAR(400)  NULL,                    -- مقدار اولین قاعده Unique جدول
+    FailedRules   NVARCHAR(400)  NOT NULL,                -- RuleIDهای نقض‌شده (جداشده با کاما)
+    RowData       NVARCHAR(MAX)  NOT NULL,
+    QuarantinedAt DATETIME2(3)   NOT NULL DEFAULT SYSDATETIME()
+);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ValidationResult_Table' AND object_id = OBJECT_ID('Audit.ValidationResult'))
+    CREATE NONCLUSTERED INDEX IX_ValidationResult_Table ON Audit.ValidationResult(TableName, CheckTime)
+    INCLUDE (RunID, RuleID, FailedRows);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_QuarantineRow_Table' AND object_id = OBJECT_ID('Audit.QuarantineRow'))
+    CREATE NONCLUSTERED INDEX IX_QuarantineRow_Table ON Audit.QuarantineRow(TableName, RunID);
+GO
+
+-- قواعد پیش‌فرض (همان بررسی‌های NULL / تکراری قبلی رویه‌های Load* به علاوه FK و بازه جدول‌های بزرگ)
+MERGE Audit.ValidationRule AS tgt
+USING (VALUES
+    -- Finance
+    ('Finance.Customer',           'NotNull',    'CustomerID',          NULL, NULL, NULL, NULL),
+    ('Finance.Customer',           'NotNull',    'CustomerCode',        NULL, NULL, NULL, NULL),
+    ('Finance.Customer',           'NotNull',    'CustomerName',        NULL, NULL, NULL, NULL),
+    ('Finance.Customer',           'NotNull',    'CustomerType',        NULL, NULL, NULL, NULL),
+    ('Finance.Customer',           'Unique',     'CustomerID',          NULL, NULL, NULL, NULL),
+    ('Finance.BillingCycle',       'NotNull',    'BillingCycleID',      NULL, NULL, NULL, NULL),
+    ('Finance.BillingCycle',       'NotNull',    'CycleName',           NULL, NULL, NULL, NULL),
+    ('Finance.BillingCycle',       'Unique',     'BillingCycleID',      NULL, NULL, NULL, NULL),
+    ('Finance.ServiceType',        'NotNull',    'ServiceTypeID',       NULL, NULL, NULL, NULL),
+    ('Finance.ServiceType',        'NotNull',    'ServiceName',         NULL, NULL, NULL, NULL),
+    ('Finance.ServiceType',        'Unique',     'ServiceTypeID',       NULL, NULL, NULL, NULL),
+    ('Finance.Tax',                'NotNull',    'TaxID',               NULL, NULL, NULL, NULL),
+    ('Finance.Tax',                'NotNull',    'TaxName',             NULL, NULL, NULL, NULL),
+    ('Finance.Tax',                'NotNull',    'TaxRate',             NULL, NULL, NULL, NULL),
+    ('Finance.Tax',                'NotNull',    'TaxType',             NULL, NULL, NULL, NULL),
+    ('Finance.Tax',                'NotNull',    'EffectiveFrom',       NULL, NULL, NULL, NULL),
+    ('Finance.Tax',                'Unique',     'TaxID',               NULL, NULL, NULL, NULL),
+    ('Finance.Tax',                'Range',      'TaxRate',             NULL, NULL, '0', '100'),
+    ('Finance.Tariff',             'NotNull',    'TariffID',            NULL, NULL, NULL, NULL),
+    ('Finance.Tariff',             'NotNull',    'ServiceTypeID',       NULL, NULL, NULL, NULL),
+    ('Finance.Tariff',             'NotNull',    'ValidFrom',           NULL, NULL, NULL, NULL),
+    ('Finance.Tariff',             'NotNull',    'UnitRate',            NULL, NULL, NULL, NULL),
+    ('Finance.Tariff',             'Unique',     'TariffID',            NULL, NULL, NULL, NULL),
+    ('Finance.Contract',           'NotNull',    'ContractID',          NULL, NULL, NULL, NULL),
+    ('Finance.Contract',           'NotNull',    'CustomerID',          NULL, NULL, NULL, NULL),
+    ('Finance.Contract',           'NotNull',    'ContractNumber',      NULL, NULL, NULL, NULL),
+    ('Finance.Contract',           'Unique',     'ContractID',          NULL, NULL, NULL, NULL),
+    ('Finance.Invoice',            'NotNull',    'InvoiceID',           NULL, NULL, NULL, NULL),
+    ('Finance.Invoice',            'NotNull',    'ContractID',          NULL, NULL, NULL, NULL),
+    ('Finance.Invoice',            'NotNull',    'InvoiceNumber',       NULL, NULL, NULL, NULL),
+    ('Finance.Invoice',            'NotNull',    'InvoiceDate',         NULL, NULL, NULL, NULL),
+    ('Finance.Invoice',            'NotNull',    'DueDate',             NULL, NULL, NULL, NULL),
+    ('Finance.Invoice',            'NotNull',    'TotalAmount',         NULL, NULL, NULL, NULL),
+    ('Finance.Invoice',            'NotNull',    'TaxAmount',           NULL, NULL, NULL, NULL),
+    ('Finance.Invoice',            'Unique',     'InvoiceID',           NULL, NULL, NULL, NULL),
+    ('Finance.InvoiceLine',        'NotNull',    'InvoiceLineID',       NULL, NULL, NULL, NULL),
+    ('Finance.InvoiceLine',        'NotNull',    'InvoiceID',           NULL, NULL, NULL, NULL),
+    ('Finance.InvoiceLine',        'NotNull',    'ServiceTypeID',       NULL, NULL, NULL, NULL),
+    ('Finance.InvoiceLine',        'NotNull',    'Quantity',            NULL, NULL, NULL, NULL),
+    ('Finance.InvoiceLine',        'NotNull',    'UnitPrice',           NULL, NULL, NULL, NULL),
+    ('Finance.InvoiceLine',        'NotNull',    'TaxAmount',           NULL, NULL, NULL, NULL),
+    ('Finance.InvoiceLine',        'NotNull',    'NetAmount',           NULL, NULL, NULL, NULL),
+    ('Finance.InvoiceLine',        'Unique',     'InvoiceLineID',       NULL, NULL, NULL, NULL),
+    ('Finance.InvoiceLine',        'ForeignKey', 'InvoiceID',           'Finance.Invoice', 'InvoiceID', NULL, NULL),
+    ('Finance.InvoiceLine',        'ForeignKey', 'ServiceTypeID',       'Finance.ServiceType', 'ServiceTypeID', NULL, NULL),
+    ('Finance.InvoiceLine',        'Range',      'Quantity',            NULL, NULL, '0', NULL),
+    ('Finance.InvoiceLine',        'Range',      'UnitPrice',           NULL, NULL, '0', NULL),
+    ('Finance.InvoiceLine',        'Range',      'DiscountPercent',     NULL, NULL, '0', '100'),
+    ('Finance.Payment',            'NotNull',    'PaymentID',           NULL, NULL, NULL, NULL),
+    ('Finance.Payment',            'NotNull',    'InvoiceID',           NULL, NULL, NULL, NULL),
+    ('Finance.Payment',            'NotNull',    'PaymentDate',         NULL, NULL, NULL, NULL),
+    ('Finance.Payment',            'NotNull',    'Amount',              NULL, NULL, NULL, NULL),
+    ('Finance.Payment',            'NotNull',    'PaymentMethod',       NULL, NULL, NULL, NULL),
+    ('Finance.Payment',            'Unique',     'PaymentID',           NULL, NULL, NULL, NULL),
+    ('Finance.Payment',            'ForeignKey', 'InvoiceID',           'Finance.Invoice', 'InvoiceID', NULL, NULL),
+    ('Finance.Payment',            'Range',      'Amount',              NULL, NULL, '0', NULL),
+    ('Finance.RevenueRecognition', 'NotNull',    'RecognitionID',       NULL, NULL, NULL, NULL),
+    ('Finance.RevenueRecognition', 'NotNull',    'InvoiceID',           NULL, NULL, NULL, NULL),
+    ('Finance.RevenueRecognition', 'NotNull',    'DateRecognized',      NULL, NULL, NULL, NULL),
+    ('Finance.RevenueRecognition', 'NotNull',    'Amount',              NULL, NULL, NULL, NULL),
+    ('Finance.RevenueRecognition', 'Unique',     'RecognitionID',       NULL, NULL, NULL, NULL),
+    ('Finance.RevenueRecognition', 'ForeignKey', 'InvoiceID',           'Finance.Invoice', 'InvoiceID', NULL, NULL),
+    -- HumanResources
+    ('HumanResources.Employee',          'NotNull',    'EmployeeID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.Employee',          'NotBlank',   'FullName',            NULL, NULL, NULL, NULL),
+    ('HumanResources.Employee',          'Unique',     'EmployeeID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.Department',        'NotNull',    'DepartmentID',        NULL, NULL, NULL, NULL),
+    ('HumanResources.Department',        'NotNull',    'DepartmentName',      NULL, NULL, NULL, NULL),
+    ('HumanResources.Department',        'Unique',     'DepartmentID',        NULL, NULL, NULL, NULL),
+    ('HumanResources.JobTitle',          'NotNull',    'JobTitleID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.JobTitle',          'NotNull',    'JobTitleName',        NULL, NULL, NULL, NULL),
+    ('HumanResources.JobTitle',          'Unique',     'JobTitleID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.EmploymentHistory', 'NotNull',    'EmploymentHistoryID', NULL, NULL, NULL, NULL),
+    ('HumanResources.EmploymentHistory', 'NotNull',    'EmployeeID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.EmploymentHistory', 'NotNull',    'JobTitleID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.EmploymentHistory', 'NotNull',    'DepartmentID',        NULL, NULL, NULL, NULL),
+    ('HumanResources.EmploymentHistory', 'NotNull',    'StartDate',           NULL, NULL, NULL, NULL),
+    ('HumanResources.EmploymentHistory', 'Unique',     'EmploymentHistoryID', NULL, NULL, NULL, NULL),
+    ('HumanResources.Termination',       'NotNull',    'TerminationID',       NULL, NULL, NULL, NULL),
+    ('HumanResources.Termination',       'NotNull',    'EmployeeID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.Termination',       'NotNull',    'TerminationDate',     NULL, NULL, NULL, NULL),
+    ('HumanResources.Termination',       'NotNull',    'TerminationReason',   NULL, NULL, NULL, NULL),
+    ('HumanResources.Termination',       'Unique',     'TerminationID',       NULL, NULL, NULL, NULL),
+    ('HumanResources.Attendance',        'NotNull',    'AttendanceID',        NULL, NULL, NULL, NULL),
+    ('HumanResources.Attendance',        'NotNull',    'EmployeeID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.Attendance',        'NotNull',    'AttendanceDate',      NULL, NULL, NULL, NULL),
+    ('HumanResources.Attendance',        'NotNull',    'Status',              NULL, NULL, NULL, NULL),
+    ('HumanResources.Attendance',        'Unique',     'AttendanceID',        NULL, NULL, NULL, NULL),
+    ('HumanResources.Attendance',        'ForeignKey', 'EmployeeID',          'HumanResources.Employee', 'EmployeeID', NULL, NULL),
+    ('HumanResources.Attendance',        'Range',      'HoursWorked',         NULL, NULL, '0', '24'),
+    ('HumanResources.SalaryPayment',     'NotNull',    'SalaryPaymentID',     NULL, NULL, NULL, NULL),
+    ('HumanResources.SalaryPayment',     'NotNull',    'EmployeeID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.SalaryPayment',     'NotNull',    'PaymentDate',         NULL, NULL, NULL, NULL),
+    ('HumanResources.SalaryPayment',     'NotNull',    'Amount',              NULL, NULL, NULL, NULL),
+    ('HumanResources.SalaryPayment',     'NotNull',    'NetAmount',           NULL, NULL, NULL, NULL),
+    ('HumanResources.SalaryPayment',     'Unique',     'SalaryPaymentID',     NULL, NULL, NULL, NULL),
+    ('HumanResources.SalaryPayment',     'ForeignKey', 'EmployeeID',          'HumanResources.Employee', 'EmployeeID', NULL, NULL),
+    ('HumanResources.SalaryPayment',     'Range',      'Amount',              NULL, NULL, '0', NULL),
+    ('HumanResources.TrainingProgram',   'NotNull',    'TrainingProgramID',   NULL, NULL, NULL, NULL),
+    ('HumanResources.TrainingProgram',   'NotNull',    'ProgramName',         NULL, NULL, NULL, NULL),
+    ('HumanResources.TrainingProgram',   'Unique',     'TrainingProgramID',   NULL, NULL, NULL, NULL),
+    ('HumanResources.EmployeeTraining',  'NotNull',    'EmployeeTrainingID',  NULL, NULL, NULL, NULL),
+    ('HumanResources.EmployeeTraining',  'NotNull',    'EmployeeID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.EmployeeTraining',  'NotNull',    'TrainingProgramID',   NULL, NULL, NULL, NULL),
+    ('HumanResources.EmployeeTraining',  'NotNull',    'TrainingDate',        NULL, NULL, NULL, NULL),
+    ('HumanResources.EmployeeTraining',  'NotNull',    'CompletionStatus',    NULL, NULL, NULL, NULL),
+    ('HumanResources.EmployeeTraining',  'Unique',     'EmployeeTrainingID',  NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveType',         'NotNull',    'LeaveTypeID',         NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveType',         'NotNull',    'LeaveTypeName',       NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveType',         'Unique',     'LeaveTypeID',         NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveRequest',      'NotNull',    'LeaveRequestID',      NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveRequest',      'NotNull',    'EmployeeID',          NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveRequest',      'NotNull',    'LeaveTypeID',         NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveRequest',      'NotNull',    'StartDate',           NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveRequest',      'NotNull',    'EndDate',             NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveRequest',      'NotNull',    'Status',              NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveRequest',      'NotNull',    'RequestDate',         NULL, NULL, NULL, NULL),
+    ('HumanResources.LeaveRequest',      'Unique',     'LeaveRequestID',      NULL, NULL, NULL, NULL),
+    -- PortOperations / Common
+    ('PortOperations.ContainerType',         'NotNull',    'ContainerTypeID',   NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerType',         'NotBlank',   'Description',       NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerType',         'NotNull',    'MaxWeightKG',       NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerType',         'Unique',     'ContainerTypeID',   NULL, NULL, NULL, NULL),
+    ('PortOperations.EquipmentType',         'NotNull',    'EquipmentTypeID',   NULL, NULL, NULL, NULL),
+    ('PortOperations.EquipmentType',         'NotBlank',   'Description',       NULL, NULL, NULL, NULL),
+    ('PortOperations.EquipmentType',         'Unique',     'EquipmentTypeID',   NULL, NULL, NULL, NULL),
+    ('PortOperations.Port',                  'NotNull',    'PortID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.Port',                  'NotBlank',   'Name',              NULL, NULL, NULL, NULL),
+    ('PortOperations.Port',                  'Unique',     'PortID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.Ship',                  'NotNull',    'ShipID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.Ship',                  'NotBlank',   'IMO_Number',        NULL, NULL, NULL, NULL),
+    ('PortOperations.Ship',                  'NotBlank',   'Name',              NULL, NULL, NULL, NULL),
+    ('PortOperations.Ship',                  'Unique',     'ShipID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerYardMovement', 'NotNull',    'MovementID',        NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerYardMovement', 'NotNull',    'ContainerID',       NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerYardMovement', 'NotNull',    'YardSlotID',        NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerYardMovement', 'NotBlank',   'MovementType',      NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerYardMovement', 'NotNull',    'MovementDateTime',  NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerYardMovement', 'Unique',     'MovementID',        NULL, NULL, NULL, NULL),
+    ('PortOperations.ContainerYardMovement', 'ForeignKey', 'ContainerID',       'PortOperations.Container', 'ContainerID', NULL, NULL),
+    ('PortOperations.ContainerYardMovement', 'ForeignKey', 'YardSlotID',        'PortOperations.YardSlot', 'YardSlotID', NULL, NULL),
+    ('PortOperations.CargoOperation',        'NotNull',    'CargoOpID',         NULL, NULL, NULL, NULL),
+    ('PortOperations.CargoOperation',        'NotNull',    'PortCallID',        NULL, NULL, NULL, NULL),
+    ('PortOperations.CargoOperation',        'NotNull',    'ContainerID',       NULL, NULL, NULL, NULL),
+    ('PortOperations.CargoOperation',        'NotBlank',   'OperationType',     NULL, NULL, NULL, NULL),
+    ('PortOperations.CargoOperation',        'NotNull',    'OperationDateTime', NULL, NULL, NULL, NULL),
+    ('PortOperations.CargoOperation',        'NotNull',    'Quantity',          NULL, NULL, NULL, NULL),
+    ('PortOperations.CargoOperation',        'NotNull',    'WeightKG',          NULL, NULL, NULL, NULL),
+    ('PortOperations.CargoOperation',        'Unique',     'CargoOpID',         NULL, NULL, NULL, NULL),
+    ('PortOperations.CargoOperation',        'ForeignKey', 'PortCallID',        'PortOperations.PortCall', 'PortCallID', NULL, NULL),
+    ('PortOperations.CargoOperation',        'ForeignKey', 'ContainerID',       'PortOperations.Container', 'ContainerID', NULL, NULL),
+    ('PortOperations.CargoOperation',        'Range',      'Quantity',          NULL, NULL, '0', NULL),
+    ('PortOperations.CargoOperation',        'Range',      'WeightKG',          NULL, NULL, '0', NULL),
+    ('Common.OperationEquipmentAssignment',  'NotNull',    'AssignmentID',      NULL, NULL, NULL, NULL),
+    ('Common.OperationEquipmentAssignment',  'NotNull',    'CargoOpID',         NULL, NULL, NULL, NULL),
+    ('Common.OperationEquipmentAssignment',  'NotNull',    'EquipmentID',       NULL, NULL, NULL, NULL),
+    ('Common.OperationEquipmentAssignment',  'NotNull',    'StartTime',         NULL, NULL, NULL, NULL),
+    ('Common.OperationEquipmentAssignment',  'NotNull',    'EndTime',           NULL, NULL, NULL, NULL),
+    ('Common.OperationEquipmentAssignment',  'Unique',     'AssignmentID',      NULL, NULL, NULL, NULL),
+    ('Common.OperationEquipmentAssignment',  'ForeignKey', 'CargoOpID',         'PortOperations.CargoOperation', 'CargoOpID', NULL, NULL),
+    ('PortOperations.Container',             'NotNull',    'ContainerID',       NULL, NULL, NULL, NULL),
+    ('PortOperations.Container',             'NotNull',    'ContainerNumber',   NULL, NULL, NULL, NULL),
+    ('PortOperations.Container',             'NotNull',    'ContainerTypeID',   NULL, NULL, NULL, NULL),
+    ('PortOperations.Container',             'NotBlank',   'OwnerCompany',      NULL, NULL, NULL, NULL),
+    ('PortOperations.Container',             'Unique',     'ContainerID',       NULL, NULL, NULL, NULL),
+    ('PortOperations.Equipment',             'NotNull',    'EquipmentID',       NULL, NULL, NULL, NULL),
+    ('PortOperations.Equipment',             'NotNull',    'EquipmentTypeID',   NULL, NULL, NULL, NULL),
+    ('PortOperations.Equipment',             'NotBlank',   'Model',             NULL, NULL, NULL, NULL),
+    ('PortOperations.Equipment',             'Unique',     'EquipmentID',       NULL, NULL, NULL, NULL),
+    ('PortOperations.Voyage',                'NotNull',    'VoyageID',          NULL, NULL, NULL, NULL),
+    ('PortOperations.Voyage',                'NotNull',    'ShipID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.Voyage',                'NotNull',    'VoyageNumber',      NULL, NULL, NULL, NULL),
+    ('PortOperations.Voyage',                'Unique',     'VoyageID',          NULL, NULL, NULL, NULL),
+    ('PortOperations.PortCall',              'NotNull',    'PortCallID',        NULL, NULL, NULL, NULL),
+    ('PortOperations.PortCall',              'NotNull',    'VoyageID',          NULL, NULL, NULL, NULL),
+    ('PortOperations.PortCall',              'NotNull',    'PortID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.PortCall',              'NotNull',    'ArrivalDateTime',   NULL, NULL, NULL, NULL),
+    ('PortOperations.PortCall',              'Unique',     'PortCallID',        NULL, NULL, NULL, NULL),
+    ('PortOperations.Berth',                 'NotNull',    'BerthID',           NULL, NULL, NULL, NULL),
+    ('PortOperations.Berth',                 'NotNull',    'PortID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.Berth',                 'NotBlank',   'Name',              NULL, NULL, NULL, NULL),
+    ('PortOperations.Berth',                 'Unique',     'BerthID',           NULL, NULL, NULL, NULL),
+    ('PortOperations.BerthAllocation',       'NotNull',    'AllocationID',      NULL, NULL, NULL, NULL),
+    ('PortOperations.BerthAllocation',       'NotNull',    'PortCallID',        NULL, NULL, NULL, NULL),
+    ('PortOperations.BerthAllocation',       'NotNull',    'BerthID',           NULL, NULL, NULL, NULL),
+    ('PortOperations.BerthAllocation',       'Unique',     'AllocationID',      NULL, NULL, NULL, NULL),
+    ('PortOperations.Yard',                  'NotNull',    'YardID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.Yard',                  'NotNull',    'PortID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.Yard',                  'NotBlank',   'Name',              NULL, NULL, NULL, NULL),
+    ('PortOperations.Yard',                  'Unique',     'YardID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.YardSlot',              'NotNull',    'YardSlotID',        NULL, NULL, NULL, NULL),
+    ('PortOperations.YardSlot',              'NotNull',    'YardID',            NULL, NULL, NULL, NULL),
+    ('PortOperations.YardSlot',              'NotBlank',   'Block',             NULL, NULL, NULL, NULL),
+    ('PortOperations.YardSlot',              'Unique',     'YardSlotID',        NULL, NULL, NULL, NULL),
+    ('Common.Country',                       'NotNull',    'CountryID',         NULL, NULL, NULL, NULL),
+    ('Common.Country',                       'NotBlank',   'CountryName',       NULL, NULL, NULL, NULL),
+    ('Common.Country',                       'Unique',     'CountryID',         NULL, NULL, NULL, NULL)
+) AS src (TableName, RuleType, ColumnName, RefTable, RefColumn, MinValue, MaxValue)
+ON tgt.TableName = src.TableName AND tgt.RuleType = src.RuleType AND tgt.ColumnName = src.ColumnName
+WHEN NOT MATCHED THEN
+    INSERT (TableName, RuleType, ColumnName, RefTable, RefColumn, MinValue, MaxValue)
+    VALUES (src.TableName, src.RuleType, src.ColumnName, src.RefTable, src.RefColumn, src.MinValue, src.MaxValue);
+GO
@@ -1,6 +1,416 @@
 USE StagingDB;
 go
 
+--------------------------------------------------------------------------------
+-- 0) Incremental Staging (watermark)
+--    رویه‌های Load* جدول‌های بزرگ (InvoiceLine، Payment، RevenueRecognition، Attendance،
+--    SalaryPayment، ContainerYardMovement، CargoOperation) با @LoadMode:
+--      NULL          : حالت ثبت‌شده در Audit.ETL_Watermark
+--      'Incremental' : فقط سطرهای جدید/تغییر یافته از آخرین watermark
+--      'Full'        : TRUNCATE و بارگذاری کامل (fallback؛ watermark را هم بازنشانی می‌کند)
+--    اگر هنوز watermark ثبت نشده باشد بارگذاری کامل انجام می‌شود.
+--------------------------------------------------------------------------------
+CREATE OR ALTER FUNCTION Audit.fn_StagingLoadMode
+(
+    @TableName NVARCHAR(128),
+    @LoadMode  NVARCHAR(20)
+)
+RETURNS NVARCHAR(20)
+AS
+BEGIN
+    DECLARE @Mode NVARCHAR(20);
+
+    SELECT @Mode = CASE
+                       WHEN ISNULL(@LoadMode, w.LoadMode) <> 'Incremental' THEN 'Full'
+                       WHEN w.WatermarkType = 'Key' AND w.LastKey IS NOT NULL THEN 'Incremental'
+                       WHEN w.WatermarkType = 'RowVersion' AND w.LastRowVersion IS NOT NULL THEN 'Incremental'
+                       ELSE 'Full'
+                   END
+    FROM Audit.ETL_Watermark AS w
+    WHERE w.TableName = @TableName;
+
+    RETURN ISNULL(@Mode, 'Full');
+END;
+GO
+
+
+-- ثبت پیام در جدول لاگ لایه (Finance.ETLLog | Audit.ETLLog | PortOperations.ETLLog)
+CREATE OR ALTER PROCEDURE Audit.WriteStagingLog
+    @LogTable      NVARCHAR(256),
+    @TableName     NVARCHAR(128),
+    @OperationType NVARCHAR(50),
+    @StartTime     DATETIME,
+    @EndTime       DATETIME,
+    @Message       NVARCHAR(2000)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Sql NVARCHAR(MAX) =
+        N'INSERT INTO ' + QUOTENAME(PARSENAME(@LogTable, 2)) + N'.' + QUOTENAME(PARSENAME(@LogTable, 1)) +
+        N' (TableName, OperationType, StartTime, EndTime, [Message])
+           VALUES (@TableName, @OperationType, @StartTime, @EndTime, @Message);';
+
+    EXEC sp_executesql @Sql,
+        N'@TableName NVARCHAR(128), @OperationType NVARCHAR(50), @StartTime DATETIME, @EndTime DATETIME, @Message NVARCHAR(2000)',
+        @TableName, @OperationType, @StartTime, @EndTime, @Message;
+END;
+GO
+
+
+-- مقداردهی watermark در بارگذاری کامل؛ قبل از کپی داده و داخل همان تراکنش صدا زده می‌شود
+-- تا سطرهایی که هم‌زمان با کپی درج یا تغییر می‌کنند در اجرای افزایشی بعدی دوباره خوانده شوند
+CREATE OR ALTER PROCEDURE Audit.SetStagingWatermark
+    @TableName NVARCHAR(128)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @KeyColumn SYSNAME, @WatermarkType NVARCHAR(20),
+            @LastKey BIGINT, @LastRowVersion BINARY(8), @Sql NVARCHAR(MAX);
+
+    SELECT @KeyColumn = KeyColumn, @WatermarkType = WatermarkType
+    FROM Audit.ETL_Watermark
+    WHERE TableName = @TableName;
+
+    IF @KeyColumn IS NULL RETURN;  -- جدول افزایشی نیست
+
+    IF @WatermarkType = 'RowVersion'
+        EXEC TradePortDB.sys.sp_executesql N'SELECT @v = MIN_ACTIVE_ROWVERSION();',
+            N'@v BINARY(8) OUTPUT', @v = @LastRowVersion OUTPUT;
+
+    SET @Sql = N'SELECT @k = ISNULL(MAX(' + QUOTENAME(@KeyColumn) + N'), 0) FROM TradePortDB.' +
+               QUOTENAME(PARSENAME(@TableName, 2)) + N'.' + QUOTENAME(PARSENAME(@TableName, 1)) + N';';
+    EXEC sp_executesql @Sql, N'@k BIGINT OUTPUT', @k = @LastKey OUTPUT;
+
+    UPDATE Audit.ETL_Watermark
+    SET LastKey        = @LastKey,
+        LastRowVersion = @LastRowVersion,
+        LastLoadMode   = 'Full',
+        LastDeltaRows  = NULL,
+        LastRunStart   = GETDATE(),
+        LastRunEnd     = GETDATE()
+    WHERE TableName = @TableName;
+END;
+GO
+
+
+-- فعال‌سازی change capture برای تغییرات (نه فقط درج‌ها): ستون rowversion به جدول منبع اضافه
+-- و watermark پاک می‌شود تا اجرای بعدی یک بارگذاری کامل برای مقداردهی مرز rowversion باشد
+CREATE OR ALTER PROCEDURE Audit.EnableRowVersionCapture
+    @TableName NVARCHAR(128),
+    @Column    SYSNAME = 'RowVer'
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Object NVARCHAR(300) = QUOTENAME(PARSENAME(@TableName, 2)) + N'.' + QUOTENAME(PARSENAME(@TableName, 1)),
+            @Sql NVARCHAR(MAX);
+
+    IF NOT EXISTS (SELECT 1 FROM Audit.ETL_Watermark WHERE TableName = @TableName)
+        THROW 50200, 'Table is not registered in Audit.ETL_Watermark', 1;
+
+    IF COL_LENGTH(N'TradePortDB.' + @Object, @Column) IS NULL
+    BEGIN
+        SET @Sql = N'ALTER TABLE ' + @Object + N' ADD ' + QUOTENAME(@Column) + N' ROWVERSION;
+                     CREATE NONCLUSTERED INDEX ' + QUOTENAME(N'IX_' + PARSENAME(@TableName, 1) + N'_' + @Column) +
+                   N' ON ' + @Object + N'(' + QUOTENAME(@Column) + N');';
+        EXEC TradePortDB.sys.sp_executesql @Sql;
+    END;
+
+    UPDATE Audit.ETL_Watermark
+    SET WatermarkType = 'RowVersion', WatermarkColumn = @Column, LastKey = NULL, LastRowVersion = NULL
+    WHERE TableName = @TableName;
+END;
+GO
+
+
+--------------------------------------------------------------------------------
+-- 0-1) Staging Validation
+--    قواعد هر جدول در Audit.ValidationRule (4 - SATables.sql) تعریف می‌شوند و همه با هم
+--    در یک پیمایش منبع ارزیابی می‌شوند (به جای یک COUNT جدا برای NULL و یک GROUP BY برای تکرار).
+--    نتیجه هر قاعده در Audit.ValidationResult ثبت و سطرهای ردشده به Audit.QuarantineRow منتقل
+--    می‌شوند؛ بقیه سطرها بارگذاری می‌شوند و اجرا به خاطر یک سطر بد متوقف نمی‌شود.
+--------------------------------------------------------------------------------
+
+-- ساخت SQL اعتبارسنجی از قواعد فعال جدول
+--   @From      : عبارت FROM منبع با نام مستعار src (به همراه شرط delta در حالت افزایشی)
+--   @Columns   : ستون‌های جدول Staging (بدون LoadDate)
+--   @CheckSql  : سطرهای منبع را با پرچم هر قاعده ([_R<RuleID>]) و _Rejected در #Checked می‌ریزد
+--                و @CheckedRows را مقدار می‌دهد
+--   @ResultSql : شمارش خطای هر قاعده در Audit.ValidationResult (یک aggregate روی #Checked) و
+--                انتقال سطرهای ردشده به Audit.QuarantineRow؛ @RejectedRows را مقدار می‌دهد
+-- #Checked محلی batch است، پس فراخواننده هر دو را همراه مرحله بارگذاری در یک sp_executesql اجرا می‌کند.
+CREATE OR ALTER PROCEDURE Audit.BuildValidationSql
+    @TableName NVARCHAR(128),               -- Schema.Table
+    @LoadMode  NVARCHAR(20),                -- 'Full' | 'Incremental' (برای Audit.ValidationResult)
+    @From      NVARCHAR(MAX),
+    @Columns   NVARCHAR(MAX) OUTPUT,
+    @CheckSql  NVARCHAR(MAX) OUTPUT,
+    @ResultSql NVARCHAR(MAX) OUTPUT,
+    @RuleCount INT           OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Target NVARCHAR(300) = N'StagingDB.' + QUOTENAME(PARSENAME(@TableName, 2)) + N'.' + QUOTENAME(PARSENAME(@TableName, 1)),
+            @Literal NVARCHAR(300) = N'N''' + REPLACE(@TableName, N'''', N'''''') + N'''',
+            @JsonColumns NVARCHAR(MAX), @KeyValue NVARCHAR(MAX),
+            @Windows NVARCHAR(MAX), @Flags NVARCHAR(MAX), @RejectSum NVARCHAR(MAX),
+            @Sums NVARCHAR(MAX), @Values NVARCHAR(MAX), @FailedList NVARCHAR(MAX);
+
+    SELECT @Columns     = STRING_AGG(CAST(QUOTENAME(c.name) AS NVARCHAR(MAX)), N', ') WITHIN GROUP (ORDER BY c.column_id),
+           @JsonColumns = STRING_AGG(CAST(N'c.' + QUOTENAME(c.name) AS NVARCHAR(MAX)), N', ') WITHIN GROUP (ORDER BY c.column_id)
+    FROM sys.columns AS c
+    WHERE c.object_id = OBJECT_ID(@Target) AND c.name <> 'LoadDate';
+
+    IF @Columns IS NULL
+        THROW 50210, 'Staging table not found for validation', 1;
+
+    -- هر قاعده: ستون(ها)، شرط نقض روی src و در صورت Unique یک ستون شمارش پنجره‌ای
+    SELECT @RuleCount  = COUNT(*),
+           @Windows    = STRING_AGG(CASE WHEN r.RuleType = 'Unique'
+                                         THEN CAST(N', COUNT(*) OVER (PARTITION BY ' + k.Cols + N') AS [_U' + i.id + N']' AS NVARCHAR(MAX)) END, N'')
+                         WITHIN GROUP (ORDER BY r.RuleID),
+           @Flags      = STRING_AGG(CAST(N'CASE WHEN ' + p.Predicate + N' THEN 1 ELSE 0 END AS [_R' + i.id + N']' AS NVARCHAR(MAX)), N', ')
+                         WITHIN GROUP (ORDER BY r.RuleID),
+           @RejectSum  = STRING_AGG(CASE WHEN r.Severity = 'Reject' THEN CAST(N'f.[_R' + i.id + N']' AS NVARCHAR(MAX)) END, N' + ')
+                         WITHIN GROUP (ORDER BY r.RuleID),
+           @Sums       = STRING_AGG(CAST(N'SUM(CAST([_R' + i.id + N'] AS BIGINT)) AS [_R' + i.id + N']' AS NVARCHAR(MAX)), N', ')
+                         WITHIN GROUP (ORDER BY r.RuleID),
+           @Values     = STRING_AGG(CAST(N'(' + i.id + N', a.[_R' + i.id + N'])' AS NVARCHAR(MAX)), N', ')
+                         WITHIN GROUP (ORDER BY r.RuleID),
+           @FailedList = STRING_AGG(CAST(N'CASE WHEN c.[_R' + i.id + N'] = 1 THEN N''' + i.id + N''' END' AS NVARCHAR(MAX)), N', ')
+                         WITHIN GROUP (ORDER BY r.RuleID)
+    FROM Audit.ValidationRule AS r
+    CROSS APPLY (SELECT CAST(r.RuleID AS NVARCHAR(10)) AS id) AS i
+    CROSS APPLY (SELECT STRING_AGG(CAST(QUOTENAME(LTRIM(RTRIM(s.value))) AS NVARCHAR(MAX)), N', ') AS Cols
+                 FROM STRING_SPLIT(r.ColumnName, ',') AS s) AS k
+    CROSS APPLY (SELECT CASE r.RuleType
+                     WHEN 'NotNull'    THEN N'src.' + k.Cols + N' IS NULL'
+                     WHEN 'NotBlank'   THEN N'src.' + k.Cols + N' IS NULL OR src.' + k.Cols + N' = N'''''
+                     WHEN 'Unique'     THEN N'src.[_U' + i.id + N'] > 1'
+                     WHEN 'ForeignKey' THEN N'src.' + k.Cols + N' IS NOT NULL AND NOT EXISTS (SELECT 1 FROM TradePortDB.' +
+                                            QUOTENAME(PARSENAME(r.RefTable, 2)) + N'.' + QUOTENAME(PARSENAME(r.RefTable, 1)) +
+                                            N' AS ref WHERE ref.' + QUOTENAME(r.RefColumn) + N' = src.' + k.Cols + N')'
+                     WHEN 'Range'      THEN CONCAT_WS(N' OR ', NULL,
+                                            N'src.' + k.Cols + N' < N''' + REPLACE(r.MinValue, N'''', N'''''') + N'''',
+                                            N'src.' + k.Cols + N' > N''' + REPLACE(r.MaxValue, N'''', N'''''') + N'''')
+                 END AS Predicate) AS p
+    WHERE r.TableName = @TableName AND r.IsActive = 1
+      AND (r.RuleType <> 'Range' OR r.MinValue IS NOT NULL OR r.MaxValue IS NOT NULL);
+
+    -- مقدار کلید سطر قرنطینه از اولین قاعده Unique
+    SELECT TOP (1) @KeyValue = N'NULLIF(CONCAT_WS(N''|'', NULL, ' +
+                               (SELECT STRING_AGG(CAST(N'c.' + QUOTENAME(LTRIM(RTRIM(s.value))) AS NVARCHAR(MAX)), N', ')
+                                FROM STRING_SPLIT(r.ColumnName, ',') AS s) + N'), N'''')'
+    FROM Audit.ValidationRule AS r
+    WHERE r.TableName = @TableName AND r.IsActive = 1 AND r.RuleType = 'Unique'
+    ORDER BY r.RuleID;
+
+    IF @RuleCount = 0
+    BEGIN
+        SET @CheckSql =
+            N'SELECT ' + @Columns + N', 0 AS _Rejected INTO #Checked FROM ' + @From + N';
+              SET @CheckedRows = ROWCOUNT_BIG();';
+        SET @ResultSql = N'
+              SET @RejectedRows = 0;';
+        RETURN;
+    END;
+
+    SET @CheckSql =
+        N'SELECT ' + @Columns + N', f.*,
+                 CASE WHEN ' + ISNULL(@RejectSum, N'0') + N' > 0 THEN 1 ELSE 0 END AS _Rejected
+          INTO #Checked
+          FROM (SELECT ' + @Columns + ISNULL(@Windows, N'') + N' FROM ' + @From + N') AS src
+          CROSS APPLY (SELECT ' + @Flags + N') AS f;
+          SET @CheckedRows = ROWCOUNT_BIG();';
+
+    SET @ResultSql = N'
+          INSERT INTO StagingDB.Audit.ValidationResult
+              (RunID, TableName, RuleID, RuleType, ColumnName, Severity, LoadMode, CheckedRows, FailedRows)
+          SELECT CONVERT(NVARCHAR(64), SESSION_CONTEXT(N''ETLRunID'')), r.TableName, r.RuleID, r.RuleType, r.ColumnName,
+                 r.Severity, N''' + @LoadMode + N''', a.CheckedRows, ISNULL(v.FailedRows, 0)
+          FROM (SELECT COUNT_BIG(*) AS CheckedRows, ' + @Sums + N' FROM #Checked) AS a
+          CROSS APPLY (VALUES ' + @Values + N') AS v (RuleID, FailedRows)
+          INNER JOIN StagingDB.Audit.ValidationRule AS r ON r.RuleID = v.RuleID;
+
+          INSERT INTO StagingDB.Audit.QuarantineRow (RunID, TableName, KeyValue, FailedRules, RowData)
+          SELECT CONVERT(NVARCHAR(64), SESSION_CONTEXT(N''ETLRunID'')), ' + @Literal + N',
+                 ' + ISNULL(@KeyValue, N'NULL') + N',
+                 CONCAT_WS(N'','', NULL, ' + @FailedList + N'),
+                 (SELECT ' + @JsonColumns + N' FOR JSON PATH, WITHOUT_ARRAY_WRAPPER, INCLUDE_NULL_VALUES)
+          FROM #Checked AS c
+          WHERE c._Rejected = 1;
+          SET @RejectedRows = ROWCOUNT_BIG();';
+END;
+GO
+
+
+-- بارگذاری کامل با اعتبارسنجی: یک پیمایش TradePortDB، ثبت نتیجه قواعد، قرنطینه سطرهای ردشده
+-- و درج بقیه در Staging. داخل تراکنش رویه Load* و بعد از TRUNCATE / DELETE صدا زده می‌شود؛
+-- مراحل 'Validate' و 'Insert' در جدول لاگ همان لایه ثبت می‌شوند.
+CREATE OR ALTER PROCEDURE Audit.LoadStagingValidated
+    @TableName NVARCHAR(128),               -- Schema.Table (هم‌نام در TradePortDB و StagingDB)
+    @LogTable  NVARCHAR(256),               -- جدول لاگ لایه
+    @LogName   NVARCHAR(128) = NULL         -- نام جدول در لاگ (پیش‌فرض: @TableName)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Source NVARCHAR(300), @Target NVARCHAR(300), @HasLoadDate BIT,
+            @Columns NVARCHAR(MAX), @CheckSql NVARCHAR(MAX), @ResultSql NVARCHAR(MAX), @Sql NVARCHAR(MAX),
+            @RuleCount INT, @CheckedRows BIGINT, @RejectedRows BIGINT, @Inserted BIGINT,
+            @StepStart DATETIME = GETDATE(), @ValidateEnd DATETIME, @StepEnd DATETIME, @Message NVARCHAR(2000);
+
+    SET @LogName = ISNULL(@LogName, @TableName);
+    SET @Source  = N'TradePortDB.' + QUOTENAME(PARSENAME(@TableName, 2)) + N'.' + QUOTENAME(PARSENAME(@TableName, 1));
+    SET @Target  = N'StagingDB.'   + QUOTENAME(PARSENAME(@TableName, 2)) + N'.' + QUOTENAME(PARSENAME(@TableName, 1));
+    SET @HasLoadDate = CASE WHEN COL_LENGTH(@Target, 'LoadDate') IS NULL THEN 0 ELSE 1 END;
+
+    EXEC Audit.BuildValidationSql
+        @TableName = @TableName, @LoadMode = 'Full', @From = @Source + N' AS src',
+        @Columns = @Columns OUTPUT, @CheckSql = @CheckSql OUTPUT, @ResultSql = @ResultSql OUTPUT,
+        @RuleCount = @RuleCount OUTPUT;
+
+    SET @Sql = @CheckSql + @ResultSql + N'
+          SET @ValidateEnd = GETDATE();
+          INSERT INTO ' + @Target + N' (' + @Columns + CASE WHEN @HasLoadDate = 1 THEN N', LoadDate' ELSE N'' END + N')
+          SELECT ' + @Columns + CASE WHEN @HasLoadDate = 1 THEN N', GETDATE()' ELSE N'' END + N'
+          FROM #Checked
+          WHERE _Rejected = 0;
+          SET @Inserted = ROWCOUNT_BIG();';
+
+    EXEC sp_executesql @Sql,
+        N'@CheckedRows BIGINT OUTPUT, @RejectedRows BIGINT OUTPUT, @ValidateEnd DATETIME OUTPUT, @Inserted BIGINT OUTPUT',
+        @CheckedRows OUTPUT, @RejectedRows OUTPUT, @ValidateEnd OUTPUT, @Inserted OUTPUT;
+    SET @StepEnd = GETDATE();
+
+    SET @Message = CONCAT('Checked=', @CheckedRows, ', Rejected=', @RejectedRows, ', Rules=', @RuleCount);
+    EXEC Audit.WriteStagingLog @LogTable, @LogName, 'Validate', @StepStart, @ValidateEnd, @Message;
+    SET @Message = CONCAT('Inserted ', @Inserted, ' rows');
+    EXEC Audit.WriteStagingLog @LogTable, @LogName, 'Insert', @ValidateEnd, @StepEnd, @Message;
+END;
+GO
+
+
+-- بارگذاری افزایشی: delta از TradePortDB خوانده، فقط روی delta با قواعد Audit.ValidationRule
+-- اعتبارسنجی و با upsert روی کلید در Staging اعمال می‌شود؛ سطرهای ردشده قرنطینه می‌شوند و
+-- watermark از آن‌ها هم عبور می‌کند. اندازه delta در جدول لاگ همان لایه ثبت می‌شود
+CREATE OR ALTER PROCEDURE Audit.LoadStagingIncremental
+    @TableName       NVARCHAR(128),          -- Schema.Table (هم‌نام در TradePortDB و StagingDB)
+    @LogTable        NVARCHAR(256),          -- جدول لاگ لایه
+    @LogName         NVARCHAR(128) = NULL    -- نام جدول در لاگ (پیش‌فرض: @TableName)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @KeyColumn SYSNAME, @WatermarkType NVARCHAR(20), @WatermarkColumn SYSNAME,
+            @LastKey BIGINT, @ToKey BIGINT, @LastRowVersion BINARY(8), @ToRowVersion BINARY(8),
+            @Source NVARCHAR(300), @Target NVARCHAR(300), @HasLoadDate BIT,
+            @Columns NVARCHAR(MAX), @SetList NVARCHAR(MAX), @Filter NVARCHAR(MAX),
+            @CheckSql NVARCHAR(MAX), @ResultSql NVARCHAR(MAX), @RuleCount INT,
+            @Sql NVARCHAR(MAX), @DeltaRows BIGINT, @RejectedRows BIGINT, @Inserted INT, @Updated INT,
+            @RunStart DATETIME = GETDATE(), @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(2000);
+
+    SET @LogName = ISNULL(@LogName, @TableName);
+    SET @Source  = N'TradePortDB.' + QUOTENAME(PARSENAME(@TableName, 2)) + N'.' + QUOTENAME(PARSENAME(@TableName, 1));
+    SET @Target  = N'StagingDB.'   + QUOTENAME(PARSENAME(@TableName, 2)) + N'.' + QUOTENAME(PARSENAME(@TableName, 1));
+
+    BEGIN TRY
+        BEGIN TRAN;
+
+        -- STEP 1: خواندن watermark (با قفل تا اجرای هم‌زمان همان جدول ممکن نباشد)
+        SET @StepStart = GETDATE();
+        SELECT @KeyColumn = KeyColumn, @WatermarkType = WatermarkType, @WatermarkColumn = WatermarkColumn,
+               @LastKey = LastKey, @LastRowVersion = LastRowVersion
+        FROM Audit.ETL_Watermark WITH (UPDLOCK, HOLDLOCK)
+        WHERE TableName = @TableName;
+
+        IF @KeyColumn IS NULL
+            THROW 50201, 'Table is not registered in Audit.ETL_Watermark', 1;
+
+        -- ستون‌های به‌روزرسانی Staging (بدون کلید و LoadDate)
+        SELECT @SetList = STRING_AGG(CASE WHEN c.name <> @KeyColumn
+                                          THEN CAST(QUOTENAME(c.name) + N' = d.' + QUOTENAME(c.name) AS NVARCHAR(MAX)) END, N', ')
+                          WITHIN GROUP (ORDER BY c.column_id)
+        FROM sys.columns AS c
+        WHERE c.object_id = OBJECT_ID(@Target) AND c.name <> 'LoadDate';
+        SET @HasLoadDate = CASE WHEN COL_LENGTH(@Target, 'LoadDate') IS NULL THEN 0 ELSE 1 END;
+
+        -- مرز بالای delta؛ سطرهایی که بعد از آن درج/تغییر کنند به اجرای بعدی می‌رسند
+        IF @WatermarkType = 'RowVersion'
+        BEGIN
+            EXEC TradePortDB.sys.sp_executesql N'SELECT @v = MIN_ACTIVE_ROWVERSION();',
+                N'@v BINARY(8) OUTPUT', @v = @ToRowVersion OUTPUT;
+            SET @Filter = N'src.' + QUOTENAME(@WatermarkColumn) + N' >= @LastRowVersion AND src.' +
+                          QUOTENAME(@WatermarkColumn) + N' < @ToRowVersion';
+        END
+        ELSE
+        BEGIN
+            SET @Sql = N'SELECT @k = ISNULL(MAX(' + QUOTENAME(@KeyColumn) + N'), 0) FROM ' + @Source + N';';
+            EXEC sp_executesql @Sql, N'@k BIGINT OUTPUT', @k = @ToKey OUTPUT;
+            SET @Filter = N'src.' + QUOTENAME(@KeyColumn) + N' > @LastKey AND src.' + QUOTENAME(@KeyColumn) + N' <= @ToKey';
+        END;
+
+        -- STEP 2: استخراج و اعتبارسنجی delta در یک پیمایش (#Checked)
+        EXEC Audit.BuildValidationSql
+            @TableName = @TableName, @LoadMode = 'Incremental', @From = @Source + N' AS src WHERE ' + @Filter,
+            @Columns = @Columns OUTPUT, @CheckSql = @CheckSql OUTPUT, @ResultSql = @ResultSql OUTPUT,
+            @RuleCount = @RuleCount OUTPUT;
+
+        SET @Sql = @CheckSql + N'
+              CREATE CLUSTERED INDEX IX_Checked_Key ON #Checked(' + QUOTENAME(@KeyColumn) + N');' + @ResultSql +
+
+            -- STEP 3: upsert در Staging (به‌روزرسانی فقط برای change capture با rowversion)
+            CASE WHEN @WatermarkType = 'RowVersion' THEN N'
+              UPDATE tgt SET ' + @SetList + CASE WHEN @HasLoadDate = 1 THEN N', LoadDate = GETDATE()' ELSE N'' END + N'
+              FROM ' + @Target + N' AS tgt
+              INNER JOIN #Checked AS d ON d.' + QUOTENAME(@KeyColumn) + N' = tgt.' + QUOTENAME(@KeyColumn) + N'
+              WHERE d._Rejected = 0;
+              SET @Updated = @@ROWCOUNT;'
+            ELSE N'
+              SET @Updated = 0;' END + N'
+              INSERT INTO ' + @Target + N' (' + @Columns + CASE WHEN @HasLoadDate = 1 THEN N', LoadDate' ELSE N'' END + N')
+              SELECT ' + @Columns + CASE WHEN @HasLoadDate = 1 THEN N', GETDATE()' ELSE N'' END + N'
+              FROM #Checked AS d
+              WHERE d._Rejected = 0
+                AND NOT EXISTS (SELECT 1 FROM ' + @Target + N' AS tgt
+                                WHERE tgt.' + QUOTENAME(@KeyColumn) + N' = d.' + QUOTENAME(@KeyColumn) + N');
+              SET @Inserted = @@ROWCOUNT;';
+
+        EXEC sp_executesql @Sql,
+            N'@LastKey BIGINT, @ToKey BIGINT, @LastRowVersion BINARY(8), @ToRowVersion BINARY(8),
+              @CheckedRows BIGINT OUTPUT, @RejectedRows BIGINT OUTPUT, @Inserted INT OUTPUT, @Updated INT OUTPUT',
+            @LastKey, @ToKey, @LastRowVersion, @ToRowVersion,
+            @DeltaRows OUTPUT, @RejectedRows OUTPUT, @Inserted OUTPUT, @Updated OUTPUT;
+
+        -- STEP 4: پیش بردن watermark و ثبت اندازه delta
+        SET @StepEnd = GETDATE();
+        UPDATE Audit.ETL_Watermark
+        SET LastKey        = CASE WHEN @WatermarkType = 'Key' THEN @ToKey ELSE LastKey END,
+            LastRowVersion = CASE WHEN @WatermarkType = 'RowVersion' THEN @ToRowVersion ELSE LastRowVersion END,
+            LastLoadMode   = 'Incremental',
+            LastDeltaRows  = @DeltaRows,
+            LastRunStart   = @RunStart,
+            LastRunEnd     = @StepEnd
+        WHERE TableName = @TableName;
+
+        -- تعداد نوشته‌شده اولین عدد پیام است (Audit.fn_MessageRowCount)
+        SET @Message = CONCAT('Written ', @Inserted + @Updated, ' rows (Inserted=', @Inserted, ', Updated=', @Updated,
+                              '), Delta=', @DeltaRows, ', Rejected=', @RejectedRows, ', watermark ',
+                              CASE WHEN @WatermarkType = 'Key'
+                                   THEN CONCAT(@KeyColumn, ' ', @LastKey, ' -> ', @ToKey)
+                                   ELSE CONCAT(@WatermarkColumn, ' ', CONVERT(VARCHAR(18), @LastRowVersion, 1),
+                                               ' -> ', CONVERT(VARCHAR(18), @ToRowVersion, 1)) END);
+        EXEC Audit.WriteStagingLog @LogTable, @LogName, 'Incremental', @StepStart, @StepEnd, @Message;
+        COMMIT;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0 ROLLBACK;
+        SET @StepEnd = GETDATE();
+        SET @Message = ERROR_MESSAGE();
+        EXEC Audit.WriteStagingLog @LogTable, @LogName, 'Error', @StepStart, @StepEnd, @Message;
+        THROW;
+    END CATCH;
+END;
+GO
+
+
 -------------------------------------------------------------------------------
 -- 1) LoadFinanceCustomer
 --------------------------------------------------------------------------------
@@ -8,8 +418,7 @@ CREATE OR ALTER PROCEDURE Finance.LoadFinanceCustomer
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.Customer',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
 
     BEGIN TRY
         BEGIN TRAN;
@@ -21,44 +430,12 @@ BEGIN
         INSERT INTO StagingDB.Finance.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
             VALUES (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated Finance.Customer');
 
-        -- STEP 2: VALIDATE SOURCE
-        SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.Finance.Customer AS src
-        WHERE src.CustomerID   IS NULL
-           OR src.CustomerCode IS NULL
-           OR src.CustomerName IS NULL
-           OR src.CustomerType IS NULL;
-        IF @NullCount > 0
-            THROW 51000, 'Validation failed: NULLs in Finance.Customer', 1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT CustomerID FROM Finance.Customer
-            GROUP BY CustomerID
-            HAVING COUNT(*) > 1
-        ) AS d;
-        IF @DupCount > 0
-            THROW 51001, 'Validation failed: Duplicates in Finance.Customer', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog VALUES(@TableName,'Validate',@StepStart,@StepEnd,
-            CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        -- STEP 3: INSERT DATA
+        -- STEP 2: VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.Customer (
-            CustomerID, CustomerCode, CustomerName, CustomerType,
-            TIN, VATNumber, Phone, Email, [Address], CountryID, LoadDate
-        )
-        SELECT
-            CustomerID, CustomerCode, CustomerName, CustomerType,
-            TIN, VATNumber, Phone, Email, [Address], CountryID, GETDATE()
-        FROM TradePortDB.Finance.Customer;  -- فرض جدول منبع Finance.Customer_Source
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog VALUES(@TableName,'Insert',@StepStart,@StepEnd,
-            CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.Customer',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -79,8 +456,7 @@ CREATE OR ALTER PROCEDURE Finance.LoadFinanceBillingCycle
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.BillingCycle',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
     BEGIN TRY
         BEGIN TRAN;
         SET @StepStart = GETDATE();
@@ -88,20 +464,13 @@ BEGIN
         SET @StepEnd = GETDATE();
         INSERT INTO StagingDB.Finance.ETLLog VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) FROM TradePortDB.Finance.BillingCycle
-        WHERE BillingCycleID IS NULL OR CycleName IS NULL;
-        SELECT @DupCount = COUNT(*) FROM (SELECT BillingCycleID FROM TradePortDB.Finance.BillingCycle GROUP BY BillingCycleID HAVING COUNT(*) > 1) x;
-        IF @NullCount > 0 THROW 52000, 'Validation failed: NULLs in BillingCycle', 1;
-        IF @DupCount > 0 THROW 52001, 'Validation failed: Duplicates in BillingCycle', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.BillingCycle',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.BillingCycle
-        SELECT *, GETDATE() FROM TradePortDB.Finance.BillingCycle;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -121,8 +490,7 @@ CREATE OR ALTER PROCEDURE Finance.LoadFinanceServiceType
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.ServiceType',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
     BEGIN TRY
         BEGIN TRAN;
         SET @StepStart = GETDATE();
@@ -130,20 +498,13 @@ BEGIN
         SET @StepEnd = GETDATE();
         INSERT INTO StagingDB.Finance.ETLLog VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) FROM TradePortDB.Finance.ServiceType
-        WHERE ServiceTypeID IS NULL OR ServiceName IS NULL;
-        SELECT @DupCount = COUNT(*) FROM (SELECT ServiceTypeID FROM TradePortDB.Finance.ServiceType GROUP BY ServiceTypeID HAVING COUNT(*) > 1) x;
-        IF @NullCount > 0 THROW 53000, 'Validation failed: NULLs in ServiceType', 1;
-        IF @DupCount > 0 THROW 53001, 'Validation failed: Duplicates in ServiceType', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.ServiceType',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.ServiceType
-        SELECT *, GETDATE() FROM TradePortDB.Finance.ServiceType;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -163,8 +524,7 @@ CREATE OR ALTER PROCEDURE Finance.LoadFinanceTax
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.Tax',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
     BEGIN TRY
         BEGIN TRAN;
         SET @StepStart = GETDATE();
@@ -172,20 +532,13 @@ BEGIN
         SET @StepEnd = GETDATE();
         INSERT INTO StagingDB.Finance.ETLLog VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) FROM TradePortDB.Finance.Tax
-        WHERE TaxID IS NULL OR TaxName IS NULL OR TaxRate IS NULL OR TaxType IS NULL OR EffectiveFrom IS NULL;
-        SELECT @DupCount = COUNT(*) FROM (SELECT TaxID FROM TradePortDB.Finance.Tax GROUP BY TaxID HAVING COUNT(*) > 1) x;
-        IF @NullCount > 0 THROW 54000, 'Validation failed: NULLs in Tax', 1;
-        IF @DupCount > 0 THROW 54001, 'Validation failed: Duplicates in Tax', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.Tax',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.Tax
-        SELECT *, GETDATE() FROM TradePortDB.Finance.Tax;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -205,8 +558,7 @@ CREATE OR ALTER PROCEDURE Finance.LoadFinanceTariff
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.Tariff',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
 
     BEGIN TRY
         BEGIN TRAN;
@@ -218,29 +570,12 @@ BEGIN
         INSERT INTO StagingDB.Finance.ETLLog 
         VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated');
 
-        -- Step 2: Validate
-        SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) FROM TradePortDB.Finance.Tariff
-        WHERE TariffID IS NULL OR ServiceTypeID IS NULL OR ValidFrom IS NULL OR UnitRate IS NULL;
-
-        SELECT @DupCount = COUNT(*) FROM (
-            SELECT TariffID FROM TradePortDB.Finance.Tariff GROUP BY TariffID HAVING COUNT(*) > 1
-        ) x;
-
-        IF @NullCount > 0 THROW 55000, 'Validation failed: NULLs in Tariff', 1;
-        IF @DupCount > 0 THROW 55001, 'Validation failed: Duplicates in Tariff', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        -- Step 3: Insert
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.Tariff
-        SELECT *, GETDATE() FROM TradePortDB.Finance.Tariff;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.Tariff',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -263,8 +598,7 @@ CREATE OR ALTER PROCEDURE Finance.LoadFinanceContract
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.Contract',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
 
     BEGIN TRY
         BEGIN TRAN;
@@ -275,27 +609,12 @@ BEGIN
         INSERT INTO StagingDB.Finance.ETLLog 
         VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) FROM TradePortDB.Finance.Contract
-        WHERE ContractID IS NULL OR CustomerID IS NULL OR ContractNumber IS NULL;
-
-        SELECT @DupCount = COUNT(*) FROM (
-            SELECT ContractID FROM TradePortDB.Finance.Contract GROUP BY ContractID HAVING COUNT(*) > 1
-        ) x;
-
-        IF @NullCount > 0 THROW 56000, 'Validation failed: NULLs in Contract', 1;
-        IF @DupCount > 0 THROW 56001, 'Validation failed: Duplicates in Contract', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.Contract
-        SELECT *, GETDATE() FROM TradePortDB.Finance.Contract;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.Contract',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -318,8 +637,7 @@ CREATE OR ALTER PROCEDURE Finance.LoadFinanceInvoice
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.Invoice',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
 
     BEGIN TRY
         BEGIN TRAN;
@@ -329,27 +647,13 @@ BEGIN
         INSERT INTO StagingDB.Finance.ETLLog 
         VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) FROM TradePortDB.Finance.Invoice
-        WHERE InvoiceID IS NULL OR ContractID IS NULL OR InvoiceNumber IS NULL OR InvoiceDate IS NULL OR DueDate IS NULL OR TotalAmount IS NULL OR TaxAmount IS NULL;
-
-        SELECT @DupCount = COUNT(*) FROM (
-            SELECT InvoiceID FROM TradePortDB.Finance.Invoice GROUP BY InvoiceID HAVING COUNT(*) > 1
-        ) x;
-
-        IF @NullCount > 0 THROW 57000, 'Validation failed: NULLs in Invoice', 1;
-        IF @DupCount > 0 THROW 57001, 'Validation failed: Duplicates in Invoice', 1;
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.Invoice',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.Invoice
-        SELECT *, GETDATE() FROM TradePortDB.Finance.Invoice;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -368,41 +672,38 @@ GO
 -- 8) LoadFinanceInvoiceLine
 --------------------------------------------------------------------------------
 CREATE OR ALTER PROCEDURE Finance.LoadFinanceInvoiceLine
+    @LoadMode NVARCHAR(20) = NULL   -- NULL: از Audit.ETL_Watermark | 'Incremental' | 'Full'
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.InvoiceLine',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
+
+    -- حالت افزایشی: فقط delta از آخرین watermark (Audit.ETL_Watermark)
+    IF Audit.fn_StagingLoadMode('Finance.InvoiceLine', @LoadMode) = 'Incremental'
+    BEGIN
+        EXEC Audit.LoadStagingIncremental
+            @TableName = 'Finance.InvoiceLine',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
+        RETURN;
+    END;
 
     BEGIN TRY
         BEGIN TRAN;
         SET @StepStart = GETDATE();
         TRUNCATE TABLE StagingDB.Finance.InvoiceLine;
+        EXEC Audit.SetStagingWatermark @TableName = 'Finance.InvoiceLine';
         SET @StepEnd = GETDATE();
         INSERT INTO StagingDB.Finance.ETLLog 
         VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) FROM TradePortDB.Finance.InvoiceLine
-        WHERE InvoiceLineID IS NULL OR InvoiceID IS NULL OR ServiceTypeID IS NULL OR Quantity IS NULL OR UnitPrice IS NULL OR TaxAmount IS NULL OR NetAmount IS NULL;
-
-        SELECT @DupCount = COUNT(*) FROM (
-            SELECT InvoiceLineID FROM TradePortDB.Finance.InvoiceLine GROUP BY InvoiceLineID HAVING COUNT(*) > 1
-        ) x;
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.InvoiceLine',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
-        IF @NullCount > 0 THROW 58000, 'Validation failed: NULLs in InvoiceLine', 1;
-        IF @DupCount > 0 THROW 58001, 'Validation failed: Duplicates in InvoiceLine', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.InvoiceLine
-        SELECT *, GETDATE() FROM TradePortDB.Finance.InvoiceLine;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -421,41 +722,38 @@ GO
 -- 9) LoadFinancePayment
 --------------------------------------------------------------------------------
 CREATE OR ALTER PROCEDURE Finance.LoadFinancePayment
+    @LoadMode NVARCHAR(20) = NULL   -- NULL: از Audit.ETL_Watermark | 'Incremental' | 'Full'
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.Payment',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
+
+    -- حالت افزایشی: فقط delta از آخرین watermark (Audit.ETL_Watermark)
+    IF Audit.fn_StagingLoadMode('Finance.Payment', @LoadMode) = 'Incremental'
+    BEGIN
+        EXEC Audit.LoadStagingIncremental
+            @TableName = 'Finance.Payment',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
+        RETURN;
+    END;
 
     BEGIN TRY
         BEGIN TRAN;
         SET @StepStart = GETDATE();
         TRUNCATE TABLE StagingDB.Finance.Payment;
+        EXEC Audit.SetStagingWatermark @TableName = 'Finance.Payment';
         SET @StepEnd = GETDATE();
         INSERT INTO StagingDB.Finance.ETLLog 
         VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) FROM TradePortDB.Finance.Payment
-        WHERE PaymentID IS NULL OR InvoiceID IS NULL OR PaymentDate IS NULL OR Amount IS NULL OR PaymentMethod IS NULL;
-
-        SELECT @DupCount = COUNT(*) FROM (
-            SELECT PaymentID FROM TradePortDB.Finance.Payment GROUP BY PaymentID HAVING COUNT(*) > 1
-        ) x;
-
-        IF @NullCount > 0 THROW 59000, 'Validation failed: NULLs in Payment', 1;
-        IF @DupCount > 0 THROW 59001, 'Validation failed: Duplicates in Payment', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.Payment',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.Payment
-        SELECT *, GETDATE() FROM TradePortDB.Finance.Payment;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -474,41 +772,38 @@ GO
 -- 10) LoadFinanceRevenueRecognition
 --------------------------------------------------------------------------------
 CREATE OR ALTER PROCEDURE Finance.LoadFinanceRevenueRecognition
+    @LoadMode NVARCHAR(20) = NULL   -- NULL: از Audit.ETL_Watermark | 'Incremental' | 'Full'
 AS
 BEGIN
     DECLARE @TableName NVARCHAR(128) = 'StagingDB.Finance.RevenueRecognition',
-            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000),
-            @NullCount INT, @DupCount INT;
+            @StepStart DATETIME, @StepEnd DATETIME, @Message NVARCHAR(1000);
+
+    -- حالت افزایشی: فقط delta از آخرین watermark (Audit.ETL_Watermark)
+    IF Audit.fn_StagingLoadMode('Finance.RevenueRecognition', @LoadMode) = 'Incremental'
+    BEGIN
+        EXEC Audit.LoadStagingIncremental
+            @TableName = 'Finance.RevenueRecognition',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
+        RETURN;
+    END;
 
     BEGIN TRY
         BEGIN TRAN;
         SET @StepStart = GETDATE();
         TRUNCATE TABLE StagingDB.Finance.RevenueRecognition;
+        EXEC Audit.SetStagingWatermark @TableName = 'Finance.RevenueRecognition';
         SET @StepEnd = GETDATE();
         INSERT INTO StagingDB.Finance.ETLLog 
         VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) FROM TradePortDB.Finance.RevenueRecognition
-        WHERE RecognitionID IS NULL OR InvoiceID IS NULL OR DateRecognized IS NULL OR Amount IS NULL;
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Finance.RevenueRecognition',
+            @LogTable  = 'Finance.ETLLog',
+            @LogName   = @TableName;
 
-        SELECT @DupCount = COUNT(*) FROM (
-            SELECT RecognitionID FROM TradePortDB.Finance.RevenueRecognition GROUP BY RecognitionID HAVING COUNT(*) > 1
-        ) x;
-
-        IF @NullCount > 0 THROW 60000, 'Validation failed: NULLs in RevenueRecognition', 1;
-        IF @DupCount > 0 THROW 60001, 'Validation failed: Duplicates in RevenueRecognition', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO StagingDB.Finance.RevenueRecognition
-        SELECT *, GETDATE() FROM TradePortDB.Finance.RevenueRecognition;
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.Finance.ETLLog 
-        VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -536,8 +831,6 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -550,44 +843,12 @@ BEGIN
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, @Message);
 
-        -- STEP 2: VALIDATE SOURCE
-        SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.Employee
-        WHERE EmployeeID IS NULL OR FullName IS NULL;
-        IF @NullCount > 0
-            THROW 51000, 'Validation failed: NULLs found in critical columns of HumanResources.Employee', 1;
-        
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT EmployeeID, COUNT(*) cnt 
-            FROM TradePortDB.HumanResources.Employee 
-            GROUP BY EmployeeID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0
-            THROW 51001, 'Validation failed: Duplicate EmployeeIDs found in HumanResources.Employee', 1;
-        
-        SET @StepEnd = GETDATE();
-        SET @Message = CONCAT('Validation successful. Nulls found: ', @NullCount, ', Duplicates found: ', @DupCount);
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, @Message);
-
-        -- STEP 3: INSERT DATA
+        -- STEP 2: VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.Employee (
-            EmployeeID, FullName, Position, NationalID, HireDate, BirthDate, 
-            Gender, MaritalStatus, Address, Phone, Email, EmploymentStatus, LoadDate
-        )
-        SELECT
-            EmployeeID, FullName, Position, NationalID, HireDate, BirthDate, 
-            Gender, MaritalStatus, Address, Phone, Email, EmploymentStatus, GETDATE()
-        FROM TradePortDB.HumanResources.Employee;
-        
-        SET @StepEnd = GETDATE();
-        SET @Message = CONCAT('Inserted ', @@ROWCOUNT, ' rows');
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, @Message);
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.Employee',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -613,8 +874,6 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -624,32 +883,13 @@ BEGIN
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.Department');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.Department 
-        WHERE DepartmentID IS NULL OR DepartmentName IS NULL;
-        IF @NullCount > 0 
-            THROW 52000, 'NULLs found in critical columns of HumanResources.Department', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT DepartmentID 
-            FROM TradePortDB.HumanResources.Department 
-            GROUP BY DepartmentID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 52001, 'Duplicate DepartmentIDs found in HumanResources.Department', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.Department',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.Department (DepartmentID, DepartmentName, ManagerID, IsActive, LoadDate)
-        SELECT DepartmentID, DepartmentName, ManagerID, IsActive, GETDATE()
-        FROM TradePortDB.HumanResources.Department;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -673,8 +913,6 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -684,32 +922,13 @@ BEGIN
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.JobTitle');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.JobTitle 
-        WHERE JobTitleID IS NULL OR JobTitleName IS NULL;
-        IF @NullCount > 0 
-            THROW 53000, 'NULLs found in critical columns of HumanResources.JobTitle', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT JobTitleID 
-            FROM TradePortDB.HumanResources.JobTitle 
-            GROUP BY JobTitleID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 53001, 'Duplicate JobTitleIDs found in HumanResources.JobTitle', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.JobTitle',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.JobTitle (JobTitleID, JobTitleName, JobCategory, BaseSalary, IsActive, LoadDate)
-        SELECT JobTitleID, JobTitleName, JobCategory, BaseSalary, IsActive, GETDATE()
-        FROM TradePortDB.HumanResources.JobTitle;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -733,8 +952,6 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -744,32 +961,13 @@ BEGIN
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.EmploymentHistory');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.EmploymentHistory 
-        WHERE EmploymentHistoryID IS NULL OR EmployeeID IS NULL OR JobTitleID IS NULL OR DepartmentID IS NULL OR StartDate IS NULL;
-        IF @NullCount > 0 
-            THROW 54000, 'NULLs found in critical columns of HumanResources.EmploymentHistory', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT EmploymentHistoryID 
-            FROM TradePortDB.HumanResources.EmploymentHistory 
-            GROUP BY EmploymentHistoryID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 54001, 'Duplicate EmploymentHistoryIDs found', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.EmploymentHistory',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.EmploymentHistory (EmploymentHistoryID, EmployeeID, JobTitleID, DepartmentID, StartDate, EndDate, Salary, EmploymentType, LoadDate)
-        SELECT EmploymentHistoryID, EmployeeID, JobTitleID, DepartmentID, StartDate, EndDate, Salary, EmploymentType, GETDATE()
-        FROM TradePortDB.HumanResources.EmploymentHistory;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -793,8 +991,6 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -804,32 +1000,13 @@ BEGIN
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.Termination');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.Termination 
-        WHERE TerminationID IS NULL OR EmployeeID IS NULL OR TerminationDate IS NULL OR TerminationReason IS NULL;
-        IF @NullCount > 0 
-            THROW 55000, 'NULLs found in critical columns of HumanResources.Termination', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT TerminationID 
-            FROM TradePortDB.HumanResources.Termination 
-            GROUP BY TerminationID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 55001, 'Duplicate TerminationIDs found', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.Termination',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.Termination (TerminationID, EmployeeID, TerminationDate, TerminationReason, Notes, LoadDate)
-        SELECT TerminationID, EmployeeID, TerminationDate, TerminationReason, Notes, GETDATE()
-        FROM TradePortDB.HumanResources.Termination;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -846,6 +1023,7 @@ GO
 -- 6) LoadSAAttendance
 --------------------------------------------------------------------------------
 CREATE OR ALTER PROCEDURE HumanResources.LoadSAAttendance
+    @LoadMode NVARCHAR(20) = NULL   -- NULL: از Audit.ETL_Watermark | 'Incremental' | 'Full'
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -853,43 +1031,33 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
+
+    -- حالت افزایشی: فقط delta از آخرین watermark (Audit.ETL_Watermark)
+    IF Audit.fn_StagingLoadMode('HumanResources.Attendance', @LoadMode) = 'Incremental'
+    BEGIN
+        EXEC Audit.LoadStagingIncremental
+            @TableName = 'HumanResources.Attendance',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
+        RETURN;
+    END;
 
     BEGIN TRY
         BEGIN TRAN;
         SET @StepStart = GETDATE();
         TRUNCATE TABLE HumanResources.Attendance;
+        EXEC Audit.SetStagingWatermark @TableName = 'HumanResources.Attendance';
         SET @StepEnd = GETDATE();
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.Attendance');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.Attendance 
-        WHERE AttendanceID IS NULL OR EmployeeID IS NULL OR AttendanceDate IS NULL OR Status IS NULL;
-        IF @NullCount > 0 
-            THROW 56000, 'NULLs found in critical columns of HumanResources.Attendance', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT AttendanceID 
-            FROM TradePortDB.HumanResources.Attendance 
-            GROUP BY AttendanceID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 56001, 'Duplicate AttendanceIDs found', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.Attendance',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.Attendance (AttendanceID, EmployeeID, AttendanceDate, Status, CheckInTime, CheckOutTime, HoursWorked, Notes, LoadDate)
-        SELECT AttendanceID, EmployeeID, AttendanceDate, Status, CheckInTime, CheckOutTime, HoursWorked, Notes, GETDATE()
-        FROM TradePortDB.HumanResources.Attendance;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -906,6 +1074,7 @@ GO
 -- 7) LoadSASalaryPayment
 --------------------------------------------------------------------------------
 CREATE OR ALTER PROCEDURE HumanResources.LoadSASalaryPayment
+    @LoadMode NVARCHAR(20) = NULL   -- NULL: از Audit.ETL_Watermark | 'Incremental' | 'Full'
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -913,43 +1082,33 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
+
+    -- حالت افزایشی: فقط delta از آخرین watermark (Audit.ETL_Watermark)
+    IF Audit.fn_StagingLoadMode('HumanResources.SalaryPayment', @LoadMode) = 'Incremental'
+    BEGIN
+        EXEC Audit.LoadStagingIncremental
+            @TableName = 'HumanResources.SalaryPayment',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
+        RETURN;
+    END;
 
     BEGIN TRY
         BEGIN TRAN;
         SET @StepStart = GETDATE();
         TRUNCATE TABLE HumanResources.SalaryPayment;
+        EXEC Audit.SetStagingWatermark @TableName = 'HumanResources.SalaryPayment';
         SET @StepEnd = GETDATE();
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.SalaryPayment');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.SalaryPayment 
-        WHERE SalaryPaymentID IS NULL OR EmployeeID IS NULL OR PaymentDate IS NULL OR Amount IS NULL OR NetAmount IS NULL;
-        IF @NullCount > 0 
-            THROW 57000, 'NULLs found in critical columns of HumanResources.SalaryPayment', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT SalaryPaymentID 
-            FROM TradePortDB.HumanResources.SalaryPayment 
-            GROUP BY SalaryPaymentID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 57001, 'Duplicate SalaryPaymentIDs found', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.SalaryPayment',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.SalaryPayment (SalaryPaymentID, EmployeeID, PaymentDate, Amount, Bonus, Deductions, NetAmount, PaymentMethod, ReferenceNumber, LoadDate)
-        SELECT SalaryPaymentID, EmployeeID, PaymentDate, Amount, Bonus, Deductions, NetAmount, PaymentMethod, ReferenceNumber, GETDATE()
-        FROM TradePortDB.HumanResources.SalaryPayment;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -973,8 +1132,6 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -984,32 +1141,13 @@ BEGIN
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.TrainingProgram');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.TrainingProgram 
-        WHERE TrainingProgramID IS NULL OR ProgramName IS NULL;
-        IF @NullCount > 0 
-            THROW 58000, 'NULLs found in critical columns of HumanResources.TrainingProgram', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT TrainingProgramID 
-            FROM TradePortDB.HumanResources.TrainingProgram 
-            GROUP BY TrainingProgramID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 58001, 'Duplicate TrainingProgramIDs found', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.TrainingProgram',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.TrainingProgram (TrainingProgramID, ProgramName, Category, DurationHours, Cost, IsActive, LoadDate)
-        SELECT TrainingProgramID, ProgramName, Category, DurationHours, Cost, IsActive, GETDATE()
-        FROM TradePortDB.HumanResources.TrainingProgram;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -1033,8 +1171,6 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1044,32 +1180,13 @@ BEGIN
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.EmployeeTraining');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.EmployeeTraining 
-        WHERE EmployeeTrainingID IS NULL OR EmployeeID IS NULL OR TrainingProgramID IS NULL OR TrainingDate IS NULL OR CompletionStatus IS NULL;
-        IF @NullCount > 0 
-            THROW 59000, 'NULLs found in critical columns of HumanResources.EmployeeTraining', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT EmployeeTrainingID 
-            FROM TradePortDB.HumanResources.EmployeeTraining 
-            GROUP BY EmployeeTrainingID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 59001, 'Duplicate EmployeeTrainingIDs found', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.EmployeeTraining',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.EmployeeTraining (EmployeeTrainingID, EmployeeID, TrainingProgramID, TrainingDate, Score, CompletionStatus, Notes, LoadDate)
-        SELECT EmployeeTrainingID, EmployeeID, TrainingProgramID, TrainingDate, Score, CompletionStatus, Notes, GETDATE()
-        FROM TradePortDB.HumanResources.EmployeeTraining;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -1093,8 +1210,6 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1104,32 +1219,13 @@ BEGIN
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.LeaveType');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.LeaveType 
-        WHERE LeaveTypeID IS NULL OR LeaveTypeName IS NULL;
-        IF @NullCount > 0 
-            THROW 60000, 'NULLs found in critical columns of HumanResources.LeaveType', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT LeaveTypeID 
-            FROM TradePortDB.HumanResources.LeaveType 
-            GROUP BY LeaveTypeID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 60001, 'Duplicate LeaveTypeIDs found', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.LeaveType',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.LeaveType (LeaveTypeID, LeaveTypeName, IsPaid, MaxDaysPerYear, LoadDate)
-        SELECT LeaveTypeID, LeaveTypeName, IsPaid, MaxDaysPerYear, GETDATE()
-        FROM TradePortDB.HumanResources.LeaveType;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -1153,8 +1249,6 @@ BEGIN
     DECLARE @StepStart DATETIME;
     DECLARE @StepEnd DATETIME;
     DECLARE @Message NVARCHAR(1000);
-    DECLARE @NullCount INT;
-    DECLARE @DupCount INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1164,32 +1258,13 @@ BEGIN
         INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
             VALUES (@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated HumanResources.LeaveRequest');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.HumanResources.LeaveRequest 
-        WHERE LeaveRequestID IS NULL OR EmployeeID IS NULL OR LeaveTypeID IS NULL OR StartDate IS NULL OR EndDate IS NULL OR Status IS NULL OR RequestDate IS NULL;
-        IF @NullCount > 0 
-            THROW 61000, 'NULLs found in critical columns of HumanResources.LeaveRequest', 1;
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT LeaveRequestID 
-            FROM TradePortDB.HumanResources.LeaveRequest 
-            GROUP BY LeaveRequestID 
-            HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0 
-            THROW 61001, 'Duplicate LeaveRequestIDs found', 1;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Validate', @StepStart, @StepEnd, CONCAT('Validation successful. Nulls: ', @NullCount, ', Duplicates: ', @DupCount));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.LeaveRequest',
+            @LogTable  = 'Audit.ETLLog',
+            @LogName   = @TableName;
 
-        SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.LeaveRequest (LeaveRequestID, EmployeeID, LeaveTypeID, StartDate, EndDate, Status, RequestDate, ApprovedBy, Notes, LoadDate)
-        SELECT LeaveRequestID, EmployeeID, LeaveTypeID, StartDate, EndDate, Status, RequestDate, ApprovedBy, Notes, GETDATE()
-        FROM TradePortDB.HumanResources.LeaveRequest;
-        SET @StepEnd = GETDATE();
-        INSERT INTO Audit.ETLLog (TableName, OperationType, StartTime, EndTime, [Message])
-            VALUES (@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -1215,9 +1290,7 @@ BEGIN
       @TableName    NVARCHAR(128) = 'StagingDB.PortOperations.ContainerType',
       @StepStart    DATETIME,
       @StepEnd      DATETIME,
-      @Message      NVARCHAR(2000),
-      @NullCount    INT,
-      @DupCount     INT;
+      @Message      NVARCHAR(2000);
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1229,41 +1302,12 @@ BEGIN
         INSERT INTO StagingDB.PortOperations.ETLLog(TableName,OperationType,StartTime,EndTime,Message)
          VALUES(@TableName,'Truncate',@StepStart,@StepEnd,'Truncated ContainerType');
 
-        -- 2) VALIDATE (NULL)
-        SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.ContainerType AS src
-        WHERE src.ContainerTypeID IS NULL
-           OR src.Description       IS NULL OR src.Description = ''
-           OR src.MaxWeightKG       IS NULL OR src.MaxWeightKG = '';
-        IF @NullCount > 0
-            THROW 51000, 'Validation failed: NULLs in ContainerType', 1;
-
-        -- 3) VALIDATE (Duplicates)
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-            SELECT ContainerTypeID 
-            FROM TradePortDB.PortOperations.ContainerType
-            GROUP BY ContainerTypeID
-            HAVING COUNT(*) > 1
-        ) AS d;
-        IF @DupCount > 0
-            THROW 51001, 'Validation failed: Duplicates in ContainerType', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO StagingDB.PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd,CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        -- 4) INSERT
+        -- 2) VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.ContainerType
-          (ContainerTypeID, Description, MaxWeightKG)
-        SELECT
-          ContainerTypeID, Description, MaxWeightKG
-        FROM TradePortDB.PortOperations.ContainerType;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd,CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.ContainerType',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1287,9 +1331,7 @@ BEGIN
         @TableName NVARCHAR(128) = 'StagingDB.PortOperations.EquipmentType',
         @StepStart DATETIME,
         @StepEnd   DATETIME,
-        @Message   NVARCHAR(2000),
-        @NullCount INT,
-        @DupCount  INT;
+        @Message   NVARCHAR(2000);
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1301,43 +1343,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
             VALUES(@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated EquipmentType');
 
-        -- STEP 2: VALIDATE SOURCE NULLS
-        SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*)
-        FROM TradePortDB.PortOperations.EquipmentType AS src
-        WHERE src.EquipmentTypeID IS NULL
-           OR src.Description     IS NULL OR src.Description = '';
-        IF @NullCount > 0
-            THROW 51000, 'Validation failed: NULLs in EquipmentType', 1;
-
-        -- STEP 3: VALIDATE DUPLICATES
-        SELECT @DupCount = COUNT(*)
-        FROM (
-            SELECT EquipmentTypeID
-            FROM TradePortDB.PortOperations.EquipmentType
-            GROUP BY EquipmentTypeID
-            HAVING COUNT(*) > 1
-        ) AS d;
-        IF @DupCount > 0
-            THROW 51001, 'Validation failed: Duplicates in EquipmentType', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES(@TableName, 'Validate', @StepStart, @StepEnd,
-                   CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        -- STEP 4: INSERT DATA
+        -- STEP 2: VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.EquipmentType
-            (EquipmentTypeID, Description)
-        SELECT
-            EquipmentTypeID,
-            Description
-        FROM TradePortDB.PortOperations.EquipmentType;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES(@TableName, 'Insert', @StepStart, @StepEnd,
-                   CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.EquipmentType',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1360,9 +1371,7 @@ BEGIN
         @TableName NVARCHAR(128) = 'StagingDB.PortOperations.Port',
         @StepStart DATETIME,
         @StepEnd   DATETIME,
-        @Message   NVARCHAR(2000),
-        @NullCount INT,
-        @DupCount  INT;
+        @Message   NVARCHAR(2000);
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1374,44 +1383,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
             VALUES(@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated Port');
 
-        -- STEP 2: VALIDATE SOURCE NULLS
-        SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*)
-        FROM TradePortDB.PortOperations.Port AS src
-        WHERE src.PortID   IS NULL
-           OR src.Name     IS NULL OR src.Name ='';
-        IF @NullCount > 0
-            THROW 51000, 'Validation failed: NULLs in Port', 1;
-
-        -- STEP 3: VALIDATE DUPLICATES
-        SELECT @DupCount = COUNT(*)
-        FROM (
-            SELECT PortID
-            FROM TradePortDB.PortOperations.Port
-            GROUP BY PortID
-            HAVING COUNT(*) > 1
-        ) AS d;
-        IF @DupCount > 0
-            THROW 51001, 'Validation failed: Duplicates in Port', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES(@TableName, 'Validate', @StepStart, @StepEnd,
-                   CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        -- STEP 4: INSERT DATA
+        -- STEP 2: VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.Port
-            (PortID, Name, Location)
-        SELECT
-            PortID,
-            Name,
-            Location
-        FROM TradePortDB.PortOperations.Port;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES(@TableName, 'Insert', @StepStart, @StepEnd,
-                   CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.Port',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1434,9 +1411,7 @@ BEGIN
         @TableName NVARCHAR(128) = 'StagingDB.PortOperations.Ship',
         @StepStart DATETIME,
         @StepEnd   DATETIME,
-        @Message   NVARCHAR(2000),
-        @NullCount INT,
-        @DupCount  INT;
+        @Message   NVARCHAR(2000);
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1448,46 +1423,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
             VALUES(@TableName, 'Truncate', @StepStart, @StepEnd, 'Truncated Ship');
 
-        -- STEP 2: VALIDATE SOURCE NULLS
+        -- STEP 2: VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*)
-        FROM TradePortDB.PortOperations.Ship AS src
-        WHERE src.ShipID     IS NULL
-           OR src.IMO_Number IS NULL OR src.IMO_Number=''
-           OR src.Name       IS NULL OR src.Name='';
-        IF @NullCount > 0
-            THROW 51000, 'Validation failed: NULLs in Ship', 1;
-
-        -- STEP 3: VALIDATE DUPLICATES
-        SELECT @DupCount = COUNT(*)
-        FROM (
-            SELECT ShipID
-            FROM TradePortDB.PortOperations.Ship
-            GROUP BY ShipID
-            HAVING COUNT(*) > 1
-        ) AS d;
-        IF @DupCount > 0
-            THROW 51001, 'Validation failed: Duplicates in Ship', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES(@TableName, 'Validate', @StepStart, @StepEnd,
-                   CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        -- STEP 4: INSERT DATA
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.Ship
-            (ShipID, IMO_Number, Name, CountryID)
-        SELECT
-            ShipID,
-            IMO_Number,
-            Name,
-            CountryID
-        FROM TradePortDB.PortOperations.Ship;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES(@TableName, 'Insert', @StepStart, @StepEnd,
-                   CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.Ship',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1506,53 +1447,39 @@ GO
 
 
 CREATE OR ALTER PROCEDURE PortOperations.LoadContainerYardMovement
+    @LoadMode NVARCHAR(20) = NULL   -- NULL: از Audit.ETL_Watermark | 'Incremental' | 'Full'
 AS
 BEGIN
     DECLARE
         @TableName NVARCHAR(128) = 'PortOperations.ContainerYardMovement',
         @StepStart DATETIME, @StepEnd DATETIME,
-        @Message   NVARCHAR(2000),
-        @NullCount INT, @DupCount INT;
+        @Message   NVARCHAR(2000);
+
+    -- حالت افزایشی: فقط delta از آخرین watermark (Audit.ETL_Watermark)
+    IF Audit.fn_StagingLoadMode('PortOperations.ContainerYardMovement', @LoadMode) = 'Incremental'
+    BEGIN
+        EXEC Audit.LoadStagingIncremental
+            @TableName = 'PortOperations.ContainerYardMovement',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
+        RETURN;
+    END;
     BEGIN TRY
         BEGIN TRAN;
 
         SET @StepStart = GETDATE();
         TRUNCATE TABLE PortOperations.ContainerYardMovement;
+        EXEC Audit.SetStagingWatermark @TableName = 'PortOperations.ContainerYardMovement';
         SET @StepEnd = GETDATE();
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated ContainerYardMovement');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.ContainerYardMovement src
-        WHERE src.MovementID       IS NULL
-           OR src.ContainerID      IS NULL
-           OR src.YardSlotID       IS NULL
-           OR src.MovementType     IS NULL OR src.MovementType=''
-           OR src.MovementDateTime IS NULL OR src.MovementDateTime='';
-        IF @NullCount > 0 THROW 51000,'NULLs in ContainerYardMovement',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-          SELECT MovementID 
-          FROM TradePortDB.PortOperations.ContainerYardMovement
-          GROUP BY MovementID
-          HAVING COUNT(*)>1
-        ) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in ContainerYardMovement',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.ContainerYardMovement
-          (MovementID,ContainerID,YardSlotID,MovementType,MovementDateTime)
-        SELECT MovementID,ContainerID,YardSlotID,MovementType,MovementDateTime
-        FROM TradePortDB.PortOperations.ContainerYardMovement;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.ContainerYardMovement',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1572,55 +1499,39 @@ GO
 
 
 CREATE OR ALTER PROCEDURE PortOperations.LoadCargoOperation
+    @LoadMode NVARCHAR(20) = NULL   -- NULL: از Audit.ETL_Watermark | 'Incremental' | 'Full'
 AS
 BEGIN
     DECLARE
         @TableName NVARCHAR(128) = 'PortOperations.CargoOperation',
         @StepStart DATETIME, @StepEnd DATETIME,
-        @Message   NVARCHAR(2000),
-        @NullCount INT, @DupCount INT;
+        @Message   NVARCHAR(2000);
+
+    -- حالت افزایشی: فقط delta از آخرین watermark (Audit.ETL_Watermark)
+    IF Audit.fn_StagingLoadMode('PortOperations.CargoOperation', @LoadMode) = 'Incremental'
+    BEGIN
+        EXEC Audit.LoadStagingIncremental
+            @TableName = 'PortOperations.CargoOperation',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
+        RETURN;
+    END;
     BEGIN TRY
         BEGIN TRAN;
 
         SET @StepStart = GETDATE();
         TRUNCATE TABLE PortOperations.CargoOperation;
+        EXEC Audit.SetStagingWatermark @TableName = 'PortOperations.CargoOperation';
         SET @StepEnd = GETDATE();
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated CargoOperation');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.CargoOperation src
-        WHERE src.CargoOpID        IS NULL
-           OR src.PortCallID       IS NULL
-           OR src.ContainerID      IS NULL
-           OR src.OperationType    IS NULL OR src.OperationType=''
-           OR src.OperationDateTime IS NULL OR src.OperationDateTime=''
-		   OR src.Quantity IS NULL OR src.Quantity=''
-		   OR src.WeightKG IS NULL OR src.WeightKG='';
-        IF @NullCount > 0 THROW 51000,'NULLs in CargoOperation',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-          SELECT CargoOpID 
-          FROM TradePortDB.PortOperations.CargoOperation
-          GROUP BY CargoOpID
-          HAVING COUNT(*)>1
-        ) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in CargoOperation',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.CargoOperation
-          (CargoOpID,PortCallID,ContainerID,OperationType,OperationDateTime,Quantity,WeightKG)
-        SELECT CargoOpID,PortCallID,ContainerID,OperationType,OperationDateTime,Quantity,WeightKG
-        FROM TradePortDB.PortOperations.CargoOperation;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.CargoOperation',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1644,8 +1555,7 @@ BEGIN
     DECLARE
         @TableName NVARCHAR(128) = 'Common.OperationEquipmentAssignment',
         @StepStart DATETIME, @StepEnd DATETIME,
-        @Message   NVARCHAR(2000),
-        @NullCount INT, @DupCount INT;
+        @Message   NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -1655,37 +1565,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated OperationEquipmentAssignment');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.Common.OperationEquipmentAssignment src
-        WHERE src.AssignmentID IS NULL
-           OR src.CargoOpID     IS NULL
-           OR src.EquipmentID   IS NULL
-		   OR src.StartTime IS NULL OR src.StartTime=''
-		   OR src.EndTime IS NULL OR src.EndTime='';
-        IF @NullCount > 0 THROW 51000,'NULLs in OperationEquipmentAssignment',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-          SELECT AssignmentID 
-          FROM TradePortDB.Common.OperationEquipmentAssignment
-          GROUP BY AssignmentID
-          HAVING COUNT(*)>1
-        ) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in OperationEquipmentAssignment',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO Common.OperationEquipmentAssignment
-          (AssignmentID,CargoOpID,EquipmentID,EmployeeID,StartTime,EndTime)
-        SELECT AssignmentID,CargoOpID,EquipmentID,EmployeeID,StartTime,EndTime
-        FROM TradePortDB.Common.OperationEquipmentAssignment;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Common.OperationEquipmentAssignment',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1712,9 +1597,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'PortOperations.Container',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -1725,40 +1608,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog(TableName,OperationType,StartTime,EndTime,Message)
             VALUES(@TableName,'Truncate',@StepStart,@StepEnd,'Truncated Container');
 
-        -- Validate NULLs
-        SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.Container src
-        WHERE src.ContainerID     IS NULL
-           OR src.ContainerNumber IS NULL
-           OR src.ContainerTypeID IS NULL
-		   OR src.OwnerCompany IS NULL OR src.OwnerCompany='';
-        IF @NullCount > 0
-            THROW 51000, 'NULLs in Container', 1;
-
-        -- Validate duplicates
-        SELECT @DupCount = COUNT(*) 
-        FROM (
-          SELECT ContainerID 
-          FROM TradePortDB.PortOperations.Container
-          GROUP BY ContainerID
-          HAVING COUNT(*) > 1
-        ) d;
-        IF @DupCount > 0
-            THROW 51001, 'Duplicates in Container', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        -- Insert data
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.Container(ContainerID,ContainerNumber,ContainerTypeID,OwnerCompany)
-        SELECT ContainerID,ContainerNumber,ContainerTypeID,OwnerCompany
-        FROM TradePortDB.PortOperations.Container;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.Container',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1783,9 +1638,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'PortOperations.Equipment',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -1795,29 +1648,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated Equipment');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.Equipment src
-        WHERE src.EquipmentID     IS NULL
-           OR src.EquipmentTypeID IS NULL
-		   OR src.Model IS NULL OR src.Model='';
-        IF @NullCount > 0 THROW 51000,'NULLs in Equipment',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (SELECT EquipmentID FROM TradePortDB.PortOperations.Equipment GROUP BY EquipmentID HAVING COUNT(*)>1) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in Equipment',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.Equipment(EquipmentID,EquipmentTypeID,Model)
-        SELECT EquipmentID,EquipmentTypeID,Model
-        FROM TradePortDB.PortOperations.Equipment;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.Equipment',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1842,9 +1678,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'PortOperations.Voyage',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -1854,29 +1688,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated Voyage');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.Voyage src
-        WHERE src.VoyageID      IS NULL
-           OR src.ShipID        IS NULL
-           OR src.VoyageNumber  IS NULL;
-        IF @NullCount > 0 THROW 51000,'NULLs in Voyage',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (SELECT VoyageID FROM TradePortDB.PortOperations.Voyage GROUP BY VoyageID HAVING COUNT(*)>1) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in Voyage',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.Voyage(VoyageID,ShipID,VoyageNumber,DeparturePortID,ArrivalPortID)
-        SELECT VoyageID,ShipID,VoyageNumber,DeparturePortID,ArrivalPortID
-        FROM TradePortDB.PortOperations.Voyage;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.Voyage',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1901,9 +1718,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'PortOperations.PortCall',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -1913,31 +1728,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated PortCall');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.PortCall src
-        WHERE src.PortCallID      IS NULL
-           OR src.VoyageID        IS NULL
-           OR src.PortID          IS NULL
-           OR src.ArrivalDateTime IS NULL;
-        IF @NullCount > 0 THROW 51000,'NULLs in PortCall',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (SELECT PortCallID FROM TradePortDB.PortOperations.PortCall GROUP BY PortCallID HAVING COUNT(*)>1) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in PortCall',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.PortCall
-          (PortCallID,VoyageID,PortID,ArrivalDateTime,DepartureDateTime,Status)
-        SELECT PortCallID,VoyageID,PortID,ArrivalDateTime,DepartureDateTime,Status
-        FROM TradePortDB.PortOperations.PortCall;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.PortCall',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1962,9 +1758,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'PortOperations.Berth',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -1974,29 +1768,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated Berth');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.Berth src
-        WHERE src.BerthID    IS NULL
-           OR src.PortID     IS NULL
-           OR src.Name       IS NULL OR src.Name='';
-        IF @NullCount > 0 THROW 51000,'NULLs in Berth',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (SELECT BerthID FROM TradePortDB.PortOperations.Berth GROUP BY BerthID HAVING COUNT(*)>1) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in Berth',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.Berth(BerthID,PortID,Name,LengthMeters)
-        SELECT BerthID,PortID,Name,LengthMeters
-        FROM TradePortDB.PortOperations.Berth;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.Berth',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -2021,9 +1798,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'PortOperations.BerthAllocation',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -2033,30 +1808,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated BerthAllocation');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.BerthAllocation src
-        WHERE src.AllocationID IS NULL
-           OR src.PortCallID    IS NULL
-           OR src.BerthID       IS NULL;
-        IF @NullCount > 0 THROW 51000,'NULLs in BerthAllocation',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (SELECT AllocationID FROM TradePortDB.PortOperations.BerthAllocation GROUP BY AllocationID HAVING COUNT(*)>1) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in BerthAllocation',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.BerthAllocation
-          (AllocationID,PortCallID,BerthID,AllocationStart,AllocationEnd,AssignedBy)
-        SELECT AllocationID,PortCallID,BerthID,AllocationStart,AllocationEnd,AssignedBy
-        FROM TradePortDB.PortOperations.BerthAllocation;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.BerthAllocation',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -2081,9 +1838,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'PortOperations.Yard',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -2093,29 +1848,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated Yard');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.Yard src
-        WHERE src.YardID   IS NULL
-           OR src.PortID   IS NULL
-           OR src.Name     IS NULL OR src.Name='';
-        IF @NullCount > 0 THROW 51000,'NULLs in Yard',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (SELECT YardID FROM TradePortDB.PortOperations.Yard GROUP BY YardID HAVING COUNT(*)>1) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in Yard',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.Yard(YardID,PortID,Name,UsageType)
-        SELECT YardID,PortID,Name,UsageType
-        FROM TradePortDB.PortOperations.Yard;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.Yard',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -2140,9 +1878,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'PortOperations.YardSlot',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -2152,29 +1888,12 @@ BEGIN
         INSERT INTO PortOperations.ETLLog VALUES
           (@TableName,'Truncate',@StepStart,@StepEnd,'Truncated YardSlot');
 
+        -- VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*) 
-        FROM TradePortDB.PortOperations.YardSlot src
-        WHERE src.YardSlotID IS NULL
-           OR src.YardID     IS NULL
-		   OR src.Block		IS NULL OR src.Block = '';
-        IF @NullCount > 0 THROW 51000,'NULLs in YardSlot',1;
-
-        SELECT @DupCount = COUNT(*) 
-        FROM (SELECT YardSlotID FROM TradePortDB.PortOperations.YardSlot GROUP BY YardSlotID HAVING COUNT(*)>1) d;
-        IF @DupCount > 0 THROW 51001,'Duplicates in YardSlot',1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Validate',@StepStart,@StepEnd, CONCAT('Null=',@NullCount,',Dup=',@DupCount));
-
-        SET @StepStart = GETDATE();
-        INSERT INTO PortOperations.YardSlot(YardSlotID,YardID,Block,RowNumber,TierLevel)
-        SELECT YardSlotID,YardID,Block,RowNumber,TierLevel
-        FROM TradePortDB.PortOperations.YardSlot;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog VALUES
-          (@TableName,'Insert',@StepStart,@StepEnd, CONCAT('Inserted ',@@ROWCOUNT,' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'PortOperations.YardSlot',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -2201,9 +1920,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'Common.Country',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
 
     BEGIN TRY
         BEGIN TRAN;
@@ -2217,46 +1934,12 @@ BEGIN
         VALUES
             (@TableName, 'Delete', @StepStart, @StepEnd, 'Deleted all rows from Country');
 
-        -- STEP 2: VALIDATE SOURCE NULLS
+        -- STEP 2: VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*)
-        FROM TradePortDB.Common.Country AS src
-        WHERE src.CountryID   IS NULL
-           OR src.CountryName IS NULL OR src.CountryName='';
-        IF @NullCount > 0
-            THROW 51000, 'Validation failed: NULLs in Country', 1;
-
-        -- STEP 3: VALIDATE DUPLICATES
-        SELECT @DupCount = COUNT(*)
-        FROM (
-            SELECT CountryID
-            FROM TradePortDB.Common.Country
-            GROUP BY CountryID
-            HAVING COUNT(*) > 1
-        ) AS d;
-        IF @DupCount > 0
-            THROW 51001, 'Validation failed: Duplicates in Country', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog
-            (TableName, OperationType, StartTime, EndTime, Message)
-        VALUES
-            (@TableName, 'Validate', @StepStart, @StepEnd,
-             CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        -- STEP 4: INSERT DATA
-        SET @StepStart = GETDATE();
-        INSERT INTO Common.Country
-            (CountryID, CountryName, CountryCode)
-        SELECT
-            CountryID, CountryName, CountryCode
-        FROM TradePortDB.Common.Country;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog
-            (TableName, OperationType, StartTime, EndTime, Message)
-        VALUES
-            (@TableName, 'Insert', @StepStart, @StepEnd,
-             CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'Common.Country',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -2283,9 +1966,7 @@ BEGIN
         @TableName  NVARCHAR(128) = 'HumanResources.Employee',
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
-        @Message    NVARCHAR(2000),
-        @NullCount  INT,
-        @DupCount   INT;
+        @Message    NVARCHAR(2000);
     BEGIN TRY
         BEGIN TRAN;
 
@@ -2298,48 +1979,12 @@ BEGIN
         VALUES
             (@TableName, 'Delete', @StepStart, @StepEnd, 'Deleted all rows from Employee');
 
-        -- STEP 2: VALIDATE SOURCE NULLS
-        SET @StepStart = GETDATE();
-        SELECT @NullCount = COUNT(*)
-        FROM TradePortDB.HumanResources.Employee AS src
-        WHERE src.EmployeeID IS NULL
-           OR src.FullName   IS NULL OR src.FullName='';
-        IF @NullCount > 0
-            THROW 51000, 'Validation failed: NULLs in Employee', 1;
-
-        -- STEP 3: VALIDATE DUPLICATES
-        SELECT @DupCount = COUNT(*)
-        FROM (
-            SELECT EmployeeID
-            FROM TradePortDB.HumanResources.Employee
-            GROUP BY EmployeeID
-            HAVING COUNT(*) > 1
-        ) AS d;
-        IF @DupCount > 0
-            THROW 51001, 'Validation failed: Duplicates in Employee', 1;
-
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog
-            (TableName, OperationType, StartTime, EndTime, Message)
-        VALUES
-            (@TableName, 'Validate', @StepStart, @StepEnd,
-             CONCAT('Null=', @NullCount, ', Dup=', @DupCount));
-
-        -- STEP 4: INSERT DATA
+        -- STEP 2: VALIDATE + INSERT (Audit.ValidationRule، سطرهای ردشده قرنطینه می‌شوند)
         SET @StepStart = GETDATE();
-        INSERT INTO HumanResources.Employee
-            (EmployeeID, FullName, Position, NationalID, HireDate,
-             BirthDate, Gender, MaritalStatus, Address, Phone, Email, EmploymentStatus)
-        SELECT
-            EmployeeID, FullName, Position, NationalID, HireDate,
-            BirthDate, Gender, MaritalStatus, Address, Phone, Email, EmploymentStatus
-        FROM TradePortDB.HumanResources.Employee;
-        SET @StepEnd = GETDATE();
-        INSERT INTO PortOperations.ETLLog
-            (TableName, OperationType, StartTime, EndTime, Message)
-        VALUES
-            (@TableName, 'Insert', @StepStart, @StepEnd,
-             CONCAT('Inserted ', @@ROWCOUNT, ' rows'));
+        EXEC Audit.LoadStagingValidated
+            @TableName = 'HumanResources.Employee',
+            @LogTable  = 'PortOperations.ETLLog',
+            @LogName   = @TableName;
 
         COMMIT;
     END TRY
@@ -1,6 +1,10 @@
 USE StagingDB;
 GO
 
+-- شناسه اجرا برای Audit.ETLStepMetric (در همین session به اشتراک گذاشته می‌شود)
+EXEC StagingDB.Audit.BeginETLRun;
+GO
+
 --------------------------------------------------------------------------------
 -- Wrapper: LoadAllFinanceStagingTables
 -- Description: Executes all individual Finance staging-load procedures in sequence
@@ -163,3 +167,17 @@ GO
 
 EXEC dbo.LoadAllPortOperationsStagingTables;
 
+
+
+--------------------------------------------------------------------------------
+-- Incremental Staging
+-- جدول‌های بزرگ به صورت پیش‌فرض از Audit.ETL_Watermark پیروی می‌کنند (اولین اجرا کامل است)
+--------------------------------------------------------------------------------
+-- بارگذاری کامل اجباری (مثلاً بعد از اصلاح داده منبع):
+--   EXEC Finance.LoadFinanceInvoiceLine @LoadMode = 'Full';
+-- برگرداندن یک جدول به TRUNCATE و بارگذاری کامل در همه اجراها:
+--   UPDATE Audit.ETL_Watermark SET LoadMode = 'Full' WHERE TableName = 'Finance.InvoiceLine';
+-- گرفتن تغییرات (نه فقط درج‌ها) با ستون rowversion در TradePortDB:
+--   EXEC Audit.EnableRowVersionCapture @TableName = 'HumanResources.Attendance';
+-- اندازه delta اجرای اخیر:
+--   SELECT TableName, LastLoadMode, LastDeltaRows, LastRunStart, LastRunEnd FROM Audit.ETL_Watermark;
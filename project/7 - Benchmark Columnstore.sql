@@ -0,0 +1,210 @@
+/*====================================================================
+  Benchmark: rowstore (چیدمان فعلی) در برابر columnstore + partition ماهانه
+  یک کپی از Fact.FactInvoiceLineTransaction با @Rows سطر در دو چیدمان ساخته می‌شود:
+    Bench.FactInvoiceLine_Rowstore    : heap + IX_FactInvoiceLine_AllFKs (مثل 7 - DWTables.sql)
+    Bench.FactInvoiceLine_Columnstore : clustered columnstore روی ps_DateKeyMonthly
+  و گزارش‌های ماهانه/سالانه روی هر دو اجرا و زمان، CPU و logical reads هر اجرا
+  در Bench.LayoutBenchmark ثبت می‌شود.
+  پیش‌نیاز: Dim.DimDate پر باشد و «7 - DWTables Columnstore.sql» (یا حداقل
+  Dim.ExtendDateKeyPartitions) اجرا شده باشد.
+====================================================================*/
+USE DataWarehouse;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.schemas WHERE name = 'Bench')
+    EXEC('CREATE SCHEMA Bench;');
+GO
+
+IF OBJECT_ID('Bench.LayoutBenchmark', 'U') IS NULL
+CREATE TABLE Bench.LayoutBenchmark (
+    ResultID      INT IDENTITY(1,1) PRIMARY KEY,
+    RunID         UNIQUEIDENTIFIER NOT NULL,
+    Layout        NVARCHAR(20)     NOT NULL,   -- 'Rowstore' | 'Columnstore'
+    QueryName     NVARCHAR(50)     NOT NULL,
+    Iteration     INT              NOT NULL,
+    TableRows     BIGINT           NOT NULL,
+    ElapsedMs     INT              NOT NULL,
+    CpuMs         INT              NOT NULL,
+    LogicalReads  BIGINT           NOT NULL,
+    RunTime       DATETIME         NOT NULL DEFAULT GETDATE()
+);
+GO
+
+/*-------------- 1) Test data --------------*/
+DECLARE @Rows BIGINT = 10000000,          -- حجم جدول آزمون
+        @KeyColumn SYSNAME = CASE WHEN COL_LENGTH('Dim.DimDate', 'DimDateID') IS NOT NULL
+                                  THEN 'DimDateID' ELSE 'DateKey' END,
+        @MinKey INT, @MaxKey INT, @Sql NVARCHAR(MAX);
+
+SET @Sql = N'SELECT @MinKey = MIN(' + QUOTENAME(@KeyColumn) + N'), @MaxKey = MAX(' + QUOTENAME(@KeyColumn) + N')
+             FROM Dim.DimDate WHERE ' + QUOTENAME(@KeyColumn) + N' > 0;';
+EXEC sp_executesql @Sql, N'@MinKey INT OUTPUT, @MaxKey INT OUTPUT', @MinKey = @MinKey OUTPUT, @MaxKey = @MaxKey OUTPUT;
+
+IF OBJECT_ID('Bench.FactInvoiceLine_Rowstore', 'U') IS NOT NULL DROP TABLE Bench.FactInvoiceLine_Rowstore;
+IF OBJECT_ID('Bench.FactInvoiceLine_Columnstore', 'U') IS NOT NULL DROP TABLE Bench.FactInvoiceLine_Columnstore;
+
+CREATE TABLE Bench.FactInvoiceLine_Rowstore (
+    DimInvoiceID       INT           NOT NULL,
+    DimCustomerID      INT           NOT NULL,
+    DimServiceTypeID   INT           NOT NULL,
+    DimTaxID           INT,
+    DimDateID          INT           NOT NULL,
+    Quantity           INT           NOT NULL,
+    UnitPrice          DECIMAL(18,4) NOT NULL,
+    GrossAmount        AS (Quantity * UnitPrice) PERSISTED,
+    DiscountPercent    DECIMAL(6,4),
+    NetAmount          DECIMAL(18,4) NOT NULL,
+    TaxAmount          DECIMAL(18,4) NOT NULL
+);
+
+CREATE TABLE Bench.FactInvoiceLine_Columnstore (
+    DimInvoiceID       INT           NOT NULL,
+    DimCustomerID      INT           NOT NULL,
+    DimServiceTypeID   INT           NOT NULL,
+    DimTaxID           INT,
+    DimDateID          INT           NOT NULL,
+    Quantity           INT           NOT NULL,
+    UnitPrice          DECIMAL(18,4) NOT NULL,
+    GrossAmount        AS (Quantity * UnitPrice) PERSISTED,
+    DiscountPercent    DECIMAL(6,4),
+    NetAmount          DECIMAL(18,4) NOT NULL,
+    TaxAmount          DECIMAL(18,4) NOT NULL,
+    INDEX CCI_Bench_FactInvoiceLine CLUSTERED COLUMNSTORE
+) ON ps_DateKeyMonthly(DimDateID);
+
+-- تولید set-based (بدون حلقه)؛ توزیع مشابه داده تولیدی main.py
+;WITH n AS (
+    SELECT TOP (@Rows) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects a CROSS JOIN sys.all_objects b CROSS JOIN sys.all_objects c
+)
+INSERT INTO Bench.FactInvoiceLine_Rowstore WITH (TABLOCK)
+    (DimInvoiceID, DimCustomerID, DimServiceTypeID, DimTaxID, DimDateID,
+     Quantity, UnitPrice, DiscountPercent, NetAmount, TaxAmount)
+SELECT
+    1 + i % 500000,
+    1 + ABS(CHECKSUM(i * 7919)) % 10000,
+    1 + ABS(CHECKSUM(i * 104729)) % 50,
+    1 + ABS(CHECKSUM(i * 31)) % 20,
+    @MinKey + ABS(CHECKSUM(NEWID())) % (@MaxKey - @MinKey + 1),
+    q.Quantity,
+    q.UnitPrice,
+    q.DiscountPercent,
+    q.Quantity * q.UnitPrice * (1 - q.DiscountPercent),
+    q.Quantity * q.UnitPrice * (1 - q.DiscountPercent) * 0.09
+FROM n
+CROSS APPLY (SELECT 1 + ABS(CHECKSUM(NEWID())) % 100                       AS Quantity,
+                    CAST(10 + ABS(CHECKSUM(NEWID())) % 99000 / 100.0 AS DECIMAL(18,4)) AS UnitPrice,
+                    CAST(ABS(CHECKSUM(NEWID())) % 20 / 100.0 AS DECIMAL(6,4))          AS DiscountPercent) AS q;
+
+CREATE NONCLUSTERED INDEX IX_Bench_FactInvoiceLine_AllFKs
+ON Bench.FactInvoiceLine_Rowstore(DimInvoiceID, DimCustomerID, DimServiceTypeID, DimTaxID, DimDateID);
+
+INSERT INTO Bench.FactInvoiceLine_Columnstore WITH (TABLOCK)
+    (DimInvoiceID, DimCustomerID, DimServiceTypeID, DimTaxID, DimDateID,
+     Quantity, UnitPrice, DiscountPercent, NetAmount, TaxAmount)
+SELECT DimInvoiceID, DimCustomerID, DimServiceTypeID, DimTaxID, DimDateID,
+       Quantity, UnitPrice, DiscountPercent, NetAmount, TaxAmount
+FROM Bench.FactInvoiceLine_Rowstore;
+
+-- فشرده‌سازی delta storeها تا اندازه‌گیری روی rowgroupهای فشرده باشد
+ALTER INDEX CCI_Bench_FactInvoiceLine ON Bench.FactInvoiceLine_Columnstore REORGANIZE WITH (COMPRESS_ALL_ROW_GROUPS = ON);
+GO
+
+/*-------------- 2) Scan / aggregate queries --------------*/
+DECLARE @RunID UNIQUEIDENTIFIER = NEWID(),
+        @Iterations INT = 3,
+        @ColdCache BIT = 0,               -- 1: DBCC DROPCLEANBUFFERS قبل از هر اجرا (نیاز به sysadmin)
+        @KeyColumn SYSNAME = CASE WHEN COL_LENGTH('Dim.DimDate', 'DimDateID') IS NOT NULL
+                                  THEN 'DimDateID' ELSE 'DateKey' END,
+        @TableRows BIGINT = (SELECT COUNT_BIG(*) FROM Bench.FactInvoiceLine_Rowstore),
+        @Layout NVARCHAR(20), @TableName NVARCHAR(256), @QueryName NVARCHAR(50), @Template NVARCHAR(MAX),
+        @Sql NVARCHAR(MAX), @Iteration INT, @Started DATETIME2, @Cpu INT, @Reads BIGINT;
+
+DECLARE @Layouts TABLE (Layout NVARCHAR(20), TableName NVARCHAR(256));
+INSERT INTO @Layouts VALUES
+    ('Rowstore',    'Bench.FactInvoiceLine_Rowstore'),
+    ('Columnstore', 'Bench.FactInvoiceLine_Columnstore');
+
+-- {T}: جدول آزمون، {K}: ستون کلید DimDate
+DECLARE @Queries TABLE (QueryName NVARCHAR(50), Template NVARCHAR(MAX));
+INSERT INTO @Queries VALUES
+('MonthlyRevenue', N'
+    SELECT d.[Year], d.[Month], COUNT_BIG(*) AS Lines, SUM(f.NetAmount) AS Net, SUM(f.TaxAmount) AS Tax
+    INTO #Result
+    FROM {T} AS f INNER JOIN Dim.DimDate AS d ON d.{K} = f.DimDateID
+    GROUP BY d.[Year], d.[Month];'),
+('YearlyByServiceType', N'
+    SELECT d.[Year], f.DimServiceTypeID, SUM(f.GrossAmount) AS Gross, AVG(f.DiscountPercent) AS AvgDiscount
+    INTO #Result
+    FROM {T} AS f INNER JOIN Dim.DimDate AS d ON d.{K} = f.DimDateID
+    GROUP BY d.[Year], f.DimServiceTypeID;'),
+('SingleMonthByCustomer', N'
+    DECLARE @From INT, @To INT;
+    SELECT @From = MIN({K}), @To = MAX({K}) FROM Dim.DimDate
+    WHERE [Year] = (SELECT MAX([Year]) FROM Dim.DimDate WHERE {K} > 0) AND [Month] = 1;
+    SELECT f.DimCustomerID, SUM(f.NetAmount) AS Net
+    INTO #Result
+    FROM {T} AS f
+    WHERE f.DimDateID BETWEEN @From AND @To
+    GROUP BY f.DimCustomerID;'),
+('FullScanTotals', N'
+    SELECT COUNT_BIG(*) AS Lines, SUM(f.NetAmount) AS Net, SUM(CAST(f.Quantity AS BIGINT)) AS Quantity
+    INTO #Result
+    FROM {T} AS f;');
+
+DECLARE bench_cursor CURSOR LOCAL FAST_FORWARD FOR
+    SELECT l.Layout, l.TableName, q.QueryName, q.Template
+    FROM @Queries AS q CROSS JOIN @Layouts AS l
+    ORDER BY q.QueryName, l.Layout;
+
+OPEN bench_cursor;
+FETCH NEXT FROM bench_cursor INTO @Layout, @TableName, @QueryName, @Template;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    SET @Sql = REPLACE(REPLACE(@Template, N'{T}', @TableName), N'{K}', QUOTENAME(@KeyColumn));
+    SET @Iteration = 1;
+    WHILE @Iteration <= @Iterations
+    BEGIN
+        IF @ColdCache = 1
+        BEGIN
+            CHECKPOINT;
+            DBCC DROPCLEANBUFFERS WITH NO_INFOMSGS;
+        END;
+
+        SELECT @Cpu = cpu_time, @Reads = logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID;
+        SET @Started = SYSDATETIME();
+        EXEC sp_executesql @Sql;
+
+        INSERT INTO Bench.LayoutBenchmark (RunID, Layout, QueryName, Iteration, TableRows, ElapsedMs, CpuMs, LogicalReads)
+        SELECT @RunID, @Layout, @QueryName, @Iteration, @TableRows,
+               DATEDIFF(MILLISECOND, @Started, SYSDATETIME()), r.cpu_time - @Cpu, r.logical_reads - @Reads
+        FROM sys.dm_exec_requests AS r
+        WHERE r.session_id = @@SPID;
+
+        SET @Iteration += 1;
+    END;
+    FETCH NEXT FROM bench_cursor INTO @Layout, @TableName, @QueryName, @Template;
+END;
+CLOSE bench_cursor;
+DEALLOCATE bench_cursor;
+
+/*-------------- 3) Report --------------*/
+SELECT QueryName,
+       MAX(TableRows) AS TableRows,
+       AVG(CASE WHEN Layout = 'Rowstore'    THEN ElapsedMs END)    AS RowstoreMs,
+       AVG(CASE WHEN Layout = 'Columnstore' THEN ElapsedMs END)    AS ColumnstoreMs,
+       AVG(CASE WHEN Layout = 'Rowstore'    THEN LogicalReads END) AS RowstoreReads,
+       AVG(CASE WHEN Layout = 'Columnstore' THEN LogicalReads END) AS ColumnstoreReads,
+       CAST(AVG(CASE WHEN Layout = 'Rowstore' THEN ElapsedMs * 1.0 END) /
+            NULLIF(AVG(CASE WHEN Layout = 'Columnstore' THEN ElapsedMs * 1.0 END), 0) AS DECIMAL(10,1)) AS Speedup
+FROM Bench.LayoutBenchmark
+WHERE RunID = @RunID
+GROUP BY QueryName
+ORDER BY QueryName;
+
+-- حجم ذخیره‌سازی دو چیدمان
+SELECT OBJECT_NAME(object_id) AS TableName, SUM(used_page_count) * 8 / 1024 AS UsedMB
+FROM sys.dm_db_partition_stats
+WHERE object_id IN (OBJECT_ID('Bench.FactInvoiceLine_Rowstore'), OBJECT_ID('Bench.FactInvoiceLine_Columnstore'))
+GROUP BY object_id;
+GO
@@ -0,0 +1,187 @@
+/*====================================================================
+  Benchmark: گزارش‌های Finance / HR روی لایه Agg در برابر scan کامل Fact
+  هر گزارش با Agg.RouteQuery یک بار با @UseRollups = 1 (درشت‌ترین Rollup
+  پاسخ‌گو) و یک بار با @UseRollups = 0 (GROUP BY روی Fact پایه + Dim.DimDate)
+  ساخته و اجرا می‌شود؛ نتیجه دو مسیر با EXCEPT مقایسه می‌شود (Mismatches باید 0 باشد).
+  هزینه نگهداری هم اندازه‌گیری می‌شود: Agg.RefreshRollups برای روزهای آخرین ماه هر Fact.
+  زمان، CPU و logical reads هر اجرا در Bench.RollupBenchmark ثبت می‌شود.
+  پیش‌نیاز: بارگذاری اولیه Factها و «EXEC Agg.RefreshRollups @FullRebuild = 1».
+====================================================================*/
+USE DataWarehouse;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.schemas WHERE name = 'Bench')
+    EXEC('CREATE SCHEMA Bench;');
+GO
+
+IF OBJECT_ID('Bench.RollupBenchmark', 'U') IS NULL
+CREATE TABLE Bench.RollupBenchmark (
+    ResultID      INT IDENTITY(1,1) PRIMARY KEY,
+    RunID         UNIQUEIDENTIFIER NOT NULL,
+    QueryName     NVARCHAR(50)     NOT NULL,
+    Method        NVARCHAR(20)     NOT NULL,   -- 'BaseFact' | 'Rollup' | 'Refresh'
+    Source        NVARCHAR(256)    NOT NULL,   -- جدولی که پرس‌وجو از آن خوانده شد
+    SourceRows    BIGINT           NOT NULL,
+    Iteration     INT              NOT NULL,
+    ElapsedMs     INT              NOT NULL,
+    CpuMs         INT              NOT NULL,
+    LogicalReads  BIGINT           NOT NULL,
+    Mismatches    INT              NULL,       -- سطرهای متفاوت Rollup و Fact پایه (فقط Method = 'Rollup')
+    RunTime       DATETIME         NOT NULL DEFAULT GETDATE()
+);
+GO
+
+SET NOCOUNT ON;
+
+DECLARE @RunID UNIQUEIDENTIFIER = NEWID(),
+        @Iterations INT = 3,
+        @ColdCache BIT = 0,               -- 1: DBCC DROPCLEANBUFFERS قبل از هر اجرا (نیاز به sysadmin)
+        @LastYearStart DATE = DATEFROMPARTS(YEAR(GETDATE()) - 1, 1, 1),
+        @ThisYearStart DATE = DATEFROMPARTS(YEAR(GETDATE()), 1, 1),
+        @QueryName NVARCHAR(50), @FactTable NVARCHAR(256), @Grain VARCHAR(10), @GroupBy NVARCHAR(1000),
+        @Measures NVARCHAR(1000), @FromDate DATE, @ToDate DATE, @UseRollups BIT,
+        @Source NVARCHAR(256), @Sql NVARCHAR(MAX), @RollupSql NVARCHAR(MAX), @BaseSql NVARCHAR(MAX),
+        @SourceRows BIGINT, @Mismatches INT, @Iteration INT, @Started DATETIME2, @Cpu INT, @Reads BIGINT;
+
+-- گزارش‌های نمونه: مشتری × ماه × سرویس، کارمند/دپارتمان × ماه و سطوح درشت‌تر
+DECLARE @Queries TABLE (
+    QueryName NVARCHAR(50), FactTable NVARCHAR(256), Grain VARCHAR(10),
+    GroupBy NVARCHAR(1000), Measures NVARCHAR(1000), FromDate DATE, ToDate DATE
+);
+INSERT INTO @Queries VALUES
+    ('InvoiceCustomerServiceMonthly', 'Fact.FactInvoiceLineTransaction',     'Month', 'DimCustomerID,DimServiceTypeID', 'LineCount,NetAmount,TaxAmount', NULL, NULL),
+    ('InvoiceServiceMonthly',         'Fact.FactInvoiceLineTransaction',     'Month', 'DimServiceTypeID',               NULL,                            NULL, NULL),
+    ('InvoiceCustomerYearly',         'Fact.FactInvoiceLineTransaction',     'Year',  'DimCustomerID',                  'NetAmount',                     NULL, NULL),
+    ('InvoiceDailyLastYear',          'Fact.FactInvoiceLineTransaction',     'Day',   NULL,                             'LineCount,NetAmount',           @LastYearStart, @ThisYearStart),
+    ('PaymentCustomerMonthly',        'Fact.FactCustomerPaymentTransaction', 'Month', 'DimCustomerID',                  NULL,                            NULL, NULL),
+    ('SalaryDepartmentMonthly',       'Fact.FactSalaryPayment',              'Month', 'DepartmentKey',                  'GrossPayAmount,SalaryCostToCompany', NULL, NULL),
+    ('SalaryDepartmentYearly',        'Fact.FactSalaryPayment',              'Year',  'DepartmentKey',                  NULL,                            NULL, NULL),
+    ('AttendanceEmployeeMonthly',     'Fact.FactEmployeeAttendance',         'Month', 'EmployeeKey,AttendanceStatus',   'DayCount',                      NULL, NULL),
+    ('AttendanceStatusYearly',        'Fact.FactEmployeeAttendance',         'Year',  'AttendanceStatus',               'DayCount',                      NULL, NULL);
+
+/*-------------- 1) Routed queries: Rollup vs base fact --------------*/
+DECLARE query_cursor CURSOR LOCAL FAST_FORWARD FOR
+    SELECT QueryName, FactTable, Grain, GroupBy, Measures, FromDate, ToDate FROM @Queries ORDER BY QueryName;
+OPEN query_cursor;
+FETCH NEXT FROM query_cursor INTO @QueryName, @FactTable, @Grain, @GroupBy, @Measures, @FromDate, @ToDate;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    -- نتیجه به #Result می‌رود تا زمان انتقال به client اندازه‌گیری نشود
+    EXEC Agg.RouteQuery @FactTable = @FactTable, @Grain = @Grain, @GroupBy = @GroupBy, @Measures = @Measures,
+        @FromDate = @FromDate, @ToDate = @ToDate, @UseRollups = 0, @Execute = 0, @Sql = @BaseSql OUTPUT;
+    EXEC Agg.RouteQuery @FactTable = @FactTable, @Grain = @Grain, @GroupBy = @GroupBy, @Measures = @Measures,
+        @FromDate = @FromDate, @ToDate = @ToDate, @UseRollups = 1, @Execute = 0, @Source = @Source OUTPUT, @Sql = @RollupSql OUTPUT;
+
+    SET @Sql = STUFF(@BaseSql, CHARINDEX(NCHAR(10) + N'FROM ', @BaseSql), 0, NCHAR(10) + N'INTO #Base')
+             + STUFF(@RollupSql, CHARINDEX(NCHAR(10) + N'FROM ', @RollupSql), 0, NCHAR(10) + N'INTO #Rollup') + N'
+        SELECT @Mismatches = COUNT(*)
+        FROM (SELECT * FROM #Base EXCEPT SELECT * FROM #Rollup
+              UNION ALL
+              SELECT * FROM #Rollup EXCEPT SELECT * FROM #Base) AS d;';
+    EXEC sp_executesql @Sql, N'@FromDate DATE, @ToDate DATE, @Mismatches INT OUTPUT',
+        @FromDate = @FromDate, @ToDate = @ToDate, @Mismatches = @Mismatches OUTPUT;
+
+    SET @UseRollups = 0;
+    WHILE @UseRollups <= 1
+    BEGIN
+        SELECT @Sql = CASE WHEN @UseRollups = 1 THEN @RollupSql ELSE @BaseSql END;
+        SET @Sql = STUFF(@Sql, CHARINDEX(NCHAR(10) + N'FROM ', @Sql), 0, NCHAR(10) + N'INTO #Result');
+        SELECT @SourceRows = SUM(row_count)
+        FROM sys.dm_db_partition_stats
+        WHERE object_id = OBJECT_ID(CASE WHEN @UseRollups = 1 THEN @Source ELSE @FactTable END) AND index_id IN (0, 1);
+
+        SET @Iteration = 1;
+        WHILE @Iteration <= @Iterations
+        BEGIN
+            IF @ColdCache = 1
+            BEGIN
+                CHECKPOINT;
+                DBCC DROPCLEANBUFFERS WITH NO_INFOMSGS;
+            END;
+
+            SELECT @Cpu = cpu_time, @Reads = logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID;
+            SET @Started = SYSDATETIME();
+            EXEC sp_executesql @Sql, N'@FromDate DATE, @ToDate DATE', @FromDate = @FromDate, @ToDate = @ToDate;
+
+            INSERT INTO Bench.RollupBenchmark (RunID, QueryName, Method, Source, SourceRows, Iteration, ElapsedMs, CpuMs, LogicalReads, Mismatches)
+            SELECT @RunID, @QueryName, CASE WHEN @UseRollups = 1 THEN 'Rollup' ELSE 'BaseFact' END,
+                   CASE WHEN @UseRollups = 1 THEN @Source ELSE @FactTable END, ISNULL(@SourceRows, 0), @Iteration,
+                   DATEDIFF(MILLISECOND, @Started, SYSDATETIME()), r.cpu_time - @Cpu, r.logical_reads - @Reads,
+                   CASE WHEN @UseRollups = 1 THEN @Mismatches END
+            FROM sys.dm_exec_requests AS r
+            WHERE r.session_id = @@SPID;
+
+            SET @Iteration += 1;
+        END;
+        SET @UseRollups += 1;
+    END;
+    FETCH NEXT FROM query_cursor INTO @QueryName, @FactTable, @Grain, @GroupBy, @Measures, @FromDate, @ToDate;
+END;
+CLOSE query_cursor;
+DEALLOCATE query_cursor;
+
+/*-------------- 2) Maintenance cost: refresh of the latest month --------------*/
+DECLARE @KeyColumn SYSNAME = CASE WHEN COL_LENGTH('Dim.DimDate', 'DimDateID') IS NOT NULL
+                                  THEN 'DimDateID' ELSE 'DateKey' END,
+        @DateKeyColumn SYSNAME, @LastDate DATE, @RollupRows BIGINT;
+DECLARE @Dates Agg.DateList;
+
+DECLARE fact_cursor CURSOR LOCAL FAST_FORWARD FOR
+    SELECT FactTable, MIN(DateKeyColumn) FROM Agg.Definition GROUP BY FactTable ORDER BY FactTable;
+OPEN fact_cursor;
+FETCH NEXT FROM fact_cursor INTO @FactTable, @DateKeyColumn;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    SET @Sql = N'SELECT @LastDate = MAX(dd.FullDate) FROM ' + @FactTable + N' AS s
+                 INNER JOIN Dim.DimDate AS dd ON dd.' + QUOTENAME(@KeyColumn) + N' = s.' + QUOTENAME(@DateKeyColumn) + N';';
+    EXEC sp_executesql @Sql, N'@LastDate DATE OUTPUT', @LastDate = @LastDate OUTPUT;
+
+    DELETE FROM @Dates;
+    INSERT INTO @Dates (FullDate)
+    SELECT DISTINCT FullDate FROM Dim.DimDate
+    WHERE FullDate >= DATEFROMPARTS(YEAR(@LastDate), MONTH(@LastDate), 1) AND FullDate <= @LastDate;
+
+    SET @Iteration = 1;
+    WHILE @LastDate IS NOT NULL AND @Iteration <= @Iterations
+    BEGIN
+        SELECT @Cpu = cpu_time, @Reads = logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID;
+        SET @Started = SYSDATETIME();
+        EXEC Agg.RefreshRollups @FactTable = @FactTable, @Dates = @Dates, @RowsWritten = @RollupRows OUTPUT;
+
+        INSERT INTO Bench.RollupBenchmark (RunID, QueryName, Method, Source, SourceRows, Iteration, ElapsedMs, CpuMs, LogicalReads)
+        SELECT @RunID, N'RefreshLatestMonth', 'Refresh', @FactTable, @RollupRows, @Iteration,
+               DATEDIFF(MILLISECOND, @Started, SYSDATETIME()), r.cpu_time - @Cpu, r.logical_reads - @Reads
+        FROM sys.dm_exec_requests AS r
+        WHERE r.session_id = @@SPID;
+
+        SET @Iteration += 1;
+    END;
+    FETCH NEXT FROM fact_cursor INTO @FactTable, @DateKeyColumn;
+END;
+CLOSE fact_cursor;
+DEALLOCATE fact_cursor;
+
+/*-------------- 3) Report --------------*/
+SELECT QueryName,
+       MAX(CASE WHEN Method = 'Rollup' THEN Source END)              AS RoutedTo,
+       MAX(CASE WHEN Method = 'BaseFact' THEN SourceRows END)        AS FactRows,
+       MAX(CASE WHEN Method = 'Rollup' THEN SourceRows END)          AS RollupRows,
+       AVG(CASE WHEN Method = 'BaseFact' THEN ElapsedMs END)         AS BaseFactMs,
+       AVG(CASE WHEN Method = 'Rollup' THEN ElapsedMs END)           AS RollupMs,
+       AVG(CASE WHEN Method = 'BaseFact' THEN LogicalReads END)      AS BaseFactReads,
+       AVG(CASE WHEN Method = 'Rollup' THEN LogicalReads END)        AS RollupReads,
+       CAST(AVG(CASE WHEN Method = 'BaseFact' THEN ElapsedMs * 1.0 END) /
+            NULLIF(AVG(CASE WHEN Method = 'Rollup' THEN ElapsedMs * 1.0 END), 0) AS DECIMAL(10,1)) AS Speedup,
+       MAX(Mismatches)                                               AS Mismatches
+FROM Bench.RollupBenchmark
+WHERE RunID = @RunID AND Method <> 'Refresh'
+GROUP BY QueryName
+ORDER BY QueryName;
+
+SELECT Source AS FactTable, MAX(SourceRows) AS RollupRowsWritten, AVG(ElapsedMs) AS RefreshMs,
+       AVG(CpuMs) AS RefreshCpuMs, AVG(LogicalReads) AS RefreshReads
+FROM Bench.RollupBenchmark
+WHERE RunID = @RunID AND Method = 'Refresh'
+GROUP BY Source
+ORDER BY Source;
+GO
@@ -0,0 +1,275 @@
+/*====================================================================
+  DW Storage Profile: Columnstore + Monthly Partitions
+  پروفایل جایگزین برای Factهای بزرگ (بعد از «7 - DWTables.sql» اجرا شود):
+    - Fact.FactInvoiceLineTransaction        (DimDateID)
+    - Fact.FactSalaryPayment                 (PaymentDateKey)
+    - Fact.FactEmployeeAttendance            (AttendanceDateKey)
+    - Fact.FactCargoOperationTransactional   (DateKey)
+  هر جدول clustered columnstore روی ps_DateKeyMonthly (یک partition برای هر ماه) می‌شود
+  و synonym <Fact>_Load به جدول <Fact>_Switch اشاره می‌کند؛ رویه‌های Fact.Update*
+  سطرهای جدید را در _Switch درج و با Fact.SwitchInFactLoad وارد Fact می‌کنند.
+
+  کلید تاریخ IDENTITY است (نه yyyymmdd)، بنابراین مرز هر ماه کوچک‌ترین کلید آن ماه
+  در Dim.DimDate است؛ کلید ماه‌های آینده از پیوستگی روزانه DimDate پیش‌بینی می‌شود
+  تا partition انتهایی همیشه خالی بماند (SPLIT روی columnstore فقط برای partition خالی).
+  بازگشت به چیدمان rowstore: اجرای دوباره «7 - DWTables.sql».
+====================================================================*/
+USE DataWarehouse;
+GO
+
+/*-------------- 1) Partition function / scheme on the date key --------------*/
+CREATE OR ALTER PROCEDURE Dim.ExtendDateKeyPartitions
+    @MonthsAhead INT = 24    -- تعداد ماه‌های آینده که از قبل partition می‌گیرند
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @KeyColumn SYSNAME = CASE WHEN COL_LENGTH('Dim.DimDate', 'DimDateID') IS NOT NULL
+                                      THEN 'DimDateID' ELSE 'DateKey' END,
+            @Sql NVARCHAR(MAX), @MaxDate DATE, @MaxKey INT, @LastBoundary INT,
+            @Boundary INT, @Boundaries NVARCHAR(MAX), @TailRows BIGINT, @Misaligned INT;
+
+    CREATE TABLE #MonthStart (MonthStart DATE PRIMARY KEY, FirstKey INT NOT NULL);
+
+    -- مرز ماه‌های موجود در DimDate (عضو ناشناخته -1 در partition اول می‌ماند)
+    SET @Sql = N'
+        INSERT INTO #MonthStart (MonthStart, FirstKey)
+        SELECT DATEFROMPARTS([Year], [Month], 1), MIN(' + QUOTENAME(@KeyColumn) + N')
+        FROM Dim.DimDate
+        WHERE ' + QUOTENAME(@KeyColumn) + N' > 0
+        GROUP BY [Year], [Month];
+
+        SELECT TOP 1 @MaxDate = FullDate, @MaxKey = ' + QUOTENAME(@KeyColumn) + N'
+        FROM Dim.DimDate
+        WHERE ' + QUOTENAME(@KeyColumn) + N' > 0
+        ORDER BY FullDate DESC;';
+    EXEC sp_executesql @Sql, N'@MaxDate DATE OUTPUT, @MaxKey INT OUTPUT',
+        @MaxDate = @MaxDate OUTPUT, @MaxKey = @MaxKey OUTPUT;
+
+    IF @MaxDate IS NULL
+        THROW 50300, 'Dim.DimDate is empty; load the calendar before partitioning facts', 1;
+
+    -- مرز ماه‌های آینده: کلید(d) = کلید(آخرین روز) + فاصله روزها
+    ;WITH m AS (
+        SELECT 1 AS n
+        UNION ALL
+        SELECT n + 1 FROM m WHERE n < @MonthsAhead
+    )
+    INSERT INTO #MonthStart (MonthStart, FirstKey)
+    SELECT ms.MonthStart, @MaxKey + DATEDIFF(DAY, @MaxDate, ms.MonthStart)
+    FROM m
+    CROSS APPLY (SELECT DATEADD(MONTH, m.n, DATEFROMPARTS(YEAR(@MaxDate), MONTH(@MaxDate), 1)) AS MonthStart) AS ms
+    OPTION (MAXRECURSION 0);
+
+    IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = 'pf_DateKeyMonthly')
+    BEGIN
+        SELECT @Boundaries = STRING_AGG(CAST(FirstKey AS NVARCHAR(MAX)), N', ') WITHIN GROUP (ORDER BY FirstKey)
+        FROM #MonthStart;
+
+        SET @Sql = N'CREATE PARTITION FUNCTION pf_DateKeyMonthly (INT) AS RANGE RIGHT FOR VALUES (' + @Boundaries + N');';
+        EXEC sp_executesql @Sql;
+        CREATE PARTITION SCHEME ps_DateKeyMonthly AS PARTITION pf_DateKeyMonthly ALL TO ([PRIMARY]);
+        PRINT CONCAT('Partition function pf_DateKeyMonthly created with ', (SELECT COUNT(*) FROM #MonthStart), ' monthly boundaries.');
+        RETURN;
+    END;
+
+    SELECT @LastBoundary = MAX(CAST(rv.value AS INT))
+    FROM sys.partition_range_values AS rv
+    INNER JOIN sys.partition_functions AS pf ON pf.function_id = rv.function_id
+    WHERE pf.name = 'pf_DateKeyMonthly';
+
+    -- فقط partition انتهایی (خالی) تقسیم می‌شود
+    DECLARE boundary_cursor CURSOR LOCAL FAST_FORWARD FOR
+        SELECT FirstKey FROM #MonthStart WHERE FirstKey > @LastBoundary ORDER BY FirstKey;
+    OPEN boundary_cursor;
+    FETCH NEXT FROM boundary_cursor INTO @Boundary;
+    WHILE @@FETCH_STATUS = 0
+    BEGIN
+        SELECT @TailRows = ISNULL(SUM(ps.row_count), 0)
+        FROM sys.dm_db_partition_stats AS ps
+        INNER JOIN sys.indexes AS i ON i.object_id = ps.object_id AND i.index_id = ps.index_id
+        INNER JOIN sys.partition_schemes AS s ON s.data_space_id = i.data_space_id
+        WHERE s.name = 'ps_DateKeyMonthly'
+          AND ps.index_id IN (0, 1)
+          AND ps.partition_number = (SELECT fanout FROM sys.partition_functions WHERE name = 'pf_DateKeyMonthly');
+
+        IF @TailRows > 0
+        BEGIN
+            PRINT CONCAT('Tail partition holds ', @TailRows, ' rows; boundary ', @Boundary, ' not added.');
+            BREAK;
+        END;
+
+        ALTER PARTITION SCHEME ps_DateKeyMonthly NEXT USED [PRIMARY];
+        ALTER PARTITION FUNCTION pf_DateKeyMonthly() SPLIT RANGE (@Boundary);
+        FETCH NEXT FROM boundary_cursor INTO @Boundary;
+    END;
+    CLOSE boundary_cursor;
+    DEALLOCATE boundary_cursor;
+
+    -- ماه‌هایی که کلید واقعی آن‌ها با مرز پیش‌بینی‌شده فرق دارد (DimDate پیوسته بارگذاری نشده)
+    SELECT @Misaligned = COUNT(*)
+    FROM #MonthStart AS m
+    WHERE m.MonthStart <= @MaxDate
+      AND NOT EXISTS (SELECT 1
+                      FROM sys.partition_range_values AS rv
+                      INNER JOIN sys.partition_functions AS pf ON pf.function_id = rv.function_id
+                      WHERE pf.name = 'pf_DateKeyMonthly' AND CAST(rv.value AS INT) = m.FirstKey);
+    IF @Misaligned > 0
+        PRINT CONCAT(@Misaligned, ' month(s) in Dim.DimDate do not start on a partition boundary.');
+END;
+GO
+
+EXEC Dim.ExtendDateKeyPartitions;
+GO
+
+
+/*-------------- 2) Convert a fact table to partitioned clustered columnstore --------------*/
+CREATE OR ALTER PROCEDURE Fact.ApplyColumnstoreProfile
+    @FactTable     NVARCHAR(256),
+    @DateKeyColumn SYSNAME
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @ObjectId INT = OBJECT_ID(@FactTable),
+            @Table SYSNAME = PARSENAME(@FactTable, 1),
+            @PkName SYSNAME, @PkColumns NVARCHAR(MAX), @Sql NVARCHAR(MAX);
+
+    IF EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = @ObjectId AND type = 5)
+    BEGIN
+        PRINT CONCAT(@FactTable, ' already has a clustered columnstore index.');
+        RETURN;
+    END;
+
+    -- ایندکس‌های rowstore (مثل IX_FactInvoiceLine_AllFKs) با columnstore جایگزین می‌شوند
+    SELECT @Sql = STRING_AGG(CAST(N'DROP INDEX ' + QUOTENAME(name) + N' ON ' + @FactTable + N';' AS NVARCHAR(MAX)), N' ')
+    FROM sys.indexes
+    WHERE object_id = @ObjectId AND type = 2 AND is_primary_key = 0 AND is_unique_constraint = 0;
+    IF @Sql IS NOT NULL EXEC sp_executesql @Sql;
+
+    -- PK کلاستر (FactCargoOperationTransactional) به PK غیرکلاستر هم‌تراز با partition تبدیل می‌شود
+    SELECT @PkName = i.name,
+           @PkColumns = STRING_AGG(QUOTENAME(c.name), N', ') WITHIN GROUP (ORDER BY ic.key_ordinal)
+    FROM sys.indexes AS i
+    INNER JOIN sys.index_columns AS ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+    INNER JOIN sys.columns AS c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+    WHERE i.object_id = @ObjectId AND i.is_primary_key = 1
+    GROUP BY i.name;
+
+    IF @PkName IS NOT NULL
+    BEGIN
+        SET @Sql = N'ALTER TABLE ' + @FactTable + N' DROP CONSTRAINT ' + QUOTENAME(@PkName) + N';';
+        EXEC sp_executesql @Sql;
+    END;
+
+    SET @Sql = N'CREATE CLUSTERED COLUMNSTORE INDEX ' + QUOTENAME(N'CCI_' + @Table) + N' ON ' + @FactTable +
+               N' ON ps_DateKeyMonthly(' + QUOTENAME(@DateKeyColumn) + N');';
+    EXEC sp_executesql @Sql;
+
+    IF @PkName IS NOT NULL
+    BEGIN
+        SET @Sql = N'ALTER TABLE ' + @FactTable + N' ADD CONSTRAINT ' + QUOTENAME(N'PK_' + @Table) +
+                   N' PRIMARY KEY NONCLUSTERED (' + @PkColumns + N', ' + QUOTENAME(@DateKeyColumn) + N')' +
+                   N' ON ps_DateKeyMonthly(' + QUOTENAME(@DateKeyColumn) + N');';
+        EXEC sp_executesql @Sql;
+    END;
+
+    PRINT CONCAT(@FactTable, ' converted to partitioned clustered columnstore on ', @DateKeyColumn, '.');
+END;
+GO
+
+EXEC Fact.ApplyColumnstoreProfile 'Fact.FactInvoiceLineTransaction',      'DimDateID';
+EXEC Fact.ApplyColumnstoreProfile 'Fact.FactSalaryPayment',               'PaymentDateKey';
+EXEC Fact.ApplyColumnstoreProfile 'Fact.FactEmployeeAttendance',          'AttendanceDateKey';
+EXEC Fact.ApplyColumnstoreProfile 'Fact.FactCargoOperationTransactional', 'DateKey';
+GO
+
+
+/*-------------- 3) Switch tables (same columns, constraints and indexes as the facts) --------------*/
+IF OBJECT_ID('Fact.FactInvoiceLineTransaction_Switch', 'U') IS NOT NULL DROP TABLE Fact.FactInvoiceLineTransaction_Switch;
+CREATE TABLE Fact.FactInvoiceLineTransaction_Switch (
+    DimInvoiceID       INT          NOT NULL,
+    DimCustomerID      INT          NOT NULL,
+    DimServiceTypeID   INT          NOT NULL,
+    DimTaxID           INT,
+    DimDateID          INT          NOT NULL,
+
+    Quantity           INT          NOT NULL,
+    UnitPrice          DECIMAL(18,4) NOT NULL,
+    GrossAmount        AS (Quantity * UnitPrice) PERSISTED,
+    DiscountPercent    DECIMAL(6,4),
+    NetAmount          DECIMAL(18,4) NOT NULL,
+    TaxAmount          DECIMAL(18,4) NOT NULL,
+    EffectiveRate      AS (CASE WHEN Quantity = 0 THEN 0 ELSE NetAmount/Quantity END) PERSISTED,
+    SourceInvoiceLineID INT         NOT NULL,
+
+    CONSTRAINT FK_FactInvLineSw_DimInvoice     FOREIGN KEY(DimInvoiceID)     REFERENCES Dim.DimInvoice(DimInvoiceID),
+    CONSTRAINT FK_FactInvLineSw_DimCustomer    FOREIGN KEY(DimCustomerID)    REFERENCES Dim.DimCustomer(DimCustomerID),
+    CONSTRAINT FK_FactInvLineSw_DimServiceType FOREIGN KEY(DimServiceTypeID) REFERENCES Dim.DimServiceType(DimServiceTypeID),
+    CONSTRAINT FK_FactInvLineSw_DimTax         FOREIGN KEY(DimTaxID)         REFERENCES Dim.DimTax(DimTaxID),
+    CONSTRAINT FK_FactInvLineSw_DimDate        FOREIGN KEY(DimDateID)        REFERENCES Dim.DimDate(DimDateID),
+    INDEX CCI_FactInvoiceLineTransaction_Switch CLUSTERED COLUMNSTORE
+) ON ps_DateKeyMonthly(DimDateID);
+GO
+
+IF OBJECT_ID('Fact.FactSalaryPayment_Switch', 'U') IS NOT NULL DROP TABLE Fact.FactSalaryPayment_Switch;
+CREATE TABLE Fact.FactSalaryPayment_Switch (
+    PaymentDateKey      INT NOT NULL FOREIGN KEY REFERENCES Dim.DimDate(DateKey),
+    EmployeeKey         INT NOT NULL FOREIGN KEY REFERENCES Dim.DimEmployee(EmployeeKey),
+    DepartmentKey       INT NOT NULL FOREIGN KEY REFERENCES Dim.DimDepartment(DepartmentKey),
+    JobTitleKey         INT NOT NULL FOREIGN KEY REFERENCES Dim.DimJobTitle(JobTitleKey),
+    GrossPayAmount      DECIMAL(15, 2) NOT NULL,
+    BaseAmount          DECIMAL(15, 2) NOT NULL,
+    BonusAmount         DECIMAL(15, 2) NOT NULL,
+    DeductionsAmount    DECIMAL(15, 2) NOT NULL,
+    NetAmount           DECIMAL(15, 2) NOT NULL,
+    SalaryCostToCompany DECIMAL(15, 2) NOT NULL,
+    INDEX CCI_FactSalaryPayment_Switch CLUSTERED COLUMNSTORE
+) ON ps_DateKeyMonthly(PaymentDateKey);
+GO
+
+IF OBJECT_ID('Fact.FactEmployeeAttendance_Switch', 'U') IS NOT NULL DROP TABLE Fact.FactEmployeeAttendance_Switch;
+CREATE TABLE Fact.FactEmployeeAttendance_Switch (
+    AttendanceDateKey   INT NOT NULL FOREIGN KEY REFERENCES Dim.DimDate(DateKey),
+    EmployeeKey         INT NOT NULL FOREIGN KEY REFERENCES Dim.DimEmployee(EmployeeKey),
+    AttendanceStatus    NVARCHAR(20) NOT NULL,
+    INDEX CCI_FactEmployeeAttendance_Switch CLUSTERED COLUMNSTORE
+) ON ps_DateKeyMonthly(AttendanceDateKey);
+GO
+
+IF OBJECT_ID('Fact.FactCargoOperationTransactional_Switch', 'U') IS NOT NULL DROP TABLE Fact.FactCargoOperationTransactional_Switch;
+CREATE TABLE Fact.FactCargoOperationTransactional_Switch (
+    CargoOpSK         INT IDENTITY(1,1) NOT NULL,
+    DateKey           INT       NOT NULL,
+    FullDate          DATE      NOT NULL,
+    ShipSK            INT       NOT NULL,
+    PortSK            INT       NOT NULL,
+    ContainerSK       INT       NOT NULL,
+    EquipmentSK       INT       NOT NULL,
+    EmployeeSK        INT       NOT NULL,
+    OperationType     NVARCHAR(20) NOT NULL,
+    Quantity          INT       NULL,
+    WeightKG          DECIMAL(10,2) NULL,
+    OperationDateTime DATETIME NOT NULL,
+    CONSTRAINT PK_FactCargoOperationTransactional_Switch PRIMARY KEY NONCLUSTERED (CargoOpSK, DateKey),
+    FOREIGN KEY(DateKey)       REFERENCES dim.DimDate(DimDateID),
+    FOREIGN KEY(ShipSK)        REFERENCES dim.DimShip(ShipSK),
+    FOREIGN KEY(PortSK)        REFERENCES dim.DimPort(PortSK),
+    FOREIGN KEY(ContainerSK)   REFERENCES dim.DimContainer(ContainerSK),
+    FOREIGN KEY(EquipmentSK)   REFERENCES dim.DimEquipment(EquipmentSK),
+    FOREIGN KEY(EmployeeSK)    REFERENCES dim.DimEmployee(EmployeeSK),
+    INDEX CCI_FactCargoOperationTransactional_Switch CLUSTERED COLUMNSTORE
+) ON ps_DateKeyMonthly(DateKey);
+GO
+
+
+/*-------------- 4) Point the load synonyms at the switch tables --------------*/
+DROP SYNONYM IF EXISTS Fact.FactInvoiceLineTransaction_Load;
+CREATE SYNONYM Fact.FactInvoiceLineTransaction_Load FOR Fact.FactInvoiceLineTransaction_Switch;
+DROP SYNONYM IF EXISTS Fact.FactSalaryPayment_Load;
+CREATE SYNONYM Fact.FactSalaryPayment_Load FOR Fact.FactSalaryPayment_Switch;
+DROP SYNONYM IF EXISTS Fact.FactEmployeeAttendance_Load;
+CREATE SYNONYM Fact.FactEmployeeAttendance_Load FOR Fact.FactEmployeeAttendance_Switch;
+DROP SYNONYM IF EXISTS Fact.FactCargoOperationTransactional_Load;
+CREATE SYNONYM Fact.FactCargoOperationTransactional_Load FOR Fact.FactCargoOperationTransactional_Switch;
+GO
+
+PRINT 'Columnstore storage profile applied.';
@@ -54,7 +54,17 @@ CREATE TABLE Dim.DimCustomer (
     -- SCD2 tracking
     StartDate     DATE             NOT NULL,    
     EndDate       DATE,                           
-    IsCurrent     BIT              NOT NULL DEFAULT 1  
+    IsCurrent     BIT              NOT NULL DEFAULT 1,
+
+    -- hash ستون‌های ردیابی‌شده؛ عبارت معادل در Dim.UpdateDimCustomerIncremental روی Staging محاسبه می‌شود
+    RowHash       AS CAST(HASHBYTES('SHA2_256', CONCAT_WS(N'|',
+                      CAST(CustomerName AS NVARCHAR(200)),
+                      CAST(CustomerType AS NVARCHAR(100)),
+                      CAST(ISNULL(CountryName, N'') AS NVARCHAR(200)),
+                      CAST(ISNULL(VATNumber, '') AS NVARCHAR(50)),
+                      CAST(ISNULL(Address, N'') AS NVARCHAR(500)),
+                      CAST(ISNULL(Email, N'') AS NVARCHAR(200)),
+                      CAST(ISNULL(Phone, '') AS NVARCHAR(50)))) AS BINARY(32)) PERSISTED
 );
 GO
 
@@ -82,7 +92,12 @@ CREATE TABLE Dim.DimTax (
     -- SCD2 tracking
     StartDate     DATE            NOT NULL,           
     EndDate       DATE,                              
-    IsCurrent     BIT             NOT NULL DEFAULT 1  
+    IsCurrent     BIT             NOT NULL DEFAULT 1,
+
+    -- hash ستون‌های ردیابی‌شده؛ عبارت معادل در Dim.UpdateDimTaxIncremental روی Staging محاسبه می‌شود
+    RowHash       AS CAST(HASHBYTES('SHA2_256', CONCAT_WS(N'|',
+                      CONVERT(NVARCHAR(40), TaxRate),
+                      ISNULL(CONVERT(NCHAR(8), EffectiveTo, 112), N''))) AS BINARY(32)) PERSISTED
 );
 GO
 
@@ -143,6 +158,7 @@ CREATE TABLE Fact.FactInvoiceLineTransaction (
     NetAmount          DECIMAL(18,4) NOT NULL,       -- مبلغ خالص
     TaxAmount          DECIMAL(18,4) NOT NULL,       -- مبلغ مالیات
     EffectiveRate      AS (CASE WHEN Quantity = 0 THEN 0 ELSE NetAmount/Quantity END) PERSISTED,
+    SourceInvoiceLineID INT         NOT NULL,        -- StagingDB.Finance.InvoiceLine.InvoiceLineID (واترمارک بارگذاری)
 
     CONSTRAINT FK_FactInvLine_DimInvoice     FOREIGN KEY(DimInvoiceID)     REFERENCES Dim.DimInvoice(DimInvoiceID),
     CONSTRAINT FK_FactInvLine_DimCustomer    FOREIGN KEY(DimCustomerID)    REFERENCES Dim.DimCustomer(DimCustomerID),
@@ -164,6 +180,7 @@ CREATE TABLE Fact.FactCustomerPaymentTransaction (
     RemainingAmount    DECIMAL(18,4),                  -- مانده
     IsFullPayment      BIT            NOT NULL,     -- ۱=تمام‌پرداخت
     PartialPaymentCount INT,                           -- تعداد پرداخت‌های جزئی
+    SourcePaymentID    INT            NOT NULL,     -- StagingDB.Finance.Payment.PaymentID (واترمارک بارگذاری)
 
     CONSTRAINT FK_FactPay_DimPaymentMethod FOREIGN KEY(DimPaymentMethodID) REFERENCES Dim.DimPaymentMethod(DimPaymentMethodID),
     CONSTRAINT FK_FactPay_DimInvoice       FOREIGN KEY(DimInvoiceID)       REFERENCES Dim.DimInvoice(DimInvoiceID),
@@ -253,6 +270,8 @@ CREATE NONCLUSTERED INDEX IX_DimDate_FullDate ON Dim.DimDate(FullDate);
 
 -- DimCustomer: چون SCD2 است، معمولاً CustomerCode و IsCurrent برای یافتن نسخه جاری استفاده می‌شود
 CREATE NONCLUSTERED INDEX IX_DimCustomer_CustomerCode_IsCurrent ON Dim.DimCustomer(CustomerCode, IsCurrent);
+-- تشخیص تغییر SCD2 با hash: فقط نسخه‌های جاری
+CREATE NONCLUSTERED INDEX IX_DimCustomer_Current_RowHash ON Dim.DimCustomer(CustomerCode) INCLUDE (RowHash) WHERE IsCurrent = 1;
 
 -- DimServiceType
 CREATE NONCLUSTERED INDEX IX_DimServiceType_SourceID ON Dim.DimServiceType(SourceServiceTypeID);
@@ -260,6 +279,7 @@ CREATE NONCLUSTERED INDEX IX_DimServiceType_SourceID ON Dim.DimServiceType(Sourc
 -- DimTax: ممکن است بر اساس TaxName یا TaxType فیلتر شود
 CREATE NONCLUSTERED INDEX IX_DimTax_TaxName ON Dim.DimTax(TaxName);
 CREATE NONCLUSTERED INDEX IX_DimTax_TaxType ON Dim.DimTax(TaxType);
+CREATE NONCLUSTERED INDEX IX_DimTax_Current_RowHash ON Dim.DimTax(TaxName, TaxType, EffectiveFrom) INCLUDE (RowHash) WHERE IsCurrent = 1;
 
 -- DimBillingCycle
 CREATE NONCLUSTERED INDEX IX_DimBillingCycle_CycleLengthInDays ON Dim.DimBillingCycle(CycleLengthInDays);
@@ -282,6 +302,12 @@ ON Fact.FactInvoiceLineTransaction(DimInvoiceID, DimCustomerID, DimServiceTypeID
 CREATE NONCLUSTERED INDEX IX_FactCustomerPayment_AllFKs
 ON Fact.FactCustomerPaymentTransaction(DimCustomerID, DimInvoiceID, DimDateID, DimPaymentMethodID);
 
+-- واترمارک بارگذاری افزایشی: MAX(Source*ID) با یک seek خوانده می‌شود
+CREATE NONCLUSTERED INDEX IX_FactInvoiceLine_SourceInvoiceLineID
+ON Fact.FactInvoiceLineTransaction(SourceInvoiceLineID);
+CREATE NONCLUSTERED INDEX IX_FactCustomerPayment_SourcePaymentID
+ON Fact.FactCustomerPaymentTransaction(SourcePaymentID);
+
 -- FactCustomerBillingMonthlySnapshot
 CREATE NONCLUSTERED INDEX IX_FactMonthlyBilling_Composite
 ON Fact.FactCustomerBillingMonthlySnapshot(DimCustomerID, DimDateID);
@@ -597,6 +623,53 @@ BEGIN
 END
 GO
 
+--------------------------------------------------------------------------------
+-- SCD2 validity ranges for set-based key lookups in the HR fact loads
+-- بازه اعتبار هر نسخه [ValidFrom, ValidTo) از StartDate نسخه بعدی همان کارمند ساخته
+-- می‌شود (ترتیب StartDate و سپس کلید)، بنابراین بازه‌ها هم‌پوشانی ندارند و هر تاریخ
+-- دقیقاً همان سطری را می‌دهد که OUTER APPLY (SELECT TOP 1 ... ORDER BY StartDate DESC)
+-- می‌داد؛ نسخه‌هایی که در همان روز جایگزین شده‌اند بازه خالی دارند و حذف می‌شوند.
+--------------------------------------------------------------------------------
+CREATE NONCLUSTERED INDEX IX_DimEmployee_EmployeeID_StartDate
+ON Dim.DimEmployee(EmployeeID, StartDate, EmployeeKey);
+GO
+
+CREATE OR ALTER FUNCTION Dim.fn_EmployeeKeyRanges()
+RETURNS TABLE
+AS
+RETURN
+    SELECT r.EmployeeKey, r.EmployeeID, r.ValidFrom, r.ValidTo
+    FROM (
+        SELECT
+            de.EmployeeKey,
+            de.EmployeeID,
+            de.StartDate AS ValidFrom,
+            ISNULL(LEAD(de.StartDate) OVER (PARTITION BY de.EmployeeID ORDER BY de.StartDate, de.EmployeeKey),
+                   '9999-12-31') AS ValidTo
+        FROM Dim.DimEmployee de
+    ) AS r
+    WHERE r.ValidFrom < r.ValidTo;
+GO
+
+CREATE OR ALTER FUNCTION Dim.fn_EmploymentHistoryRanges()
+RETURNS TABLE
+AS
+RETURN
+    SELECT r.EmployeeID, r.DepartmentID, r.JobTitleID, r.Salary, r.ValidFrom, r.ValidTo
+    FROM (
+        SELECT
+            eh.EmployeeID,
+            eh.DepartmentID,
+            eh.JobTitleID,
+            eh.Salary,
+            eh.StartDate AS ValidFrom,
+            ISNULL(LEAD(eh.StartDate) OVER (PARTITION BY eh.EmployeeID ORDER BY eh.StartDate, eh.EmploymentHistoryID),
+                   '9999-12-31') AS ValidTo
+        FROM StagingDB.HumanResources.EmploymentHistory eh
+    ) AS r
+    WHERE r.ValidFrom < r.ValidTo;
+GO
+
 PRINT 'Data Warehouse creation script completed successfully.';
 
 
@@ -800,7 +873,706 @@ CREATE NONCLUSTERED INDEX IX_PortCallSnap_DateKey ON Fact.FactPortCallPeriodicSn
 CREATE NONCLUSTERED INDEX IX_PortCallSnap_PortSK ON Fact.FactPortCallPeriodicSnapshot(PortSK);
 
 CREATE NONCLUSTERED INDEX IX_ContainerMovAcc_PortSK ON Fact.FactContainerMovementsAcc(PortSK);
+-- grain جدول تجمیعی؛ MERGE افزایشی UpdateFactContainerMovementsAcc روی همین کلید seek می‌کند
+CREATE UNIQUE NONCLUSTERED INDEX UX_ContainerMovAcc_PortType ON Fact.FactContainerMovementsAcc(PortSK, ContainerTypeID);
 
 CREATE NONCLUSTERED INDEX IX_EquipAssign_DateKey ON Fact.FactEquipmentAssignment(DateKey);
 CREATE NONCLUSTERED INDEX IX_EquipAssign_EmployeeSK ON Fact.FactEquipmentAssignment(EmployeeSK);
 
+
+
+/*====================================================================
+  3.  FACT LOAD TARGETS
+  رویه‌های Fact.Update* سطرهای جدید را در <Fact>_Load درج می‌کنند.
+  در چیدمان rowstore (همین اسکریپت) synonym مستقیماً به جدول Fact اشاره می‌کند؛
+  اسکریپت «7 - DWTables Columnstore.sql» آن را به جدول _Switch هدایت می‌کند تا
+  سطرهای جدید با partition switch وارد جدول Fact شوند.
+====================================================================*/
+IF OBJECT_ID('Fact.FactInvoiceLineTransaction_Load', 'SN') IS NULL
+    CREATE SYNONYM Fact.FactInvoiceLineTransaction_Load FOR Fact.FactInvoiceLineTransaction;
+IF OBJECT_ID('Fact.FactSalaryPayment_Load', 'SN') IS NULL
+    CREATE SYNONYM Fact.FactSalaryPayment_Load FOR Fact.FactSalaryPayment;
+IF OBJECT_ID('Fact.FactEmployeeAttendance_Load', 'SN') IS NULL
+    CREATE SYNONYM Fact.FactEmployeeAttendance_Load FOR Fact.FactEmployeeAttendance;
+IF OBJECT_ID('Fact.FactCargoOperationTransactional_Load', 'SN') IS NULL
+    CREATE SYNONYM Fact.FactCargoOperationTransactional_Load FOR Fact.FactCargoOperationTransactional;
+GO
+
+/*====================================================================
+  4.  SURROGATE KEY MAPS
+  نگاشت کلید عددی منبع (StagingDB) به کلید جانشین نسخه جاری هر بُعد.
+  Factهای Finance به جای زنجیره Invoice → Contract → Customer و join روی
+  InvoiceNumber / CustomerCode (رشته‌ای)، کلیدها را با join عددی از این جداول می‌خوانند.
+  نگهداری: Dim.RefreshKeyMap* در انتهای بارگذاری اولیه و Dim.Update*Incremental.
+====================================================================*/
+IF OBJECT_ID('Dim.KeyMapCustomer', 'U') IS NULL
+CREATE TABLE Dim.KeyMapCustomer (
+    CustomerID     INT         NOT NULL PRIMARY KEY,   -- StagingDB.Finance.Customer.CustomerID
+    CustomerCode   VARCHAR(50) NOT NULL,
+    DimCustomerID  INT         NOT NULL                -- نسخه جاری (IsCurrent = 1)
+);
+GO
+
+IF OBJECT_ID('Dim.KeyMapInvoice', 'U') IS NULL
+CREATE TABLE Dim.KeyMapInvoice (
+    InvoiceID      INT          NOT NULL PRIMARY KEY,  -- StagingDB.Finance.Invoice.InvoiceID
+    InvoiceNumber  VARCHAR(100) NOT NULL,
+    DimInvoiceID   INT          NOT NULL,
+    CustomerID     INT          NOT NULL               -- Invoice → Contract → Customer، یک بار حل می‌شود
+);
+GO
+
+CREATE OR ALTER PROCEDURE Dim.RefreshKeyMapCustomer
+AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE Dim.KeyMapCustomer AS T
+    USING (
+        SELECT stc.CustomerID, stc.CustomerCode, dc.DimCustomerID
+        FROM StagingDB.Finance.Customer AS stc
+        INNER JOIN Dim.DimCustomer      AS dc ON dc.CustomerCode = stc.CustomerCode AND dc.IsCurrent = 1
+    ) AS S
+    ON T.CustomerID = S.CustomerID
+    WHEN MATCHED AND (T.DimCustomerID <> S.DimCustomerID OR T.CustomerCode <> S.CustomerCode) THEN
+        UPDATE SET T.DimCustomerID = S.DimCustomerID, T.CustomerCode = S.CustomerCode
+    WHEN NOT MATCHED BY TARGET THEN
+        INSERT (CustomerID, CustomerCode, DimCustomerID) VALUES (S.CustomerID, S.CustomerCode, S.DimCustomerID);
+END;
+GO
+
+CREATE OR ALTER PROCEDURE Dim.RefreshKeyMapInvoice
+AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE Dim.KeyMapInvoice AS T
+    USING (
+        SELECT inv.InvoiceID, inv.InvoiceNumber, di.DimInvoiceID, ctr.CustomerID
+        FROM StagingDB.Finance.Invoice  AS inv
+        INNER JOIN Dim.DimInvoice       AS di  ON di.InvoiceNumber = inv.InvoiceNumber
+        INNER JOIN StagingDB.Finance.Contract AS ctr ON ctr.ContractID = inv.ContractID
+    ) AS S
+    ON T.InvoiceID = S.InvoiceID
+    WHEN MATCHED AND (T.DimInvoiceID <> S.DimInvoiceID OR T.CustomerID <> S.CustomerID OR T.InvoiceNumber <> S.InvoiceNumber) THEN
+        UPDATE SET T.DimInvoiceID = S.DimInvoiceID, T.CustomerID = S.CustomerID, T.InvoiceNumber = S.InvoiceNumber
+    WHEN NOT MATCHED BY TARGET THEN
+        INSERT (InvoiceID, InvoiceNumber, DimInvoiceID, CustomerID) VALUES (S.InvoiceID, S.InvoiceNumber, S.DimInvoiceID, S.CustomerID);
+END;
+GO
+
+/*====================================================================
+  5.  LOAD WATERMARKS
+  آخرین کلید منبع پردازش‌شده برای رویه‌های افزایشی DW که شناسه منبع را در
+  خود جدول Fact نگه نمی‌دارند (مثل snapshotهای تجمیعی).
+====================================================================*/
+IF OBJECT_ID('Audit.DW_Watermark', 'U') IS NULL
+CREATE TABLE Audit.DW_Watermark (
+    ProcessName  NVARCHAR(128) NOT NULL,   -- معمولاً نام جدول Fact
+    SourceTable  NVARCHAR(128) NOT NULL,   -- جدول Staging
+    LastKey      BIGINT        NOT NULL DEFAULT 0,
+    LastRunTime  DATETIME      NULL,
+    CONSTRAINT PK_DW_Watermark PRIMARY KEY (ProcessName, SourceTable)
+);
+GO
+
+CREATE OR ALTER PROCEDURE Audit.SetDWWatermark
+    @ProcessName NVARCHAR(128),
+    @SourceTable NVARCHAR(128),
+    @LastKey     BIGINT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE Audit.DW_Watermark AS T
+    USING (SELECT @ProcessName AS ProcessName, @SourceTable AS SourceTable) AS S
+        ON T.ProcessName = S.ProcessName AND T.SourceTable = S.SourceTable
+    WHEN MATCHED THEN
+        UPDATE SET T.LastKey = @LastKey, T.LastRunTime = GETDATE()
+    WHEN NOT MATCHED THEN
+        INSERT (ProcessName, SourceTable, LastKey, LastRunTime) VALUES (@ProcessName, @SourceTable, @LastKey, GETDATE());
+END;
+GO
+
+/*====================================================================
+  6.  CALENDAR GENERATOR
+  ساخت set-based تقویم Dim.DimDate در یک INSERT. فقط تاریخ‌های موجود نبودن
+  درج می‌شوند (بدون DELETE)، پس هم بارگذاری اولیه و هم افزایشی از آن استفاده
+  می‌کنند. ستون کلید (DimDateID یا DateKey) در لیست درج نیست و هر دو نسخه
+  جدول پشتیبانی می‌شوند.
+====================================================================*/
+CREATE OR ALTER PROCEDURE Dim.ExtendDimDate
+    @StartDate DATE,
+    @EndDate   DATE,
+    @Inserted  INT = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET DATEFIRST 1;  -- Monday = 1 مستقل از تنظیمات session فراخوان
+
+    DECLARE @DayCount INT = DATEDIFF(DAY, @StartDate, @EndDate) + 1,
+            @FirstDate DATE;
+    SET @Inserted = 0;
+    IF @DayCount IS NULL OR @DayCount <= 0 RETURN;
+
+    -- کلید IDENTITY ترتیب تاریخ را دنبال می‌کند؛ افزودن تاریخ‌های قبل از اولین روز
+    -- موجود این ترتیب را می‌شکند (ماه‌های آن با مرز partition ماهانه جور نیستند).
+    SELECT @FirstDate = MIN(FullDate) FROM Dim.DimDate WHERE FullDate > '1900-01-01';
+    IF @FirstDate IS NOT NULL AND @StartDate < @FirstDate
+        PRINT CONCAT('Dim.ExtendDimDate: adding dates before ', @FirstDate,
+                     '; their keys are higher than existing keys (not chronological).');
+
+    ;WITH Tally AS
+    (
+        SELECT TOP (@DayCount) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS n
+        FROM sys.all_objects AS s1
+        CROSS JOIN sys.all_objects AS s2
+    ),
+    DateSeq AS
+    (
+        SELECT DATEADD(DAY, n, @StartDate) AS FullDate FROM Tally
+    )
+    INSERT INTO Dim.DimDate WITH (TABLOCK)
+    (
+        FullDate, [Year], [Quarter], [Month], MonthName,
+        [Day], DayOfWeek, DayName, WeekOfYear, IsWeekend
+    )
+    SELECT
+        d.FullDate,
+        YEAR(d.FullDate),
+        DATEPART(QUARTER, d.FullDate),
+        MONTH(d.FullDate),
+        CHOOSE(MONTH(d.FullDate), N'January', N'February', N'March', N'April', N'May', N'June',
+               N'July', N'August', N'September', N'October', N'November', N'December'),
+        DAY(d.FullDate),
+        DATEPART(WEEKDAY, d.FullDate),
+        CHOOSE(DATEPART(WEEKDAY, d.FullDate), N'Monday', N'Tuesday', N'Wednesday', N'Thursday',
+               N'Friday', N'Saturday', N'Sunday'),
+        DATEPART(WEEK, d.FullDate),
+        CASE WHEN DATEPART(WEEKDAY, d.FullDate) IN (6,7) THEN 1 ELSE 0 END
+    FROM DateSeq AS d
+    WHERE NOT EXISTS (SELECT 1 FROM Dim.DimDate AS x WHERE x.FullDate = d.FullDate)
+    ORDER BY d.FullDate
+    OPTION (MAXDOP 1);
+
+    SET @Inserted = @@ROWCOUNT;
+END;
+GO
+
+-- بازه تاریخ‌های Staging (Finance / HR / PortOperations) را می‌خواند و تقویم را
+-- تا پوشش کامل آن، و حداقل تا پایان @YearsAhead سال بعد، گسترش می‌دهد.
+CREATE OR ALTER PROCEDURE Dim.ExtendDimDateFromStaging
+    @YearsAhead INT = 1,
+    @Inserted   INT = NULL OUTPUT,
+    @MinDate    DATE = NULL OUTPUT,
+    @MaxDate    DATE = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Horizon DATE = DATEFROMPARTS(YEAR(GETDATE()) + @YearsAhead, 12, 31);
+
+    SELECT @MinDate = MIN(r.MinDate), @MaxDate = MAX(r.MaxDate)
+    FROM (
+        SELECT MIN(InvoiceDate), MAX(DueDate)                          FROM StagingDB.Finance.Invoice
+        UNION ALL SELECT MIN(PaymentDate), MAX(PaymentDate)            FROM StagingDB.Finance.Payment
+        UNION ALL SELECT MIN(StartDate), MAX(ISNULL(EndDate, StartDate)) FROM StagingDB.Finance.Contract
+        UNION ALL SELECT MIN(HireDate), MAX(HireDate)                  FROM StagingDB.HumanResources.Employee
+        UNION ALL SELECT MIN(StartDate), MAX(StartDate)                FROM StagingDB.HumanResources.EmploymentHistory
+        UNION ALL SELECT MIN(AttendanceDate), MAX(AttendanceDate)      FROM StagingDB.HumanResources.Attendance
+        UNION ALL SELECT MIN(PaymentDate), MAX(PaymentDate)            FROM StagingDB.HumanResources.SalaryPayment
+        UNION ALL SELECT MIN(TerminationDate), MAX(TerminationDate)    FROM StagingDB.HumanResources.Termination
+        UNION ALL SELECT MIN(CAST(ArrivalDateTime AS DATE)), MAX(CAST(ISNULL(DepartureDateTime, ArrivalDateTime) AS DATE))
+                                                                       FROM StagingDB.PortOperations.PortCall
+        UNION ALL SELECT MIN(CAST(OperationDateTime AS DATE)), MAX(CAST(OperationDateTime AS DATE))
+                                                                       FROM StagingDB.PortOperations.CargoOperation
+        UNION ALL SELECT MIN(CAST(MovementDateTime AS DATE)), MAX(CAST(MovementDateTime AS DATE))
+                                                                       FROM StagingDB.PortOperations.ContainerYardMovement
+    ) AS r(MinDate, MaxDate);
+
+    DECLARE @From DATE = ISNULL(@MinDate, CONVERT(DATE, GETDATE())),
+            @To   DATE = CASE WHEN @MaxDate > @Horizon THEN @MaxDate ELSE @Horizon END;
+
+    EXEC Dim.ExtendDimDate @StartDate = @From, @EndDate = @To, @Inserted = @Inserted OUTPUT;
+END;
+GO
+
+/*====================================================================
+  7.  ETL TELEMETRY
+  جدول واحد StagingDB.Audit.ETLStepMetric (4 - SATables.sql) از DW با synonym
+  در دسترس است؛ لاگ‌های dbo.ETLLog و Audit.DW_ETL_Log با trigger به آن منتقل
+  می‌شوند تا زمان و تعداد سطر همه مراحل Dim/Fact در یک جا باشد.
+====================================================================*/
+IF OBJECT_ID('Audit.ETLStepMetric', 'SN') IS NULL
+    CREATE SYNONYM Audit.ETLStepMetric FOR StagingDB.Audit.ETLStepMetric;
+IF OBJECT_ID('Audit.LogETLStep', 'SN') IS NULL
+    CREATE SYNONYM Audit.LogETLStep FOR StagingDB.Audit.LogETLStep;
+GO
+
+CREATE OR ALTER TRIGGER dbo.TR_ETLLog_StepMetric ON dbo.ETLLog
+AFTER INSERT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    INSERT INTO Audit.ETLStepMetric (RunID, Source, TargetTable, Step, StartTime, EndTime, RowsWritten, Status, [Message])
+    SELECT CONVERT(NVARCHAR(64), SESSION_CONTEXT(N'ETLRunID')), N'dbo.ETLLog', i.TableName, i.OperationType,
+           i.StartTime, i.EndTime, rc.RowsWritten,
+           CASE WHEN i.OperationType = 'Error' THEN 'Failed' ELSE 'Success' END, i.[Message]
+    FROM inserted AS i
+    CROSS APPLY StagingDB.Audit.fn_MessageRowCount(i.OperationType, i.[Message]) AS rc;
+END;
+GO
+
+CREATE OR ALTER TRIGGER Audit.TR_DW_ETL_Log_StepMetric ON Audit.DW_ETL_Log
+AFTER INSERT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    INSERT INTO Audit.ETLStepMetric (RunID, Source, ProcessName, TargetTable, Step, StartTime, EndTime, RowsWritten, Status, [Message])
+    SELECT CONVERT(NVARCHAR(64), SESSION_CONTEXT(N'ETLRunID')), N'Audit.DW_ETL_Log', i.ProcessName, i.TargetTable, i.OperationType,
+           i.StartTime, i.EndTime,
+           CASE WHEN i.RecordsInserted IS NULL AND i.RecordsUpdated IS NULL THEN NULL
+                ELSE ISNULL(i.RecordsInserted, 0) + ISNULL(i.RecordsUpdated, 0) END,
+           i.Status, LEFT(i.[Message], 2000)
+    FROM inserted AS i;
+END;
+GO
+
+/*====================================================================
+  8.  ROLLUPS
+  لایه تجمیع‌شده گزارش‌های Finance و HR: جمع‌های Fact در grainهای روز/ماه/سال
+  × مشتری/سرویس/دپارتمان نگه داشته می‌شوند تا گزارش‌ها GROUP BY روی کل Fact نزنند.
+    Agg.Definition : هر جدول Rollup، Fact آن، grain، ستون‌های بُعد و منبع تجمیع
+                     (Fact پایه یا Rollup ریزتر در SourceRollup)
+    Agg.Measure    : measureهای جمع‌پذیر هر Fact؛ هر Rollup همه measureهای Fact خود را دارد
+  نگهداری: Agg.RefreshRollups دوره‌هایی را که روزهای @Dates در آن‌ها است حذف و از
+  منبع دوباره تجمیع می‌کند (Fact.Update* پس از درج؛ بارگذاری اولیه با @FullRebuild = 1).
+  Agg.RouteQuery پرس‌وجوی گروه‌بندی‌شده را به درشت‌ترین Rollup پاسخ‌گو می‌فرستد.
+  indexed view استفاده نشده است: کلید Dim.DimDate در دو نسخه جدول فرق دارد و
+  partition switch روی جدول دارای indexed view ممکن نیست.
+====================================================================*/
+IF NOT EXISTS (SELECT 1 FROM sys.schemas WHERE name = 'Agg')
+    EXEC('CREATE SCHEMA Agg;');
+GO
+
+IF OBJECT_ID('Agg.Definition', 'U') IS NULL
+CREATE TABLE Agg.Definition (
+    RollupTable    NVARCHAR(256)  NOT NULL PRIMARY KEY,   -- مثل Agg.InvoiceLineDaily
+    FactTable      NVARCHAR(256)  NOT NULL,
+    Grain          VARCHAR(10)    NOT NULL CHECK (Grain IN ('Day', 'Month', 'Year')),
+    GrainRank      AS (CASE Grain WHEN 'Day' THEN 1 WHEN 'Month' THEN 2 ELSE 3 END) PERSISTED,
+    Dimensions     NVARCHAR(1000) NOT NULL,               -- ستون‌های بُعد Fact، جداشده با کاما
+    DateKeyColumn  SYSNAME        NOT NULL,               -- کلید تاریخ در Fact
+    SourceRollup   NVARCHAR(256)  NULL,                   -- NULL = Fact پایه
+    BuildOrder     TINYINT        NOT NULL,               -- منبع پیش از Rollupهای وابسته بازسازی می‌شود
+    LastFullBuild  DATETIME       NULL                    -- NULL = هنوز کامل ساخته نشده (RouteQuery از آن استفاده نمی‌کند)
+);
+GO
+
+IF COL_LENGTH('Agg.Definition', 'LastFullBuild') IS NULL
+    ALTER TABLE Agg.Definition ADD LastFullBuild DATETIME NULL;
+GO
+
+IF OBJECT_ID('Agg.Measure', 'U') IS NULL
+CREATE TABLE Agg.Measure (
+    FactTable    NVARCHAR(256) NOT NULL,
+    MeasureName  SYSNAME       NOT NULL,   -- نام ستون در جداول Rollup
+    Expression   NVARCHAR(400) NOT NULL,   -- تجمیع روی Fact (alias s)؛ در Rollupها با SUM ترکیب می‌شود
+    CONSTRAINT PK_AggMeasure PRIMARY KEY (FactTable, MeasureName)
+);
+GO
+
+IF TYPE_ID('Agg.DateList') IS NULL
+    CREATE TYPE Agg.DateList AS TABLE (FullDate DATE NOT NULL PRIMARY KEY);
+GO
+
+MERGE Agg.Measure AS T
+USING (VALUES
+    ('Fact.FactInvoiceLineTransaction',     'LineCount',           'COUNT_BIG(*)'),
+    ('Fact.FactInvoiceLineTransaction',     'Quantity',            'SUM(CAST(s.Quantity AS BIGINT))'),
+    ('Fact.FactInvoiceLineTransaction',     'GrossAmount',         'SUM(s.GrossAmount)'),
+    ('Fact.FactInvoiceLineTransaction',     'NetAmount',           'SUM(s.NetAmount)'),
+    ('Fact.FactInvoiceLineTransaction',     'TaxAmount',           'SUM(s.TaxAmount)'),
+    ('Fact.FactCustomerPaymentTransaction', 'PaymentCount',        'COUNT_BIG(*)'),
+    ('Fact.FactCustomerPaymentTransaction', 'PaymentAmount',       'SUM(s.PaymentAmount)'),
+    ('Fact.FactCustomerPaymentTransaction', 'FullPaymentCount',    'SUM(CAST(s.IsFullPayment AS INT))'),
+    ('Fact.FactCustomerPaymentTransaction', 'DaysToPaymentTotal',  'SUM(CAST(s.DaysToPayment AS BIGINT))'),
+    ('Fact.FactSalaryPayment',              'PaymentCount',        'COUNT_BIG(*)'),
+    ('Fact.FactSalaryPayment',              'GrossPayAmount',      'SUM(s.GrossPayAmount)'),
+    ('Fact.FactSalaryPayment',              'BaseAmount',          'SUM(s.BaseAmount)'),
+    ('Fact.FactSalaryPayment',              'BonusAmount',         'SUM(s.BonusAmount)'),
+    ('Fact.FactSalaryPayment',              'DeductionsAmount',    'SUM(s.DeductionsAmount)'),
+    ('Fact.FactSalaryPayment',              'NetAmount',           'SUM(s.NetAmount)'),
+    ('Fact.FactSalaryPayment',              'SalaryCostToCompany', 'SUM(s.SalaryCostToCompany)'),
+    ('Fact.FactEmployeeAttendance',         'DayCount',            'COUNT_BIG(*)')
+) AS S (FactTable, MeasureName, Expression)
+ON T.FactTable = S.FactTable AND T.MeasureName = S.MeasureName
+WHEN MATCHED AND T.Expression <> S.Expression THEN
+    UPDATE SET T.Expression = S.Expression
+WHEN NOT MATCHED BY TARGET THEN
+    INSERT (FactTable, MeasureName, Expression) VALUES (S.FactTable, S.MeasureName, S.Expression);
+
+MERGE Agg.Definition AS T
+USING (VALUES
+    ('Agg.InvoiceLineDaily',         'Fact.FactInvoiceLineTransaction',     'Day',   'DimCustomerID,DimServiceTypeID',    'DimDateID',         NULL,                     1),
+    ('Agg.InvoiceLineMonthly',       'Fact.FactInvoiceLineTransaction',     'Month', 'DimCustomerID,DimServiceTypeID',    'DimDateID',         'Agg.InvoiceLineDaily',   2),
+    ('Agg.InvoiceServiceMonthly',    'Fact.FactInvoiceLineTransaction',     'Month', 'DimServiceTypeID',                  'DimDateID',         'Agg.InvoiceLineMonthly', 3),
+    ('Agg.InvoiceCustomerYearly',    'Fact.FactInvoiceLineTransaction',     'Year',  'DimCustomerID',                     'DimDateID',         'Agg.InvoiceLineMonthly', 3),
+    ('Agg.PaymentDaily',             'Fact.FactCustomerPaymentTransaction', 'Day',   'DimCustomerID,DimPaymentMethodID',  'DimDateID',         NULL,                     1),
+    ('Agg.PaymentCustomerMonthly',   'Fact.FactCustomerPaymentTransaction', 'Month', 'DimCustomerID',                     'DimDateID',         'Agg.PaymentDaily',       2),
+    ('Agg.SalaryMonthly',            'Fact.FactSalaryPayment',              'Month', 'DepartmentKey,EmployeeKey',         'PaymentDateKey',    NULL,                     1),
+    ('Agg.SalaryDepartmentYearly',   'Fact.FactSalaryPayment',              'Year',  'DepartmentKey',                     'PaymentDateKey',    'Agg.SalaryMonthly',      2),
+    ('Agg.AttendanceMonthly',        'Fact.FactEmployeeAttendance',         'Month', 'EmployeeKey,AttendanceStatus',      'AttendanceDateKey', NULL,                     1)
+) AS S (RollupTable, FactTable, Grain, Dimensions, DateKeyColumn, SourceRollup, BuildOrder)
+ON T.RollupTable = S.RollupTable
+WHEN MATCHED THEN
+    -- تغییر تعریف یعنی محتوای فعلی Rollup دیگر معتبر نیست تا بازسازی کامل بعدی
+    UPDATE SET T.LastFullBuild = CASE WHEN T.FactTable = S.FactTable AND T.Grain = S.Grain AND T.Dimensions = S.Dimensions
+                                           AND T.DateKeyColumn = S.DateKeyColumn
+                                           AND ISNULL(T.SourceRollup, N'') = ISNULL(S.SourceRollup, N'')
+                                      THEN T.LastFullBuild END,
+               T.FactTable = S.FactTable, T.Grain = S.Grain, T.Dimensions = S.Dimensions,
+               T.DateKeyColumn = S.DateKeyColumn, T.SourceRollup = S.SourceRollup, T.BuildOrder = S.BuildOrder
+WHEN NOT MATCHED BY TARGET THEN
+    INSERT (RollupTable, FactTable, Grain, Dimensions, DateKeyColumn, SourceRollup, BuildOrder)
+    VALUES (S.RollupTable, S.FactTable, S.Grain, S.Dimensions, S.DateKeyColumn, S.SourceRollup, S.BuildOrder);
+GO
+
+/*-------------- 8-1  Rollup tables (PeriodDate = اولین روز دوره) --------------*/
+IF OBJECT_ID('Agg.InvoiceLineDaily', 'U') IS NULL
+CREATE TABLE Agg.InvoiceLineDaily (
+    PeriodDate        DATE          NOT NULL,
+    DimCustomerID     INT           NOT NULL,
+    DimServiceTypeID  INT           NOT NULL,
+    LineCount         BIGINT        NOT NULL,
+    Quantity          BIGINT        NOT NULL,
+    GrossAmount       DECIMAL(38,4) NOT NULL,
+    NetAmount         DECIMAL(38,4) NOT NULL,
+    TaxAmount         DECIMAL(38,4) NOT NULL,
+    CONSTRAINT PK_AggInvoiceLineDaily PRIMARY KEY (PeriodDate, DimCustomerID, DimServiceTypeID)
+);
+
+IF OBJECT_ID('Agg.InvoiceLineMonthly', 'U') IS NULL
+CREATE TABLE Agg.InvoiceLineMonthly (
+    PeriodDate        DATE          NOT NULL,
+    DimCustomerID     INT           NOT NULL,
+    DimServiceTypeID  INT           NOT NULL,
+    LineCount         BIGINT        NOT NULL,
+    Quantity          BIGINT        NOT NULL,
+    GrossAmount       DECIMAL(38,4) NOT NULL,
+    NetAmount         DECIMAL(38,4) NOT NULL,
+    TaxAmount         DECIMAL(38,4) NOT NULL,
+    CONSTRAINT PK_AggInvoiceLineMonthly PRIMARY KEY (PeriodDate, DimCustomerID, DimServiceTypeID)
+);
+
+IF OBJECT_ID('Agg.InvoiceServiceMonthly', 'U') IS NULL
+CREATE TABLE Agg.InvoiceServiceMonthly (
+    PeriodDate        DATE          NOT NULL,
+    DimServiceTypeID  INT           NOT NULL,
+    LineCount         BIGINT        NOT NULL,
+    Quantity          BIGINT        NOT NULL,
+    GrossAmount       DECIMAL(38,4) NOT NULL,
+    NetAmount         DECIMAL(38,4) NOT NULL,
+    TaxAmount         DECIMAL(38,4) NOT NULL,
+    CONSTRAINT PK_AggInvoiceServiceMonthly PRIMARY KEY (PeriodDate, DimServiceTypeID)
+);
+
+IF OBJECT_ID('Agg.InvoiceCustomerYearly', 'U') IS NULL
+CREATE TABLE Agg.InvoiceCustomerYearly (
+    PeriodDate        DATE          NOT NULL,
+    DimCustomerID     INT           NOT NULL,
+    LineCount         BIGINT        NOT NULL,
+    Quantity          BIGINT        NOT NULL,
+    GrossAmount       DECIMAL(38,4) NOT NULL,
+    NetAmount         DECIMAL(38,4) NOT NULL,
+    TaxAmount         DECIMAL(38,4) NOT NULL,
+    CONSTRAINT PK_AggInvoiceCustomerYearly PRIMARY KEY (PeriodDate, DimCustomerID)
+);
+
+IF OBJECT_ID('Agg.PaymentDaily', 'U') IS NULL
+CREATE TABLE Agg.PaymentDaily (
+    PeriodDate          DATE          NOT NULL,
+    DimCustomerID       INT           NOT NULL,
+    DimPaymentMethodID  INT           NOT NULL,
+    PaymentCount        BIGINT        NOT NULL,
+    PaymentAmount       DECIMAL(38,4) NOT NULL,
+    FullPaymentCount    BIGINT        NOT NULL,
+    DaysToPaymentTotal  BIGINT        NULL,      -- میانگین = DaysToPaymentTotal / PaymentCount
+    CONSTRAINT PK_AggPaymentDaily PRIMARY KEY (PeriodDate, DimCustomerID, DimPaymentMethodID)
+);
+
+IF OBJECT_ID('Agg.PaymentCustomerMonthly', 'U') IS NULL
+CREATE TABLE Agg.PaymentCustomerMonthly (
+    PeriodDate          DATE          NOT NULL,
+    DimCustomerID       INT           NOT NULL,
+    PaymentCount        BIGINT        NOT NULL,
+    PaymentAmount       DECIMAL(38,4) NOT NULL,
+    FullPaymentCount    BIGINT        NOT NULL,
+    DaysToPaymentTotal  BIGINT        NULL,
+    CONSTRAINT PK_AggPaymentCustomerMonthly PRIMARY KEY (PeriodDate, DimCustomerID)
+);
+
+IF OBJECT_ID('Agg.SalaryMonthly', 'U') IS NULL
+CREATE TABLE Agg.SalaryMonthly (
+    PeriodDate           DATE          NOT NULL,
+    DepartmentKey        INT           NOT NULL,
+    EmployeeKey          INT           NOT NULL,
+    PaymentCount         BIGINT        NOT NULL,
+    GrossPayAmount       DECIMAL(38,2) NOT NULL,
+    BaseAmount           DECIMAL(38,2) NOT NULL,
+    BonusAmount          DECIMAL(38,2) NOT NULL,
+    DeductionsAmount     DECIMAL(38,2) NOT NULL,
+    NetAmount            DECIMAL(38,2) NOT NULL,
+    SalaryCostToCompany  DECIMAL(38,2) NOT NULL,
+    CONSTRAINT PK_AggSalaryMonthly PRIMARY KEY (PeriodDate, DepartmentKey, EmployeeKey)
+);
+
+IF OBJECT_ID('Agg.SalaryDepartmentYearly', 'U') IS NULL
+CREATE TABLE Agg.SalaryDepartmentYearly (
+    PeriodDate           DATE          NOT NULL,
+    DepartmentKey        INT           NOT NULL,
+    PaymentCount         BIGINT        NOT NULL,
+    GrossPayAmount       DECIMAL(38,2) NOT NULL,
+    BaseAmount           DECIMAL(38,2) NOT NULL,
+    BonusAmount          DECIMAL(38,2) NOT NULL,
+    DeductionsAmount     DECIMAL(38,2) NOT NULL,
+    NetAmount            DECIMAL(38,2) NOT NULL,
+    SalaryCostToCompany  DECIMAL(38,2) NOT NULL,
+    CONSTRAINT PK_AggSalaryDepartmentYearly PRIMARY KEY (PeriodDate, DepartmentKey)
+);
+
+IF OBJECT_ID('Agg.AttendanceMonthly', 'U') IS NULL
+CREATE TABLE Agg.AttendanceMonthly (
+    PeriodDate        DATE          NOT NULL,
+    EmployeeKey       INT           NOT NULL,
+    AttendanceStatus  NVARCHAR(20)  NOT NULL,
+    DayCount          BIGINT        NOT NULL,
+    CONSTRAINT PK_AggAttendanceMonthly PRIMARY KEY (PeriodDate, EmployeeKey, AttendanceStatus)
+);
+GO
+
+-- بازتجمیع دوره‌های تغییرکرده از Fact پایه روی کلید تاریخ seek می‌کند
+-- (پروفایل columnstore این ایندکس‌ها را حذف می‌کند و partition elimination جای آن را می‌گیرد)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_FactInvoiceLine_DimDateID' AND object_id = OBJECT_ID('Fact.FactInvoiceLineTransaction'))
+    CREATE NONCLUSTERED INDEX IX_FactInvoiceLine_DimDateID
+    ON Fact.FactInvoiceLineTransaction(DimDateID)
+    INCLUDE (DimCustomerID, DimServiceTypeID, Quantity, GrossAmount, NetAmount, TaxAmount);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_FactCustomerPayment_DimDateID' AND object_id = OBJECT_ID('Fact.FactCustomerPaymentTransaction'))
+    CREATE NONCLUSTERED INDEX IX_FactCustomerPayment_DimDateID
+    ON Fact.FactCustomerPaymentTransaction(DimDateID)
+    INCLUDE (DimCustomerID, DimPaymentMethodID, PaymentAmount, IsFullPayment, DaysToPayment);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_FactSalaryPayment_PaymentDateKey' AND object_id = OBJECT_ID('Fact.FactSalaryPayment'))
+    CREATE NONCLUSTERED INDEX IX_FactSalaryPayment_PaymentDateKey
+    ON Fact.FactSalaryPayment(PaymentDateKey)
+    INCLUDE (DepartmentKey, EmployeeKey, GrossPayAmount, BaseAmount, BonusAmount, DeductionsAmount, NetAmount, SalaryCostToCompany);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_FactEmployeeAttendance_AttendanceDateKey' AND object_id = OBJECT_ID('Fact.FactEmployeeAttendance'))
+    CREATE NONCLUSTERED INDEX IX_FactEmployeeAttendance_AttendanceDateKey
+    ON Fact.FactEmployeeAttendance(AttendanceDateKey)
+    INCLUDE (EmployeeKey, AttendanceStatus);
+GO
+
+/*-------------- 8-2  Maintenance --------------*/
+-- اولین روز دوره‌ای که @Date در آن است
+CREATE OR ALTER FUNCTION Agg.fn_PeriodStart (@Grain VARCHAR(10), @Date DATE)
+RETURNS DATE
+AS
+BEGIN
+    RETURN CASE @Grain
+               WHEN 'Day'   THEN @Date
+               WHEN 'Month' THEN DATEFROMPARTS(YEAR(@Date), MONTH(@Date), 1)
+               WHEN 'Year'  THEN DATEFROMPARTS(YEAR(@Date), 1, 1)
+           END;
+END;
+GO
+
+-- Rollupهای @FactTable (NULL = همه) را برای دوره‌های شامل روزهای @Dates بازسازی می‌کند:
+-- سطرهای آن دوره‌ها حذف و از منبع (Fact یا Rollup ریزتر) دوباره تجمیع می‌شوند،
+-- پس اجرای تکراری همان نتیجه را می‌دهد. @FullRebuild = 1 همه دوره‌ها را می‌سازد.
+-- Rollupی که هنوز کامل ساخته نشده (LastFullBuild NULL) به‌جای تازه‌سازی دوره‌ای کامل ساخته
+-- می‌شود؛ پس اجرای بدون @Dates فقط Rollupهای ساخته‌نشده را می‌سازد (گره Agg.RefreshRollups در orchestrator).
+CREATE OR ALTER PROCEDURE Agg.RefreshRollups
+    @FactTable   NVARCHAR(256) = NULL,
+    @Dates       Agg.DateList READONLY,
+    @FullRebuild BIT = 0,
+    @RowsWritten BIGINT = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @KeyColumn SYSNAME = CASE WHEN COL_LENGTH('Dim.DimDate', 'DimDateID') IS NOT NULL
+                                      THEN 'DimDateID' ELSE 'DateKey' END,
+            @RollupTable NVARCHAR(256), @Fact NVARCHAR(256), @Grain VARCHAR(10), @Dimensions NVARCHAR(1000),
+            @DateKeyColumn SYSNAME, @SourceRollup NVARCHAR(256),
+            @DimColumns NVARCHAR(MAX), @DimSelect NVARCHAR(MAX), @MeasureColumns NVARCHAR(MAX), @MeasureSelect NVARCHAR(MAX),
+            @From NVARCHAR(MAX), @DateExpr NVARCHAR(200), @Sql NVARCHAR(MAX),
+            @LastFullBuild DATETIME, @Rebuild BIT, @Periods INT, @Written BIGINT, @StepStart DATETIME;
+
+    SET @RowsWritten = 0;
+    IF @FullRebuild = 0 AND NOT EXISTS (SELECT 1 FROM @Dates)
+       AND NOT EXISTS (SELECT 1 FROM Agg.Definition
+                       WHERE (@FactTable IS NULL OR FactTable = @FactTable) AND LastFullBuild IS NULL)
+        RETURN;
+
+    CREATE TABLE #PeriodDays (FullDate DATE NOT NULL PRIMARY KEY, PeriodDate DATE NOT NULL);
+
+    DECLARE rollup_cursor CURSOR LOCAL FAST_FORWARD FOR
+        SELECT RollupTable, FactTable, Grain, Dimensions, DateKeyColumn, SourceRollup, LastFullBuild
+        FROM Agg.Definition
+        WHERE @FactTable IS NULL OR FactTable = @FactTable
+        ORDER BY FactTable, BuildOrder;
+    OPEN rollup_cursor;
+    FETCH NEXT FROM rollup_cursor INTO @RollupTable, @Fact, @Grain, @Dimensions, @DateKeyColumn, @SourceRollup, @LastFullBuild;
+    WHILE @@FETCH_STATUS = 0
+    BEGIN
+        SET @StepStart = GETDATE();
+        SET @Rebuild = CASE WHEN @FullRebuild = 1 OR @LastFullBuild IS NULL THEN 1 ELSE 0 END;
+
+        -- روزهای تقویم در دوره‌های تغییرکرده (join تساوی روی FullDate به جای join بازه‌ای)
+        TRUNCATE TABLE #PeriodDays;
+        INSERT INTO #PeriodDays (FullDate, PeriodDate)
+        SELECT DISTINCT dd.FullDate, Agg.fn_PeriodStart(@Grain, dd.FullDate)
+        FROM Dim.DimDate AS dd
+        WHERE @Rebuild = 1
+           OR Agg.fn_PeriodStart(@Grain, dd.FullDate) IN (SELECT Agg.fn_PeriodStart(@Grain, d.FullDate) FROM @Dates AS d);
+        SELECT @Periods = COUNT(DISTINCT PeriodDate) FROM #PeriodDays;
+
+        SELECT @DimColumns = STRING_AGG(CAST(QUOTENAME(TRIM(value)) AS NVARCHAR(MAX)), N', ') WITHIN GROUP (ORDER BY TRIM(value)),
+               @DimSelect  = STRING_AGG(CAST(N's.' + QUOTENAME(TRIM(value)) AS NVARCHAR(MAX)), N', ') WITHIN GROUP (ORDER BY TRIM(value))
+        FROM STRING_SPLIT(@Dimensions, ',');
+
+        SELECT @MeasureColumns = STRING_AGG(CAST(QUOTENAME(MeasureName) AS NVARCHAR(MAX)), N', ') WITHIN GROUP (ORDER BY MeasureName),
+               @MeasureSelect  = STRING_AGG(CAST(CASE WHEN @SourceRollup IS NULL THEN Expression
+                                                      ELSE N'SUM(s.' + QUOTENAME(MeasureName) + N')' END
+                                                 + N' AS ' + QUOTENAME(MeasureName) AS NVARCHAR(MAX)), N', ') WITHIN GROUP (ORDER BY MeasureName)
+        FROM Agg.Measure
+        WHERE FactTable = @Fact;
+
+        IF @SourceRollup IS NULL
+            SELECT @From = @Fact + N' AS s INNER JOIN Dim.DimDate AS dd ON dd.' + QUOTENAME(@KeyColumn) + N' = s.' + QUOTENAME(@DateKeyColumn),
+                   @DateExpr = N'dd.FullDate';
+        ELSE
+            SELECT @From = @SourceRollup + N' AS s', @DateExpr = N's.PeriodDate';
+
+        SET @Sql = CASE WHEN @Rebuild = 1 THEN N'TRUNCATE TABLE ' + @RollupTable + N';'
+                        ELSE N'DELETE r FROM ' + @RollupTable + N' AS r WHERE r.PeriodDate IN (SELECT PeriodDate FROM #PeriodDays);' END + N'
+            INSERT INTO ' + @RollupTable + N' (PeriodDate, ' + @DimColumns + N', ' + @MeasureColumns + N')
+            SELECT pd.PeriodDate, ' + @DimSelect + N', ' + @MeasureSelect + N'
+            FROM ' + @From + N'
+            INNER JOIN #PeriodDays AS pd ON pd.FullDate = ' + @DateExpr + N'
+            GROUP BY pd.PeriodDate, ' + @DimSelect + N';
+            SET @Written = @@ROWCOUNT;';
+        -- تا پایان بازسازی کامل، RouteQuery از این Rollup نیمه‌ساخته استفاده نمی‌کند
+        IF @Rebuild = 1
+            UPDATE Agg.Definition SET LastFullBuild = NULL WHERE RollupTable = @RollupTable;
+        EXEC sp_executesql @Sql, N'@Written BIGINT OUTPUT', @Written = @Written OUTPUT;
+        SET @RowsWritten += @Written;
+        IF @Rebuild = 1
+            UPDATE Agg.Definition SET LastFullBuild = GETDATE() WHERE RollupTable = @RollupTable;
+
+        INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
+        VALUES (@RollupTable, CASE WHEN @Rebuild = 1 THEN 'RollupRebuild' ELSE 'RollupRefresh' END, @StepStart, GETDATE(),
+                CONCAT('Written ', @Written, ' rows for ', @Periods, ' ', LOWER(@Grain), ' period(s) from ', ISNULL(@SourceRollup, @Fact)));
+
+        FETCH NEXT FROM rollup_cursor INTO @RollupTable, @Fact, @Grain, @Dimensions, @DateKeyColumn, @SourceRollup, @LastFullBuild;
+    END;
+    CLOSE rollup_cursor;
+    DEALLOCATE rollup_cursor;
+END;
+GO
+
+/*-------------- 8-3  Query routing --------------*/
+-- پرس‌وجوی «measureها به تفکیک دوره @Grain و ستون‌های @GroupBy» روی @FactTable را
+-- به درشت‌ترین Rollup پاسخ‌گو می‌فرستد: grain آن ریزتر یا برابر @Grain، ستون‌های
+-- @GroupBy در Dimensions آن، و مرزهای بازه [@FromDate, @ToDate) روی مرز دوره‌های آن.
+-- بین چند Rollup، grain درشت‌تر و سپس تعداد سطر کمتر؛ در غیر این صورت Fact پایه.
+-- Rollupی که هنوز کامل ساخته نشده (LastFullBuild NULL) انتخاب نمی‌شود تا جمع ناقص برنگردد.
+CREATE OR ALTER PROCEDURE Agg.RouteQuery
+    @FactTable  NVARCHAR(256),
+    @Grain      VARCHAR(10),              -- 'Day' | 'Month' | 'Year'
+    @GroupBy    NVARCHAR(1000) = NULL,    -- ستون‌های بُعد Fact، جداشده با کاما
+    @Measures   NVARCHAR(1000) = NULL,    -- نام measureها در Agg.Measure (NULL = همه)
+    @FromDate   DATE = NULL,
+    @ToDate     DATE = NULL,              -- انحصاری
+    @UseRollups BIT = 1,                  -- 0 = همیشه Fact پایه (مقایسه و بنچمارک)
+    @Execute    BIT = 1,
+    @Source     NVARCHAR(256) = NULL OUTPUT,
+    @Sql        NVARCHAR(MAX) = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @KeyColumn SYSNAME = CASE WHEN COL_LENGTH('Dim.DimDate', 'DimDateID') IS NOT NULL
+                                      THEN 'DimDateID' ELSE 'DateKey' END,
+            @GrainRank INT = CASE @Grain WHEN 'Day' THEN 1 WHEN 'Month' THEN 2 WHEN 'Year' THEN 3 END,
+            @DateKeyColumn SYSNAME, @DateExpr NVARCHAR(200), @Period NVARCHAR(400), @From NVARCHAR(MAX),
+            @DimSelect NVARCHAR(MAX), @MeasureSelect NVARCHAR(MAX), @Where NVARCHAR(MAX), @Requested INT, @Found INT;
+
+    IF @GrainRank IS NULL
+        THROW 50400, 'Grain must be Day, Month or Year', 1;
+
+    DECLARE @Columns TABLE (ColumnName SYSNAME PRIMARY KEY);
+    INSERT INTO @Columns (ColumnName)
+    SELECT DISTINCT TRIM(value) FROM STRING_SPLIT(ISNULL(@GroupBy, N''), ',') WHERE TRIM(value) <> N'';
+    IF EXISTS (SELECT 1 FROM @Columns WHERE COL_LENGTH(@FactTable, ColumnName) IS NULL)
+        THROW 50401, 'Every group-by column must be a column of the fact table', 1;
+
+    DECLARE @Wanted TABLE (MeasureName SYSNAME PRIMARY KEY, Expression NVARCHAR(400) NOT NULL);
+    INSERT INTO @Wanted (MeasureName, Expression)
+    SELECT m.MeasureName, m.Expression
+    FROM Agg.Measure AS m
+    WHERE m.FactTable = @FactTable
+      AND (@Measures IS NULL OR m.MeasureName IN (SELECT TRIM(value) FROM STRING_SPLIT(@Measures, ',')));
+    SET @Found = @@ROWCOUNT;
+    SELECT @Requested = COUNT(DISTINCT TRIM(value)) FROM STRING_SPLIT(@Measures, ',') WHERE TRIM(value) <> N'';
+    IF @Found = 0 OR @Found < ISNULL(@Requested, 0)
+        THROW 50402, 'Unknown measure for this fact table (see Agg.Measure)', 1;
+
+    SELECT TOP 1 @DateKeyColumn = DateKeyColumn FROM Agg.Definition WHERE FactTable = @FactTable;
+    IF @DateKeyColumn IS NULL
+        THROW 50403, 'Fact table has no rollup definition (see Agg.Definition)', 1;
+
+    -- @Source: Rollup انتخاب‌شده یا خود @FactTable
+    SET @Source = NULL;
+    IF @UseRollups = 1
+        SELECT TOP 1 @Source = d.RollupTable
+        FROM Agg.Definition AS d
+        OUTER APPLY (SELECT SUM(ps.row_count) AS RowCnt
+                     FROM sys.dm_db_partition_stats AS ps
+                     WHERE ps.object_id = OBJECT_ID(d.RollupTable) AND ps.index_id IN (0, 1)) AS st
+        WHERE d.FactTable = @FactTable
+          AND d.LastFullBuild IS NOT NULL
+          AND d.GrainRank <= @GrainRank
+          AND NOT EXISTS (SELECT 1 FROM @Columns AS c
+                          WHERE c.ColumnName NOT IN (SELECT TRIM(value) FROM STRING_SPLIT(d.Dimensions, ',')))
+          AND (@FromDate IS NULL OR @FromDate = Agg.fn_PeriodStart(d.Grain, @FromDate))
+          AND (@ToDate IS NULL OR @ToDate = Agg.fn_PeriodStart(d.Grain, @ToDate))
+        ORDER BY d.GrainRank DESC, st.RowCnt;
+
+    IF @Source IS NOT NULL
+        SELECT @From = @Source + N' AS s', @DateExpr = N's.PeriodDate',
+               @MeasureSelect = STRING_AGG(CAST(N'SUM(s.' + QUOTENAME(MeasureName) + N') AS ' + QUOTENAME(MeasureName) AS NVARCHAR(MAX)), N', ')
+                                WITHIN GROUP (ORDER BY MeasureName)
+        FROM @Wanted;
+    ELSE
+        SELECT @Source = @FactTable,
+               @From = @FactTable + N' AS s INNER JOIN Dim.DimDate AS dd ON dd.' + QUOTENAME(@KeyColumn) + N' = s.' + QUOTENAME(@DateKeyColumn),
+               @DateExpr = N'dd.FullDate',
+               @MeasureSelect = STRING_AGG(CAST(Expression + N' AS ' + QUOTENAME(MeasureName) AS NVARCHAR(MAX)), N', ')
+                                WITHIN GROUP (ORDER BY MeasureName)
+        FROM @Wanted;
+
+    SET @Period = CASE @Grain
+                      WHEN 'Day'   THEN @DateExpr
+                      WHEN 'Month' THEN N'DATEFROMPARTS(YEAR(' + @DateExpr + N'), MONTH(' + @DateExpr + N'), 1)'
+                      ELSE N'DATEFROMPARTS(YEAR(' + @DateExpr + N'), 1, 1)'
+                  END;
+    SELECT @DimSelect = STRING_AGG(CAST(N', s.' + QUOTENAME(ColumnName) AS NVARCHAR(MAX)), N'') WITHIN GROUP (ORDER BY ColumnName)
+    FROM @Columns;
+    SET @Where = CONCAT_WS(N' AND ',
+                           CASE WHEN @FromDate IS NOT NULL THEN @DateExpr + N' >= @FromDate' END,
+                           CASE WHEN @ToDate IS NOT NULL THEN @DateExpr + N' < @ToDate' END);
+
+    SET @Sql = N'SELECT ' + @Period + N' AS PeriodDate' + ISNULL(@DimSelect, N'') + N', ' + @MeasureSelect + N'
+FROM ' + @From + CASE WHEN @Where <> N'' THEN N'
+WHERE ' + @Where ELSE N'' END + N'
+GROUP BY ' + @Period + ISNULL(@DimSelect, N'') + N'
+ORDER BY PeriodDate' + ISNULL(@DimSelect, N'') + N';';
+
+    IF @Execute = 1
+        EXEC sp_executesql @Sql, N'@FromDate DATE, @ToDate DATE', @FromDate = @FromDate, @ToDate = @ToDate;
+END;
+GO
@@ -8,14 +8,27 @@ conn_str = (
     "Trusted_Connection=yes;"
 )
 
-try:
-    conn = pyodbc.connect(conn_str)
-    cursor = conn.cursor()
-    cursor.execute("SELECT GETDATE();")  # یک کوئری ساده برای تست
-    row = cursor.fetchone()
-    print("✅ اتصال موفق بود. تاریخ/زمان سرور:", row[0])
-
-    cursor.close()
-    conn.close()
-except Exception as e:
-    print("❌ خطا در اتصال:", e)
+
+def connect(autocommit=False, timeout=0):
+    """اتصال جدید به SQL Server؛ timeout زمان مجاز هر query به ثانیه است (0 = بدون محدودیت)"""
+    conn = pyodbc.connect(conn_str, autocommit=autocommit)
+    conn.timeout = timeout
+    return conn
+
+
+def test_connection():
+    try:
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT GETDATE();")  # یک کوئری ساده برای تست
+        row = cursor.fetchone()
+        print("✅ اتصال موفق بود. تاریخ/زمان سرور:", row[0])
+
+        cursor.close()
+        conn.close()
+    except Exception as e:
+        print("❌ خطا در اتصال:", e)
+
+
+if __name__ == '__main__':
+    test_connection()
@@ -0,0 +1,553 @@
+import os
+import re
+import sys
+import json
+import time
+import platform
+import subprocess
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+import pandas as pd
+
+import main as finance
+import data_generator_HR as hr
+import data_generator_PortOps as portops
+import delta_generator as delta
+import etl_orchestrator as orchestrator
+from bulk_loader import make_loader
+from parallel_loader import parse_fk_graph, load_order, restrict_graph
+from streaming import database_sink_factory
+from telemetry import MetricRecorder, new_run_id, read_metrics
+
+# ----------------------------------
+# بنچمارک سرتاسری ETL با ضریب مقیاس (به سبک TPC: SF1 / SF10 / SF100)
+#   source   : تولید داده Finance، HR و PortOperations در TradePortDB
+#   staging  : رویه‌های Load* در StagingDB (etl_orchestrator)
+#   firstload: Wrapperهای بارگذاری اولیه Dim و Fact (FirstLoad/9 و 11)
+#   delta    : یک روز داده افزایشی (delta_generator) ← staging ← DWETL افزایشی
+# زمان و تعداد سطر هر مرحله در StagingDB.Audit.ETLStepMetric (با یک RunID) و در یک فایل
+# JSON در BENCHMARK_DIR ثبت می‌شود تا اجراها (مثلاً قبل و بعد از تغییر schema/رویه) مقایسه شوند.
+# پیش‌فرض: اسکریپت‌های ساخت جدول و رویه (1، 4، 5، 7، FirstLoad، DWETL) قبلاً اجرا شده‌اند.
+# در backend SQLite فقط مراحل تولید داده اجرا می‌شوند و مراحل T-SQL رد (skipped) ثبت می‌شوند.
+# ----------------------------------
+
+SCALE_FACTORS = {'SF1': 1, 'SF10': 10, 'SF100': 100}
+SCALE = 'SF1'
+
+# تعداد سطر در SF1؛ در SFn ضرب در n می‌شود (SF10 برابر پیش‌فرض‌های فعلی main.py و data_generator_HR.py)
+# جدول‌های مرجع (کشور، مالیات، نوع سرویس، کارمند، بندر و ...) ثابت‌اند: داده‌های مرجع Insert_HR.sql و
+# FKهای data_generator_PortOps.py به بازه ثابتی از شناسه‌های آن‌ها اشاره می‌کنند
+FINANCE_SF1 = {
+    'N_CUSTOMERS':     50,
+    'N_CONTRACTS':     100,
+    'N_INVOICES':      1000,
+    'N_PAYMENTS':      15000,
+    'N_RECOGNITIONS':  20000,
+    'N_INVOICE_LINES': 100000,
+}
+HR_SF1 = {
+    'NUM_ATTENDANCE':      100000,
+    'NUM_SALARY_PAYMENTS': 40000,
+}
+PORTOPS_SF1 = {
+    'NUM_SHIPS':                 2,
+    'NUM_VOYAGES':               50,
+    'NUM_CONTAINERS':            1000,     # حداقل؛ تولیدکننده برای رسیدن به NUM_CARGO_OPERATIONS بزرگ‌ترش می‌کند
+    'NUM_CARGO_OPERATIONS':      100000,
+    'NUM_EQUIPMENT_ASSIGNMENTS': 100000,
+    'NUM_YARD_MOVEMENTS':        20000,
+}
+# جدول هر ثابت PORTOPS_SF1؛ در فایل نتیجه تعداد سطر واقعی تولیدشده به‌جای مقدار اسمی ثبت می‌شود
+PORTOPS_TABLES = {
+    'NUM_SHIPS':                 'PortOperations.Ship',
+    'NUM_VOYAGES':               'PortOperations.Voyage',
+    'NUM_CONTAINERS':            'PortOperations.Container',
+    'NUM_CARGO_OPERATIONS':      'PortOperations.CargoOperation',
+    'NUM_EQUIPMENT_ASSIGNMENTS': 'Common.OperationEquipmentAssignment',
+    'NUM_YARD_MOVEMENTS':        'PortOperations.ContainerYardMovement',
+}
+# حجم داده افزایشی روزانه هم با همان نسبت DAILY_INSERTS (که متناظر SF10 است) مقیاس می‌شود
+DELTA_DAYS = 1
+
+# تاریخ ثابت برای تکرارپذیری (هم‌راستا با base_date در main.py)
+END_DATE = date(2025, 6, 26)
+
+BACKEND          = finance.BACKEND  # 'sqlserver' | 'sqlite'
+RESET            = True             # پاک‌سازی TradePortDB و StagingDB پیش از تولید داده
+WORKERS          = orchestrator.WORKERS
+STOP_ON_FAILURE  = True             # بعد از شکست یک مرحله، مراحل بعدی رد می‌شوند
+BENCHMARK_DIR    = './benchmark_results'
+COMPARE_WITH     = None             # مسیر فایل نتیجه یک اجرای قبلی برای مقایسه
+
+SOURCE_DATABASE  = 'TradePortDB'
+STAGING_DATABASE = orchestrator.STAGING_DATABASE
+DW_DATABASE      = 'DataWarehouse'
+
+HR_REFERENCE_SCRIPT = 'Insert_HR.sql'
+
+FIRSTLOAD_DIM_PROCS = (
+    'Dim.LoadAllDimInitialLoads',
+    'Dim.LoadAllDimensions',
+    'Dim.LoadAllPortOpsDimInitialLoads',
+)
+FIRSTLOAD_FACT_PROCS = (
+    'Fact.LoadAllFactInitialLoads',
+    'Fact.LoadAllFacts',
+    'Fact.LoadAllFactInitialLoad',
+    'Agg.RefreshRollups @FullRebuild = 1',   # ساخت کامل لایه Agg (مثل FirstLoad/11)
+)
+
+_GO = re.compile(r'^\s*GO\s*;?\s*$', re.IGNORECASE | re.MULTILINE)
+_BULK_INSERT = re.compile(r'BULK INSERT\b.*?\)\s*;', re.IGNORECASE | re.DOTALL)
+
+
+def scale_factor(scale=SCALE):
+    return SCALE_FACTORS[scale] if isinstance(scale, str) else scale
+
+
+def scaled_rows(sf1_rows, factor):
+    return {name: max(1, round(rows * factor)) for name, rows in sf1_rows.items()}
+
+
+@contextmanager
+def module_constants(module, values):
+    """تنظیم موقت ثابت‌های ماژول (تولیدکننده‌ها اندازه‌ها را هنگام اجرا از ثابت‌های ماژول می‌خوانند)"""
+    previous = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(module, name, value)
+
+
+# ----------------------------------
+# اسکریپت‌های T-SQL
+# ----------------------------------
+def sql_batches(text):
+    """حذف BULK INSERTها (داده‌های تولیدی مستقیماً بارگذاری می‌شوند) و تقسیم روی GO"""
+    text = _BULK_INSERT.sub('', text)
+    return [b for b in _GO.split(text) if re.sub(r'--[^\n]*', '', b).strip()]
+
+
+def read_script(path):
+    with open(path, encoding='utf-8-sig') as f:
+        return f.read()
+
+
+def execute_batches(conn, batches):
+    cursor = conn.cursor()
+    try:
+        for batch in batches:
+            cursor.execute(batch)
+            while cursor.nextset():
+                pass
+    finally:
+        cursor.close()
+
+
+def execute_procs(conn, procs, run_id, database=DW_DATABASE):
+    """اجرای رویه‌ها به ترتیب با RunID بنچمارک در SESSION_CONTEXT"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("EXEC StagingDB.Audit.BeginETLRun @RunID = ?", run_id)
+        for proc in procs:
+            print(f"🚀 Running: {database}.{proc}")
+            cursor.execute(f"EXEC {database}.{proc}")
+            while cursor.nextset():
+                pass
+    finally:
+        cursor.close()
+
+
+def layer_graph(layers):
+    """زیرگراف ETL_DAG برای یک لایه ('staging' یا 'dw')"""
+    dw = {n for n in orchestrator.ETL_DAG if n.split('.')[0] in orchestrator.LAYER_DATABASES}
+    nodes = dw if layers == 'dw' else set(orchestrator.ETL_DAG) - dw
+    return restrict_graph(orchestrator.ETL_DAG, nodes)
+
+
+# ----------------------------------
+# مراحل
+# ----------------------------------
+class Stage:
+    def __init__(self, name, run, sql_only=False):
+        self.name = name
+        self.run = run
+        self.sql_only = sql_only
+
+
+class StageResult:
+    def __init__(self, name, status, started, seconds=0.0, rows=None, error=None):
+        self.name = name
+        self.status = status
+        self.started = started
+        self.seconds = seconds
+        self.rows = rows
+        self.error = error
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.rows and self.seconds > 0 else None
+
+    def as_dict(self):
+        return {'stage': self.name, 'status': self.status, 'started': self.started.isoformat(timespec='seconds'),
+                'seconds': round(self.seconds, 3), 'rows': self.rows,
+                'rows_per_sec': round(self.rows_per_sec, 1) if self.rows_per_sec else None,
+                'error': self.error}
+
+    def __repr__(self):
+        rows = f", {self.rows} rows" if self.rows is not None else ''
+        return f"{self.name}: {self.status} ({self.seconds:.2f}s{rows})"
+
+
+class _CountingSink:
+    """شمارش سطرهای نوشته‌شده هر جدول (تعداد واقعی، نه ثابت اسمی تولیدکننده)"""
+
+    def __init__(self, sink, table, counts):
+        self.sink = sink
+        self.table = table
+        self.counts = counts
+
+    def write(self, chunk):
+        self.sink.write(chunk)
+        self.counts[self.table] = self.counts.get(self.table, 0) + len(chunk)
+
+    def close(self):
+        self.sink.close()
+
+
+class Benchmark:
+    """
+    اجرای مراحل به ترتیب با یک RunID مشترک
+    تعداد سطر مراحل Python از loaderها و بقیه مراحل از جمع RowsWritten همان بازه در ETLStepMetric است
+    """
+
+    def __init__(self, scale=SCALE, backend=BACKEND, workers=WORKERS, reset=RESET, delta_days=DELTA_DAYS):
+        self.scale = scale
+        self.factor = scale_factor(scale)
+        self.backend = backend
+        self.workers = workers
+        self.reset = reset
+        self.delta_days = delta_days
+        self.run_id = new_run_id()
+        self.recorder = MetricRecorder('benchmark', self.run_id, source='Benchmark')
+        self.results = []
+        self.generated_rows = {}
+
+    # ---------- اتصال‌ها ----------
+    def connect_source(self):
+        """اتصال loaderهای Python (همان تنظیمات main.py)"""
+        with module_constants(finance, {'BACKEND': self.backend}):
+            return finance.connect()
+
+    def connect_sql(self):
+        from Connect import connect as connect_sql_server
+        return connect_sql_server(autocommit=True)
+
+    @property
+    def sqlite(self):
+        return self.backend == 'sqlite'
+
+    def stages(self):
+        stages = [
+            Stage('source.finance', self.source_finance),
+            Stage('source.hr', self.source_hr),
+            Stage('source.hr_reference', self.source_hr_reference, sql_only=True),
+            Stage('source.portops', self.source_portops),
+            Stage('staging.initial', self.staging, sql_only=True),
+            Stage('firstload.dims', lambda: self.procs(FIRSTLOAD_DIM_PROCS), sql_only=True),
+            Stage('firstload.facts', lambda: self.procs(FIRSTLOAD_FACT_PROCS), sql_only=True),
+            Stage('delta.source', self.delta_source),
+            Stage('delta.staging', self.staging, sql_only=True),
+            Stage('delta.dwetl', self.dwetl, sql_only=True),
+        ]
+        if self.reset:
+            stages.insert(0, Stage('reset', self.reset_databases))
+        if not self.delta_days:
+            stages = [s for s in stages if not s.name.startswith('delta.')]
+        return stages
+
+    # ---------- پیاده‌سازی مراحل ----------
+    def reset_databases(self):
+        """خالی کردن جدول‌های منبع و Staging به ترتیب معکوس FK و صفر کردن watermarkهای Staging"""
+        graph = parse_fk_graph()
+        tables = [t for level in reversed(load_order(graph)) for t in level]
+        if self.sqlite:
+            conn = self.connect_source()
+            try:
+                for table in tables:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.commit()
+            finally:
+                conn.close()
+            return
+        batches = [f"DELETE FROM {db}.{t};" for db in (SOURCE_DATABASE, STAGING_DATABASE) for t in tables]
+        batches.append(f"UPDATE {STAGING_DATABASE}.Audit.ETL_Watermark "
+                       f"SET LastKey = NULL, LastRowVersion = NULL, LastDeltaRows = NULL;")
+        conn = self.connect_sql()
+        try:
+            execute_batches(conn, batches)
+        finally:
+            conn.close()
+
+    def _load_streams(self, generate):
+        conn = self.connect_source()
+        try:
+            loader = make_loader(conn, finance.LOAD_MODE, batch_size=finance.BATCH_SIZE,
+                                 commit_every=finance.COMMIT_EVERY, progress=False)
+            sink_factory = database_sink_factory(self.recorder.wrap(loader))
+            generate(lambda table: _CountingSink(sink_factory(table), table, self.generated_rows))
+        finally:
+            conn.close()
+
+    def source_finance(self):
+        day = datetime.combine(END_DATE, datetime.min.time())
+        with module_constants(finance, {**scaled_rows(FINANCE_SF1, self.factor), 'base_date': day, 'date_choices': None}):
+            self._load_streams(finance.stream_tables)
+
+    def source_hr(self):
+        with module_constants(hr, {**scaled_rows(HR_SF1, self.factor), 'END_DATE': END_DATE}):
+            self._load_streams(lambda sink_factory: hr.main(sink_factory))
+
+    def source_hr_reference(self):
+        self._script(read_script(HR_REFERENCE_SCRIPT))
+
+    def source_portops(self):
+        with module_constants(portops, {**scaled_rows(PORTOPS_SF1, self.factor), 'END_DATE': END_DATE}):
+            self._load_streams(lambda sink_factory: portops.main(sink_factory))
+
+    def _script(self, text):
+        conn = self.connect_sql()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"USE {SOURCE_DATABASE};")
+            cursor.close()
+            execute_batches(conn, sql_batches(text))
+        finally:
+            conn.close()
+
+    def procs(self, procs):
+        conn = self.connect_sql()
+        try:
+            execute_procs(conn, procs, self.run_id)
+        finally:
+            conn.close()
+
+    def _run_dag(self, layer):
+        executor = orchestrator.SqlServerExecutor(self.workers)
+        try:
+            result = orchestrator.run_dag(executor, graph=layer_graph(layer), workers=self.workers,
+                                          retries=0, run_id=self.run_id)
+        finally:
+            executor.close()
+        if not result.ok:
+            raise RuntimeError(f"Failed nodes: {', '.join(result.by_status('failed'))}")
+
+    def staging(self):
+        self._run_dag('staging')
+
+    def dwetl(self):
+        self._run_dag('dw')
+
+    def delta_source(self):
+        volumes = scaled_rows(delta.DAILY_INSERTS, self.factor / SCALE_FACTORS['SF10'])
+        start_date = datetime.combine(END_DATE, datetime.min.time()) + timedelta(days=1)
+        with module_constants(delta, {'BACKEND': self.backend}):
+            conn = delta.connect()
+            try:
+                delta.run_days(conn, days=self.delta_days, start_date=start_date, volumes=volumes,
+                               run_id=self.run_id)
+            finally:
+                conn.close()
+
+    # ---------- اجرا ----------
+    def run_stage(self, stage):
+        started = datetime.now()
+        if stage.sql_only and self.sqlite:
+            return StageResult(stage.name, 'skipped', started)
+        print(f"⏱️ {stage.name}")
+        pending = len(self.recorder.metrics)
+        timer = time.perf_counter()
+        try:
+            stage.run()
+            status, error = 'success', None
+        except Exception as e:
+            status, error = 'failed', str(e)
+            print(f"❌ {stage.name}: {e}")
+        seconds = time.perf_counter() - timer
+        written = [m.rows_written for m in self.recorder.metrics[pending:] if m.rows_written is not None]
+        result = StageResult(stage.name, status, started, seconds, sum(written) if written else None, error)
+        self.recorder.step('Stage', started, target=stage.name, rows_written=result.rows,
+                           status='Failed' if error else 'Success', message=error)
+        return result
+
+    def run(self):
+        started = datetime.now()
+        timer = time.perf_counter()
+        failed = False
+        for stage in self.stages():
+            if failed and STOP_ON_FAILURE:
+                result = StageResult(stage.name, 'skipped', datetime.now())
+            else:
+                result = self.run_stage(stage)
+                failed = failed or result.status == 'failed'
+            print(f"   {result}")
+            self.results.append(result)
+        seconds = time.perf_counter() - timer
+
+        conn = self.connect_source() if self.sqlite else self.connect_sql()
+        try:
+            self.recorder.flush(conn)
+            steps = self.step_metrics(conn)
+            table_rows = self.table_rows(conn)
+        finally:
+            conn.close()
+        self.fill_stage_rows(steps)
+        return self.report(started, seconds, steps, table_rows)
+
+    # ---------- نتایج ----------
+    def step_metrics(self, conn):
+        """مراحل ثبت‌شده این اجرا در ETLStepMetric (رویه‌ها، loaderها و گره‌های orchestrator)"""
+        metrics = read_metrics(conn)
+        metrics = metrics[(metrics['RunID'] == self.run_id) & (metrics['Source'] != 'Benchmark')]
+        metrics = metrics.assign(Seconds=(metrics['EndTime'] - metrics['StartTime']).dt.total_seconds())
+        return metrics
+
+    def fill_stage_rows(self, steps):
+        """
+        تعداد سطر مراحلی که loaderهای این کلاس را ندارند (رویه‌های T-SQL، delta_generator):
+        جمع RowsWritten مراحل ثبت‌شده با همین RunID در بازه زمانی همان مرحله
+        """
+        steps = steps[steps['Source'] != 'Orchestrator']
+        for result in self.results:
+            if result.rows is not None or result.status == 'skipped':
+                continue
+            started = pd.Timestamp(result.started)
+            ended = started + pd.Timedelta(seconds=result.seconds)
+            window = steps[(steps['StartTime'] >= started) & (steps['EndTime'] <= ended)]
+            rows = window['RowsWritten'].dropna()
+            result.rows = int(rows.sum()) if len(rows) else None
+
+    def table_rows(self, conn):
+        """تعداد سطر جدول‌های هر دیتابیس در پایان اجرا (از sys.partitions، بدون پیمایش جدول)"""
+        cursor = conn.cursor()
+        try:
+            if self.sqlite:
+                counts = {}
+                for table in parse_fk_graph():
+                    try:
+                        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                        counts[table] = cursor.fetchone()[0]
+                    except Exception:
+                        pass
+                return {SOURCE_DATABASE: counts}
+            result = {}
+            for db in (SOURCE_DATABASE, STAGING_DATABASE, DW_DATABASE):
+                cursor.execute(f"""
+                    SELECT s.name + '.' + t.name, SUM(p.rows)
+                    FROM {db}.sys.tables t
+                    JOIN {db}.sys.schemas s ON s.schema_id = t.schema_id
+                    JOIN {db}.sys.partitions p ON p.object_id = t.object_id AND p.index_id IN (0, 1)
+                    GROUP BY s.name, t.name""")
+                result[db] = {name: int(rows) for name, rows in cursor.fetchall()}
+            return result
+        finally:
+            cursor.close()
+
+    def report(self, started, seconds, steps, table_rows):
+        return {
+            'run_id': self.run_id,
+            'scale': self.scale,
+            'scale_factor': self.factor,
+            'backend': self.backend,
+            'started': started.isoformat(timespec='seconds'),
+            'seconds': round(seconds, 3),
+            'ok': all(r.status != 'failed' for r in self.results),
+            'git': git_revision(),
+            'host': {'platform': platform.platform(), 'python': sys.version.split()[0],
+                     'cpu_count': os.cpu_count()},
+            'config': {
+                'finance': scaled_rows(FINANCE_SF1, self.factor),
+                'hr': scaled_rows(HR_SF1, self.factor),
+                'portops': self.portops_rows(),
+                'delta_days': self.delta_days,
+                'workers': self.workers,
+                'load_mode': finance.LOAD_MODE,
+            },
+            'stages': [r.as_dict() for r in self.results],
+            'steps': [{'source': s.Source, 'process': s.ProcessName, 'target': s.TargetTable, 'step': s.Step,
+                       'seconds': round(s.Seconds, 3),
+                       'rows_written': None if pd.isna(s.RowsWritten) else int(s.RowsWritten),
+                       'status': s.Status}
+                      for s in steps.itertuples(index=False)],
+            'table_rows': table_rows,
+            'generated_rows': self.generated_rows,
+        }
+
+    def portops_rows(self):
+        """تعداد سطر واقعی هر ثابت PORTOPS_SF1 (مقدار اسمی فقط اگر source.portops اجرا نشده باشد)"""
+        nominal = scaled_rows(PORTOPS_SF1, self.factor)
+        return {name: self.generated_rows.get(PORTOPS_TABLES[name], rows) for name, rows in nominal.items()}
+
+
+def git_revision():
+    """commit فعلی مخزن برای مقایسه اجراها قبل و بعد از تغییر schema/رویه‌ها"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout
+        return {'commit': commit.strip(), 'dirty': bool(dirty.strip())}
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results, directory=BENCHMARK_DIR):
+    os.makedirs(directory, exist_ok=True)
+    started = datetime.fromisoformat(results['started'])
+    path = os.path.join(directory, f"{started:%Y%m%d_%H%M%S}_{results['scale']}_{results['run_id']}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def print_results(results):
+    print(f"Benchmark {results['run_id']} ({results['scale']}, {results['backend']}): {results['seconds']:.2f}s")
+    print(f"{'Stage':<22}{'Status':>10}{'Seconds':>11}{'Rows':>14}{'Rows/s':>13}")
+    for s in results['stages']:
+        rows = f"{s['rows']:>14,}" if s['rows'] is not None else f"{'-':>14}"
+        rate = f"{s['rows_per_sec']:>13,.0f}" if s['rows_per_sec'] else f"{'-':>13}"
+        print(f"{s['stage']:<22}{s['status']:>10}{s['seconds']:>11.2f}{rows}{rate}")
+
+
+def compare_results(baseline, current):
+    """مقایسه زمان مراحل دو اجرا (مثلاً قبل و بعد از یک تغییر)"""
+    before = {s['stage']: s for s in baseline['stages']}
+    print(f"Stage times: {baseline['run_id']} ({baseline['scale']}) -> {current['run_id']} ({current['scale']})")
+    print(f"{'Stage':<22}{'Before':>11}{'After':>11}{'Change':>10}")
+    for s in current['stages']:
+        b = before.get(s['stage'])
+        if b is None or b['status'] != 'success' or s['status'] != 'success':
+            continue
+        change = f"{(s['seconds'] / b['seconds'] - 1) * 100:>+9.0f}%" if b['seconds'] > 0 else f"{'-':>10}"
+        print(f"{s['stage']:<22}{b['seconds']:>11.2f}{s['seconds']:>11.2f}{change}")
+
+
+def main(scale=None):
+    results = Benchmark(scale or SCALE).run()
+    path = save_results(results)
+    print_results(results)
+    print(f"📄 Results written to {path}")
+    if COMPARE_WITH:
+        compare_results(load_results(COMPARE_WITH), results)
+    return results
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,239 @@
+import os
+import csv
+import time
+import sqlite3
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+import pandas as pd
+from tqdm import tqdm
+
+# ----------------------------------
+# بارگذار انبوه (Bulk Loader) قابل تعویض برای داده‌های تولیدی
+#   executemany       : همان روش قبلی main.py (هر batch یک executemany)
+#   fast_executemany  : اتصال آرایه‌ای پارامترها در سطح درایور (pyodbc)
+#   bulk_file         : نوشتن جریانی فایل CSV و بارگذاری با BULK INSERT یا bcp
+# ----------------------------------
+
+LOAD_MODES = ('executemany', 'fast_executemany', 'bulk_file')
+
+
+class LoadStats:
+    """آمار بارگذاری یک جدول"""
+
+    def __init__(self, table, rows, seconds, started=None):
+        self.table = table
+        self.rows = rows
+        self.seconds = seconds
+        # زمان شروع (برای telemetry)؛ پیش‌فرض: اکنون منهای مدت بارگذاری
+        self.started = started or datetime.now() - timedelta(seconds=seconds)
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+    def __repr__(self):
+        return f"{self.table}: {self.rows} rows in {self.seconds:.2f}s ({self.rows_per_sec:,.0f} rows/sec)"
+
+
+# ----------------------------------
+# اتصال‌ها
+# ----------------------------------
+def connect_sql_server(conn_str):
+    import pyodbc
+    return pyodbc.connect(conn_str)
+
+
+def connect_sqlite(path=':memory:', schemas=('Common', 'Finance', 'HumanResources', 'PortOperations')):
+    """
+    backend جایگزین برای بنچمارک محلی؛ هر schema یک دیتابیس ATTACH شده است
+    تا نام‌هایی مثل Finance.Invoice بدون تغییر کار کنند
+    """
+    conn = sqlite3.connect(path, timeout=300, check_same_thread=False)
+    for schema in schemas:
+        target = ':memory:' if path == ':memory:' else f"{os.path.splitext(path)[0]}_{schema}.db"
+        conn.execute(f"ATTACH DATABASE '{target}' AS {schema}")
+    return conn
+
+
+def is_sqlite(conn):
+    return isinstance(conn, sqlite3.Connection)
+
+
+_SQLITE_TYPES = {'i': 'INTEGER', 'u': 'INTEGER', 'b': 'INTEGER', 'f': 'REAL'}
+
+
+def create_sqlite_table(conn, table, df):
+    """ساخت جدول هم‌ساختار با DataFrame در backend SQLite (اگر وجود نداشته باشد)"""
+    cols = ', '.join(f"{c} {_SQLITE_TYPES.get(df[c].dtype.kind, 'TEXT')}" for c in df.columns)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+
+
+# ----------------------------------
+# تبدیل batch به سطرهای Python (بدون ساخت لیست کامل جدول)
+# ----------------------------------
+def _column_values(series):
+    if series.dtype.kind == 'M':
+        values = series.dt.to_pydatetime()
+        return [None if pd.isnull(v) else v for v in values]
+    if series.dtype.kind in 'iub':
+        return series.tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def iter_batches(df, batch_size):
+    """تولید batchهای لیست tuple به ترتیب؛ در هر لحظه فقط یک batch در حافظه Python است"""
+    for start in range(0, len(df), batch_size):
+        chunk = df.iloc[start:start + batch_size]
+        yield list(zip(*(_column_values(chunk[c]) for c in chunk.columns)))
+
+
+def insert_query(table, columns):
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+
+
+# ----------------------------------
+# Loaderها
+# ----------------------------------
+class ExecuteManyLoader:
+    """
+    بارگذاری با executemany
+    batch_size    : تعداد سطر در هر فراخوانی executemany
+    commit_every  : تعداد سطر بین دو commit (None = یک commit در پایان جدول)
+    fast          : فعال‌سازی fast_executemany در pyodbc (در SQLite همیشه آرایه‌ای است)
+    """
+
+    def __init__(self, conn, batch_size=10000, commit_every=None, fast=True, progress=True):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.fast = fast
+        self.progress = progress
+
+    def _cursor(self):
+        cursor = self.conn.cursor()
+        if self.fast and hasattr(cursor, 'fast_executemany'):
+            cursor.fast_executemany = True
+        return cursor
+
+    def load(self, table, df):
+        if is_sqlite(self.conn):
+            create_sqlite_table(self.conn, table, df)
+        query = insert_query(table, df.columns)
+        cursor = self._cursor()
+        started = time.perf_counter()
+        since_commit = 0
+        try:
+            with tqdm(total=len(df), desc=f"Inserting into {table}", disable=not self.progress) as pbar:
+                for batch in iter_batches(df, self.batch_size):
+                    cursor.executemany(query, batch)
+                    since_commit += len(batch)
+                    if self.commit_every and since_commit >= self.commit_every:
+                        self.conn.commit()
+                        since_commit = 0
+                    pbar.update(len(batch))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return LoadStats(table, len(df), time.perf_counter() - started)
+
+
+class BulkFileLoader:
+    """
+    مسیر جایگزین به سبک BCP: داده به صورت جریانی (chunk به chunk) در یک فایل CSV نوشته
+    و سپس با BULK INSERT (یا ابزار bcp) یک‌جا بارگذاری می‌شود.
+    در SQLite (که BULK INSERT ندارد) فایل به صورت جریانی خوانده و با executemany درج می‌شود.
+    """
+
+    def __init__(self, conn, work_dir=None, batch_size=100000, commit_every=None,
+                 use_bcp=False, bcp_args=('-T', '-S', 'localhost', '-d', 'TradePortDB'), keep_files=False, progress=True):
+        self.conn = conn
+        self.work_dir = work_dir or tempfile.gettempdir()
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.use_bcp = use_bcp
+        self.bcp_args = list(bcp_args)
+        self.keep_files = keep_files
+        self.progress = progress
+        # bcp در حالت کاراکتری از نقل‌قول CSV پشتیبانی نمی‌کند؛ برای آن فایل tab-delimited نوشته می‌شود
+        self.delimiter = '\t' if use_bcp else ','
+
+    def write_file(self, table, df):
+        """نوشتن جریانی فایل (UTF-8، بدون سرستون، NULL = فیلد خالی)"""
+        path = os.path.join(self.work_dir, f"{table.replace('.', '_')}.csv")
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for start in range(0, len(df), self.batch_size):
+                df.iloc[start:start + self.batch_size].to_csv(
+                    f, sep=self.delimiter, header=False, index=False, date_format='%Y-%m-%d %H:%M:%S',
+                    quoting=csv.QUOTE_NONE if self.use_bcp else csv.QUOTE_MINIMAL,
+                    escapechar='\\' if self.use_bcp else None, lineterminator='\n')
+        return path
+
+    def _bulk_insert_sql(self, table, path):
+        options = ["FORMAT = 'CSV'", "FIELDQUOTE = '\"'", "CODEPAGE = '65001'",
+                   "ROWTERMINATOR = '0x0a'", "TABLOCK"]
+        if self.commit_every:
+            options.append(f"BATCHSIZE = {self.commit_every}")
+        return f"BULK INSERT {table} FROM '{path}' WITH ({', '.join(options)})"
+
+    def _load_sqlite(self, table, df, path):
+        create_sqlite_table(self.conn, table, df)
+        query = insert_query(table, df.columns)
+        with open(path, encoding='utf-8', newline='') as f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            batch = []
+            for row in reader:
+                batch.append([v if v != '' else None for v in row])
+                if len(batch) >= self.batch_size:
+                    self.conn.executemany(query, batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(query, batch)
+        self.conn.commit()
+
+    def load(self, table, df):
+        started = time.perf_counter()
+        path = self.write_file(table, df)
+        try:
+            if is_sqlite(self.conn):
+                self._load_sqlite(table, df, path)
+            elif self.use_bcp:
+                args = ['bcp', table, 'in', path, '-c', '-t\\t', '-r\\n', '-C', '65001'] + self.bcp_args
+                if self.commit_every:
+                    args += ['-b', str(self.commit_every)]
+                subprocess.run(args, check=True)
+            else:
+                cursor = self.conn.cursor()
+                cursor.execute(self._bulk_insert_sql(table, path))
+                self.conn.commit()
+                cursor.close()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            if not self.keep_files and os.path.exists(path):
+                os.remove(path)
+        stats = LoadStats(table, len(df), time.perf_counter() - started)
+        if self.progress:
+            print(f"Bulk loaded {stats}")
+        return stats
+
+
+def make_loader(conn, mode='fast_executemany', **options):
+    """ساخت loader بر اساس حالت بارگذاری"""
+    if mode == 'executemany':
+        return ExecuteManyLoader(conn, fast=False, **options)
+    if mode == 'fast_executemany':
+        return ExecuteManyLoader(conn, fast=True, **options)
+    if mode == 'bulk_file':
+        return BulkFileLoader(conn, **options)
+    raise ValueError(f"Unknown load mode: {mode} (expected one of {LOAD_MODES})")
+
+
+def print_report(results):
+    print(f"{'Table':<30}{'Rows':>12}{'Seconds':>10}{'Rows/sec':>14}")
+    for s in results:
+        print(f"{s.table:<30}{s.rows:>12}{s.seconds:>10.2f}{s.rows_per_sec:>14,.0f}")
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------------
+# خروجی ستونی (Parquet / Arrow IPC) برای داده‌های تولیدی
+# تاریخ، زمان و مبالغ با نوع واقعی (date32، time32، decimal128) ذخیره می‌شوند نه به صورت متن
+# و ستون‌های کم‌تنوع (Status، Position، PaymentMethod، ...) dictionary-encoded هستند.
+# خواندن فایل‌ها با memory-map انجام می‌شود تا بارگذاری مجدد تقریباً بدون کپی باشد.
+# ----------------------------------
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow فقط برای خروجی ستونی لازم است
+    pa = pq = None
+
+OUTPUT_FORMATS = ('csv', 'parquet', 'arrow')
+FILE_EXTENSIONS = {'csv': 'csv', 'parquet': 'parquet', 'arrow': 'arrow'}
+
+# ستون‌های کم‌تنوع که همیشه dictionary-encoded ذخیره می‌شوند
+DICTIONARY_COLUMNS = {
+    'Status', 'Position', 'PaymentMethod', 'Gender', 'MaritalStatus', 'EmploymentStatus',
+    'CustomerType', 'ServiceCategory', 'UnitOfMeasure', 'TaxType', 'PaymentTerms', 'ContractStatus',
+    'CheckInTime', 'CheckOutTime', 'Notes',
+}
+
+# ستون‌های زمان روز (رشته HH:MM:SS در CSV)
+TIME_COLUMNS = {'CheckInTime', 'CheckOutTime'}
+
+# ستون‌های مبلغ/درصد با نوع DECIMAL در دیتابیس منبع
+DECIMAL_COLUMNS = {
+    'Amount': (15, 2), 'Bonus': (15, 2), 'Deductions': (15, 2), 'NetAmount': (15, 2),
+    'HoursWorked': (5, 2), 'TotalAmount': (15, 2), 'TaxAmount': (15, 2), 'UnitPrice': (15, 2),
+    'DiscountPercent': (5, 2), 'BaseRate': (15, 2), 'UnitRate': (15, 2), 'TaxRate': (5, 2),
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for parquet/arrow output (pip install pyarrow)")
+
+
+def _time_seconds(series):
+    """تبدیل ستون HH:MM:SS به ثانیه؛ برای Categorical فقط دسته‌ها پردازش می‌شوند"""
+    cat = series.astype('category')
+    parts = pd.Series(cat.cat.categories.astype(str)).str.split(':', expand=True).astype(int)
+    seconds = (parts[0] * 3600 + parts[1] * 60 + parts[2]).to_numpy()
+    codes = cat.cat.codes.to_numpy()
+    return np.where(codes >= 0, seconds[codes], 0), codes < 0
+
+
+class ArrowConverter:
+    """
+    تبدیل chunkهای DataFrame به RecordBatch با schema ثابت
+    دیکشنری هر ستون در طول فایل فقط رشد می‌کند (مقادیر جدید به انتها اضافه می‌شوند)،
+    بنابراین chunkها با dictionary delta در یک فایل Arrow IPC هم قابل نوشتن هستند
+    """
+
+    def __init__(self, dictionary_columns=None):
+        _require_pyarrow()
+        self.dictionary_columns = DICTIONARY_COLUMNS if dictionary_columns is None else set(dictionary_columns)
+        self._dictionaries = {}
+        self.schema = None
+
+    def _dictionary_array(self, name, series):
+        known = self._dictionaries.setdefault(name, pd.Index([], dtype=object))
+        cat = series.astype('category')
+        categories = cat.cat.categories.astype(object)
+        new = categories[known.get_indexer(categories) < 0]
+        if len(new):
+            known = self._dictionaries[name] = known.append(pd.Index(new, dtype=object))
+        mapping = known.get_indexer(categories)
+        codes = cat.cat.codes.to_numpy()
+        indices = pa.array(np.where(codes >= 0, mapping[codes], 0).astype(np.int32), mask=codes < 0)
+        return pa.DictionaryArray.from_arrays(indices, pa.array(known.to_numpy(), pa.string()))
+
+    def _array(self, name, series):
+        if name in TIME_COLUMNS and series.dtype.kind not in 'iuf':
+            seconds, mask = _time_seconds(series)
+            return pa.array(seconds.astype(np.int32), mask=mask).cast(pa.time32('s'))
+        if name in self.dictionary_columns:
+            return self._dictionary_array(name, series)
+        if series.dtype.kind == 'M':
+            values = series.to_numpy()
+            if (values == values.astype('datetime64[D]')).all():
+                return pa.array(values.astype('datetime64[D]'), pa.date32())
+            return pa.array(values)
+        if name in DECIMAL_COLUMNS and series.dtype.kind == 'f':
+            precision, scale = DECIMAL_COLUMNS[name]
+            return pa.array(np.round(series.to_numpy(), scale)).cast(pa.decimal128(precision, scale))
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # فقط دسته‌ها به رشته تبدیل می‌شوند و سطرها با take ساخته می‌شوند
+            codes = series.cat.codes.to_numpy()
+            categories = pa.array(series.cat.categories.astype(str).to_numpy(dtype=object), pa.string())
+            return categories.take(pa.array(np.where(codes >= 0, codes, 0), mask=codes < 0))
+        return pa.Array.from_pandas(series)
+
+    def convert(self, df):
+        arrays = [self._array(c, df[c]) for c in df.columns]
+        if self.schema is None:
+            self.schema = pa.schema([pa.field(c, a.type) for c, a in zip(df.columns, arrays)])
+        return pa.RecordBatch.from_arrays([a.cast(f.type) if a.type != f.type else a
+                                           for a, f in zip(arrays, self.schema)], schema=self.schema)
+
+
+# ----------------------------------
+# Sinkها (سازگار با streaming.run_pipeline)
+# ----------------------------------
+class ParquetSink:
+    """هر chunk یک row group در فایل Parquet؛ ستون‌های dictionary با dictionary encoding فشرده می‌شوند"""
+
+    def __init__(self, path, compression='zstd', dictionary_columns=None):
+        self.path = path
+        self.compression = compression
+        self._converter = ArrowConverter(dictionary_columns)
+        self._writer = None
+
+    def write(self, chunk):
+        batch = self._converter.convert(chunk)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                self.path, batch.schema, compression=self.compression,
+                use_dictionary=[f.name for f in batch.schema if pa.types.is_dictionary(f.type)])
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class ArrowSink:
+    """فایل Arrow IPC (Feather v2)؛ بدون فشرده‌سازی تا خواندن با memory-map بدون کپی باشد"""
+
+    def __init__(self, path, dictionary_columns=None):
+        self.path = path
+        self._converter = ArrowConverter(dictionary_columns)
+        self._sink = None
+        self._writer = None
+
+    def write(self, chunk):
+        batch = self._converter.convert(chunk)
+        if self._writer is None:
+            self._sink = pa.OSFile(self.path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, batch.schema,
+                                           options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+
+
+def write_table(df, path, fmt='parquet', **options):
+    """نوشتن یک DataFrame کامل در قالب ستونی"""
+    sink = ParquetSink(path, **options) if fmt == 'parquet' else ArrowSink(path, **options)
+    try:
+        sink.write(df)
+    finally:
+        sink.close()
+
+
+# ----------------------------------
+# Readerها (memory-mapped)
+# ----------------------------------
+def read_parquet(path, columns=None):
+    _require_pyarrow()
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+
+def read_arrow(path, columns=None):
+    """خواندن فایل Arrow IPC با memory-map؛ بافرهای ستون‌ها مستقیماً به فایل اشاره می‌کنند"""
+    _require_pyarrow()
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.select(columns) if columns else table
+
+
+def read_columnar(path, columns=None, as_pandas=True):
+    """خواندن بر اساس پسوند فایل؛ as_pandas=False خروجی pyarrow.Table (بدون کپی) می‌دهد"""
+    table = read_arrow(path, columns) if path.endswith('.arrow') else read_parquet(path, columns)
+    return table.to_pandas() if as_pandas else table
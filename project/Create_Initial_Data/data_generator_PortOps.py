@@ -0,0 +1,530 @@
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+from generator_engine import weighted_choice, pick_keys, round2
+from streaming import TableStream, run_pipeline, file_sink_factory, chunk_rng
+from data_generator_HR import NUM_EMPLOYEES
+from distributions import fk_model
+
+# ----------------------------------
+# تولید برداری داده PortOperations (جایگزین generate_data-PortOperations.sql با اندازه ثابت)
+# زمان‌ها یک سری زمانی سازگار می‌سازند:
+#   Voyage → PortCall (مبدأ و مقصد هر سفر) → BerthAllocation (داخل بازه PortCall)
+#   → CargoOperation (داخل بازه تخصیص اسکله) → ContainerYardMovement / تخصیص تجهیزات (حول عملیات)
+# هر کشتی سفرهایش را پشت سر هم انجام می‌دهد (بندر مقصد هر سفر مبدأ سفر بعدی است)،
+# در بندر مبدأ فقط LOAD و در بندر مقصد فقط UNLOAD انجام می‌شود: هر کانتینر سفر دقیقاً یک LOAD
+# و یک UNLOAD دارد و هر کانتینر در هر زمان فقط در یک سفر است (plan_cargo_operations).
+# Common.Country از main.py و HumanResources.Employee از data_generator_HR.py می‌آیند.
+# ----------------------------------
+
+# تنظیمات تعداد داده‌ها (مقیاس)
+NUM_SHIPS = 20
+NUM_VOYAGES = 500                      # هر سفر دو PortCall و دو BerthAllocation دارد
+NUM_CONTAINERS = 10000                 # حداقل؛ برای رسیدن به NUM_CARGO_OPERATIONS بزرگ‌تر می‌شود
+NUM_EQUIPMENT = 50
+NUM_CARGO_OPERATIONS = 1000000         # زوج LOAD/UNLOAD؛ مقدار فرد یک سطر کمتر می‌سازد
+NUM_EQUIPMENT_ASSIGNMENTS = 1000000
+NUM_YARD_MOVEMENTS = 200000
+BERTHS_PER_PORT = 5
+SLOTS_PER_YARD = 50
+# کشورهای Common.Country (هم‌اندازه N_COUNTRIES در main.py) و کارکنان HR برای FKها
+NUM_COUNTRIES = 30
+EMPLOYEE_IDS = np.arange(1, NUM_EMPLOYEES + 1)
+
+# seed واحد برای تولید داده تکرارپذیر
+SEED = 42
+# بازه زمانی سفرها؛ برای تکرارپذیری کامل یک END_DATE ثابت بدهید
+START_DATE = date(2023, 1, 1)
+END_DATE = date.today()
+# اندازه هر chunk؛ حافظه مصرفی به این عدد وابسته است نه به تعداد کل سطرها
+CHUNK_SIZE = 500000
+
+# مسیر و قالب فایل‌های خروجی: 'csv' (utf-8-sig) | 'parquet' | 'arrow'
+OUTPUT_DIR = './tradeportdb_data'
+OUTPUT_FORMAT = 'csv'
+FILE_NAMES = {
+    'PortOperations.ContainerType': 'container_type',
+    'PortOperations.EquipmentType': 'equipment_type',
+    'PortOperations.Port': 'port',
+    'PortOperations.Ship': 'ship',
+    'PortOperations.Voyage': 'voyage',
+    'PortOperations.PortCall': 'port_call',
+    'PortOperations.Berth': 'berth',
+    'PortOperations.BerthAllocation': 'berth_allocation',
+    'PortOperations.Container': 'container',
+    'PortOperations.Equipment': 'equipment',
+    'PortOperations.Yard': 'yard',
+    'PortOperations.YardSlot': 'yard_slot',
+    'PortOperations.CargoOperation': 'cargo_operation',
+    'Common.OperationEquipmentAssignment': 'operation_equipment_assignment',
+    'PortOperations.ContainerYardMovement': 'container_yard_movement',
+}
+
+# ----------------------------------
+# داده‌های مرجع (همان مقادیر اسکریپت SQL)
+# ----------------------------------
+PORTS = [
+    ('Port of Shanghai', 'Shanghai, China'), ('Port of Singapore', 'Singapore'),
+    ('Port of Ningbo–Zhoushan', 'Ningbo, China'), ('Port of Shenzhen', 'Shenzhen, China'),
+    ('Port of Guangzhou', 'Guangzhou, China'), ('Port of Busan', 'Busan, South Korea'),
+    ('Port of Qingdao', 'Qingdao, China'), ('Port of Tianjin', 'Tianjin, China'),
+    ('Port of Rotterdam', 'Rotterdam, Netherlands'), ('Port of Jebel Ali', 'Dubai, UAE'),
+    ('Port of Los Angeles', 'Los Angeles, USA'), ('Port of Antwerp–Bruges', 'Antwerp, Belgium'),
+    ('Port of Hamburg', 'Hamburg, Germany'), ('Port of Port Rashid', 'Dubai, UAE'),
+    ('Port of Tanjung Pelepas', 'Johor, Malaysia'), ('Port of Kaohsiung', 'Kaohsiung, Taiwan'),
+    ('Port of Valencia', 'Valencia, Spain'), ('Port of New York & New Jersey', 'NY/NJ, USA'),
+    ('Port of Singapore', 'Singapore'), ('Port of Hamburg', 'Hamburg, Germany'),
+]
+
+SHIPS = [
+    ('Ever Given', '9811000'), ('Maersk Mc-Kinney Moller', '9693460'), ('MSC Zoe', '9683457'),
+    ('CMA CGM Benjamin Franklin', '9424273'), ('HMM Algeciras', '9839504'), ('OOCL Hong Kong', '9441001'),
+    ('CSCL Globe', '9610102'), ('MOL Triumph', '9392812'), ('Madrid Maersk', '9651539'),
+    ('COSCO Shipping Taurus', '9708230'), ('APL France', '9203265'),
+    ('Hapag-Lloyd Hamburg Express', '9115374'), ('NYK Kagu Maru', '9441443'), ('YM Efficiency', '9755063'),
+    ('ZIM Shanghai', '9350899'), ('CMA CGM Antoine de Saint Exupéry', '9731040'), ('ONE Apus', '9820464'),
+    ('Berge Everest', '9651847'), ('Madrid Maersk II', '9700137'), ('Evergreen Ever Ace', '9876543'),
+]
+
+# (توضیح، حداکثر وزن) به ترتیب ContainerTypeID
+CONTAINER_TYPES = [('20ft Dry', 20000), ('40ft Dry', 30000), ('20ft Reefer', 20000),
+                   ('40ft Reefer', 30000), ('40ft HighCube', 28000)]
+CONTAINER_TYPE_WEIGHTS = {1: 30, 2: 35, 3: 10, 4: 10, 5: 15}
+CONTAINER_MAX_WEIGHT = np.array([w for _, w in CONTAINER_TYPES], dtype=float)
+
+EQUIPMENT_TYPES = ['Crane', 'Forklift', 'Reach Stacker', 'Straddle Carrier', 'Yard Truck']
+EQUIPMENT_MODELS = [
+    ['ZPMC STS', 'Liebherr LHM 600', 'Konecranes Gottwald HMK 6105', 'Kalmar STS 800', 'SMT Titan'],
+    ['Toyota 8FGCU25', 'Caterpillar DP70', 'Hyster H16.00XM-12', 'Komatsu FD70'],
+    ['Kalmar DRG450-60S5', 'Fantuzzi FR', 'Hyster RS46-31CT'],
+    ['Konecranes SC', 'Kalmar DCF', 'Terex SC'],
+    ['Kalmar Ottawa T2E', 'Hyster Yard Spotter', 'SMV 4531TB5'],
+]
+
+OWNER_COMPANIES = ['A.P. Moller – Maersk', 'MSC', 'CMA CGM', 'Hapag-Lloyd', 'Evergreen Marine',
+                   'COSCO Shipping', 'ONE', 'Yang Ming', 'HMM', 'ZIM']
+
+# ترتیب یاردهای هر بندر: YardID = (PortID-1)*3 + اندیس + 1
+YARD_USAGES = ['IMPORT', 'EXPORT', 'EMPTY']
+OPERATION_TYPES = ['LOAD', 'UNLOAD']
+MOVEMENT_TYPES = ['IN', 'OUT', 'RELOCATE']
+
+# زمان‌بندی (بازه‌های یکنواخت)
+PORT_STAY_HOURS = (12, 72)             # از ورود تا خروج کشتی در هر بندر
+TRANSIT_DAYS = (2, 30)                 # از خروج از مبدأ تا ورود به مقصد
+BERTH_DELAY_MINUTES = (0, 60)          # ورود تا شروع تخصیص اسکله
+BERTH_RELEASE_MINUTES = (0, 30)        # پایان تخصیص تا خروج کشتی
+YARD_DWELL_HOURS = (1, 48)             # OUT پیش از LOAD و IN پس از UNLOAD
+RELOCATE_RATE = 0.1
+RELOCATE_HOURS = (2, 72)
+ASSIGNMENT_LEAD_MINUTES = (0, 15)      # شروع کار تجهیزات پیش از زمان عملیات
+ASSIGNMENT_MINUTES = (10, 130)
+# فاصله آزاد شدن کانتینر پس از تخصیص مقصد تا سفر بعدی؛ جابه‌جایی‌های یارد پس از UNLOAD و پیش از LOAD بعدی جا می‌شوند
+CONTAINER_TURNAROUND_HOURS = 2 * max(YARD_DWELL_HOURS[1], RELOCATE_HOURS[1])
+
+
+def _seconds(rng, bounds, unit, size):
+    return (rng.uniform(*bounds, size=size) * unit).astype('int64').astype('timedelta64[s]')
+
+
+def _timestamps(values):
+    return np.asarray(values, dtype='datetime64[s]')
+
+
+# ----------------------------------
+# جدول‌های مرجع
+# ----------------------------------
+def generate_ports():
+    return pd.DataFrame({
+        'PortID': np.arange(1, len(PORTS) + 1),
+        'Name': [name for name, _ in PORTS],
+        'Location': [location for _, location in PORTS],
+    })
+
+
+def generate_container_types():
+    return pd.DataFrame({
+        'ContainerTypeID': np.arange(1, len(CONTAINER_TYPES) + 1),
+        'Description': [d for d, _ in CONTAINER_TYPES],
+        'MaxWeightKG': [w for _, w in CONTAINER_TYPES],
+    })
+
+
+def generate_equipment_types():
+    return pd.DataFrame({
+        'EquipmentTypeID': np.arange(1, len(EQUIPMENT_TYPES) + 1),
+        'Description': EQUIPMENT_TYPES,
+    })
+
+
+def generate_ships(rng, n, n_countries, start_id=1):
+    """کشتی‌های واقعی SHIPS و در مقیاس بزرگ‌تر نام‌های شماره‌دار (IMO مصنوعی با پیشوند 8 تا با واقعی‌ها تداخل نکند)"""
+    ids = np.arange(start_id, start_id + n)
+    index = (ids - 1) % len(SHIPS)
+    series = (ids - 1) // len(SHIPS)
+    names = np.array([s for s, _ in SHIPS], dtype=object)[index]
+    names = np.where(series == 0, names, names + ' ' + (series + 1).astype(str))
+    imo = np.where(ids <= len(SHIPS), np.array([i for _, i in SHIPS], dtype=object)[index],
+                   (8000000 + ids).astype(str))
+    return pd.DataFrame({
+        'ShipID': ids,
+        'IMO_Number': 'IMO' + imo.astype(object),
+        'Name': names,
+        'CountryID': rng.integers(1, n_countries + 1, size=n),
+    })
+
+
+def generate_berths(n_ports, per_port):
+    port = np.repeat(np.arange(1, n_ports + 1), per_port)
+    i = np.tile(np.arange(1, per_port + 1), n_ports)
+    return pd.DataFrame({
+        'BerthID': (port - 1) * per_port + i,
+        'PortID': port,
+        'Name': 'Berth_' + port.astype(str).astype(object) + '_' + i.astype(str).astype(object),
+        'LengthMeters': 100 + 20 * i,
+    })
+
+
+def generate_yards(n_ports):
+    port = np.repeat(np.arange(1, n_ports + 1), len(YARD_USAGES))
+    usage = np.tile(np.arange(len(YARD_USAGES)), n_ports)
+    labels = np.array([u.capitalize() for u in YARD_USAGES], dtype=object)
+    return pd.DataFrame({
+        'YardID': (port - 1) * len(YARD_USAGES) + usage + 1,
+        'PortID': port,
+        'Name': 'Yard_' + labels[usage] + '_' + port.astype(str).astype(object),
+        'UsageType': pd.Categorical.from_codes(usage, categories=YARD_USAGES),
+    })
+
+
+def generate_yard_slots(n_yards, per_yard):
+    """هر یارد per_yard اسلات: بلوک A–E، ردیف 1–10، طبقه 1–5 (همان فرمول اسکریپت SQL)"""
+    yard = np.repeat(np.arange(1, n_yards + 1), per_yard)
+    s = np.tile(np.arange(per_yard), n_yards)
+    return pd.DataFrame({
+        'YardSlotID': (yard - 1) * per_yard + s + 1,
+        'YardID': yard,
+        'Block': np.array([chr(65 + b) for b in range(5)], dtype=object)[s % 5],
+        'RowNumber': (s // 5) % 10 + 1,
+        'TierLevel': (s // 10) % 5 + 1,
+    })
+
+
+def generate_containers(rng, n, start_id=1):
+    ids = np.arange(start_id, start_id + n)
+    return pd.DataFrame({
+        'ContainerID': ids,
+        'ContainerNumber': np.char.add('CONT', np.char.zfill(ids.astype(str), 8)),
+        'ContainerTypeID': np.asarray(weighted_choice(rng, CONTAINER_TYPE_WEIGHTS, n)).astype('int64'),
+        'OwnerCompany': pd.Categorical.from_codes(rng.integers(0, len(OWNER_COMPANIES), size=n),
+                                                  categories=OWNER_COMPANIES),
+    })
+
+
+def generate_equipment(n, start_id=1):
+    ids = np.arange(start_id, start_id + n)
+    types = (ids - 1) % len(EQUIPMENT_TYPES)
+    rounds = (ids - 1) // len(EQUIPMENT_TYPES)
+    models = [EQUIPMENT_MODELS[t][r % len(EQUIPMENT_MODELS[t])] for t, r in zip(types, rounds)]
+    return pd.DataFrame({'EquipmentID': ids, 'EquipmentTypeID': types + 1, 'Model': models})
+
+
+# ----------------------------------
+# سفرها و فراخوان‌ها (هر کدام در یک chunk: زمان‌بندی هر کشتی به همه سفرهای آن وابسته است)
+# ----------------------------------
+def generate_voyages(rng, n, n_ships, n_ports, start_id=1):
+    """
+    سفر v به کشتی ((v-1) % n_ships)+1 تعلق دارد و rank آن سفر چندم همان کشتی است؛
+    مسیر هر کشتی یک گشت تصادفی روی بندرهاست، پس مقصد هر سفر مبدأ سفر بعدی همان کشتی است
+    """
+    ids = np.arange(start_id, start_id + n)
+    ship = (ids - start_id) % n_ships
+    rank = (ids - start_id) // n_ships
+    hops = rng.integers(1, n_ports, size=(rank.max() + 1, n_ships))
+    route = (rng.integers(0, n_ports, size=n_ships) + np.vstack([np.zeros((1, n_ships), dtype='int64'),
+                                                                  np.cumsum(hops, axis=0)])) % n_ports
+    return pd.DataFrame({
+        'VoyageID': ids,
+        'ShipID': ship + 1,
+        'VoyageNumber': np.char.add('VYG', np.char.zfill(ids.astype(str), 4)),
+        'DeparturePortID': route[rank, ship] + 1,
+        'ArrivalPortID': route[rank + 1, ship] + 1,
+    })
+
+
+def voyage_keys(df_voyages):
+    return df_voyages[['ShipID', 'DeparturePortID', 'ArrivalPortID']].to_records(index=False)
+
+
+def generate_port_calls(rng, voyages, start_date, end_date, start_id=1):
+    """
+    PortCall 2v-1 ورود به بندر مبدأ سفر v و 2v ورود به بندر مقصد است.
+    سفرهای هر کشتی پشت سر هم‌اند؛ زمان بیکار بین سفرها تصادفی پخش می‌شود تا کل برنامه
+    کشتی در [start_date, end_date] جا شود (اگر سفرها بیش از بازه باشند بیکاری صفر است)
+    """
+    n = len(voyages)
+    stay_dep = _seconds(rng, PORT_STAY_HOURS, 3600, n)
+    transit = _seconds(rng, TRANSIT_DAYS, 86400, n)
+    stay_arr = _seconds(rng, PORT_STAY_HOURS, 3600, n)
+    duration = (stay_dep + transit + stay_arr).astype('int64')
+
+    window = int((np.datetime64(end_date, 's') - np.datetime64(start_date, 's')).astype('int64'))
+    plan = pd.DataFrame({'ship': voyages['ShipID'], 'duration': duration, 'w': rng.uniform(size=n)})
+    by_ship = plan.groupby('ship', sort=False)
+    idle = (window - by_ship['duration'].transform('sum')).clip(lower=0)
+    # یک سهم اضافه برای بیکاری پس از آخرین سفر
+    gap = (idle * plan['w'] / (by_ship['w'].transform('sum') + 1)).astype('int64')
+    offset = (gap + plan['duration']).groupby(plan['ship']).cumsum() - plan['duration']
+
+    arrive_dep = np.datetime64(start_date, 's') + offset.to_numpy().astype('timedelta64[s]')
+    depart_dep = arrive_dep + stay_dep
+    arrive_arr = depart_dep + transit
+    depart_arr = arrive_arr + stay_arr
+
+    arrival = np.column_stack([arrive_dep, arrive_arr]).ravel()
+    departure = np.column_stack([depart_dep, depart_arr]).ravel()
+    cutoff = np.datetime64(end_date + timedelta(days=1), 's')
+    return pd.DataFrame({
+        'PortCallID': np.arange(start_id, start_id + 2 * n),
+        'VoyageID': np.repeat(np.arange(1, n + 1), 2),
+        'PortID': np.column_stack([voyages['DeparturePortID'], voyages['ArrivalPortID']]).ravel(),
+        'ArrivalDateTime': arrival,
+        'DepartureDateTime': departure,
+        'Status': pd.Categorical(np.where(departure < cutoff, 'Departed', 'Docked'),
+                                 categories=['Docked', 'Departed']),
+    })
+
+
+def port_call_keys(df_calls):
+    return df_calls[['PortID', 'ArrivalDateTime', 'DepartureDateTime']].to_records(index=False)
+
+
+def generate_berth_allocations(rng, ids, port_calls, per_port):
+    """یک تخصیص برای هر PortCall (AllocationID = PortCallID) داخل بازه حضور کشتی"""
+    n = len(ids)
+    calls = port_calls[ids - 1]
+    arrival, departure = _timestamps(calls['ArrivalDateTime']), _timestamps(calls['DepartureDateTime'])
+    quarter = (departure - arrival) // 4
+    start = arrival + np.minimum(_seconds(rng, BERTH_DELAY_MINUTES, 60, n), quarter)
+    end = departure - np.minimum(_seconds(rng, BERTH_RELEASE_MINUTES, 60, n), quarter)
+    return pd.DataFrame({
+        'AllocationID': ids,
+        'PortCallID': ids,
+        'BerthID': (calls['PortID'] - 1) * per_port + rng.integers(1, per_port + 1, size=n),
+        'AllocationStart': start,
+        'AllocationEnd': end,
+        'AssignedBy': 'Scheduler_' + ((ids % 10) + 1).astype(str).astype(object),
+    })
+
+
+def allocation_keys(df_allocations, per_port=None):
+    """PortID (از BerthID) و بازه تخصیص به ترتیب PortCallID (برای زمان‌بندی عملیات بار)"""
+    ports = (df_allocations['BerthID'].to_numpy() - 1) // (per_port or BERTHS_PER_PORT) + 1
+    return np.rec.fromarrays([ports, _timestamps(df_allocations['AllocationStart']),
+                              _timestamps(df_allocations['AllocationEnd'])],
+                             names=['PortID', 'AllocationStart', 'AllocationEnd'])
+
+
+# ----------------------------------
+# جدول‌های تراکنشی (chunkهای مستقل)
+# ----------------------------------
+def plan_cargo_operations(rng, allocations, n_containers, n_target, voyage_model=None,
+                          turnaround_hours=CONTAINER_TURNAROUND_HOURS):
+    """
+    کانتینرهای هر سفر و عملیات بار آن‌ها (به ترتیب PortCallID؛ هر سطر یک CargoOpID):
+    سهم هر سفر از n_target کانتینر با voyage_model (محبوبیت، کشتی‌های بزرگ‌تر) تعیین می‌شود و
+    کانتینرها بدون جایگذاری از کانتینرهای آزاد در شروع تخصیص مبدأ انتخاب می‌شوند؛ هر کانتینر تا
+    پایان تخصیص مقصد + turnaround_hours در اختیار همان سفر است. n_containers حداقل اندازه ناوگان
+    کانتینر است: اگر کانتینر آزاد کافی نباشد کانتینر جدید (ID بعدی) اضافه می‌شود تا سهم هر سفر کامل شود.
+    هر کانتینر سفر v یک LOAD در PortCall 2v-1 و یک UNLOAD در PortCall 2v دارد.
+    خروجی: (عملیات، اندازه ناوگان کانتینر)
+    """
+    n_voyages = len(allocations) // 2
+    voyage_ids = np.arange(1, n_voyages + 1)
+    target = np.bincount(pick_keys(rng, voyage_ids, n_target, voyage_model), minlength=n_voyages + 1)[1:]
+    start = _timestamps(allocations['AllocationStart'][0::2]).astype('int64')
+    free = _timestamps(allocations['AllocationEnd'][1::2]).astype('int64') + int(turnaround_hours * 3600)
+
+    free_at = np.full(n_containers, np.iinfo(np.int64).min)
+    chosen = [None] * n_voyages
+    for v in np.argsort(start, kind='stable'):
+        available = np.flatnonzero(free_at <= start[v])
+        picked = rng.choice(available, size=min(target[v], len(available)), replace=False)
+        missing = target[v] - len(picked)
+        if missing:
+            picked = np.concatenate([picked, np.arange(len(free_at), len(free_at) + missing)])
+            free_at = np.concatenate([free_at, np.empty(missing, dtype=free_at.dtype)])
+        picked = np.sort(picked)
+        free_at[picked] = free[v]
+        chosen[v] = picked + 1
+    count = np.array([len(c) for c in chosen], dtype='int64')
+    containers = np.concatenate(chosen) if n_voyages else np.array([], dtype='int64')
+
+    # هر سفر: بلوک LOAD (PortCall 2v-1) و سپس بلوک UNLOAD (PortCall 2v) با همان کانتینرها
+    per_call = np.repeat(count, 2)
+    call = np.repeat(np.arange(1, 2 * n_voyages + 1), per_call)
+    position = np.arange(len(call)) - np.repeat(np.cumsum(per_call) - per_call, per_call)
+    first = np.cumsum(count) - count
+    ops = np.rec.fromarrays([call.astype(np.int32), containers[first[(call - 1) // 2] + position].astype(np.int32)],
+                            names=['PortCallID', 'ContainerID'])
+    return ops, len(free_at)
+
+
+def generate_cargo_operations(rng, ids, allocations, container_types, plan, start_id=1):
+    """
+    عملیات بار plan (plan_cargo_operations) داخل بازه تخصیص اسکله؛ PortCall فرد (مبدأ) LOAD و زوج
+    (مقصد) UNLOAD، پس UNLOAD هر کانتینر پس از LOAD همان سفر است
+    """
+    n = len(ids)
+    ops = plan[ids - 1]
+    call, container = ops['PortCallID'].astype('int64'), ops['ContainerID'].astype('int64')
+    alloc = allocations[call - 1]
+    start = _timestamps(alloc['AllocationStart'])
+    span = (_timestamps(alloc['AllocationEnd']) - start).astype('int64')
+    max_weight = CONTAINER_MAX_WEIGHT[container_types[container - 1] - 1]
+    return pd.DataFrame({
+        'CargoOpID': np.arange(start_id, start_id + n),
+        'PortCallID': call,
+        'ContainerID': container,
+        'OperationType': pd.Categorical.from_codes(1 - call % 2, categories=OPERATION_TYPES),
+        'OperationDateTime': start + (rng.uniform(size=n) * span).astype('int64').astype('timedelta64[s]'),
+        'Quantity': rng.integers(1, 6, size=n),
+        'WeightKG': round2(rng.uniform(0.15, 1.0, size=n) * max_weight),
+    })
+
+
+def cargo_operation_keys(df_ops):
+    """کلید فشرده عملیات بار به ترتیب CargoOpID (برای جابه‌جایی‌های یارد و تخصیص تجهیزات)"""
+    return np.rec.fromarrays([df_ops['PortCallID'].to_numpy(np.int32), df_ops['ContainerID'].to_numpy(np.int32),
+                              _timestamps(df_ops['OperationDateTime']),
+                              (df_ops['OperationType'] == 'LOAD').to_numpy()],
+                             names=['PortCallID', 'ContainerID', 'OperationDateTime', 'IsLoad'])
+
+
+def generate_equipment_assignments(rng, ids, cargo_ops, equipment_ids, employee_ids, start_id=1,
+                                   equipment_model=None, employee_model=None):
+    n = len(ids)
+    op = rng.integers(0, len(cargo_ops), size=n)
+    started = _timestamps(cargo_ops['OperationDateTime'][op]) - _seconds(rng, ASSIGNMENT_LEAD_MINUTES, 60, n)
+    return pd.DataFrame({
+        'AssignmentID': np.arange(start_id, start_id + n),
+        'CargoOpID': op + 1,
+        'EquipmentID': pick_keys(rng, equipment_ids, n, equipment_model),
+        'EmployeeID': pick_keys(rng, employee_ids, n, employee_model),
+        'StartTime': started,
+        'EndTime': started + _seconds(rng, ASSIGNMENT_MINUTES, 60, n),
+    })
+
+
+def generate_yard_movements(rng, ids, cargo_ops, allocations, per_yard, start_id=1):
+    """
+    هر جابه‌جایی به یک عملیات بار وابسته است: OUT از یارد EXPORT پیش از LOAD،
+    IN به یارد IMPORT پس از UNLOAD؛ RELOCATE_RATE از آن‌ها جابه‌جایی داخلی در همان بندر است
+    """
+    n = len(ids)
+    ops = cargo_ops[rng.integers(0, len(cargo_ops), size=n)]
+    port = allocations['PortID'][ops['PortCallID'] - 1]
+    is_load = ops['IsLoad']
+    direction = np.where(is_load, -1, 1)
+    relocate = rng.random(n) < RELOCATE_RATE
+
+    movement = np.where(relocate, 2, np.where(is_load, 1, 0))
+    usage = np.where(relocate, rng.integers(0, len(YARD_USAGES), size=n), np.where(is_load, 1, 0))
+    hours = np.where(relocate, rng.uniform(*RELOCATE_HOURS, size=n), rng.uniform(*YARD_DWELL_HOURS, size=n))
+    yard = (port - 1) * len(YARD_USAGES) + usage + 1
+    return pd.DataFrame({
+        'MovementID': np.arange(start_id, start_id + n),
+        'ContainerID': ops['ContainerID'],
+        'YardSlotID': (yard - 1) * per_yard + rng.integers(1, per_yard + 1, size=n),
+        'MovementType': pd.Categorical.from_codes(movement, categories=MOVEMENT_TYPES),
+        'MovementDateTime': _timestamps(ops['OperationDateTime'])
+                            + (direction * hours * 3600).astype('int64').astype('timedelta64[s]'),
+    })
+
+
+def portops_streams():
+    """تعریف جریانی جدول‌های PortOperations به ترتیب FK؛ محبوبیت FKها از distribution_spec.json"""
+    n_ports = len(PORTS)
+    n_calls = 2 * NUM_VOYAGES
+    n_yards = n_ports * len(YARD_USAGES)
+    equipment_ids = np.arange(1, NUM_EQUIPMENT + 1)
+    plan = {}
+
+    def cargo_plan(keys):
+        # یک بار برای Container و همه chunkهای CargoOperation (RNG جدا، مستقل از اندازه chunk)
+        if 'ops' not in plan:
+            plan['ops'], plan['containers'] = plan_cargo_operations(
+                chunk_rng(SEED, 'PortOperations.CargoPlan', 0), keys['PortOperations.BerthAllocation'],
+                NUM_CONTAINERS, NUM_CARGO_OPERATIONS // 2, voyage_model=fk_model('PortOperations.PortCall'))
+            if len(plan['ops']) < 2 * (NUM_CARGO_OPERATIONS // 2):
+                raise ValueError(f"Cargo plan has {len(plan['ops'])} of {NUM_CARGO_OPERATIONS} operations "
+                                 f"(NUM_VOYAGES={NUM_VOYAGES})")
+            if plan['containers'] > NUM_CONTAINERS:
+                print(f"⚠️ NUM_CONTAINERS={NUM_CONTAINERS} is too small for {NUM_CARGO_OPERATIONS} cargo operations; "
+                      f"generating {plan['containers']} containers")
+        return plan['ops']
+
+    def container_count(keys):
+        cargo_plan(keys)
+        return plan['containers']
+
+    def single(name, n_rows, make, key=None):
+        # جدول‌های مرجع، سفرها و فراخوان‌ها کوچک‌اند و در یک chunk ساخته می‌شوند
+        return TableStream(name, n_rows, make, key=key, chunk_size=n_rows)
+
+    return [
+        single('PortOperations.ContainerType', len(CONTAINER_TYPES),
+               lambda rng, fake, ids, keys: generate_container_types()),
+        single('PortOperations.EquipmentType', len(EQUIPMENT_TYPES),
+               lambda rng, fake, ids, keys: generate_equipment_types()),
+        single('PortOperations.Port', n_ports, lambda rng, fake, ids, keys: generate_ports()),
+        single('PortOperations.Ship', NUM_SHIPS,
+               lambda rng, fake, ids, keys: generate_ships(rng, len(ids), NUM_COUNTRIES)),
+        single('PortOperations.Voyage', NUM_VOYAGES,
+               lambda rng, fake, ids, keys: generate_voyages(rng, len(ids), NUM_SHIPS, n_ports),
+               key=voyage_keys),
+        single('PortOperations.PortCall', n_calls,
+               lambda rng, fake, ids, keys: generate_port_calls(
+                   rng, keys['PortOperations.Voyage'], START_DATE, END_DATE),
+               key=port_call_keys),
+        single('PortOperations.Berth', n_ports * BERTHS_PER_PORT,
+               lambda rng, fake, ids, keys: generate_berths(n_ports, BERTHS_PER_PORT)),
+        TableStream('PortOperations.BerthAllocation', n_calls,
+                    lambda rng, fake, ids, keys: generate_berth_allocations(
+                        rng, ids, keys['PortOperations.PortCall'], BERTHS_PER_PORT),
+                    key=allocation_keys),
+        TableStream('PortOperations.Container', container_count,
+                    lambda rng, fake, ids, keys: generate_containers(rng, len(ids), start_id=ids[0]),
+                    key='ContainerTypeID'),
+        single('PortOperations.Equipment', NUM_EQUIPMENT,
+               lambda rng, fake, ids, keys: generate_equipment(len(ids))),
+        single('PortOperations.Yard', n_yards, lambda rng, fake, ids, keys: generate_yards(n_ports)),
+        single('PortOperations.YardSlot', n_yards * SLOTS_PER_YARD,
+               lambda rng, fake, ids, keys: generate_yard_slots(n_yards, SLOTS_PER_YARD)),
+        TableStream('PortOperations.CargoOperation', lambda keys: len(cargo_plan(keys)),
+                    lambda rng, fake, ids, keys: generate_cargo_operations(
+                        rng, ids, keys['PortOperations.BerthAllocation'], keys['PortOperations.Container'],
+                        cargo_plan(keys), start_id=ids[0]),
+                    key=cargo_operation_keys),
+        TableStream('Common.OperationEquipmentAssignment', NUM_EQUIPMENT_ASSIGNMENTS,
+                    lambda rng, fake, ids, keys: generate_equipment_assignments(
+                        rng, ids, keys['PortOperations.CargoOperation'], equipment_ids, EMPLOYEE_IDS,
+                        start_id=ids[0], equipment_model=fk_model('PortOperations.Equipment'),
+                        employee_model=fk_model('HumanResources.Employee'))),
+        TableStream('PortOperations.ContainerYardMovement', NUM_YARD_MOVEMENTS,
+                    lambda rng, fake, ids, keys: generate_yard_movements(
+                        rng, ids, keys['PortOperations.CargoOperation'], keys['PortOperations.BerthAllocation'],
+                        SLOTS_PER_YARD, start_id=ids[0])),
+    ]
+
+
+def main(sink_factory=None):
+    if sink_factory is None:
+        options = {'sep': ','} if OUTPUT_FORMAT == 'csv' else {}
+        sink_factory = file_sink_factory(OUTPUT_DIR, FILE_NAMES, fmt=OUTPUT_FORMAT, **options)
+    return run_pipeline(portops_streams(), sink_factory, seed=SEED, chunk_size=CHUNK_SIZE)
+
+
+if __name__ == '__main__':
+    main()
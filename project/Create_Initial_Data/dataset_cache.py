@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import inspect
+
+from columnar_io import pa, _require_pyarrow
+
+# ----------------------------------
+# کش دیسکی داده‌های تولیدی (یک بار تولید، چند بار بارگذاری)
+# کلید هر ورودی hash پارامترهای تولید (تعداد سطرها، تاریخ‌ها، seed، ...) است؛
+# اجرای تکراری با همان پارامترها بدون تولید مجدد از کش خوانده می‌شود.
+#
+# ساختار هر ورودی: <cache_dir>/<key>/<table>.arrow + manifest.json
+#   - ورودی ابتدا در پوشه موقت نوشته و با rename اتمیک منتشر می‌شود
+#   - manifest آخرین فایل است و اندازه، تعداد سطر و sha256 هر فایل را دارد
+#   - ورودی ناقص یا خراب هرگز استفاده نمی‌شود و حذف می‌شود
+#   - با عبور حجم کل از max_bytes، ورودی‌هایی که دیرتر از همه استفاده شده‌اند حذف می‌شوند (LRU)
+# ----------------------------------
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dataset_cache')
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+# با تغییر قالب ذخیره‌سازی افزایش یابد تا ورودی‌های قدیمی نادیده گرفته شوند
+CACHE_VERSION = 1
+MANIFEST = 'manifest.json'
+VERIFY_MODES = ('hash', 'size', 'none')
+# پوشه‌های موقت رهاشده (اجرای قطع‌شده) پس از این مدت پاک می‌شوند
+STALE_TMP_SECONDS = 24 * 3600
+
+
+def source_fingerprint(*objects):
+    """hash کد منبع توابع تولید؛ با تغییر منطق تولید، کلید کش هم عوض می‌شود"""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode())
+    return digest.hexdigest()[:16]
+
+
+def config_key(config):
+    """کلید پایدار برای یک دیکشنری پارامتر (ترتیب کلیدها مهم نیست)"""
+    payload = json.dumps({'version': CACHE_VERSION, 'config': config}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def _file_sha256(path, block_size=8 * 1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_name(table):
+    return f"{table.replace('.', '_')}.arrow"
+
+
+def write_frame(df, path, compression='lz4'):
+    """ذخیره DataFrame با متادیتای pandas (categorical و datetime64 بدون تغییر برمی‌گردند)"""
+    _require_pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+
+
+def read_frame(path):
+    _require_pyarrow()
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+class CacheEntry:
+    """یک ورودی منتشرشده در کش"""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+
+    @property
+    def key(self):
+        return os.path.basename(self.path)
+
+    @property
+    def size(self):
+        return sum(t['bytes'] for t in self.manifest['tables'].values())
+
+    @property
+    def last_used(self):
+        return os.path.getmtime(os.path.join(self.path, MANIFEST))
+
+    def __repr__(self):
+        return f"{self.key}: {len(self.manifest['tables'])} tables, {self.size / 1024 ** 2:,.1f} MB"
+
+
+class DatasetCache:
+    """
+    کش DataFrameهای تولیدی
+    max_bytes   : سقف حجم کل کش؛ None = بدون حذف خودکار
+    verify      : 'hash' (بررسی sha256 هر فایل) | 'size' (فقط اندازه) | 'none'
+    compression : فشرده‌سازی Arrow IPC ('lz4' | 'zstd' | None)
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, verify='hash', compression='lz4'):
+        if verify not in VERIFY_MODES:
+            raise ValueError(f"Unknown verify mode: {verify} (expected one of {VERIFY_MODES})")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.verify = verify
+        self.compression = compression
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, config):
+        return config_key(config)
+
+    # ---------- خواندن ----------
+    def _manifest(self, path):
+        try:
+            with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get('version') == CACHE_VERSION else None
+
+    def _valid(self, path, manifest):
+        for table, info in manifest['tables'].items():
+            file_path = os.path.join(path, info['file'])
+            if not os.path.isfile(file_path) or os.path.getsize(file_path) != info['bytes']:
+                return False
+            if self.verify == 'hash' and _file_sha256(file_path) != info['sha256']:
+                return False
+        return True
+
+    def _published(self, path):
+        manifest = self._manifest(path)
+        return manifest is not None and self._valid(path, manifest)
+
+    def get(self, config):
+        """DataFrameهای ذخیره‌شده یا None؛ ورودی نامعتبر حذف می‌شود"""
+        path = os.path.join(self.cache_dir, self.key(config))
+        if not os.path.isdir(path):
+            return None
+        manifest = self._manifest(path)
+        if manifest is None or not self._valid(path, manifest):
+            print(f"⚠️ Discarding invalid cache entry {os.path.basename(path)}")
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        tables = {}
+        for table, info in manifest['tables'].items():
+            df = read_frame(os.path.join(path, info['file']))
+            if len(df) != info['rows']:
+                print(f"⚠️ Discarding invalid cache entry {os.path.basename(path)}")
+                shutil.rmtree(path, ignore_errors=True)
+                return None
+            tables[table] = df
+        # زمان آخرین استفاده برای LRU
+        os.utime(os.path.join(path, MANIFEST))
+        return tables
+
+    # ---------- نوشتن ----------
+    def put(self, config, tables):
+        """
+        نوشتن اتمیک یک ورودی؛ اگر ورودی معتبر با همین کلید وجود داشته باشد (یا writer دیگری
+        زودتر منتشر کند) همان حفظ و پوشه موقت حذف می‌شود. فقط ورودی ناقص یا خراب جایگزین می‌شود.
+        """
+        key = self.key(config)
+        final = os.path.join(self.cache_dir, key)
+        if self._published(final):
+            return key
+        tmp = os.path.join(self.cache_dir, f".tmp-{key}-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        try:
+            manifest = {'version': CACHE_VERSION, 'created': time.time(), 'config': config, 'tables': {}}
+            for table, df in tables.items():
+                name = _file_name(table)
+                file_path = os.path.join(tmp, name)
+                write_frame(df, file_path, self.compression)
+                manifest['tables'][table] = {
+                    'file': name, 'rows': len(df),
+                    'bytes': os.path.getsize(file_path), 'sha256': _file_sha256(file_path),
+                }
+            with open(os.path.join(tmp, MANIFEST), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            if self._published(final):
+                return key
+            if os.path.isdir(final):
+                shutil.rmtree(final, ignore_errors=True)
+            try:
+                os.replace(tmp, final)
+            except OSError:
+                # writer دیگری همین کلید را همزمان منتشر کرده است
+                if not self._published(final):
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=key)
+        return key
+
+    def get_or_create(self, config, generate):
+        """خواندن از کش یا اجرای generate() و ذخیره خروجی آن"""
+        started = time.perf_counter()
+        tables = self.get(config)
+        if tables is not None:
+            print(f"♻️ Loaded {len(tables)} tables from cache {self.key(config)} "
+                  f"in {time.perf_counter() - started:.2f}s")
+            return tables
+        tables = generate()
+        key = self.put(config, tables)
+        print(f"💾 Cached {len(tables)} tables as {key}")
+        return tables
+
+    # ---------- نگه‌داری ----------
+    def entries(self):
+        """ورودی‌های منتشرشده از قدیمی‌ترین استفاده به جدیدترین"""
+        result = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            manifest = self._manifest(path)
+            if manifest is not None:
+                result.append(CacheEntry(path, manifest))
+        return sorted(result, key=lambda e: e.last_used)
+
+    def _remove_stale(self):
+        """حذف پوشه‌های موقت رهاشده و ورودی‌های بدون manifest"""
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(path):
+                continue
+            if name.startswith('.tmp-'):
+                if now - os.path.getmtime(path) > STALE_TMP_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+            elif self._manifest(path) is None:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def evict(self, keep=None):
+        """حذف LRU تا زمانی که حجم کل کمتر از max_bytes شود (ورودی keep حذف نمی‌شود)"""
+        self._remove_stale()
+        if self.max_bytes is None:
+            return []
+        entries = self.entries()
+        total = sum(e.size for e in entries)
+        removed = []
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.key == keep:
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            total -= entry.size
+            removed.append(entry.key)
+            print(f"🗑️ Evicted cache entry {entry.key}")
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
@@ -0,0 +1,290 @@
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import numpy as np
+
+import main as finance
+from bulk_loader import connect_sql_server, connect_sqlite, make_loader
+from streaming import chunk_rng
+from text_pools import get_text_pools
+from telemetry import MetricRecorder
+
+# ----------------------------------
+# تولید داده افزایشی (Delta) برای آزمون کارایی رویه‌های Update*Incremental در DWETL
+# جایگزین NewData.py و 16 - UpdateSomeRow.sql:
+#   - شناسه‌ها از بیشترین شناسه فعلی دیتابیس منبع ادامه پیدا می‌کنند (نه offset ثابت)
+#   - حجم درج روزانه هر جدول و نرخ تغییرات SCD قابل تنظیم است
+#   - N روز شبیه‌سازی می‌شود؛ بعد از هر روز می‌توان ETL را اجرا و زمان آن را با حجم delta مقایسه کرد
+# ----------------------------------
+
+# ستون شناسه جدول‌هایی که delta می‌گیرند (به ترتیب وابستگی FK)
+ID_COLUMNS = {
+    "Finance.Customer":           "CustomerID",
+    "Finance.Contract":           "ContractID",
+    "Finance.Invoice":            "InvoiceID",
+    "Finance.Payment":            "PaymentID",
+    "Finance.RevenueRecognition": "RecognitionID",
+    "Finance.InvoiceLine":        "InvoiceLineID",
+}
+
+# جدول‌های مرجعی که فقط از دیتابیس خوانده می‌شوند (delta نمی‌گیرند)
+REFERENCE_KEYS = {
+    "Common.Country":       "CountryID",
+    "Finance.BillingCycle": "BillingCycleID",
+    "Finance.ServiceType":  "ServiceTypeID",
+    "Finance.Tax":          "TaxID",
+}
+
+CHUNK_FUNCTIONS = {
+    "Finance.Customer":           finance.customers_chunk,
+    "Finance.Contract":           finance.contracts_chunk,
+    "Finance.Invoice":            finance.invoices_chunk,
+    "Finance.Payment":            finance.payments_chunk,
+    "Finance.RevenueRecognition": finance.recognitions_chunk,
+    "Finance.InvoiceLine":        finance.invoice_lines_chunk,
+}
+
+# حجم درج روزانه
+DAILY_INSERTS = {
+    "Finance.Customer":           20,
+    "Finance.Contract":           50,
+    "Finance.Invoice":            500,
+    "Finance.Payment":            7500,
+    "Finance.RevenueRecognition": 10000,
+    "Finance.InvoiceLine":        50000,
+}
+
+# نرخ تغییر روزانه (کسری از سطرهای موجود) برای ستون‌های SCD
+CHURN_RATES = {
+    "customer_phone":   0.01,
+    "customer_address": 0.005,
+    "tax_rate":         0.02,
+    "contract_status":  0.01,
+}
+
+# FK تراکنش‌های جدید فقط به این تعداد از آخرین سطرهای جدول مرجع اشاره می‌کند
+# (پرداخت‌های امروز مربوط به فاکتورهای اخیر هستند؛ کل جدول هم خوانده نمی‌شود)
+RECENT_WINDOW = 50000
+
+DAYS       = 7
+START_DATE = datetime(2025, 6, 27)
+SEED       = 7
+
+BACKEND     = 'sqlserver'           # 'sqlserver' | 'sqlite'
+SQLITE_PATH = finance.SQLITE_PATH
+LOAD_MODE   = 'fast_executemany'
+BATCH_SIZE  = 10000
+TELEMETRY   = finance.TELEMETRY     # ثبت هر درج/به‌روزرسانی روزانه در Audit.ETLStepMetric
+
+
+def connect():
+    if BACKEND == 'sqlite':
+        return connect_sqlite(SQLITE_PATH)
+    return connect_sql_server(finance.conn_str)
+
+
+@contextmanager
+def simulated_day(day):
+    """تاریخ‌های سطرهای تولیدی main.py برابر روز شبیه‌سازی‌شده می‌شوند"""
+    previous = finance.date_choices
+    finance.date_choices = [day]
+    try:
+        yield
+    finally:
+        finance.date_choices = previous
+
+
+# ----------------------------------
+# وضعیت فعلی دیتابیس منبع
+# ----------------------------------
+def max_id(cursor, table, column):
+    cursor.execute(f"SELECT MAX({column}) FROM {table}")
+    value = cursor.fetchone()[0]
+    return int(value) if value is not None else 0
+
+
+def fetch_keys(cursor, table, column, limit=None):
+    """آرایه فشرده شناسه‌ها؛ با limit فقط آخرین شناسه‌ها خوانده می‌شوند"""
+    cursor.execute(f"SELECT {column} FROM {table} ORDER BY {column} DESC")
+    rows = cursor.fetchmany(limit) if limit else cursor.fetchall()
+    return np.array([r[0] for r in rows], dtype=np.int64)
+
+
+class DeltaState:
+    """بیشترین شناسه هر جدول و کلیدهای قابل ارجاع برای FK"""
+
+    def __init__(self, conn, recent_window=RECENT_WINDOW):
+        cursor = conn.cursor()
+        try:
+            self.max_ids = {t: max_id(cursor, t, c) for t, c in ID_COLUMNS.items()}
+            self.keys = {t: fetch_keys(cursor, t, c) for t, c in REFERENCE_KEYS.items()}
+            for table in ("Finance.Customer", "Finance.Contract", "Finance.Invoice"):
+                self.keys[table] = fetch_keys(cursor, table, ID_COLUMNS[table], recent_window)
+            # جامعه نمونه‌گیری تغییرات SCD (همه مشتری‌ها، مالیات‌ها و قراردادها)
+            self.customer_ids = fetch_keys(cursor, "Finance.Customer", "CustomerID")
+            self.contract_ids = fetch_keys(cursor, "Finance.Contract", "ContractID")
+        finally:
+            cursor.close()
+        self.recent_window = recent_window
+
+    def add(self, table, ids):
+        """شناسه‌های درج‌شده امروز به کلیدها اضافه می‌شوند (محدود به پنجره اخیر)"""
+        self.max_ids[table] = int(ids[-1])
+        if table in self.keys:
+            self.keys[table] = np.concatenate([ids[::-1], self.keys[table]])[:self.recent_window]
+        if table == "Finance.Customer":
+            self.customer_ids = np.concatenate([self.customer_ids, ids])
+        elif table == "Finance.Contract":
+            self.contract_ids = np.concatenate([self.contract_ids, ids])
+
+
+# ----------------------------------
+# درج‌ها
+# ----------------------------------
+def generate_inserts(state, day, day_index, seed=0, volumes=None):
+    """جدول‌های delta یک روز؛ شناسه‌ها از max فعلی ادامه پیدا می‌کنند"""
+    volumes = DAILY_INSERTS if volumes is None else volumes
+    tables = {}
+    with simulated_day(day):
+        for table, make_chunk in CHUNK_FUNCTIONS.items():
+            n = volumes.get(table, 0)
+            if not n:
+                continue
+            ids = np.arange(state.max_ids[table] + 1, state.max_ids[table] + 1 + n)
+            rng = chunk_rng(seed, table, day_index)
+            tables[table] = make_chunk(rng, finance.fake, ids, state.keys)
+            state.add(table, ids)
+    return tables
+
+
+# ----------------------------------
+# تغییرات SCD
+# ----------------------------------
+def _sample(rng, ids, rate):
+    k = int(round(len(ids) * rate))
+    return rng.choice(ids, size=min(k, len(ids)), replace=False) if k else ids[:0]
+
+
+def generate_updates(state, day_index, seed=0, churn=None):
+    """
+    تغییرات روز به صورت {نام: (query، لیست پارامترها)}
+    مقادیر جدید از همان مخزن‌های متنی تولید اولیه انتخاب می‌شوند
+    """
+    churn = CHURN_RATES if churn is None else churn
+    rng = np.random.default_rng([seed, day_index, 1])
+    pools = get_text_pools(finance.LOCALE, finance.SEED, finance.TEXT_POOL_SIZE)
+    updates = {}
+
+    ids = _sample(rng, state.customer_ids, churn.get("customer_phone", 0))
+    updates["customer_phone"] = (
+        "UPDATE Finance.Customer SET Phone = ? WHERE CustomerID = ?",
+        list(zip(np.asarray(pools.sample(rng, 'phone', len(ids))).tolist(), ids.tolist())))
+
+    ids = _sample(rng, state.customer_ids, churn.get("customer_address", 0))
+    updates["customer_address"] = (
+        "UPDATE Finance.Customer SET Address = ? WHERE CustomerID = ?",
+        list(zip(np.asarray(pools.sample(rng, 'address', len(ids))).tolist(), ids.tolist())))
+
+    ids = _sample(rng, state.keys["Finance.Tax"], churn.get("tax_rate", 0))
+    updates["tax_rate"] = (
+        "UPDATE Finance.Tax SET TaxRate = ? WHERE TaxID = ?",
+        list(zip(np.round(rng.uniform(0.01, 0.25, len(ids)), 2).tolist(), ids.tolist())))
+
+    ids = _sample(rng, state.contract_ids, churn.get("contract_status", 0))
+    updates["contract_status"] = (
+        "UPDATE Finance.Contract SET ContractStatus = CASE WHEN ContractStatus = 'Active' "
+        "THEN 'Expired' ELSE 'Active' END WHERE ContractID = ?",
+        [(i,) for i in ids.tolist()])
+    return updates
+
+
+def apply_updates(conn, updates, batch_size=BATCH_SIZE):
+    cursor = conn.cursor()
+    if hasattr(cursor, 'fast_executemany'):
+        cursor.fast_executemany = True
+    try:
+        for query, params in updates.values():
+            for start in range(0, len(params), batch_size):
+                cursor.executemany(query, params[start:start + batch_size])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {name: len(params) for name, (_, params) in updates.items()}
+
+
+# ----------------------------------
+# اجرای چند روزه
+# ----------------------------------
+class DayStats:
+    def __init__(self, day, inserts, updates, seconds):
+        self.day = day
+        self.inserts = inserts
+        self.updates = updates
+        self.seconds = seconds
+        self.etl_seconds = None
+
+    @property
+    def delta_rows(self):
+        return sum(self.inserts.values()) + sum(self.updates.values())
+
+    def __repr__(self):
+        etl = f", ETL {self.etl_seconds:.2f}s" if self.etl_seconds is not None else ""
+        return f"{self.day:%Y-%m-%d}: {self.delta_rows} delta rows in {self.seconds:.2f}s{etl}"
+
+
+def run_days(conn, days=None, start_date=None, seed=None, volumes=None, churn=None, after_day=None, run_id=None):
+    """
+    شبیه‌سازی days روز (پیش‌فرض‌ها از تنظیمات ماژول)؛ after_day(stats) بعد از هر روز صدا زده
+    می‌شود (مثلاً اجرای ETL افزایشی) و زمان آن به عنوان زمان ETL همان روز ثبت می‌شود
+    run_id: شناسه اجرا در telemetry (پیش‌فرض: شناسه جدید)
+    """
+    days = DAYS if days is None else days
+    start_date = start_date or START_DATE
+    seed = SEED if seed is None else seed
+    state = DeltaState(conn)
+    recorder = MetricRecorder('delta_generator.run_days', run_id)
+    loader = recorder.wrap(make_loader(conn, LOAD_MODE, batch_size=BATCH_SIZE, progress=False))
+    results = []
+    for day_index in range(days):
+        day = start_date + timedelta(days=day_index)
+        started = time.perf_counter()
+        tables = generate_inserts(state, day, day_index, seed, volumes)
+        for table, df in tables.items():
+            loader.load(table, df)
+        updates_started = datetime.now()
+        counts = apply_updates(conn, generate_updates(state, day_index, seed, churn))
+        recorder.step('Update', updates_started, rows_written=sum(counts.values()), message=str(counts))
+        if TELEMETRY:
+            recorder.flush(conn)
+        stats = DayStats(day, {t: len(df) for t, df in tables.items()}, counts, time.perf_counter() - started)
+        if after_day is not None:
+            etl_started = time.perf_counter()
+            after_day(stats)
+            stats.etl_seconds = time.perf_counter() - etl_started
+        print(f"📅 {stats}")
+        results.append(stats)
+    return results
+
+
+def print_summary(results):
+    print(f"{'Day':<12}{'Inserts':>10}{'Updates':>10}{'Gen+Load(s)':>13}{'ETL(s)':>9}{'Rows/s':>11}")
+    for s in results:
+        etl = f"{s.etl_seconds:>9.2f}" if s.etl_seconds is not None else f"{'-':>9}"
+        rate = f"{s.delta_rows / s.etl_seconds:>11,.0f}" if s.etl_seconds else f"{'-':>11}"
+        print(f"{s.day:%Y-%m-%d}  {sum(s.inserts.values()):>10}{sum(s.updates.values()):>10}"
+              f"{s.seconds:>13.2f}{etl}{rate}")
+
+
+def main():
+    conn = connect()
+    try:
+        print_summary(run_days(conn))
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import os
+import json
+from datetime import timedelta
+import numpy as np
+
+from generator_engine import weekday_of, round2, UNIFORM
+
+# ----------------------------------
+# لایه مدل توزیع برای تولیدکننده‌ها: محبوبیت FK، توزیع زمانی و ویژگی‌های همبسته
+# همه پارامترها از یک فایل spec (SPEC_FILE) خوانده می‌شوند:
+#   fk           : مدل انتخاب FK به تفکیک جدول مرجع ('uniform' یا 'zipf' با توان s)
+#   dates        : مدل تاریخ هر دامنه (طول بازه، وزن ماه‌ها و روزهای هفته، اوج پایان ماه، رشد سالانه)
+#   correlations : پارامترهای ستون‌های وابسته هر جدول (مبلغ lognormal، نسبت مالیات، تخفیف حجمی و ...)
+# نمونه‌گیری Zipf کلیدها (pick_keys) در generator_engine است.
+# ----------------------------------
+
+SPEC_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distribution_spec.json')
+_specs = {}
+_date_cdfs = {}
+_CACHE_LIMIT = 64
+
+
+def load_spec(path=None):
+    """spec توزیع‌ها (یک بار برای هر مسیر خوانده می‌شود)"""
+    path = path or SPEC_FILE
+    if path not in _specs:
+        with open(path, encoding='utf-8') as f:
+            _specs[path] = json.load(f)
+    return _specs[path]
+
+
+def fk_model(table, spec=None):
+    """مدل محبوبیت کلیدهای جدول مرجع table (پیش‌فرض: fk.default یا uniform)"""
+    fk = (spec or load_spec()).get('fk', {})
+    return fk.get(table, fk.get('default', UNIFORM))
+
+
+def date_model(domain, spec=None):
+    return (spec or load_spec()).get('dates', {}).get(domain, {})
+
+
+def correlation(table, spec=None):
+    return (spec or load_spec()).get('correlations', {}).get(table, {})
+
+
+# ----------------------------------
+# توزیع زمانی
+# ----------------------------------
+def date_weights(start, end, model):
+    """
+    روزهای [start, end] و احتمال هر روز
+    model: monthly (12 وزن)، weekday (7 وزن، دوشنبه=0)، month_end {'days', 'factor'}، growth_per_year
+    """
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    weights = np.ones(len(days))
+    if model.get('monthly'):
+        weights *= np.asarray(model['monthly'], dtype=float)[days.astype('datetime64[M]').astype('int64') % 12]
+    if model.get('weekday'):
+        weights *= np.asarray(model['weekday'], dtype=float)[weekday_of(days)]
+    month_end = model.get('month_end')
+    if month_end:
+        days_left = ((days.astype('datetime64[M]') + 1).astype('datetime64[D]') - days).astype('int64')
+        weights[days_left <= month_end.get('days', 1)] *= month_end.get('factor', 1.0)
+    if model.get('growth_per_year'):
+        years = (days - days[0]).astype('int64') / 365.25
+        weights *= (1 + model['growth_per_year']) ** years
+    return days, weights / weights.sum()
+
+
+def sample_dates(rng, end, size, model):
+    """تاریخ‌های datetime64[D] در بازه model['days'] روزه منتهی به end"""
+    start = end - timedelta(days=max(1, int(model.get('days', 1))) - 1)
+    cache_key = (start, end, json.dumps(model, sort_keys=True))
+    if cache_key not in _date_cdfs:
+        if len(_date_cdfs) >= _CACHE_LIMIT:
+            _date_cdfs.clear()
+        days, p = date_weights(start, end, model)
+        _date_cdfs[cache_key] = (days, np.cumsum(p))
+    days, cdf = _date_cdfs[cache_key]
+    index = np.searchsorted(cdf, rng.random(size) * cdf[-1], side='right')
+    return days[np.minimum(index, len(days) - 1)]
+
+
+# ----------------------------------
+# ویژگی‌های همبسته
+# ----------------------------------
+def lognormal_amounts(rng, size, model):
+    """مبلغ با دم سنگین: median * exp(sigma * N(0,1))، بریده‌شده به [min, max]"""
+    values = model.get('median', 1.0) * np.exp(model.get('sigma', 0.0) * rng.standard_normal(size))
+    return round2(np.clip(values, model.get('min', 0.0), model.get('max', np.inf)))
+
@@ -0,0 +1,393 @@
+import os
+import json
+import time
+import uuid
+import random
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from parallel_loader import ConnectionPool, restrict_graph, load_order, dependents_of
+from telemetry import StepMetric, write_metrics
+
+# ----------------------------------
+# هماهنگ‌کننده ETL (جایگزین زنجیره سریال job/HR_job.sql و رویه‌های Wrapper)
+# هر رویه Load*/Update* یک گره در گراف وابستگی اعلام‌شده است؛ گره‌هایی که به هم وابسته
+# نیستند هم‌زمان (با حداکثر WORKERS اتصال) اجرا می‌شوند.
+#   - تلاش مجدد با فاصله افزایشی برای هر گره
+#   - ادامه از گره شکست‌خورده (resume) با فایل وضعیت اجرا
+#   - زمان اجرای هر گره (و ثبت آن با RunID اجرا در StagingDB.Audit.ETLStepMetric)
+#   - StandInExecutor برای آزمون بدون SQL Server
+# هر رویه در تراکنش خودش اجرا می‌شود (برخلاف Wrapperها که همه را در یک تراکنش اجرا می‌کنند).
+# ----------------------------------
+
+# گراف وابستگی: {رویه: رویه‌هایی که باید قبل از آن تمام شوند}
+# یال‌ها از جدول‌هایی که هر رویه می‌خواند استخراج شده‌اند (StagingDB.* -> Load*، Dim.* -> Update*)
+ETL_DAG = {
+    # ---------- Staging (StagingDB) ----------
+    "Finance.LoadFinanceCustomer": set(),
+    "Finance.LoadFinanceBillingCycle": set(),
+    "Finance.LoadFinanceServiceType": set(),
+    "Finance.LoadFinanceTax": set(),
+    "Finance.LoadFinanceTariff": set(),
+    "Finance.LoadFinanceContract": set(),
+    "Finance.LoadFinanceInvoice": set(),
+    "Finance.LoadFinanceInvoiceLine": set(),
+    "Finance.LoadFinancePayment": set(),
+    "Finance.LoadFinanceRevenueRecognition": set(),
+    "HumanResources.LoadSAEmployee": set(),
+    "HumanResources.LoadSADepartment": set(),
+    "HumanResources.LoadSAJobTitle": set(),
+    "HumanResources.LoadSAEmploymentHistory": set(),
+    "HumanResources.LoadSATermination": set(),
+    "HumanResources.LoadSAAttendance": set(),
+    "HumanResources.LoadSASalaryPayment": set(),
+    "HumanResources.LoadSATrainingProgram": set(),
+    "HumanResources.LoadSAEmployeeTraining": set(),
+    "HumanResources.LoadSALeaveType": set(),
+    "HumanResources.LoadSALeaveRequest": set(),
+    "PortOperations.LoadContainerType": set(),
+    "PortOperations.LoadEquipmentType": set(),
+    "PortOperations.LoadPort": set(),
+    "PortOperations.LoadShip": set(),
+    "PortOperations.LoadContainerYardMovement": set(),
+    "PortOperations.LoadCargoOperation": set(),
+    "Common.LoadOperationEquipmentAssignment": set(),
+    "PortOperations.LoadContainer": set(),
+    "PortOperations.LoadEquipment": set(),
+    "PortOperations.LoadVoyage": set(),
+    "PortOperations.LoadPortCall": set(),
+    "PortOperations.LoadBerth": set(),
+    "PortOperations.LoadBerthAllocation": set(),
+    "PortOperations.LoadYard": set(),
+    "PortOperations.LoadYardSlot": set(),
+    "Common.LoadCountry": set(),
+    # ---------- Dimensions (DataWarehouse) ----------
+    "Dim.UpdateDimDateIncremental": {"Finance.LoadFinanceContract", "Finance.LoadFinanceInvoice", "Finance.LoadFinancePayment", "HumanResources.LoadSAAttendance", "HumanResources.LoadSAEmployee", "HumanResources.LoadSAEmploymentHistory", "HumanResources.LoadSASalaryPayment", "HumanResources.LoadSATermination", "PortOperations.LoadCargoOperation", "PortOperations.LoadContainerYardMovement", "PortOperations.LoadPortCall"},
+    "Dim.UpdateDimCustomerIncremental": {"Finance.LoadFinanceCustomer"},
+    "Dim.UpdateDimServiceTypeIncremental": {"Finance.LoadFinanceServiceType"},
+    "Dim.UpdateDimTaxIncremental": {"Finance.LoadFinanceTax"},
+    "Dim.UpdateDimBillingCycleIncremental": {"Finance.LoadFinanceBillingCycle"},
+    "Dim.UpdateDimPaymentMethodIncremental": {"Finance.LoadFinancePayment"},
+    "Dim.UpdateDimContractIncremental": {"Finance.LoadFinanceContract"},
+    "Dim.UpdateDimInvoiceIncremental": {"Finance.LoadFinanceContract", "Finance.LoadFinanceInvoice"},
+    "Dim.UpdateDimDepartment": {"HumanResources.LoadSADepartment", "HumanResources.LoadSAEmployee"},
+    "Dim.UpdateDimJobTitle": {"HumanResources.LoadSAJobTitle"},
+    "Dim.UpdateDimEmployee": {"HumanResources.LoadSAEmployee"},
+    "Dim.UpdateDimLeaveType": {"HumanResources.LoadSALeaveType"},
+    "Dim.UpdateDimTerminationReason": {"HumanResources.LoadSATermination"},
+    "Dim.UpdateDimShipIncremental": {"PortOperations.LoadShip"},
+    "Dim.UpdateDimPortIncremental": {"PortOperations.LoadPort"},
+    "Dim.UpdateDimContainerIncremental": {"PortOperations.LoadContainer"},
+    "Dim.UpdateDimEquipmentIncremental": {"PortOperations.LoadEquipment"},
+    "Dim.UpdateDimEmployeeIncremental": {"Dim.UpdateDimEmployee", "HumanResources.LoadSAEmployee"},
+    "Dim.UpdateDimYardSlotIncremental": {"PortOperations.LoadYardSlot"},
+    # ---------- Facts (DataWarehouse) ----------
+    "Fact.UpdateFactInvoiceLineTransactionIncremental": {"Dim.UpdateDimCustomerIncremental", "Dim.UpdateDimDateIncremental", "Dim.UpdateDimInvoiceIncremental", "Dim.UpdateDimServiceTypeIncremental", "Dim.UpdateDimTaxIncremental", "Finance.LoadFinanceContract", "Finance.LoadFinanceCustomer", "Finance.LoadFinanceInvoice", "Finance.LoadFinanceInvoiceLine"},
+    "Fact.UpdateFactCustomerPaymentTransactionIncremental": {"Dim.UpdateDimCustomerIncremental", "Dim.UpdateDimDateIncremental", "Dim.UpdateDimInvoiceIncremental", "Dim.UpdateDimPaymentMethodIncremental", "Finance.LoadFinanceContract", "Finance.LoadFinanceCustomer", "Finance.LoadFinanceInvoice", "Finance.LoadFinancePayment"},
+    "Fact.UpdateFactCustomerBillingMonthlySnapshotIncremental": {"Dim.UpdateDimBillingCycleIncremental", "Dim.UpdateDimCustomerIncremental", "Dim.UpdateDimDateIncremental", "Finance.LoadFinanceContract", "Finance.LoadFinanceCustomer", "Finance.LoadFinanceInvoice", "Finance.LoadFinanceInvoiceLine", "Finance.LoadFinancePayment"},
+    "Fact.UpdateFactInvoiceLifecycleAccumulatingIncremental": {"Dim.UpdateDimContractIncremental", "Dim.UpdateDimCustomerIncremental", "Dim.UpdateDimDateIncremental", "Dim.UpdateDimInvoiceIncremental", "Finance.LoadFinanceContract", "Finance.LoadFinanceCustomer", "Finance.LoadFinanceInvoice", "Finance.LoadFinancePayment"},
+    "Fact.UpdateFactCustomerContractActivationIncremental": {"Dim.UpdateDimContractIncremental", "Dim.UpdateDimCustomerIncremental", "Dim.UpdateDimDateIncremental", "Finance.LoadFinanceContract", "Finance.LoadFinanceCustomer"},
+    "Fact.UpdateFactTermination": {"Dim.UpdateDimDateIncremental", "Dim.UpdateDimDepartment", "Dim.UpdateDimEmployeeIncremental", "Dim.UpdateDimJobTitle", "Dim.UpdateDimTerminationReason", "HumanResources.LoadSAEmploymentHistory", "HumanResources.LoadSATermination"},
+    "Fact.UpdateFactSalaryPayment": {"Dim.UpdateDimDateIncremental", "Dim.UpdateDimDepartment", "Dim.UpdateDimEmployeeIncremental", "Dim.UpdateDimJobTitle", "HumanResources.LoadSAEmploymentHistory", "HumanResources.LoadSASalaryPayment"},
+    "Fact.UpdateFactEmployeeAttendance": {"Dim.UpdateDimDateIncremental", "Dim.UpdateDimEmployeeIncremental", "HumanResources.LoadSAAttendance"},
+    "Fact.UpdateFactMonthlyEmployeePerformance": {"Dim.UpdateDimDateIncremental", "Dim.UpdateDimDepartment", "Dim.UpdateDimEmployeeIncremental", "HumanResources.LoadSAAttendance", "HumanResources.LoadSAEmploymentHistory"},
+    "Fact.UpdateFactEmployeeLifecycle": {"Dim.UpdateDimDateIncremental", "Dim.UpdateDimEmployeeIncremental", "Dim.UpdateDimTerminationReason", "HumanResources.LoadSAEmployeeTraining", "HumanResources.LoadSAEmploymentHistory", "HumanResources.LoadSATermination"},
+    "Fact.UpdateFactCargoOperationIncremental": {"Common.LoadOperationEquipmentAssignment", "Dim.UpdateDimContainerIncremental", "Dim.UpdateDimDateIncremental", "Dim.UpdateDimEmployeeIncremental", "Dim.UpdateDimEquipmentIncremental", "Dim.UpdateDimPortIncremental", "Dim.UpdateDimShipIncremental", "PortOperations.LoadCargoOperation", "PortOperations.LoadPortCall", "PortOperations.LoadVoyage"},
+    "Fact.UpdateFactEquipmentAssignmentIncremental": {"Common.LoadOperationEquipmentAssignment", "Dim.UpdateDimDateIncremental", "Dim.UpdateDimEmployeeIncremental", "Dim.UpdateDimEquipmentIncremental", "Dim.UpdateDimPortIncremental", "PortOperations.LoadCargoOperation", "PortOperations.LoadContainer", "PortOperations.LoadPortCall"},
+    "Fact.UpdateFactContainerMovementsAcc": {"Dim.UpdateDimPortIncremental", "PortOperations.LoadCargoOperation", "PortOperations.LoadContainer", "PortOperations.LoadContainerType", "PortOperations.LoadPortCall"},
+    "Fact.UpdateFactPortCallSnapshotIncremental": {"Dim.UpdateDimDateIncremental", "Dim.UpdateDimPortIncremental", "PortOperations.LoadBerthAllocation", "PortOperations.LoadCargoOperation", "PortOperations.LoadPortCall"},
+    # ---------- Rollups (DataWarehouse) ----------
+    # بدون @Dates فقط Rollupهای هنوز کامل‌ساخته‌نشده را می‌سازد (اجرای اول روی DW تازه)؛ در اجراهای بعدی کاری نمی‌کند
+    "Agg.RefreshRollups": {"Fact.UpdateFactCustomerPaymentTransactionIncremental", "Fact.UpdateFactEmployeeAttendance", "Fact.UpdateFactInvoiceLineTransactionIncremental", "Fact.UpdateFactSalaryPayment"},
+}
+
+# پایگاه داده هر لایه؛ رویه‌ها با نام کامل (DB.Schema.Proc) اجرا می‌شوند
+LAYER_DATABASES = {'Dim': 'DataWarehouse', 'Fact': 'DataWarehouse', 'Agg': 'DataWarehouse'}
+STAGING_DATABASE = 'StagingDB'
+
+WORKERS       = 4
+RETRIES       = 2                   # تعداد تلاش مجدد پس از اولین شکست
+RETRY_DELAY   = 5.0                 # ثانیه؛ در هر تلاش دو برابر می‌شود
+NODE_TIMEOUT  = 0                   # حداکثر زمان هر رویه به ثانیه (0 = بدون محدودیت)
+STATE_FILE    = 'etl_run_state.json'
+RESUME        = False               # True: گره‌های موفق اجرای قبلی دوباره اجرا نمی‌شوند
+DRY_RUN       = False               # True: اجرای گراف با StandInExecutor
+
+
+def qualified_name(node):
+    """نام کامل رویه برای EXEC"""
+    layer = node.split('.')[0]
+    return f"{LAYER_DATABASES.get(layer, STAGING_DATABASE)}.{node}"
+
+
+def with_ancestors(graph, targets):
+    """زیرگراف شامل targets و همه پیش‌نیازهای آن‌ها (برای اجرای بخشی از ETL)"""
+    selected, stack = set(), list(targets)
+    while stack:
+        node = stack.pop()
+        if node in selected:
+            continue
+        if node not in graph:
+            raise KeyError(f"Unknown ETL node: {node}")
+        selected.add(node)
+        stack.extend(graph[node])
+    return restrict_graph(graph, selected)
+
+
+# ----------------------------------
+# Executorها
+# ----------------------------------
+class SqlServerExecutor:
+    """
+    اجرای رویه‌ها روی SQL Server؛ هر worker یک اتصال autocommit از pool می‌گیرد
+    run_id (توسط run_dag تنظیم می‌شود) در SESSION_CONTEXT اتصال قرار می‌گیرد تا مراحل ثبت‌شده
+    توسط خود رویه‌ها با همان RunID در Audit.ETLStepMetric بنشینند؛ زمان کل هر گره هم ثبت می‌شود
+    """
+
+    run_id = None
+
+    def __init__(self, workers=WORKERS, timeout=NODE_TIMEOUT, connect=None, telemetry=True):
+        if connect is None:
+            from Connect import connect as connect_sql_server
+            connect = lambda: connect_sql_server(autocommit=True, timeout=timeout)
+        self.pool = ConnectionPool(connect, workers)
+        self.telemetry = telemetry
+
+    def execute(self, node):
+        conn = self.pool.acquire()
+        started, error = datetime.now(), None
+        try:
+            cursor = conn.cursor()
+            try:
+                if self.run_id:
+                    cursor.execute("EXEC StagingDB.Audit.BeginETLRun @RunID = ?", self.run_id)
+                cursor.execute(f"EXEC {qualified_name(node)}")
+                # خطاهایی که بعد از اولین result set رخ می‌دهند فقط با پیمایش همه result setها ظاهر می‌شوند
+                while cursor.nextset():
+                    pass
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                cursor.close()
+                if self.telemetry:
+                    self._record(conn, node, started, error)
+        finally:
+            self.pool.release(conn)
+
+    def _record(self, conn, node, started, error):
+        metric = StepMetric(self.run_id, node, 'Node', started, datetime.now(), source='Orchestrator',
+                            status='Failed' if error else 'Success', message=str(error) if error else None)
+        try:
+            write_metrics(conn, [metric])
+        except Exception as e:
+            # خطای telemetry نباید اجرای ETL را متوقف کند
+            print(f"⚠️ Could not record telemetry for {node}: {e}")
+
+    def close(self):
+        self.pool.close()
+
+
+class StandInExecutor:
+    """
+    جایگزین SQL Server برای آزمون گراف
+    durations : {گره: ثانیه} زمان شبیه‌سازی‌شده هر رویه (پیش‌فرض default)
+    failures  : {گره: تعداد شکست پیش از موفقیت}؛ مقدار None یعنی همیشه شکست
+    """
+
+    run_id = None
+
+    def __init__(self, durations=None, failures=None, default=0.0):
+        self.durations = durations or {}
+        self.failures = dict(failures or {})
+        self.default = default
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def execute(self, node):
+        with self._lock:
+            self.calls.append(node)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            remaining = self.failures.get(node, 0)
+            fail = remaining is None or remaining > 0
+            if remaining:
+                self.failures[node] = remaining - 1
+        try:
+            time.sleep(self.durations.get(node, self.default))
+            if fail:
+                raise RuntimeError(f"Simulated failure in {node}")
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def close(self):
+        pass
+
+
+# ----------------------------------
+# وضعیت اجرا (برای resume)
+# ----------------------------------
+class RunState:
+    """وضعیت گره‌ها در فایل JSON؛ بعد از پایان هر گره به صورت اتمیک ذخیره می‌شود"""
+
+    def __init__(self, path=None, run_id=None):
+        self.path = path
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.nodes = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        state = cls(path, data['run_id'])
+        state.nodes = data['nodes']
+        return state
+
+    def completed(self):
+        return {n for n, info in self.nodes.items() if info['status'] == 'success'}
+
+    def record(self, node, **info):
+        with self._lock:
+            self.nodes[node] = info
+            if self.path:
+                tmp = f"{self.path}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump({'run_id': self.run_id, 'nodes': self.nodes}, f, indent=2)
+                os.replace(tmp, self.path)
+
+
+class NodeResult:
+    def __init__(self, node, status, attempts=0, seconds=0.0, error=None):
+        self.node = node
+        self.status = status
+        self.attempts = attempts
+        self.seconds = seconds
+        self.error = error
+
+    def __repr__(self):
+        return f"{self.node}: {self.status} ({self.attempts} attempts, {self.seconds:.2f}s)"
+
+
+class RunResult:
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.nodes = {}
+        self.seconds = 0.0
+
+    def by_status(self, status):
+        return sorted(n for n, r in self.nodes.items() if r.status == status)
+
+    @property
+    def ok(self):
+        return all(r.status in ('success', 'resumed') for r in self.nodes.values())
+
+
+# ----------------------------------
+# زمان‌بند
+# ----------------------------------
+def _run_node(executor, node, retries, retry_delay):
+    """اجرای یک گره با تلاش مجدد؛ خروجی (تعداد تلاش، ثانیه، خطا)"""
+    started = time.perf_counter()
+    for attempt in range(1, retries + 2):
+        try:
+            executor.execute(node)
+            return attempt, time.perf_counter() - started, None
+        except Exception as e:
+            if attempt > retries:
+                return attempt, time.perf_counter() - started, e
+            delay = retry_delay * 2 ** (attempt - 1)
+            print(f"🔁 {node} failed (attempt {attempt}): {e}; retrying in {delay:.1f}s")
+            time.sleep(delay + random.uniform(0, delay / 10))
+
+
+def run_dag(executor, graph=None, workers=WORKERS, retries=RETRIES, retry_delay=RETRY_DELAY,
+            state_file=None, resume=False, targets=None, run_id=None):
+    """
+    اجرای گراف با حداکثر workers رویه هم‌زمان
+    targets : فقط این گره‌ها و پیش‌نیازهایشان اجرا می‌شوند
+    run_id  : شناسه اجرای جدید (مثلاً مشترک بین چند مرحله بنچمارک)؛ پیش‌فرض: شناسه تصادفی
+    resume  : گره‌های موفق در state_file دوباره اجرا نمی‌شوند (ادامه از گره شکست‌خورده)
+    در صورت شکست یک گره، وابسته‌های آن رد می‌شوند و شاخه‌های مستقل ادامه می‌دهند
+    """
+    graph = ETL_DAG if graph is None else graph
+    if targets:
+        graph = with_ancestors(graph, targets)
+    load_order(graph)  # بررسی نبود چرخه
+
+    if resume and state_file and os.path.exists(state_file):
+        state = RunState.load(state_file)
+    else:
+        state = RunState(state_file, run_id)
+    done = state.completed() & set(graph)
+    result = RunResult(state.run_id)
+    executor.run_id = state.run_id
+    for node in done:
+        result.nodes[node] = NodeResult(node, 'resumed')
+    if done:
+        print(f"⏩ Resuming run {state.run_id}: {len(done)} nodes already completed")
+
+    waiting = {n: set(deps) - done for n, deps in graph.items() if n not in done}
+    running = {}
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while waiting or running:
+            for node in sorted(n for n, deps in waiting.items() if not deps):
+                del waiting[node]
+                print(f"🚀 Running: {node}")
+                running[pool.submit(_run_node, executor, node, retries, retry_delay)] = node
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                node = running.pop(future)
+                attempts, seconds, error = future.result()
+                if error is None:
+                    result.nodes[node] = NodeResult(node, 'success', attempts, seconds)
+                    state.record(node, status='success', attempts=attempts, seconds=round(seconds, 3))
+                    print(f"✅ {node} ({seconds:.2f}s)")
+                    for deps in waiting.values():
+                        deps.discard(node)
+                    continue
+                result.nodes[node] = NodeResult(node, 'failed', attempts, seconds, error)
+                state.record(node, status='failed', attempts=attempts, seconds=round(seconds, 3), error=str(error))
+                print(f"❌ {node}: {error}")
+                for dependent in dependents_of(graph, node) & set(waiting):
+                    del waiting[dependent]
+                    result.nodes[dependent] = NodeResult(dependent, 'skipped')
+                    state.record(dependent, status='skipped')
+                    print(f"⏭️ Skipped {dependent} (depends on {node})")
+
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def print_report(result):
+    print(f"Run {result.run_id}: {result.seconds:.2f}s")
+    print(f"{'Node':<60}{'Status':>10}{'Tries':>7}{'Seconds':>10}")
+    for r in sorted(result.nodes.values(), key=lambda r: -r.seconds):
+        print(f"{r.node:<60}{r.status:>10}{r.attempts:>7}{r.seconds:>10.2f}")
+    serial = sum(r.seconds for r in result.nodes.values())
+    if result.seconds > 0:
+        print(f"Sum of node times {serial:.2f}s; wall time {result.seconds:.2f}s "
+              f"(speedup x{serial / result.seconds:.1f})")
+
+
+def main():
+    executor = StandInExecutor(default=0.05) if DRY_RUN else SqlServerExecutor(WORKERS)
+    try:
+        result = run_dag(executor, workers=WORKERS, retries=RETRIES, retry_delay=RETRY_DELAY,
+                         state_file=STATE_FILE, resume=RESUME)
+    finally:
+        executor.close()
+    print_report(result)
+    return result
+
+
+if __name__ == '__main__':
+    main()
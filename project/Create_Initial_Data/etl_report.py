@@ -0,0 +1,114 @@
+import pandas as pd
+
+from main import connect
+from telemetry import read_metrics
+
+# ----------------------------------
+# گزارش روند کارایی ETL از StagingDB.Audit.ETLStepMetric
+#   - زمان هر مرحله (رویه/جدول + Step) در آخرین LAST_RUNS اجرا
+#   - پرچم regression: زمان آخرین اجرا بیش از REGRESSION_PCT از میانه اجراهای قبلی
+#     بیشتر (و حداقل MIN_SECONDS کندتر) باشد، یا rows/sec به همان نسبت افت کند
+# چند سطر یک مرحله در یک اجرا (مثلاً هر chunk بارگذاری جریانی) جمع زده می‌شوند.
+# ----------------------------------
+
+# اتصال از main.connect (BACKEND / SQLITE_PATH همان‌جا تنظیم می‌شوند)
+LAST_RUNS      = 10
+REGRESSION_PCT = 0.25              # 25% کندتر از میانه
+MIN_SECONDS    = 1.0               # مراحل کوتاه‌تر از این نوسان زمان‌سنجی حساب می‌شوند
+MIN_HISTORY    = 2                 # حداقل تعداد اجرای قبلی برای مقایسه
+
+
+def step_runs(metrics):
+    """یک سطر برای هر (اجرا، مرحله): ثانیه، سطرهای نوشته‌شده، rows/sec و شروع اجرا"""
+    df = metrics.copy()
+    df['Task'] = df['ProcessName'].fillna(df['TargetTable']).fillna('')
+    df['Target'] = df['TargetTable'].fillna('')
+    df['Seconds'] = (df['EndTime'] - df['StartTime']).dt.total_seconds()
+    df['Failed'] = df['Status'].eq('Failed')
+    grouped = df.groupby(['RunID', 'Task', 'Target', 'Step'], sort=False).agg(
+        Seconds=('Seconds', 'sum'), RowsWritten=('RowsWritten', lambda s: s.sum(min_count=1)),
+        Failed=('Failed', 'any'), Started=('StartTime', 'min')).reset_index()
+    run_start = df.groupby('RunID')['StartTime'].min().rename('RunStart')
+    grouped = grouped.join(run_start, on='RunID')
+    rows = pd.to_numeric(grouped['RowsWritten'], errors='coerce')
+    grouped['RowsPerSec'] = rows / grouped['Seconds'].where(grouped['Seconds'] > 0)
+    return grouped.sort_values(['RunStart', 'Started']).reset_index(drop=True)
+
+
+def trend(steps):
+    """جدول محوری: هر مرحله یک سطر، هر اجرا (به ترتیب زمان) یک ستون ثانیه"""
+    order = steps.drop_duplicates('RunID').sort_values('RunStart')['RunID']
+    table = steps.pivot_table(index=['Task', 'Target', 'Step'], columns='RunID', values='Seconds', aggfunc='sum')
+    return table.reindex(columns=order)
+
+
+def find_regressions(steps, threshold=REGRESSION_PCT, min_seconds=MIN_SECONDS, min_history=MIN_HISTORY):
+    """مقایسه آخرین اجرای هر مرحله با میانه اجراهای قبلی همان مرحله"""
+    flagged = []
+    for key, runs in steps.groupby(['Task', 'Target', 'Step'], sort=False):
+        runs = runs.sort_values('RunStart')
+        latest, history = runs.iloc[-1], runs.iloc[:-1]
+        history = history[~history['Failed']]
+        if len(history) < min_history:
+            continue
+        base_seconds = history['Seconds'].median()
+        base_rate = history['RowsPerSec'].median()
+        reasons = []
+        if latest['Failed']:
+            reasons.append('failed')
+        if latest['Seconds'] > base_seconds * (1 + threshold) and latest['Seconds'] - base_seconds >= min_seconds:
+            reasons.append(f"time +{(latest['Seconds'] / base_seconds - 1) * 100 if base_seconds else float('inf'):.0f}%")
+        if pd.notna(base_rate) and pd.notna(latest['RowsPerSec']) and latest['RowsPerSec'] < base_rate / (1 + threshold) \
+                and latest['Seconds'] >= min_seconds:
+            reasons.append(f"rows/sec -{(1 - latest['RowsPerSec'] / base_rate) * 100:.0f}%")
+        if reasons:
+            flagged.append({'Task': key[0], 'Target': key[1], 'Step': key[2], 'RunID': latest['RunID'],
+                            'Seconds': latest['Seconds'], 'BaselineSeconds': base_seconds,
+                            'RowsPerSec': latest['RowsPerSec'], 'BaselineRowsPerSec': base_rate,
+                            'Reason': ', '.join(reasons)})
+    columns = ['Task', 'Target', 'Step', 'RunID', 'Seconds', 'BaselineSeconds', 'RowsPerSec',
+               'BaselineRowsPerSec', 'Reason']
+    return pd.DataFrame(flagged, columns=columns)
+
+
+def print_trend(steps, top=30):
+    table = trend(steps)
+    latest = table.columns[-1]
+    table = table.sort_values(latest, ascending=False).head(top)
+    print(f"Slowest {len(table)} steps over {table.shape[1]} runs (seconds, oldest -> newest)")
+    name_width = max(30, min(70, max(len(f"{t} {g} {s}") for t, g, s in table.index) + 2))
+    print(f"{'Step':<{name_width}}" + ''.join(f"{r[:10]:>12}" for r in table.columns))
+    for (task, target, step), values in table.iterrows():
+        label = f"{task} {target if target != task else ''} {step}".replace('  ', ' ')
+        print(f"{label[:name_width - 1]:<{name_width}}" + ''.join(
+            f"{v:>12.2f}" if pd.notna(v) else f"{'-':>12}" for v in values))
+
+
+def print_regressions(regressions):
+    if regressions.empty:
+        print("No regressions detected.")
+        return
+    print(f"⚠️ {len(regressions)} regression(s) in the latest run:")
+    for r in regressions.itertuples(index=False):
+        print(f"  {r.Task} / {r.Step} {r.Target}: {r.Seconds:.2f}s vs median {r.BaselineSeconds:.2f}s ({r.Reason})")
+
+
+def main():
+    conn = connect()
+    try:
+        metrics = read_metrics(conn, last_runs=LAST_RUNS)
+    finally:
+        conn.close()
+    if metrics.empty:
+        print("No telemetry recorded yet (StagingDB.Audit.ETLStepMetric is empty).")
+        return None
+    steps = step_runs(metrics)
+    print_trend(steps)
+    print()
+    regressions = find_regressions(steps)
+    print_regressions(regressions)
+    return regressions
+
+
+if __name__ == '__main__':
+    main()
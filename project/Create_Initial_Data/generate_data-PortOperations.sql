@@ -1,4 +1,5 @@
-﻿---- غیرفعال‌سازی موقت همه‌ی قیدهای FK 
+﻿-- نسخه برداری و مقیاس‌پذیر این اسکریپت: data_generator_PortOps.py (سری زمانی سازگار، seed و اندازه قابل تنظیم)
+---- غیرفعال‌سازی موقت همه‌ی قیدهای FK 
 --EXEC sp_msforeachtable 'ALTER TABLE ? NOCHECK CONSTRAINT ALL';
 
 ---- ۱. پاک‌سازی جداول Fact و Factless و عملیاتی
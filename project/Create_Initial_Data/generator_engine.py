@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+
+# ----------------------------------
+# موتور تولید داده ستونی (Vectorized)
+# هر ستون به صورت یک آرایه NumPy و در یک مرحله تولید می‌شود
+# ----------------------------------
+
+# لیست مشاغل منطقی بندری
+POSITIONS = ['Crane Operator', 'Forklift Driver', 'Dock Supervisor', 'Logistics Clerk', 'Port Manager',
+             'Maintenance Technician', 'Security Officer', 'Cargo Inspector']
+
+EMPLOYMENT_STATUS_WEIGHTS = {'Active': 80, 'OnLeave': 15, 'Terminated': 5}
+GENDER_WEIGHTS = {'Male': 70, 'Female': 30}
+MARITAL_STATUS_WEIGHTS = {'Married': 60, 'Single': 40}
+ATTENDANCE_STATUS_WEIGHTS = {'Present': 85, 'Late': 10, 'Absent': 5}
+PAYMENT_METHOD_WEIGHTS = {'BankTransfer': 90, 'Cash': 10}
+
+# احتمال پذیرش یکشنبه در نمونه‌گیری تاریخ حضور (بقیه روزها همیشه پذیرفته می‌شوند)
+SUNDAY_ACCEPT_RATE = 0.1
+
+# بازه ساعت ورود (شامل هر دو سر) برای هر وضعیت
+CHECK_IN_HOURS = {'Present': (7, 8), 'Late': (8, 9)}
+HOURS_WORKED_RANGE = (6, 10)
+PAYDAY = 28
+# حقوق پایه هر کارمند در بازه base (ثابت برای هر EmployeeID) ± spread؛ پاداش و کسورات نسبتی از حقوق
+SALARY_MODEL = {'base': (2000, 6000), 'spread': 0.03, 'bonus_rate': (0.05, 0.2), 'deduction_rate': (0.02, 0.08)}
+
+# همه رشته‌های زمانی ممکن در یک روز؛ تبدیل ثانیه به HH:MM:SS با یک اندیس‌گذاری انجام می‌شود
+_SECONDS = np.arange(24 * 3600)
+TIME_STRINGS = np.array([f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in _SECONDS])
+
+
+def make_rng(seed=None):
+    """ساخت مولد اعداد تصادفی NumPy؛ با seed یکسان داده‌ها تکرارپذیر هستند"""
+    return np.random.default_rng(seed)
+
+
+def weighted_choice(rng, weights, size):
+    """نمونه‌گیری وزنی از دیکشنری {مقدار: وزن}؛ خروجی Categorical است (بدون ساخت رشته برای هر سطر)"""
+    p = np.array(list(weights.values()), dtype=float)
+    codes = rng.choice(len(p), size=size, p=p / p.sum())
+    return pd.Categorical.from_codes(codes, categories=list(weights.keys()))
+
+
+def uniform_choice(rng, values, size):
+    """نمونه‌گیری یکنواخت از یک لیست یا آرایه (مثل کلیدهای خارجی)"""
+    values = np.asarray(values)
+    return values[rng.integers(0, len(values), size=size)]
+
+
+def sample_pool(rng, pool, size):
+    """نمونه‌گیری یکنواخت از یک مخزن رشته‌ای؛ فقط اندیس‌ها تصادفی هستند و خروجی Categorical است"""
+    categories = pd.unique(np.asarray(pool, dtype=object))
+    return pd.Categorical.from_codes(rng.integers(0, len(categories), size=size), categories=categories)
+
+
+# ----------------------------------
+# محبوبیت کلیدها (Zipf)
+# محبوبیت هر کلید تابعی قطعی از مقدار خود کلید است (نه جایگاه آن در آرایه)، پس مشتری پرتکرار
+# داده اولیه در delta_generator هم (که فقط پنجره‌ای از کلیدها را دارد) پرتکرار می‌ماند.
+# ----------------------------------
+UNIFORM = {'type': 'uniform'}
+_KEY_CACHE_LIMIT = 64
+_key_cdfs = {}
+
+
+def key_scores(keys, salt=0):
+    """عدد قطعی در [0, 1) برای هر کلید (splitmix64)؛ ترتیب محبوبیت کلیدها از آن می‌آید"""
+    x = np.asarray(keys).astype(np.uint64) + np.uint64(salt) * np.uint64(0x9E3779B97F4A7C15)
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)).astype(np.float64) / float(2 ** 53)
+
+
+def _zipf_cdf(keys, s, salt):
+    """CDF تجمعی وزن‌های rank^-s؛ rank هر کلید از key_scores می‌آید (کش تا وقتی آرایه کلیدها عوض نشده)"""
+    cache_key = (id(keys), s, salt)
+    entry = _key_cdfs.get(cache_key)
+    if entry is not None and entry[0] is keys:
+        return entry[1]
+    order = np.argsort(key_scores(keys, salt), kind='stable')
+    rank = np.empty(len(keys), dtype=np.float64)
+    rank[order] = np.arange(1, len(keys) + 1)
+    cdf = np.cumsum(rank ** -float(s))
+    if len(_key_cdfs) >= _KEY_CACHE_LIMIT:
+        _key_cdfs.clear()
+    _key_cdfs[cache_key] = (keys, cdf)
+    return cdf
+
+
+def pick_keys(rng, keys, size, model=None):
+    """
+    انتخاب FK از آرایه کلیدها
+    model: {'type': 'uniform'} (همان uniform_choice) یا {'type': 'zipf', 's': 1.1, 'salt': 0}
+    """
+    keys = np.asarray(keys)
+    kind = (model or UNIFORM).get('type', 'uniform')
+    if kind == 'uniform':
+        return keys[rng.integers(0, len(keys), size=size)]
+    if kind != 'zipf':
+        raise ValueError(f"Unknown key distribution: {kind}")
+    cdf = _zipf_cdf(keys, model.get('s', 1.0), model.get('salt', 0))
+    index = np.searchsorted(cdf, rng.random(size) * cdf[-1], side='right')
+    return keys[np.minimum(index, len(keys) - 1)]
+
+
+def key_levels(keys, low, high, salt=1):
+    """سطح ثابت هر کلید در [low, high] (مثلاً حقوق پایه هر کارمند)؛ برای همه سطرهای همان کلید یکسان است"""
+    return low + (high - low) * key_scores(keys, salt)
+
+
+# ----------------------------------
+# تاریخ، زمان و رشته‌ها
+# ----------------------------------
+def weekday_of(days):
+    """روز هفته برای آرایه datetime64[D] (0=دوشنبه ... 6=یکشنبه)"""
+    return (days.astype('int64') + 3) % 7
+
+
+def random_dates(rng, start, end, size, sunday_rate=1.0):
+    """
+    تولید تاریخ تصادفی یکنواخت در بازه [start, end]
+    sunday_rate معادل برداری حلقه رد/پذیرش قبلی است: وزن یکشنبه‌ها برابر این مقدار است
+    """
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    if sunday_rate == 1.0:
+        return days[rng.integers(0, len(days), size=size)]
+    p = np.where(weekday_of(days) == 6, sunday_rate, 1.0)
+    return days[rng.choice(len(days), size=size, p=p / p.sum())]
+
+
+def pay_dates(rng, start, end, size, payday=PAYDAY):
+    """تاریخ پرداخت: یک روز تصادفی در بازه که به روز payday همان ماه منتقل می‌شود"""
+    days = random_dates(rng, start, end, size)
+    return days.astype('datetime64[M]').astype('datetime64[D]') + (payday - 1)
+
+
+def format_times(seconds):
+    """تبدیل آرایه ثانیه از ابتدای روز به رشته HH:MM:SS (Categorical روی TIME_STRINGS)"""
+    return pd.Categorical.from_codes(np.asarray(seconds) % len(TIME_STRINGS), categories=TIME_STRINGS)
+
+
+def random_digits(rng, low, high, size, prefix=''):
+    """رشته‌های عددی تصادفی در بازه [low, high] با پیشوند اختیاری"""
+    if high - low < min(size, 2000000):
+        # بازه کوچک: همه رشته‌ها یک بار ساخته و سپس فقط اندیس‌گذاری می‌شوند
+        lookup = np.arange(low, high + 1).astype(str)
+        if prefix:
+            lookup = np.char.add(prefix, lookup)
+        return pd.Categorical.from_codes(rng.integers(0, len(lookup), size=size), categories=lookup)
+    numbers = rng.integers(low, high + 1, size=size).astype(str)
+    return np.char.add(prefix, numbers) if prefix else numbers
+
+
+def unique_digits(rng, low, high, size):
+    """رشته‌های عددی یکتا در بازه [low, high] (نمونه‌گیری برداری بدون جایگذاری، بدون حلقه تکرار)"""
+    return (rng.choice(high - low + 1, size=size, replace=False) + low).astype(str)
+
+
+def round2(values):
+    return np.round(values, 2)
+
+
+# ----------------------------------
+# جدول Employee
+# ----------------------------------
+def generate_employees(rng, pools, n, end_date=None, start_id=1):
+    """pools: text_pools.TextPools برای ستون‌های متنی (نام، آدرس، ایمیل)"""
+    end_date = end_date or date.today()
+    return pd.DataFrame({
+        'EmployeeID': np.arange(start_id, start_id + n),
+        'FullName': pools.sample(rng, 'person_name', n),
+        'Position': uniform_choice(rng, POSITIONS, n),
+        'NationalID': unique_digits(rng, 1000000000, 9999999999, n),
+        'HireDate': random_dates(rng, date(2015, 1, 1), end_date, n),
+        'BirthDate': random_dates(rng, date(1965, 1, 1), date(2007, 12, 31), n),
+        'Gender': weighted_choice(rng, GENDER_WEIGHTS, n),
+        'MaritalStatus': weighted_choice(rng, MARITAL_STATUS_WEIGHTS, n),
+        'Address': pools.sample(rng, 'address', n),
+        'Phone': random_digits(rng, 100000000, 999999999, n, prefix='+989'),
+        'Email': pools.sample(rng, 'email', n),
+        'EmploymentStatus': weighted_choice(rng, EMPLOYMENT_STATUS_WEIGHTS, n),
+    })
+
+
+def attendance_employee_ids(df_employees):
+    """فقط کارکنان Active و OnLeave در حضور و غیاب و حقوق ظاهر می‌شوند"""
+    mask = df_employees['EmploymentStatus'].isin(['Active', 'OnLeave'])
+    return df_employees.loc[mask, 'EmployeeID'].to_numpy()
+
+
+# ----------------------------------
+# جدول Attendance
+# ----------------------------------
+def generate_attendance(rng, n, employee_ids, notes_pool, start_date=date(2020, 1, 1), end_date=None, start_id=1,
+                        key_model=None):
+    """key_model: مدل محبوبیت کارکنان (pick_keys)؛ None یعنی یکنواخت"""
+    end_date = end_date or date.today()
+    status = weighted_choice(rng, ATTENDANCE_STATUS_WEIGHTS, n)
+    is_late = np.asarray(status == 'Late')
+    worked = np.asarray(status != 'Absent')
+
+    # ساعت ورود: Present بین 7 و 8، Late بین 8 و 9 (دقیقه تصادفی، ثانیه صفر)
+    low = np.where(is_late, CHECK_IN_HOURS['Late'][0], CHECK_IN_HOURS['Present'][0])
+    high = np.where(is_late, CHECK_IN_HOURS['Late'][1], CHECK_IN_HOURS['Present'][1])
+    check_in = rng.integers(low, high + 1) * 3600 + rng.integers(0, 60, size=n) * 60
+    hours = rng.uniform(*HOURS_WORKED_RANGE, size=n)
+    check_out = check_in + (hours * 3600).astype('int64')
+
+    return pd.DataFrame({
+        'AttendanceID': np.arange(start_id, start_id + n),
+        'EmployeeID': pick_keys(rng, employee_ids, n, key_model),
+        'AttendanceDate': random_dates(rng, start_date, end_date, n, sunday_rate=SUNDAY_ACCEPT_RATE),
+        'Status': status,
+        'CheckInTime': format_times(np.where(worked, check_in, 0)),
+        'CheckOutTime': format_times(np.where(worked, check_out, 0)),
+        'HoursWorked': np.where(worked, round2(hours), 0.0),
+        'Notes': sample_pool(rng, notes_pool, n),
+    })
+
+
+# ----------------------------------
+# جدول SalaryPayment
+# ----------------------------------
+def generate_salary_payments(rng, n, employee_ids, start_date=date(2020, 1, 1), end_date=None, start_id=1,
+                             key_model=None, salary_model=None):
+    """
+    حقوق هر کارمند حول یک حقوق پایه ثابت همان کارمند است و پاداش و کسورات نسبتی از حقوق‌اند
+    salary_model: {'base', 'spread', 'bonus_rate', 'deduction_rate'} (پیش‌فرض SALARY_MODEL)
+    """
+    end_date = end_date or date.today()
+    model = salary_model or SALARY_MODEL
+    employees = pick_keys(rng, employee_ids, n, key_model)
+    spread = model['spread']
+    amount = round2(key_levels(employees, *model['base']) * rng.uniform(1 - spread, 1 + spread, size=n))
+    bonus = round2(amount * rng.uniform(*model['bonus_rate'], size=n))
+    deductions = round2(amount * rng.uniform(*model['deduction_rate'], size=n))
+    return pd.DataFrame({
+        'SalaryPaymentID': np.arange(start_id, start_id + n),
+        'EmployeeID': employees,
+        'PaymentDate': pay_dates(rng, start_date, end_date, n),
+        'Amount': amount,
+        'Bonus': bonus,
+        'Deductions': deductions,
+        'NetAmount': round2(amount + bonus - deductions),
+        'PaymentMethod': weighted_choice(rng, PAYMENT_METHOD_WEIGHTS, n),
+        'ReferenceNumber': random_digits(rng, 100000, 999999, n, prefix='REF'),
+    })
@@ -1,17 +1,28 @@
 import pandas as pd
 import numpy as np
-import random
 from datetime import datetime, timedelta
 from faker import Faker
-import pyodbc
-from tqdm import tqdm
+
+from bulk_loader import connect_sql_server, connect_sqlite, make_loader, print_report
+from parallel_loader import load_parallel, parse_fk_graph
+from generator_engine import uniform_choice, weighted_choice, pick_keys, random_digits, round2
+from distributions import fk_model, sample_dates, date_model, correlation, lognormal_amounts, load_spec
+from streaming import TableStream, materialize, run_pipeline, database_sink_factory, file_sink_factory
+from dataset_cache import DatasetCache, CACHE_DIR, source_fingerprint
+from text_pools import get_text_pools
+from telemetry import MetricRecorder
+import generator_engine
+import distributions
+import text_pools
 
 fake = Faker()
 
 # تاریخ‌های مورد نظر: امروز (۲۵ ژوئن ۲۰۲۵) و دو روز قبل
 base_date = datetime(2025, 6, 26)
 # date_choices = [base_date - timedelta(days=i) for i in range(3)]
-date_choices = [base_date]
+# None: تاریخ‌ها از مدل 'finance' در distribution_spec.json (بازه منتهی به base_date با فصلی بودن و اوج پایان ماه)
+# لیست صریح (مثل روز شبیه‌سازی‌شده delta_generator) مدل را کنار می‌گذارد
+date_choices = None
 
 # پارامترهای کاهش‌یافته
 # پارامترهای کاهش‌یافته (جدید)
@@ -27,125 +38,271 @@ N_PAYMENTS        = 150000
 N_RECOGNITIONS    = 200000
 N_INVOICE_LINES   = 1000000
 
+# seed واحد برای تولید داده تکرارپذیر و اندازه chunk در تولید جریانی
+SEED       = 42
+CHUNK_SIZE = 100000
+
+# مخزن‌های متنی Faker (یک بار برای هر locale و seed ساخته و روی دیسک کش می‌شوند)
+LOCALE         = 'en_US'
+TEXT_POOL_SIZE = 10000
+
+
+def _dates(rng, n):
+    if date_choices:
+        return uniform_choice(rng, np.array(date_choices, dtype='datetime64[ns]'), n)
+    return sample_dates(rng, base_date.date(), n, date_model('finance')).astype('datetime64[ns]')
+
+
+def _reference_date():
+    """«امروز» داده تولیدی: آخرین تاریخ ممکن برای ستون‌های تاریخ"""
+    return np.datetime64(max(date_choices) if date_choices else base_date, 'ns')
+
+
+def _days(rng, bounds, n):
+    return rng.integers(bounds[0], bounds[1] + 1, n).astype('timedelta64[D]')
+
+
+def _text(rng, pool, n):
+    """نمونه‌گیری برداری از مخزن متنی به جای فراخوانی Faker برای هر سطر"""
+    return get_text_pools(LOCALE, SEED, TEXT_POOL_SIZE).sample(rng, pool, n)
+
+
+def _pick(rng, keys, table, n):
+    """انتخاب FK از آرایه فشرده کلیدهای جدول مرجع با مدل محبوبیت همان جدول (distribution_spec.json)"""
+    return pick_keys(rng, keys[table], n, fk_model(table))
+
+
+# هر تابع یک chunk از جدول را برای شناسه‌های ids می‌سازد: (rng, fake, ids, keys) -> DataFrame
 
 # 1. Common.Country
-countries = pd.DataFrame({
-    "CountryID":   np.arange(1, N_COUNTRIES+1),
-    "CountryName": [fake.country()[:100] for _ in range(N_COUNTRIES)],
-    "CountryCode": [fake.country_code()[:10] for _ in range(N_COUNTRIES)]
-})
+def countries_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    return pd.DataFrame({
+        "CountryID":   ids,
+        "CountryName": _text(rng, "country", n),
+        "CountryCode": _text(rng, "country_code", n)
+    })
+
 
 # 2. Finance.Customer
-customers = pd.DataFrame({
-    "CustomerID":    np.arange(1, N_CUSTOMERS+1),
-    "CustomerCode":  [f"CUST{str(i).zfill(4)}"[:19] for i in range(1, N_CUSTOMERS+1)],
-    "CustomerName":  [fake.company()[:99] for _ in range(N_CUSTOMERS)],
-    "CustomerType":  np.random.choice(['Individual','Company','Foreign'], N_CUSTOMERS),
-    "TIN":           [fake.bothify(text='??####??')[:19] for _ in range(N_CUSTOMERS)],
-    "VATNumber":     [fake.bothify(text='VAT###??')[:19] for _ in range(N_CUSTOMERS)],
-    "Phone":         [fake.phone_number()[:19] for _ in range(N_CUSTOMERS)],
-    "Email":         [fake.company_email()[:99] for _ in range(N_CUSTOMERS)],
-    "Address":       [fake.address().replace("\n",", ")[:199] for _ in range(N_CUSTOMERS)],
-    "CountryID":     np.random.choice(countries["CountryID"], N_CUSTOMERS),
-})
+def customers_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    return pd.DataFrame({
+        "CustomerID":    ids,
+        "CustomerCode":  [f"CUST{str(i).zfill(4)}"[:19] for i in ids],
+        "CustomerName":  _text(rng, "company", n),
+        "CustomerType":  uniform_choice(rng, ['Individual','Company','Foreign'], n),
+        "TIN":           _text(rng, "tin", n),
+        "VATNumber":     _text(rng, "vat", n),
+        "Phone":         _text(rng, "phone", n),
+        "Email":         _text(rng, "company_email", n),
+        "Address":       _text(rng, "address", n),
+        "CountryID":     _pick(rng, keys, "Common.Country", n),
+    })
+
 
 # 3. Finance.BillingCycle
-billing_cycles = pd.DataFrame({
-    "BillingCycleID":    list(range(1, N_BILLING_CYCLES+1)),
-    "CycleName":         ['Monthly','Quarterly','Annually','Bi-Weekly','Weekly'],
-    "CycleLengthInDays": [30,90,365,14,7]
-})
+def billing_cycles_chunk(rng, fake, ids, keys):
+    cycles = pd.DataFrame({
+        "BillingCycleID":    np.arange(1, 6),
+        "CycleName":         ['Monthly','Quarterly','Annually','Bi-Weekly','Weekly'],
+        "CycleLengthInDays": [30,90,365,14,7]
+    })
+    return cycles[cycles["BillingCycleID"].isin(ids)].reset_index(drop=True)
+
 
 # 4. Finance.ServiceType
-service_types = pd.DataFrame({
-    "ServiceTypeID":   np.arange(1, N_SERVICE_TYPES+1),
-    "ServiceName":     [fake.bs().title()[:99] for _ in range(N_SERVICE_TYPES)],
-    "ServiceCategory": np.random.choice(['Unloading','Storage','Transport'], N_SERVICE_TYPES),
-    "BaseRate":        np.round(np.random.uniform(50,499, N_SERVICE_TYPES),2),
-    "UnitOfMeasure":   np.random.choice(['TEU','Hour','Ton'], N_SERVICE_TYPES),
-    "Taxable":         np.random.choice([0,1], N_SERVICE_TYPES),
-    "IsActive":        np.ones(N_SERVICE_TYPES, dtype=int)
-})
+def service_types_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    return pd.DataFrame({
+        "ServiceTypeID":   ids,
+        "ServiceName":     _text(rng, "service_name", n),
+        "ServiceCategory": uniform_choice(rng, ['Unloading','Storage','Transport'], n),
+        "BaseRate":        np.round(rng.uniform(50,499, n),2),
+        "UnitOfMeasure":   uniform_choice(rng, ['TEU','Hour','Ton'], n),
+        "Taxable":         rng.integers(0, 2, n),
+        "IsActive":        np.ones(n, dtype=int)
+    })
+
 
 # 5. Finance.Tax
-taxes = pd.DataFrame({
-    "TaxID":        np.arange(1, N_TAXES+1),
-    "TaxName":      [f"Tax{str(i).zfill(3)}"[:49] for i in range(1, N_TAXES+1)],
-    "TaxRate":      np.round(np.random.uniform(0.01,0.25, N_TAXES),2),
-    "TaxType":      np.random.choice(['National','Service'], N_TAXES),
-    "EffectiveFrom":[random.choice(date_choices) for _ in range(N_TAXES)],
-    "EffectiveTo":  [random.choice(date_choices) for _ in range(N_TAXES)]
-})
+def taxes_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    effective = _dates(rng, n)
+    return pd.DataFrame({
+        "TaxID":        ids,
+        "TaxName":      [f"Tax{str(i).zfill(3)}"[:49] for i in ids],
+        "TaxRate":      np.round(rng.uniform(0.01,0.25, n),2),
+        "TaxType":      uniform_choice(rng, ['National','Service'], n),
+        "EffectiveFrom":effective,
+        "EffectiveTo":  effective + _days(rng, correlation("Finance.Tax")["validity_days"], n)
+    })
+
 
 # 6. Finance.Tariff
-tariffs = pd.DataFrame({
-    "TariffID":      np.arange(1, N_TARIFFS+1),
-    "ServiceTypeID": np.random.choice(service_types["ServiceTypeID"], N_TARIFFS),
-    "ValidFrom":     [random.choice(date_choices) for _ in range(N_TARIFFS)],
-    "ValidTo":       [random.choice(date_choices) for _ in range(N_TARIFFS)],
-    "UnitRate":      np.round(np.random.uniform(100,999, N_TARIFFS),2)
-})
+def tariffs_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    valid = _dates(rng, n)
+    return pd.DataFrame({
+        "TariffID":      ids,
+        "ServiceTypeID": _pick(rng, keys, "Finance.ServiceType", n),
+        "ValidFrom":     valid,
+        "ValidTo":       valid + _days(rng, correlation("Finance.Tariff")["validity_days"], n),
+        "UnitRate":      np.round(rng.uniform(100,999, n),2)
+    })
+
 
 # 7. Finance.Contract
-contracts = pd.DataFrame({
-    "ContractID":     np.arange(1, N_CONTRACTS+1),
-    "CustomerID":     np.random.choice(customers["CustomerID"], N_CONTRACTS),
-    "ContractNumber":[f"CON{str(i).zfill(6)}"[:49] for i in range(1, N_CONTRACTS+1)],
-    "StartDate":      [random.choice(date_choices) for _ in range(N_CONTRACTS)],
-    "EndDate":        [random.choice(date_choices) for _ in range(N_CONTRACTS)],
-    "BillingCycleID": np.random.choice(billing_cycles["BillingCycleID"], N_CONTRACTS),
-    "PaymentTerms":   np.random.choice(['Net 30','Net 60','Prepaid'], N_CONTRACTS),
-    "ContractStatus": np.random.choice(['Active','Expired'], N_CONTRACTS),
-    "CreatedDate":    [random.choice(date_choices) for _ in range(N_CONTRACTS)]
-})
+def contracts_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    spec = correlation("Finance.Contract")
+    start = _dates(rng, n)
+    end = start + _days(rng, spec["duration_days"], n)
+    return pd.DataFrame({
+        "ContractID":     ids,
+        "CustomerID":     _pick(rng, keys, "Finance.Customer", n),
+        "ContractNumber":[f"CON{str(i).zfill(6)}"[:49] for i in ids],
+        "StartDate":      start,
+        "EndDate":        end,
+        "BillingCycleID": _pick(rng, keys, "Finance.BillingCycle", n),
+        "PaymentTerms":   uniform_choice(rng, ['Net 30','Net 60','Prepaid'], n),
+        # وضعیت از تاریخ پایان می‌آید نه مستقل از آن
+        "ContractStatus": np.where(end < _reference_date(), 'Expired', 'Active'),
+        "CreatedDate":    start - _days(rng, spec["created_lead_days"], n)
+    })
+
 
 # 8. Finance.Invoice
-invoices = pd.DataFrame({
-    "InvoiceID":     np.arange(1, N_INVOICES+1),
-    "ContractID":    np.random.choice(contracts["ContractID"], N_INVOICES),
-    "InvoiceNumber":[f"INV{str(i).zfill(7)}"[:49] for i in range(1, N_INVOICES+1)],
-    "InvoiceDate":   [random.choice(date_choices) for _ in range(N_INVOICES)],
-    "DueDate":       [random.choice(date_choices) for _ in range(N_INVOICES)],
-    "Status":        np.random.choice(['Paid','Overdue','Cancelled'], N_INVOICES),
-    "TotalAmount":   np.round(np.random.uniform(500,19999, N_INVOICES),2),
-    "TaxAmount":     np.round(np.random.uniform(50,1999, N_INVOICES),2),
-    "CreatedBy":     [fake.user_name()[:99] for _ in range(N_INVOICES)],
-    "CreatedDate":   [random.choice(date_choices) for _ in range(N_INVOICES)]
-})
+def invoices_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    spec = correlation("Finance.Invoice")
+    invoice_date = _dates(rng, n)
+    due_date = invoice_date + np.timedelta64(spec["due_days"], 'D')
+    status = np.asarray(weighted_choice(rng, spec["status_weights"], n)).astype(object)
+    # فاکتوری که هنوز سررسید نشده نمی‌تواند Overdue باشد
+    status[(status == 'Overdue') & (due_date >= _reference_date())] = 'Paid'
+    total = lognormal_amounts(rng, n, spec["total"])
+    return pd.DataFrame({
+        "InvoiceID":     ids,
+        "ContractID":    _pick(rng, keys, "Finance.Contract", n),
+        "InvoiceNumber":[f"INV{str(i).zfill(7)}"[:49] for i in ids],
+        "InvoiceDate":   invoice_date,
+        "DueDate":       due_date,
+        "Status":        status,
+        "TotalAmount":   total,
+        "TaxAmount":     round2(total * rng.uniform(*spec["tax_rate"], n)),
+        "CreatedBy":     _text(rng, "user_name", n),
+        "CreatedDate":   invoice_date
+    })
+
 
 # 9. Finance.Payment
-payments = pd.DataFrame({
-    "PaymentID":      np.arange(1, N_PAYMENTS+1),
-    "InvoiceID":      np.random.choice(invoices["InvoiceID"], N_PAYMENTS),
-    "PaymentDate":    [random.choice(date_choices) for _ in range(N_PAYMENTS)],
-    "Amount":         np.round(np.random.uniform(50,9999, N_PAYMENTS),2),
-    "PaymentMethod":  np.random.choice(['Cash','Card','Transfer'], N_PAYMENTS),
-    "ConfirmedBy":    [fake.user_name()[:100] for _ in range(N_PAYMENTS)],
-    "ReferenceNumber":[f"REF{random.randint(10000,99998)}"[:49] for _ in range(N_PAYMENTS)],
-    "Notes":          [fake.sentence()[:499] for _ in range(N_PAYMENTS)]
-})
+def payments_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    return pd.DataFrame({
+        "PaymentID":      ids,
+        "InvoiceID":      _pick(rng, keys, "Finance.Invoice", n),
+        "PaymentDate":    _dates(rng, n),
+        "Amount":         lognormal_amounts(rng, n, correlation("Finance.Payment")["amount"]),
+        "PaymentMethod":  uniform_choice(rng, ['Cash','Card','Transfer'], n),
+        "ConfirmedBy":    _text(rng, "user_name", n),
+        "ReferenceNumber":random_digits(rng, 10000, 99998, n, prefix='REF'),
+        "Notes":          _text(rng, "sentence", n)
+    })
+
 
 # 10. Finance.RevenueRecognition
-recognitions = pd.DataFrame({
-    "RecognitionID":   np.arange(1, N_RECOGNITIONS+1),
-    "InvoiceID":       np.random.choice(invoices["InvoiceID"], N_RECOGNITIONS),
-    "DateRecognized": [random.choice(date_choices) for _ in range(N_RECOGNITIONS)],
-    "Amount":         np.round(np.random.uniform(20,7999, N_RECOGNITIONS),2),
-    "Notes":          [fake.bs()[:499] for _ in range(N_RECOGNITIONS)]
-})
+def recognitions_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    return pd.DataFrame({
+        "RecognitionID":   ids,
+        "InvoiceID":       _pick(rng, keys, "Finance.Invoice", n),
+        "DateRecognized": _dates(rng, n),
+        "Amount":         lognormal_amounts(rng, n, correlation("Finance.RevenueRecognition")["amount"]),
+        "Notes":          _text(rng, "bs", n)
+    })
+
 
 # 11. Finance.InvoiceLine
-invoice_lines = pd.DataFrame({
-    "InvoiceLineID":   np.arange(1, N_INVOICE_LINES+1),
-    "InvoiceID":       np.random.choice(invoices["InvoiceID"], N_INVOICE_LINES),
-    "ServiceTypeID":   np.random.choice(service_types["ServiceTypeID"], N_INVOICE_LINES),
-    "TaxID":           np.random.choice(taxes["TaxID"], N_INVOICE_LINES),
-    "Quantity":        np.random.randint(1,49, N_INVOICE_LINES),
-    "UnitPrice":       np.round(np.random.uniform(20,499, N_INVOICE_LINES),2),
-    "DiscountPercent": np.round(np.random.uniform(0,0.3, N_INVOICE_LINES),2),
-    "TaxAmount":       np.round(np.random.uniform(5,299, N_INVOICE_LINES),2),
-    "NetAmount":       np.round(np.random.uniform(20,499, N_INVOICE_LINES),2)
-})
+def invoice_lines_chunk(rng, fake, ids, keys):
+    n = len(ids)
+    spec = correlation("Finance.InvoiceLine")
+    quantity = np.rint(lognormal_amounts(rng, n, spec["quantity"])).astype(int)
+    unit_price = lognormal_amounts(rng, n, spec["unit_price"])
+    # تخفیف حجمی: با تعداد بیشتر تخفیف بیشتر
+    discount = round2(np.clip(quantity * spec["discount_per_unit"] + rng.uniform(0, spec["discount_noise"], n),
+                              0, spec["max_discount"]))
+    net = round2(quantity * unit_price * (1 - discount))
+    return pd.DataFrame({
+        "InvoiceLineID":   ids,
+        "InvoiceID":       _pick(rng, keys, "Finance.Invoice", n),
+        "ServiceTypeID":   _pick(rng, keys, "Finance.ServiceType", n),
+        "TaxID":           _pick(rng, keys, "Finance.Tax", n),
+        "Quantity":        quantity,
+        "UnitPrice":       unit_price,
+        "DiscountPercent": discount,
+        "TaxAmount":       round2(net * rng.uniform(*spec["tax_rate"], n)),
+        "NetAmount":       net
+    })
+
+
+def finance_streams():
+    """
+    جدول‌های Finance به ترتیب وابستگی (کلید خارجی)
+    فقط برای جدول‌های مرجع، آرایه شناسه‌ها (key) نگه داشته می‌شود
+    """
+    return [
+        TableStream("Common.Country",             N_COUNTRIES,      countries_chunk,      key="CountryID"),
+        TableStream("Finance.BillingCycle",       N_BILLING_CYCLES, billing_cycles_chunk, key="BillingCycleID"),
+        TableStream("Finance.ServiceType",        N_SERVICE_TYPES,  service_types_chunk,  key="ServiceTypeID"),
+        TableStream("Finance.Tax",                N_TAXES,          taxes_chunk,          key="TaxID"),
+        TableStream("Finance.Tariff",             N_TARIFFS,        tariffs_chunk),
+        TableStream("Finance.Customer",           N_CUSTOMERS,      customers_chunk,      key="CustomerID"),
+        TableStream("Finance.Contract",           N_CONTRACTS,      contracts_chunk,      key="ContractID"),
+        TableStream("Finance.Invoice",            N_INVOICES,       invoices_chunk,       key="InvoiceID"),
+        TableStream("Finance.Payment",            N_PAYMENTS,       payments_chunk),
+        TableStream("Finance.RevenueRecognition", N_RECOGNITIONS,   recognitions_chunk),
+        TableStream("Finance.InvoiceLine",        N_INVOICE_LINES,  invoice_lines_chunk),
+    ]
+
+
+# توابعی که منطق تولید را تعیین می‌کنند؛ تغییر کد آن‌ها کش را باطل می‌کند
+_GENERATOR_CODE = (countries_chunk, customers_chunk, billing_cycles_chunk, service_types_chunk, taxes_chunk,
+                   tariffs_chunk, contracts_chunk, invoices_chunk, payments_chunk, recognitions_chunk,
+                   invoice_lines_chunk, finance_streams, generator_engine, distributions, text_pools)
+
+
+def generate_tables():
+    """تولید کامل همه جدول‌های Finance در حافظه (برای بارگذاری موازی)"""
+    return materialize(finance_streams(), seed=SEED, chunk_size=CHUNK_SIZE, fake=fake)
+
+
+def generator_config():
+    """همه پارامترهایی که خروجی تولید به آن‌ها وابسته است (کلید کش)"""
+    return {
+        "tables": {s.name: s.n_rows for s in finance_streams()},
+        "date_choices": [d.isoformat() for d in date_choices] if date_choices else None,
+        "base_date": base_date.isoformat(),
+        "distributions": load_spec(),
+        "seed": SEED,
+        "chunk_size": CHUNK_SIZE,
+        "text_pools": [LOCALE, TEXT_POOL_SIZE],
+        "code": source_fingerprint(*_GENERATOR_CODE),
+    }
+
+
+def cached_tables():
+    """جدول‌ها از کش دیسکی (در صورت وجود) وگرنه تولید و ذخیره در کش"""
+    if not USE_CACHE:
+        return generate_tables()
+    cache = DatasetCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+    return cache.get_or_create(generator_config(), generate_tables)
+
+
+def stream_tables(sink_factory):
+    """تولید جریانی جدول‌ها و نوشتن مستقیم هر chunk در sink؛ حافظه به CHUNK_SIZE محدود است"""
+    return run_pipeline(finance_streams(), sink_factory, seed=SEED, chunk_size=CHUNK_SIZE, fake=fake)
+
 
 def generate_insert_statements(df, table_name):
     lines = []
@@ -169,20 +326,6 @@ sql_lines = []
 batch_size = 1000
 count = 0
 
-tables = {
-    "Common.Country":             countries,
-    "Finance.BillingCycle":       billing_cycles,
-    "Finance.ServiceType":        service_types,
-    "Finance.Tax":                taxes,
-    "Finance.Tariff":             tariffs,
-    "Finance.Customer":           customers,
-    "Finance.Contract":           contracts,
-    "Finance.Invoice":            invoices,
-    "Finance.Payment":            payments,
-    "Finance.RevenueRecognition": recognitions,
-    "Finance.InvoiceLine":        invoice_lines
-}
-
 conn_str = (
     "DRIVER={ODBC Driver 17 for SQL Server};"  # اگر Driver 17 نصب نیست، از Driver 18 استفاده کن
     "SERVER=localhost;"                        # یا .\\SQLEXPRESS یا آدرس سرورت
@@ -190,52 +333,92 @@ conn_str = (
     "Trusted_Connection=yes;"
 )
 
+# تنظیمات بارگذاری
+BACKEND      = 'sqlserver'          # 'sqlserver' یا 'sqlite' (برای بنچمارک محلی)
+SQLITE_PATH  = 'tradeportdb_bench.db'
+LOAD_MODE    = 'fast_executemany'   # 'executemany' | 'fast_executemany' | 'bulk_file'
+BATCH_SIZE   = 10000                # تعداد سطر در هر executemany
+COMMIT_EVERY = 100000               # تعداد سطر بین دو commit (None = یک commit برای هر جدول)
+
+# بارگذاری موازی بر اساس گراف FK فایل 1 - InitialTablesSource.sql
+PARALLEL_WORKERS = 4                # تعداد اتصال/نخ هم‌زمان
+FAILURE_POLICY   = 'skip_dependents'  # 'abort' | 'skip_dependents' | 'continue'
+TABLE_POLICIES   = {}               # سیاست اختصاصی، مثلاً {"Finance.InvoiceLine": "continue"}
+
+# حالت اجرا
+#   parallel : تولید کامل در حافظه و بارگذاری موازی جدول‌ها
+#   stream   : تولید chunk به chunk و نوشتن مستقیم در sink با حافظه محدود (برای داده‌های بزرگ‌تر از RAM)
+RUN_MODE    = 'parallel'
+STREAM_SINK = 'db'                  # 'db' | 'csv' | 'parquet' | 'arrow'
+OUTPUT_DIR  = './finance_data'
+
+# کش دیسکی داده‌های تولیدی (حالت parallel)؛ با پارامترهای یکسان تولید دوباره انجام نمی‌شود
+USE_CACHE       = True
+CACHE_MAX_BYTES = 5 * 1024 ** 3     # سقف حجم کش؛ ورودی‌های قدیمی‌تر (LRU) حذف می‌شوند
+
+# ثبت زمان و تعداد سطر هر بارگذاری در StagingDB.Audit.ETLStepMetric (telemetry.py)
+TELEMETRY = True
+
+
+def connect():
+    if BACKEND == 'sqlite':
+        return connect_sqlite(SQLITE_PATH)
+    return connect_sql_server(conn_str)
+
+
+def stream_main():
+    if STREAM_SINK != 'db':
+        return stream_tables(file_sink_factory(OUTPUT_DIR, fmt=STREAM_SINK))
+    conn = connect()
+    recorder = MetricRecorder('main.stream_main')
+    try:
+        loader = make_loader(conn, LOAD_MODE, batch_size=BATCH_SIZE, commit_every=COMMIT_EVERY, progress=False)
+        keys = stream_tables(database_sink_factory(recorder.wrap(loader)))
+        if TELEMETRY:
+            recorder.flush(conn)
+        return keys
+    finally:
+        conn.close()
+        print("✅ Connection closed.")
+
+
+def main():
+    if RUN_MODE == 'stream':
+        return stream_main()
+
+    tables = cached_tables()
+    print("✅ Loading into", BACKEND, datetime.now())
+
+    recorder = MetricRecorder('main.load_parallel')
+    result = load_parallel(
+        tables,
+        connect,
+        lambda conn: recorder.wrap(make_loader(conn, LOAD_MODE, batch_size=BATCH_SIZE, commit_every=COMMIT_EVERY,
+                                               progress=PARALLEL_WORKERS == 1)),
+        graph=parse_fk_graph(),
+        workers=PARALLEL_WORKERS,
+        failure_policy=FAILURE_POLICY,
+        table_policies=TABLE_POLICIES,
+    )
+
+    print_report(list(result.stats.values()))
+    for table, error in result.errors.items():
+        print(f"❌ {table}: {error}")
+    if result.skipped:
+        print("⏭️ Skipped:", ', '.join(sorted(result.skipped)))
+    if TELEMETRY:
+        for table, error in result.errors.items():
+            recorder.step('Load', datetime.now(), target=table, status='Failed', message=str(error))
+        conn = connect()
+        try:
+            print(f"📈 Run {recorder.run_id}: {recorder.flush(conn)} step metrics written")
+        finally:
+            conn.close()
+    return result
 
 
-try:
-    # 1️⃣ Open connection and cursor
-    conn = pyodbc.connect(conn_str)
-    cursor = conn.cursor()
-    print("✅ Connected To Sql Server", datetime.now())
-
-    for table_name, df in tables.items():
-        print(f"🚀 Loading: {table_name} ({len(df)} rows)")
-
-        # 2️⃣ Replace NaN with None
-        df = df.where(pd.notnull(df), None)
-
-        # 3️⃣ Build insert query
-        columns = ', '.join(df.columns)
-        placeholders = ', '.join(['?'] * len(df.columns))
-        insert_query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-
-        data = [tuple(row) for row in df.to_numpy()]
-
-        try:
-            with tqdm(total=len(data), desc=f"Inserting into {table_name}") as pbar:
-                batch_size = 1000
-                for i in range(0, len(data), batch_size):
-                    chunk = data[i:i + batch_size]
-                    cursor.executemany(insert_query, chunk)
-                    conn.commit()
-                    pbar.update(len(chunk))
-            print(f"✅ Success: {table_name}")
-        except Exception as e:
-            conn.rollback()
-            print(f"❌ Error in {table_name}: {e}")
-
-    # 4️⃣ Close connection at the end
-    cursor.close()
-    conn.close()
-    print("✅ Connection closed.")
-
-except Exception as e:
-    print("❌ Could not connect or load data:", e)
-
-# 🔚 Close the connection
-cursor.close()
-conn.close()
-print("✅ Connection closed.")
+if __name__ == '__main__':
+    main()
 
 
 
@@ -0,0 +1,205 @@
+import os
+import re
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# ----------------------------------
+# بارگذار موازی مبتنی بر گراف وابستگی کلید خارجی
+# فقط یال‌های FK ترتیب را تعیین می‌کنند؛ جدول‌های مستقل هم‌زمان روی
+# اتصال‌های جداگانه (Connection Pool) بارگذاری می‌شوند
+# ----------------------------------
+
+SOURCE_DDL = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '1 - InitialTablesSource.sql')
+
+# وابستگی‌های اعلام‌شده جدول‌های Finance (مطابق 1 - InitialTablesSource.sql)
+FINANCE_DEPENDENCIES = {
+    "Common.Country":             set(),
+    "Finance.BillingCycle":       set(),
+    "Finance.ServiceType":        set(),
+    "Finance.Tax":                set(),
+    "Finance.Tariff":             {"Finance.ServiceType"},
+    "Finance.Customer":           {"Common.Country"},
+    "Finance.Contract":           {"Finance.Customer", "Finance.BillingCycle"},
+    "Finance.Invoice":            {"Finance.Contract"},
+    "Finance.Payment":            {"Finance.Invoice"},
+    "Finance.RevenueRecognition": {"Finance.Invoice"},
+    "Finance.InvoiceLine":        {"Finance.Invoice", "Finance.ServiceType", "Finance.Tax"},
+}
+
+# سیاست خطا برای هر جدول
+#   abort           : توقف کل بارگذاری (کارهای در حال اجرا تمام می‌شوند، کار جدیدی شروع نمی‌شود)
+#   skip_dependents : جدول‌های وابسته (مستقیم و غیرمستقیم) رد می‌شوند، بقیه ادامه می‌دهند
+#   continue        : رفتار قبلی main.py؛ خطا ثبت و وابسته‌ها هم بارگذاری می‌شوند
+FAILURE_POLICIES = ('abort', 'skip_dependents', 'continue')
+
+_CREATE_TABLE = re.compile(r'CREATE\s+TABLE\s+([\w\.\[\]]+)\s*\(', re.IGNORECASE)
+_REFERENCES = re.compile(r'REFERENCES\s+([\w\.\[\]]+)\s*\(', re.IGNORECASE)
+
+
+def _clean_name(name):
+    return name.replace('[', '').replace(']', '')
+
+
+def parse_fk_graph(ddl_path=SOURCE_DDL):
+    """استخراج گراف {جدول: مجموعه جدول‌های مرجع} از اسکریپت DDL"""
+    with open(ddl_path, encoding='utf-8-sig') as f:
+        text = re.sub(r'--[^\n]*', '', f.read())
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)
+
+    graph = {}
+    matches = list(_CREATE_TABLE.finditer(text))
+    for i, match in enumerate(matches):
+        table = _clean_name(match.group(1))
+        body_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():body_end]
+        graph[table] = {_clean_name(r) for r in _REFERENCES.findall(body)} - {table}
+    return graph
+
+
+def restrict_graph(graph, tables):
+    """محدود کردن گراف به جدول‌هایی که واقعاً بارگذاری می‌شوند"""
+    tables = set(tables)
+    return {t: set(graph.get(t, set())) & tables for t in tables}
+
+
+def load_order(graph):
+    """مرتب‌سازی توپولوژیک به صورت سطح به سطح (هر سطح قابل اجرای موازی است)"""
+    remaining = {t: set(deps) for t, deps in graph.items()}
+    levels = []
+    while remaining:
+        ready = sorted(t for t, deps in remaining.items() if not deps)
+        if not ready:
+            raise ValueError(f"Cycle in FK graph: {sorted(remaining)}")
+        levels.append(ready)
+        for t in ready:
+            del remaining[t]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return levels
+
+
+def dependents_of(graph, table):
+    """همه جدول‌هایی که مستقیم یا غیرمستقیم به table وابسته‌اند"""
+    result, stack = set(), [table]
+    while stack:
+        current = stack.pop()
+        for t, deps in graph.items():
+            if current in deps and t not in result:
+                result.add(t)
+                stack.append(t)
+    return result
+
+
+class ConnectionPool:
+    """Pool ساده اتصال‌ها؛ هر worker یک اتصال اختصاصی قرض می‌گیرد"""
+
+    def __init__(self, connect, size):
+        self._connect = connect
+        self._idle = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+        self.size = size
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if len(self._all) < self.size:
+                    conn = self._connect()
+                    self._all.append(conn)
+                    return conn
+            return self._idle.get()
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+        self._all.clear()
+
+
+class LoadResult:
+    """نتیجه نهایی بارگذاری موازی"""
+
+    def __init__(self):
+        self.stats = {}
+        self.errors = {}
+        self.skipped = set()
+        self.aborted = False
+
+    @property
+    def ok(self):
+        return not self.errors and not self.skipped and not self.aborted
+
+
+def load_parallel(tables, connect, make_loader, graph=None, workers=4,
+                  failure_policy='skip_dependents', table_policies=None):
+    """
+    بارگذاری جدول‌ها به ترتیب گراف FK با حداکثر workers اتصال هم‌زمان
+    tables         : {نام جدول: DataFrame}
+    connect        : تابع بدون آرگومان که یک اتصال جدید می‌سازد
+    make_loader    : تابع (conn) -> loader با متد load(table, df) (مثل bulk_loader.make_loader)
+    graph          : گراف وابستگی؛ پیش‌فرض از 1 - InitialTablesSource.sql خوانده می‌شود
+    table_policies : سیاست خطای اختصاصی برای جدول‌های خاص
+    """
+    graph = restrict_graph(graph if graph is not None else parse_fk_graph(), tables)
+    load_order(graph)  # بررسی نبود چرخه قبل از شروع
+    table_policies = table_policies or {}
+    for policy in [failure_policy, *table_policies.values()]:
+        if policy not in FAILURE_POLICIES:
+            raise ValueError(f"Unknown failure policy: {policy} (expected one of {FAILURE_POLICIES})")
+
+    pool = ConnectionPool(connect, workers)
+    result = LoadResult()
+    waiting = {t: set(deps) for t, deps in graph.items()}
+    running = {}
+
+    def run(table):
+        conn = pool.acquire()
+        try:
+            return make_loader(conn).load(table, tables[table])
+        finally:
+            pool.release(conn)
+
+    def finish(table):
+        for deps in waiting.values():
+            deps.discard(table)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while waiting or running:
+                if not result.aborted:
+                    for table in sorted(t for t, deps in waiting.items() if not deps):
+                        del waiting[table]
+                        print(f"🚀 Loading: {table} ({len(tables[table])} rows)")
+                        running[executor.submit(run, table)] = table
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    table = running.pop(future)
+                    try:
+                        result.stats[table] = future.result()
+                        print(f"✅ Success: {result.stats[table]}")
+                        finish(table)
+                    except Exception as e:
+                        result.errors[table] = e
+                        print(f"❌ Error in {table}: {e}")
+                        policy = table_policies.get(table, failure_policy)
+                        if policy == 'abort':
+                            result.aborted = True
+                        elif policy == 'skip_dependents':
+                            for dependent in dependents_of(graph, table) & set(waiting):
+                                del waiting[dependent]
+                                result.skipped.add(dependent)
+                                print(f"⏭️ Skipped {dependent} (depends on {table})")
+                        else:
+                            finish(table)
+            if result.aborted:
+                result.skipped.update(waiting)
+    finally:
+        pool.close()
+    return result
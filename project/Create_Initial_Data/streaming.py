@@ -0,0 +1,172 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+from faker import Faker
+
+from columnar_io import OUTPUT_FORMATS, FILE_EXTENSIONS, ParquetSink, ArrowSink
+
+# ----------------------------------
+# تولید جریانی (Streaming) داده به صورت chunkهای با اندازه ثابت
+# هر chunk مستقیماً به sink (دیتابیس، CSV یا فایل ستونی) نوشته می‌شود و
+# از هر جدول فقط آرایه فشرده کلیدها (برای FK جدول‌های بعدی) در حافظه می‌ماند
+# ----------------------------------
+
+DEFAULT_CHUNK_SIZE = 100000
+
+
+class TableStream:
+    """
+    تعریف یک جدول قابل تولید جریانی
+    n_rows     : تعداد سطر یا تابع (keys) -> int وقتی تعداد به جدول‌های قبلی وابسته است
+    make_chunk : تابع (rng, fake, ids, keys) -> DataFrame برای شناسه‌های ids
+    key        : نام ستون یا تابع (chunk) -> آرایه؛ مقادیری که جدول‌های بعدی به عنوان FK لازم دارند
+    """
+
+    def __init__(self, name, n_rows, make_chunk, key=None, start_id=1, chunk_size=None):
+        self.name = name
+        self.n_rows = n_rows
+        self.make_chunk = make_chunk
+        self.key = key
+        self.start_id = start_id
+        # برای جدول‌هایی که قید یکتایی در کل جدول دارند (مثل NationalID) می‌توان کل جدول را یک chunk کرد
+        self.chunk_size = chunk_size
+
+    def rows(self, keys):
+        return self.n_rows(keys) if callable(self.n_rows) else self.n_rows
+
+    def key_values(self, chunk):
+        if callable(self.key):
+            return np.asarray(self.key(chunk))
+        return chunk[self.key].to_numpy()
+
+
+def chunk_rng(seed, table, chunk_index):
+    """RNG مستقل برای هر (جدول، chunk)؛ خروجی به اندازه chunk یا ترتیب اجرا وابسته نیست"""
+    return np.random.default_rng([seed, zlib.crc32(table.encode()), chunk_index])
+
+
+def iter_table(stream, keys, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, fake=None):
+    """تولید chunkهای یک جدول به ترتیب شناسه"""
+    fake = fake or Faker()
+    chunk_size = stream.chunk_size or chunk_size
+    stop = stream.start_id + stream.rows(keys)
+    for index, start in enumerate(range(stream.start_id, stop, chunk_size)):
+        rng = chunk_rng(seed, stream.name, index)
+        fake.seed_instance(int(rng.integers(2 ** 32)))
+        ids = np.arange(start, min(start + chunk_size, stop))
+        yield stream.make_chunk(rng, fake, ids, keys)
+
+
+def run_pipeline(streams, sink_factory, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, fake=None, keys=None):
+    """
+    اجرای جدول‌ها به ترتیب (ترتیب باید وابستگی FK را رعایت کند)
+    sink_factory : تابع (table_name) -> sink با متدهای write(chunk) و close()
+    خروجی: دیکشنری {جدول: آرایه کلیدها} برای جدول‌هایی که key دارند
+    """
+    keys = {} if keys is None else keys
+    fake = fake or Faker()
+    for stream in streams:
+        sink = sink_factory(stream.name)
+        collected = []
+        rows = 0
+        try:
+            for chunk in iter_table(stream, keys, seed, chunk_size, fake):
+                sink.write(chunk)
+                rows += len(chunk)
+                if stream.key is not None:
+                    collected.append(stream.key_values(chunk))
+        finally:
+            sink.close()
+        if stream.key is not None:
+            keys[stream.name] = np.concatenate(collected) if collected else np.array([], dtype=np.int64)
+        print(f"Streamed {rows} records for {stream.name}.")
+    return keys
+
+
+def materialize(streams, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, fake=None):
+    """ساخت کامل جدول‌ها در حافظه (برای جدول‌های کوچک یا بارگذاری موازی)"""
+    frames = {}
+
+    def factory(name):
+        frames[name] = []
+        return _ListSink(frames[name])
+
+    run_pipeline(streams, factory, seed, chunk_size, fake)
+    return {name: pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            for name, chunks in frames.items()}
+
+
+# ----------------------------------
+# Sinkها
+# ----------------------------------
+class _ListSink:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+    def close(self):
+        pass
+
+
+class CsvSink:
+    """افزودن chunkها به یک فایل CSV (سرستون فقط یک بار نوشته می‌شود)"""
+
+    def __init__(self, path, encoding='utf-8-sig', **to_csv_kwargs):
+        self.path = path
+        self.encoding = encoding
+        self.kwargs = {'index': False, **to_csv_kwargs}
+        self._file = None
+
+    def write(self, chunk):
+        header = self._file is None
+        if header:
+            self._file = open(self.path, 'w', encoding=self.encoding, newline='')
+        chunk.to_csv(self._file, header=header, **self.kwargs)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class DatabaseSink:
+    """نوشتن هر chunk با یک loader از bulk_loader (هر chunk یک load مستقل است)"""
+
+    def __init__(self, loader, table):
+        self.loader = loader
+        self.table = table
+        self.stats = []
+
+    def write(self, chunk):
+        self.stats.append(self.loader.load(self.table, chunk))
+
+    def close(self):
+        pass
+
+
+def file_sink_factory(output_dir, file_names=None, fmt='csv', **options):
+    """
+    sink فایلی برای هر جدول؛ نام فایل از file_names یا نام جدول گرفته می‌شود
+    fmt: 'csv' | 'parquet' | 'arrow' (options فقط برای CSV به to_csv داده می‌شود)
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt} (expected one of {OUTPUT_FORMATS})")
+    os.makedirs(output_dir, exist_ok=True)
+    file_names = file_names or {}
+
+    def factory(table):
+        base = file_names.get(table, table.replace('.', '_').lower())
+        path = os.path.join(output_dir, f"{base}.{FILE_EXTENSIONS[fmt]}")
+        if fmt == 'csv':
+            return CsvSink(path, **options)
+        if fmt == 'parquet':
+            return ParquetSink(path)
+        return ArrowSink(path)
+
+    return factory
+
+
+def database_sink_factory(loader):
+    return lambda table: DatabaseSink(loader, table)
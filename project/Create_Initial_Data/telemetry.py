@@ -0,0 +1,158 @@
+import uuid
+import threading
+from datetime import datetime, timedelta
+import pandas as pd
+
+from bulk_loader import is_sqlite, insert_query
+
+# ----------------------------------
+# تله‌متری ETL: هر مرحله (بارگذاری یک جدول، اجرای یک رویه، ...) یک سطر در
+# StagingDB.Audit.ETLStepMetric (4 - SATables.sql) با RunID، زمان و تعداد سطر.
+# رویه‌های SQL از طریق triggerهای جدول‌های لاگ در همین جدول می‌نویسند؛ این ماژول
+# سمت Python (loaderها و etl_orchestrator.py) را به همان جدول متصل می‌کند.
+# در backend SQLite جدول ETLStepMetric در دیتابیس اصلی ساخته می‌شود.
+# ----------------------------------
+
+METRIC_TABLE = 'StagingDB.Audit.ETLStepMetric'
+SQLITE_METRIC_TABLE = 'ETLStepMetric'
+COLUMNS = ('RunID', 'Source', 'ProcessName', 'TargetTable', 'Step', 'StartTime', 'EndTime',
+           'RowsRead', 'RowsWritten', 'Status', 'Message')
+
+
+def new_run_id():
+    return uuid.uuid4().hex[:12]
+
+
+class StepMetric:
+    """یک مرحله اندازه‌گیری‌شده"""
+
+    def __init__(self, run_id, process, step, started, ended, target=None, rows_read=None,
+                 rows_written=None, status='Success', message=None, source='Python'):
+        self.run_id = run_id
+        self.process = process
+        self.step = step
+        self.started = started
+        self.ended = ended
+        self.target = target
+        self.rows_read = rows_read
+        self.rows_written = rows_written
+        self.status = status
+        self.message = message
+        self.source = source
+
+    @property
+    def seconds(self):
+        return (self.ended - self.started).total_seconds()
+
+    @property
+    def rows_per_sec(self):
+        return self.rows_written / self.seconds if self.rows_written and self.seconds > 0 else None
+
+    def row(self):
+        return (self.run_id, self.source, self.process, self.target, self.step, self.started, self.ended,
+                self.rows_read, self.rows_written, self.status, self.message and self.message[:2000])
+
+    def __repr__(self):
+        return f"{self.process}/{self.step} {self.target or ''}: {self.rows_written} rows in {self.seconds:.2f}s"
+
+
+def metric_from_stats(run_id, stats, process, step='Load', source='Python'):
+    """تبدیل LoadStats (bulk_loader) به StepMetric؛ در بارگذاری داده تولیدی سطر خوانده = سطر نوشته"""
+    ended = stats.started + timedelta(seconds=stats.seconds)
+    return StepMetric(run_id, process, step, stats.started, ended, target=stats.table,
+                      rows_read=stats.rows, rows_written=stats.rows, source=source)
+
+
+class MetricRecorder:
+    """
+    جمع‌آوری StepMetricهای یک اجرا (thread-safe) و نوشتن یک‌جای آن‌ها
+    wrap(loader) هر load() را به صورت خودکار ثبت می‌کند
+    """
+
+    def __init__(self, process, run_id=None, source='Python'):
+        self.process = process
+        self.run_id = run_id or new_run_id()
+        self.source = source
+        self.metrics = []
+        self._lock = threading.Lock()
+
+    def add(self, metric):
+        with self._lock:
+            self.metrics.append(metric)
+        return metric
+
+    def add_stats(self, stats, step='Load'):
+        return self.add(metric_from_stats(self.run_id, stats, self.process, step, self.source))
+
+    def step(self, step, started, target=None, rows_read=None, rows_written=None, status='Success', message=None):
+        return self.add(StepMetric(self.run_id, self.process, step, started, datetime.now(), target=target,
+                                   rows_read=rows_read, rows_written=rows_written, status=status,
+                                   message=message, source=self.source))
+
+    def wrap(self, loader):
+        return _RecordingLoader(loader, self)
+
+    def flush(self, conn):
+        """نوشتن متریک‌های ثبت‌شده و خالی کردن صف"""
+        with self._lock:
+            pending, self.metrics = self.metrics, []
+        return write_metrics(conn, pending)
+
+
+class _RecordingLoader:
+    def __init__(self, loader, recorder):
+        self.loader = loader
+        self.recorder = recorder
+
+    def load(self, table, df):
+        stats = self.loader.load(table, df)
+        self.recorder.add_stats(stats)
+        return stats
+
+
+def _metric_table(conn):
+    if not is_sqlite(conn):
+        return METRIC_TABLE
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {SQLITE_METRIC_TABLE} ("
+                 "RunID TEXT, Source TEXT, ProcessName TEXT, TargetTable TEXT, Step TEXT, "
+                 "StartTime TEXT, EndTime TEXT, RowsRead INTEGER, RowsWritten INTEGER, Status TEXT, Message TEXT)")
+    return SQLITE_METRIC_TABLE
+
+
+def write_metrics(conn, metrics):
+    metrics = list(metrics)
+    if not metrics:
+        return 0
+    table = _metric_table(conn)
+    rows = [m.row() for m in metrics]
+    if is_sqlite(conn):
+        rows = [tuple(v.isoformat(sep=' ', timespec='milliseconds') if isinstance(v, datetime) else v for v in r)
+                for r in rows]
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(insert_query(table, COLUMNS), rows)
+        conn.commit()
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def read_metrics(conn, last_runs=None):
+    """
+    متریک‌های اجراهای دارای RunID به صورت DataFrame (مرتب بر اساس زمان شروع)
+    last_runs : فقط آخرین N اجرا
+    """
+    table = _metric_table(conn)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM {table} WHERE RunID IS NOT NULL")
+        df = pd.DataFrame.from_records([tuple(r) for r in cursor.fetchall()], columns=COLUMNS)
+    finally:
+        cursor.close()
+    df['StartTime'] = pd.to_datetime(df['StartTime'])
+    df['EndTime'] = pd.to_datetime(df['EndTime'])
+    df = df.sort_values('StartTime', kind='stable')
+    if last_runs:
+        runs = df.groupby('RunID')['StartTime'].min().sort_values()
+        df = df[df['RunID'].isin(runs.index[-last_runs:])]
+    return df.reset_index(drop=True)
@@ -0,0 +1,171 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+import faker
+from faker import Faker
+
+# ----------------------------------
+# مخزن‌های متنی (Text Pools) به جای فراخوانی Faker برای هر سطر
+# برای هر (locale، seed) از هر نوع متن یک مخزن محدود از مقادیر یکتا یک بار ساخته و
+# روی دیسک ذخیره می‌شود؛ ستون‌ها فقط با نمونه‌گیری برداری اندیس از مخزن پر می‌شوند.
+# کوتاه‌سازی طول ([:499]، [:99]، ...) هم یک بار برای هر عضو مخزن انجام می‌شود نه برای هر سطر.
+# ----------------------------------
+
+TEXT_POOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.text_pools')
+DEFAULT_POOL_SIZE = 10000
+# ساخت مخزن پس از این تعداد تلاش پیاپی بدون مقدار جدید متوقف می‌شود (مثلاً country فقط ~۲۵۰ مقدار دارد)
+STALL_LIMIT = 2000
+
+
+class PoolSpec:
+    """
+    نحوه ساخت هر عضو مخزن
+    method  : نام متد Faker (sentence، bs، user_name، ...)
+    max_len : طول مجاز ستون مقصد
+    oneline : تبدیل خط جدید به ', ' (برای آدرس)
+    title   : Title Case (مثل ServiceName)
+    kwargs  : آرگومان‌های متد Faker (مثلاً text برای bothify)
+    """
+
+    def __init__(self, method, max_len=None, oneline=False, title=False, **kwargs):
+        self.method = method
+        self.max_len = max_len
+        self.oneline = oneline
+        self.title = title
+        self.kwargs = kwargs
+
+    def render(self, fake):
+        value = getattr(fake, self.method)(**self.kwargs)
+        if self.title:
+            value = value.title()
+        if self.oneline:
+            value = value.replace('\n', ', ')
+        return value[:self.max_len] if self.max_len else value
+
+    def fingerprint(self):
+        payload = json.dumps([self.method, self.max_len, self.oneline, self.title, self.kwargs,
+                              faker.VERSION], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+# مخزن‌های استفاده‌شده در تولید داده (طول‌ها مطابق 1 - InitialTablesSource.sql)
+POOL_SPECS = {
+    'sentence':      PoolSpec('sentence', max_len=499),
+    'bs':            PoolSpec('bs', max_len=499),
+    'service_name':  PoolSpec('bs', max_len=99, title=True),
+    'user_name':     PoolSpec('user_name', max_len=99),
+    'person_name':   PoolSpec('name', max_len=99),
+    'address':       PoolSpec('address', max_len=199, oneline=True),
+    'email':         PoolSpec('email', max_len=99),
+    'company':       PoolSpec('company', max_len=99),
+    'company_email': PoolSpec('company_email', max_len=99),
+    'phone':         PoolSpec('phone_number', max_len=19),
+    'country':       PoolSpec('country', max_len=100),
+    'country_code':  PoolSpec('country_code', max_len=10),
+    'tin':           PoolSpec('bothify', max_len=19, text='??####??'),
+    'vat':           PoolSpec('bothify', max_len=19, text='VAT###??'),
+}
+
+
+def build_values(spec, size, locale='en_US', seed=0):
+    """ساخت حداکثر size مقدار یکتا؛ تنها حلقه Faker در کل تولید داده همین‌جاست"""
+    fake = Faker(locale)
+    fake.seed_instance(seed)
+    values, seen = [], set()
+    stalled = 0
+    while len(values) < size and stalled < STALL_LIMIT:
+        value = spec.render(fake)
+        if value in seen:
+            stalled += 1
+            continue
+        seen.add(value)
+        values.append(value)
+        stalled = 0
+    return values
+
+
+class TextPool:
+    """مخزن مقادیر یکتا؛ نمونه‌گیری فقط روی اندیس‌ها انجام می‌شود"""
+
+    def __init__(self, name, values):
+        self.name = name
+        self.values = np.asarray(values, dtype=object)
+
+    def __len__(self):
+        return len(self.values)
+
+    def sample(self, rng, size):
+        """نمونه‌گیری با جایگذاری؛ خروجی Categorical روی مخزن است"""
+        return pd.Categorical.from_codes(rng.integers(0, len(self.values), size=size), categories=self.values)
+
+    def sample_unique(self, rng, size):
+        """نمونه‌گیری بدون جایگذاری (برای ستون‌های UNIQUE)"""
+        if size > len(self.values):
+            raise ValueError(f"Pool '{self.name}' has {len(self.values)} unique values, {size} requested")
+        return self.values[rng.choice(len(self.values), size=size, replace=False)]
+
+
+class TextPools:
+    """مجموعه مخزن‌های یک (locale، seed)؛ هر مخزن در اولین استفاده از دیسک خوانده یا ساخته می‌شود"""
+
+    def __init__(self, locale='en_US', seed=0, size=DEFAULT_POOL_SIZE, cache_dir=TEXT_POOL_DIR, specs=None):
+        self.locale = locale
+        self.seed = seed
+        self.size = size
+        self.cache_dir = cache_dir
+        self.specs = POOL_SPECS if specs is None else specs
+        self._pools = {}
+
+    def _path(self, name):
+        spec = self.specs[name]
+        return os.path.join(self.cache_dir, f"{self.locale}-{name}-{self.seed}-{self.size}-{spec.fingerprint()}.json")
+
+    def _load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                values = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return values if isinstance(values, list) and values else None
+
+    def _save(self, path, values):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(values, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def pool(self, name):
+        if name not in self._pools:
+            if name not in self.specs:
+                raise KeyError(f"Unknown text pool: {name} (expected one of {sorted(self.specs)})")
+            path = self._path(name) if self.cache_dir else None
+            values = self._load(path) if path else None
+            if values is None:
+                values = build_values(self.specs[name], self.size, self.locale, self.seed)
+                if path:
+                    self._save(path, values)
+            self._pools[name] = TextPool(name, values)
+        return self._pools[name]
+
+    def __getitem__(self, name):
+        return self.pool(name)
+
+    def sample(self, rng, name, size):
+        return self.pool(name).sample(rng, size)
+
+    def sample_unique(self, rng, name, size):
+        return self.pool(name).sample_unique(rng, size)
+
+
+_REGISTRY = {}
+
+
+def get_text_pools(locale='en_US', seed=0, size=DEFAULT_POOL_SIZE, cache_dir=TEXT_POOL_DIR):
+    """TextPools مشترک در طول فرایند (هر ترکیب پارامتر فقط یک بار ساخته می‌شود)"""
+    key = (locale, seed, size, cache_dir)
+    if key not in _REGISTRY:
+        _REGISTRY[key] = TextPools(locale, seed, size, cache_dir)
+    return _REGISTRY[key]
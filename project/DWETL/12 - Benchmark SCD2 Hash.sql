@@ -0,0 +1,258 @@
+/*====================================================================
+  Benchmark: تشخیص تغییر SCD2 در Dim.DimCustomer
+    Columns : منطق قبلی — UPDATE انقضا و INSERT نسخه جدید، هر کدام با join کامل
+              Staging ↔ نسخه جاری و مقایسه تک‌تک ستون‌ها
+    Hash    : منطق فعلی Dim.UpdateDimCustomerIncremental — یک عبور با RowHash،
+              سپس انقضا (seek روی کلید جانشین) و درج فقط روی delta
+  @Rows مشتری ساخته می‌شود، @ChangePercent درصد آن‌ها تغییر می‌کند و @NewPercent
+  درصد مشتری جدید اضافه می‌شود. هر تکرار بُعدها را از حالت اولیه دوباره می‌سازد.
+  زمان، CPU و logical reads در Bench.Scd2Benchmark ثبت و نتیجه دو روش مقایسه می‌شود.
+====================================================================*/
+USE DataWarehouse;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.schemas WHERE name = 'Bench')
+    EXEC('CREATE SCHEMA Bench;');
+GO
+
+IF OBJECT_ID('Bench.Scd2Benchmark', 'U') IS NULL
+CREATE TABLE Bench.Scd2Benchmark (
+    ResultID      INT IDENTITY(1,1) PRIMARY KEY,
+    RunID         UNIQUEIDENTIFIER NOT NULL,
+    Method        NVARCHAR(20)     NOT NULL,   -- 'Columns' | 'Hash'
+    DimRows       INT              NOT NULL,
+    ChangedRows   INT              NOT NULL,
+    Iteration     INT              NOT NULL,
+    Expired       INT              NOT NULL,
+    Inserted      INT              NOT NULL,
+    ElapsedMs     INT              NOT NULL,
+    CpuMs         INT              NOT NULL,
+    LogicalReads  BIGINT           NOT NULL,
+    RunTime       DATETIME         NOT NULL DEFAULT GETDATE()
+);
+GO
+
+/*-------------- 1) Test data --------------*/
+DECLARE @Rows INT = 1000000;            -- تعداد مشتری‌ها
+
+IF OBJECT_ID('Bench.CustomerSource', 'U') IS NOT NULL DROP TABLE Bench.CustomerSource;
+IF OBJECT_ID('Bench.DimCustomer_Columns', 'U') IS NOT NULL DROP TABLE Bench.DimCustomer_Columns;
+IF OBJECT_ID('Bench.DimCustomer_Hash', 'U') IS NOT NULL DROP TABLE Bench.DimCustomer_Hash;
+
+CREATE TABLE Bench.CustomerSource (
+    CustomerCode  VARCHAR(50)   NOT NULL PRIMARY KEY,
+    CustomerName  NVARCHAR(200) NOT NULL,
+    CustomerType  NVARCHAR(100) NOT NULL,
+    CountryName   NVARCHAR(100),
+    VATNumber     VARCHAR(50),
+    Address       NVARCHAR(500),
+    Email         NVARCHAR(200),
+    Phone         VARCHAR(50)
+);
+
+-- ساختار هر دو کپی مثل Dim.DimCustomer؛ فقط کپی Hash ستون RowHash و ایندکس آن را دارد
+CREATE TABLE Bench.DimCustomer_Columns (
+    DimCustomerID INT IDENTITY(1,1) PRIMARY KEY,
+    CustomerCode  VARCHAR(50)   NOT NULL,
+    CustomerName  NVARCHAR(200) NOT NULL,
+    CustomerType  NVARCHAR(100) NOT NULL,
+    CountryName   NVARCHAR(200),
+    VATNumber     VARCHAR(50),
+    Address       NVARCHAR(500),
+    Email         NVARCHAR(200),
+    Phone         VARCHAR(50),
+    StartDate     DATE NOT NULL,
+    EndDate       DATE,
+    IsCurrent     BIT  NOT NULL DEFAULT 1
+);
+CREATE NONCLUSTERED INDEX IX_Bench_DimCustomer_Columns ON Bench.DimCustomer_Columns(CustomerCode, IsCurrent);
+
+CREATE TABLE Bench.DimCustomer_Hash (
+    DimCustomerID INT IDENTITY(1,1) PRIMARY KEY,
+    CustomerCode  VARCHAR(50)   NOT NULL,
+    CustomerName  NVARCHAR(200) NOT NULL,
+    CustomerType  NVARCHAR(100) NOT NULL,
+    CountryName   NVARCHAR(200),
+    VATNumber     VARCHAR(50),
+    Address       NVARCHAR(500),
+    Email         NVARCHAR(200),
+    Phone         VARCHAR(50),
+    StartDate     DATE NOT NULL,
+    EndDate       DATE,
+    IsCurrent     BIT  NOT NULL DEFAULT 1,
+    RowHash       AS CAST(HASHBYTES('SHA2_256', CONCAT_WS(N'|',
+                      CAST(CustomerName AS NVARCHAR(200)),
+                      CAST(CustomerType AS NVARCHAR(100)),
+                      CAST(ISNULL(CountryName, N'') AS NVARCHAR(200)),
+                      CAST(ISNULL(VATNumber, '') AS NVARCHAR(50)),
+                      CAST(ISNULL(Address, N'') AS NVARCHAR(500)),
+                      CAST(ISNULL(Email, N'') AS NVARCHAR(200)),
+                      CAST(ISNULL(Phone, '') AS NVARCHAR(50)))) AS BINARY(32)) PERSISTED
+);
+CREATE NONCLUSTERED INDEX IX_Bench_DimCustomer_Hash ON Bench.DimCustomer_Hash(CustomerCode, IsCurrent);
+CREATE NONCLUSTERED INDEX IX_Bench_DimCustomer_Hash_Current ON Bench.DimCustomer_Hash(CustomerCode) INCLUDE (RowHash) WHERE IsCurrent = 1;
+
+;WITH n AS (
+    SELECT TOP (@Rows) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects a CROSS JOIN sys.all_objects b CROSS JOIN sys.all_objects c
+)
+INSERT INTO Bench.CustomerSource WITH (TABLOCK)
+SELECT CONCAT('CUST-', FORMAT(i, '00000000')),
+       CONCAT(N'Customer ', i),
+       CASE i % 3 WHEN 0 THEN N'Shipping Line' WHEN 1 THEN N'Freight Forwarder' ELSE N'Importer' END,
+       CONCAT(N'Country ', i % 150),
+       CASE WHEN i % 4 = 0 THEN NULL ELSE CONCAT('VAT', i) END,
+       CONCAT(N'No. ', i % 997, N', Street ', i % 389),
+       CONCAT(N'contact', i, N'@example.com'),
+       CONCAT('+98-21-', 1000000 + i % 8999999);
+GO
+
+/*-------------- 2) Bulk-change runs --------------*/
+SET NOCOUNT ON;
+DECLARE @RunID UNIQUEIDENTIFIER = NEWID(),
+        @Iterations INT = 3,
+        @ChangePercent INT = 20,
+        @NewPercent INT = 1,
+        @Today DATE = CONVERT(DATE, GETDATE()),
+        @DimRows INT = (SELECT COUNT(*) FROM Bench.CustomerSource),
+        @Changed INT, @Iteration INT = 1, @Started DATETIME2, @Cpu INT, @Reads BIGINT,
+        @Expired INT, @Inserted INT, @Mismatch INT;
+
+-- نسخه تغییر یافته منبع: @ChangePercent درصد مشتری‌ها آدرس/ایمیل جدید و @NewPercent درصد مشتری جدید
+SELECT * INTO #Changed FROM Bench.CustomerSource;
+UPDATE #Changed
+SET Address = CONCAT(Address, N' (moved)'),
+    Email   = CASE WHEN ABS(CHECKSUM(CustomerCode)) % 2 = 0 THEN CONCAT(N'new.', Email) ELSE Email END
+WHERE ABS(CHECKSUM(CustomerCode)) % 100 < @ChangePercent;
+SET @Changed = @@ROWCOUNT;
+
+INSERT INTO #Changed
+SELECT TOP (@DimRows * @NewPercent / 100)
+       CONCAT('NEW-', CustomerCode), CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone
+FROM Bench.CustomerSource;
+
+WHILE @Iteration <= @Iterations
+BEGIN
+    -- حالت اولیه هر دو بُعد: یک نسخه جاری برای هر مشتری منبع
+    TRUNCATE TABLE Bench.DimCustomer_Columns;
+    TRUNCATE TABLE Bench.DimCustomer_Hash;
+    INSERT INTO Bench.DimCustomer_Columns WITH (TABLOCK)
+        (CustomerCode, CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone, StartDate, EndDate, IsCurrent)
+    SELECT CustomerCode, CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone, DATEADD(DAY, -1, @Today), NULL, 1
+    FROM Bench.CustomerSource;
+    INSERT INTO Bench.DimCustomer_Hash WITH (TABLOCK)
+        (CustomerCode, CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone, StartDate, EndDate, IsCurrent)
+    SELECT CustomerCode, CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone, DATEADD(DAY, -1, @Today), NULL, 1
+    FROM Bench.CustomerSource;
+    CHECKPOINT;
+
+    ---------------- Columns (two full comparison passes) ----------------
+    SELECT @Cpu = cpu_time, @Reads = logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID;
+    SET @Started = SYSDATETIME();
+    BEGIN TRAN;
+    UPDATE D
+    SET D.EndDate = @Today, D.IsCurrent = 0
+    FROM Bench.DimCustomer_Columns AS D
+    INNER JOIN #Changed AS X ON D.CustomerCode = X.CustomerCode
+    WHERE D.IsCurrent = 1
+      AND (   ISNULL(D.CustomerName,'') <> ISNULL(X.CustomerName,'')
+           OR ISNULL(D.CustomerType,'') <> ISNULL(X.CustomerType,'')
+           OR ISNULL(D.CountryName,'')  <> ISNULL(X.CountryName,'')
+           OR ISNULL(D.VATNumber,'')    <> ISNULL(X.VATNumber,'')
+           OR ISNULL(D.Address,'')      <> ISNULL(X.Address,'')
+           OR ISNULL(D.Email,'')        <> ISNULL(X.Email,'')
+           OR ISNULL(D.Phone,'')        <> ISNULL(X.Phone,''));
+    SET @Expired = @@ROWCOUNT;
+
+    INSERT INTO Bench.DimCustomer_Columns
+        (CustomerCode, CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone, StartDate, EndDate, IsCurrent)
+    SELECT X.CustomerCode, X.CustomerName, X.CustomerType, X.CountryName, X.VATNumber, X.Address, X.Email, X.Phone, @Today, NULL, 1
+    FROM #Changed AS X
+    LEFT JOIN Bench.DimCustomer_Columns AS D ON X.CustomerCode = D.CustomerCode AND D.IsCurrent = 1
+    WHERE D.DimCustomerID IS NULL
+       OR (   ISNULL(D.CustomerName,'') <> ISNULL(X.CustomerName,'')
+           OR ISNULL(D.CustomerType,'') <> ISNULL(X.CustomerType,'')
+           OR ISNULL(D.VATNumber,'')    <> ISNULL(X.VATNumber,'')
+           OR ISNULL(D.Address,'')      <> ISNULL(X.Address,'')
+           OR ISNULL(D.Email,'')        <> ISNULL(X.Email,'')
+           OR ISNULL(D.Phone,'')        <> ISNULL(X.Phone,''));
+    SET @Inserted = @@ROWCOUNT;
+    COMMIT;
+
+    INSERT INTO Bench.Scd2Benchmark (RunID, Method, DimRows, ChangedRows, Iteration, Expired, Inserted, ElapsedMs, CpuMs, LogicalReads)
+    SELECT @RunID, 'Columns', @DimRows, @Changed, @Iteration, @Expired, @Inserted,
+           DATEDIFF(MILLISECOND, @Started, SYSDATETIME()), r.cpu_time - @Cpu, r.logical_reads - @Reads
+    FROM sys.dm_exec_requests AS r WHERE r.session_id = @@SPID;
+
+    ---------------- Hash (single pass + delta) ----------------
+    SELECT @Cpu = cpu_time, @Reads = logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID;
+    SET @Started = SYSDATETIME();
+    BEGIN TRAN;
+    SELECT S.*, D.DimCustomerID AS CurrentDimCustomerID
+    INTO #CustomerDelta
+    FROM
+    (
+        SELECT X.*,
+               CAST(HASHBYTES('SHA2_256', CONCAT_WS(N'|',
+                   CAST(X.CustomerName AS NVARCHAR(200)),
+                   CAST(X.CustomerType AS NVARCHAR(100)),
+                   CAST(ISNULL(X.CountryName, N'') AS NVARCHAR(200)),
+                   CAST(ISNULL(X.VATNumber, '') AS NVARCHAR(50)),
+                   CAST(ISNULL(X.Address, N'') AS NVARCHAR(500)),
+                   CAST(ISNULL(X.Email, N'') AS NVARCHAR(200)),
+                   CAST(ISNULL(X.Phone, '') AS NVARCHAR(50)))) AS BINARY(32)) AS RowHash
+        FROM #Changed AS X
+    ) AS S
+    LEFT JOIN Bench.DimCustomer_Hash AS D ON D.CustomerCode = S.CustomerCode AND D.IsCurrent = 1
+    WHERE D.DimCustomerID IS NULL OR D.RowHash <> S.RowHash;
+
+    UPDATE D
+    SET D.EndDate = @Today, D.IsCurrent = 0
+    FROM Bench.DimCustomer_Hash AS D
+    INNER JOIN #CustomerDelta AS X ON D.DimCustomerID = X.CurrentDimCustomerID;
+    SET @Expired = @@ROWCOUNT;
+
+    INSERT INTO Bench.DimCustomer_Hash
+        (CustomerCode, CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone, StartDate, EndDate, IsCurrent)
+    SELECT CustomerCode, CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone, @Today, NULL, 1
+    FROM #CustomerDelta;
+    SET @Inserted = @@ROWCOUNT;
+    COMMIT;
+    DROP TABLE #CustomerDelta;
+
+    INSERT INTO Bench.Scd2Benchmark (RunID, Method, DimRows, ChangedRows, Iteration, Expired, Inserted, ElapsedMs, CpuMs, LogicalReads)
+    SELECT @RunID, 'Hash', @DimRows, @Changed, @Iteration, @Expired, @Inserted,
+           DATEDIFF(MILLISECOND, @Started, SYSDATETIME()), r.cpu_time - @Cpu, r.logical_reads - @Reads
+    FROM sys.dm_exec_requests AS r WHERE r.session_id = @@SPID;
+
+    SET @Iteration += 1;
+END;
+
+/*-------------- 3) Correctness + report --------------*/
+SELECT @Mismatch = COUNT(*) FROM (
+    SELECT CustomerCode, CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone, StartDate, EndDate, IsCurrent
+    FROM Bench.DimCustomer_Columns
+    EXCEPT
+    SELECT CustomerCode, CustomerName, CustomerType, CountryName, VATNumber, Address, Email, Phone, StartDate, EndDate, IsCurrent
+    FROM Bench.DimCustomer_Hash
+) AS d;
+IF @Mismatch = 0
+    PRINT 'Both methods produced identical dimension versions.';
+ELSE
+    PRINT CONCAT('WARNING: ', @Mismatch, ' dimension rows differ between methods.');
+
+SELECT MAX(DimRows) AS DimRows,
+       MAX(ChangedRows) AS ChangedRows,
+       AVG(CASE WHEN Method = 'Columns' THEN ElapsedMs END)    AS ColumnsMs,
+       AVG(CASE WHEN Method = 'Hash'    THEN ElapsedMs END)    AS HashMs,
+       AVG(CASE WHEN Method = 'Columns' THEN CpuMs END)        AS ColumnsCpuMs,
+       AVG(CASE WHEN Method = 'Hash'    THEN CpuMs END)        AS HashCpuMs,
+       AVG(CASE WHEN Method = 'Columns' THEN LogicalReads END) AS ColumnsReads,
+       AVG(CASE WHEN Method = 'Hash'    THEN LogicalReads END) AS HashReads,
+       CAST(AVG(CASE WHEN Method = 'Columns' THEN ElapsedMs * 1.0 END) /
+            NULLIF(AVG(CASE WHEN Method = 'Hash' THEN ElapsedMs * 1.0 END), 0) AS DECIMAL(10,1)) AS Speedup
+FROM Bench.Scd2Benchmark
+WHERE RunID = @RunID;
+
+DROP TABLE #Changed;
+GO
@@ -3,7 +3,8 @@ GO
 
 --------------------------------------------------------------------------------
 -- 2-1) UpdateDimDateIncremental
--- Incremental populate of Dim.DimDate: only new dates from yesterday+1 through today
+-- Incremental extension of Dim.DimDate (no DELETE): adds any dates present in
+-- staging but missing from the calendar, plus the horizon through next year.
 --------------------------------------------------------------------------------
 CREATE OR ALTER PROCEDURE Dim.UpdateDimDateIncremental
 AS
@@ -14,80 +15,29 @@ BEGIN
         @StepStart DATETIME,
         @StepEnd   DATETIME,
         @Msg       NVARCHAR(2000),
-        @LastDate  DATE,
-        @StartDate DATE,
-        @EndDate   DATE = CONVERT(DATE, GETDATE()),
-        @DayCount  INT;
+        @Inserted  INT,
+        @MinDate   DATE,
+        @MaxDate   DATE;
 
     BEGIN TRY
         BEGIN TRAN;
 
-        -- 1. Find last existing date
-        SELECT @LastDate = MAX(FullDate) FROM Dim.DimDate;
-        IF @LastDate IS NULL
-            SET @LastDate = DATEADD(DAY, -1, @EndDate);
-
-        SET @StartDate = DATEADD(DAY, 1, @LastDate);
-        SET @DayCount  = DATEDIFF(DAY, @StartDate, @EndDate) + 1;
-
-        IF @DayCount > 0
-        BEGIN
-            -- 2. Generate new dates and insert
-            SET @StepStart = GETDATE();
-            ;WITH NewDates AS
-            (
-                SELECT TOP(@DayCount)
-                    DATEADD(DAY, ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1, @StartDate) AS FullDate
-                FROM sys.all_objects a
-                CROSS JOIN sys.all_objects b
-            )
-            INSERT INTO Dim.DimDate
-            (
-                FullDate, [Year], [Quarter], [Month], MonthName,
-                [Day], DayOfWeek, DayName, WeekOfYear, IsWeekend
-            )
-            SELECT
-                d.FullDate,
-                YEAR(d.FullDate),
-                DATEPART(QUARTER, d.FullDate),
-                MONTH(d.FullDate),
-                DATENAME(MONTH, d.FullDate),
-                DAY(d.FullDate),
-                DATEPART(WEEKDAY, d.FullDate),
-                DATENAME(WEEKDAY, d.FullDate),
-                DATEPART(WEEK, d.FullDate),
-                CASE WHEN DATEPART(WEEKDAY, d.FullDate) IN (6,7) THEN 1 ELSE 0 END
-            FROM NewDates AS d
-            ORDER BY d.FullDate;
-
-            SET @StepEnd = GETDATE();
-            INSERT INTO dbo.ETLLog
-            (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES
-            (
-                @TableName,
-                'Insert',
-                @StepStart,
-                @StepEnd,
-                CONCAT('Incremental: Inserted ', @@ROWCOUNT, ' new dates')
-            );
-        END
-        ELSE
-        BEGIN
-            -- nothing to do
-            SET @StepStart = GETDATE();
-            SET @StepEnd   = GETDATE();
-            INSERT INTO dbo.ETLLog
-            (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES
-            (
-                @TableName,
-                'Skip',
-                @StepStart,
-                @StepEnd,
-                'Incremental: No new dates found'
-            );
-        END
+        SET @StepStart = GETDATE();
+        EXEC Dim.ExtendDimDateFromStaging @Inserted = @Inserted OUTPUT, @MinDate = @MinDate OUTPUT, @MaxDate = @MaxDate OUTPUT;
+        SET @StepEnd = GETDATE();
+
+        INSERT INTO dbo.ETLLog
+        (TableName, OperationType, StartTime, EndTime, Message)
+        VALUES
+        (
+            @TableName,
+            CASE WHEN @Inserted > 0 THEN 'Insert' ELSE 'Skip' END,
+            @StepStart,
+            @StepEnd,
+            CASE WHEN @Inserted > 0
+                 THEN CONCAT('Incremental: Inserted ', @Inserted, ' new dates (staging ', @MinDate, ' .. ', @MaxDate, ')')
+                 ELSE 'Incremental: No new dates found' END
+        );
 
         COMMIT;
     END TRY
@@ -129,39 +79,64 @@ BEGIN
     BEGIN TRY
         BEGIN TRAN;
 
-        -- 1) Detect changes in staging by business key
+        -- 1) Single hashed pass: staging rows that are new or whose tracked attributes changed
+        --    (the hash expression must match the RowHash computed column of Dim.DimCustomer)
         SET @StepStart = GETDATE();
-        ;WITH Changed AS
+        SELECT
+            S.*,
+            D.DimCustomerID AS CurrentDimCustomerID
+        INTO #CustomerDelta
+        FROM
         (
             SELECT
                 C.CustomerCode,
                 C.CustomerName,
                 C.CustomerType,
-                (SELECT CountryName FROM TradePortDB.Common.Country WHERE CountryID = C.CountryID) AS CountryName,
+                CN.CountryName,
                 C.VATNumber,
                 C.Address,
                 C.Email,
-                C.Phone
+                C.Phone,
+                CAST(HASHBYTES('SHA2_256', CONCAT_WS(N'|',
+                    CAST(C.CustomerName AS NVARCHAR(200)),
+                    CAST(C.CustomerType AS NVARCHAR(100)),
+                    CAST(ISNULL(CN.CountryName, N'') AS NVARCHAR(200)),
+                    CAST(ISNULL(C.VATNumber, '') AS NVARCHAR(50)),
+                    CAST(ISNULL(C.Address, N'') AS NVARCHAR(500)),
+                    CAST(ISNULL(C.Email, N'') AS NVARCHAR(200)),
+                    CAST(ISNULL(C.Phone, '') AS NVARCHAR(50)))) AS BINARY(32)) AS RowHash
             FROM StagingDB.Finance.Customer AS C
-        )
-        -- 2) Expire existing versions
+            LEFT JOIN TradePortDB.Common.Country AS CN
+                ON CN.CountryID = C.CountryID
+        ) AS S
+        LEFT JOIN Dim.DimCustomer AS D
+            ON D.CustomerCode = S.CustomerCode
+           AND D.IsCurrent = 1
+        WHERE D.DimCustomerID IS NULL       -- brand-new
+           OR D.RowHash <> S.RowHash;       -- changed
+
+        SET @StepEnd = GETDATE();
+        INSERT INTO dbo.ETLLog
+        (TableName, OperationType, StartTime, EndTime, Message)
+        VALUES
+        (
+            @TableName,
+            'Detect',
+            @StepStart,
+            @StepEnd,
+            CONCAT('Incremental: ', (SELECT COUNT(*) FROM #CustomerDelta WHERE CurrentDimCustomerID IS NULL), ' new, ',
+                   (SELECT COUNT(*) FROM #CustomerDelta WHERE CurrentDimCustomerID IS NOT NULL), ' changed customers')
+        );
+
+        -- 2) Expire existing versions of the changed customers (seek on the surrogate key)
+        SET @StepStart = GETDATE();
         UPDATE D
         SET 
             D.EndDate   = @Today,
             D.IsCurrent = 0
         FROM Dim.DimCustomer AS D
-        INNER JOIN Changed AS X
-            ON D.CustomerCode = X.CustomerCode
-        WHERE D.IsCurrent = 1
-          AND (
-              ISNULL(D.CustomerName,'')    <> ISNULL(X.CustomerName,'')
-           OR ISNULL(D.CustomerType,'')    <> ISNULL(X.CustomerType,'')
-           OR ISNULL(D.CountryName,'')     <> ISNULL(X.CountryName,'')
-           OR ISNULL(D.VATNumber,'')       <> ISNULL(X.VATNumber,'')
-           OR ISNULL(D.Address,'')         <> ISNULL(X.Address,'')
-           OR ISNULL(D.Email,'')           <> ISNULL(X.Email,'')
-           OR ISNULL(D.Phone,'')           <> ISNULL(X.Phone,'')
-        );
+        INNER JOIN #CustomerDelta AS X
+            ON D.DimCustomerID = X.CurrentDimCustomerID;
 
         SET @RowsAffected = @@ROWCOUNT;
         SET @StepEnd      = GETDATE();
@@ -185,30 +160,18 @@ BEGIN
             StartDate, EndDate, IsCurrent
         )
         SELECT
-            C.CustomerCode,
-            C.CustomerName,
-            C.CustomerType,
-            (SELECT CountryName FROM TradePortDB.Common.Country WHERE CountryID = C.CountryID),
-            C.VATNumber,
-            C.Address,
-            C.Email,
-            C.Phone,
+            X.CustomerCode,
+            X.CustomerName,
+            X.CustomerType,
+            X.CountryName,
+            X.VATNumber,
+            X.Address,
+            X.Email,
+            X.Phone,
             @Today,
             NULL,
             1
-        FROM StagingDB.Finance.Customer AS C
-        LEFT JOIN Dim.DimCustomer AS D
-            ON C.CustomerCode = D.CustomerCode AND D.IsCurrent = 1
-        WHERE
-            D.DimCustomerID IS NULL  -- brand-new
-         OR (
-              ISNULL(D.CustomerName,'')  <> ISNULL(C.CustomerName,'')
-           OR ISNULL(D.CustomerType,'')  <> ISNULL(C.CustomerType,'')
-           OR ISNULL(D.VATNumber,'')     <> ISNULL(C.VATNumber,'')
-           OR ISNULL(D.Address,'')       <> ISNULL(C.Address,'')
-           OR ISNULL(D.Email,'')         <> ISNULL(C.Email,'')
-           OR ISNULL(D.Phone,'')         <> ISNULL(C.Phone,'')
-        );
+        FROM #CustomerDelta AS X;
 
         SET @RowsAffected = @@ROWCOUNT;
         SET @StepEnd      = GETDATE();
@@ -223,10 +186,27 @@ BEGIN
             CONCAT('Incremental: Inserted ', @RowsAffected, ' new/current versions')
         );
 
+        -- 4) Point the CustomerID key map at the current versions
+        SET @StepStart = GETDATE();
+        EXEC Dim.RefreshKeyMapCustomer;
+        SET @StepEnd = GETDATE();
+        INSERT INTO dbo.ETLLog
+        (TableName, OperationType, StartTime, EndTime, Message)
+        VALUES
+        (
+            'Dim.KeyMapCustomer',
+            'Refresh',
+            @StepStart,
+            @StepEnd,
+            'Incremental: Refreshed CustomerID -> DimCustomerID map'
+        );
+
         COMMIT;
+        DROP TABLE #CustomerDelta;
     END TRY
     BEGIN CATCH
         IF XACT_STATE() <> 0 ROLLBACK;
+        IF OBJECT_ID('tempdb..#CustomerDelta') IS NOT NULL DROP TABLE #CustomerDelta;
         SET @StepEnd = GETDATE();
         SET @Msg     = ERROR_MESSAGE();
         INSERT INTO dbo.ETLLog
@@ -364,19 +344,36 @@ BEGIN
     BEGIN TRY
         BEGIN TRAN;
 
-        -- Expire old versions when rate or type changes
+        -- Single hashed pass: new tax keys and current versions whose tracked attributes changed
+        -- (the hash expression must match the RowHash computed column of Dim.DimTax)
         SET @StepStart = GETDATE();
+        SELECT
+            S.TaxName,
+            CAST(S.TaxRate AS DECIMAL(18,4)) AS TaxRate,
+            S.TaxType,
+            S.EffectiveFrom,
+            S.EffectiveTo,
+            D.DimTaxID AS CurrentDimTaxID
+        INTO #TaxDelta
+        FROM StagingDB.Finance.Tax AS S
+        LEFT JOIN Dim.DimTax AS D
+            ON D.TaxName = S.TaxName
+           AND D.TaxType = S.TaxType
+           AND D.EffectiveFrom = S.EffectiveFrom
+           AND D.IsCurrent = 1
+        WHERE D.DimTaxID IS NULL
+           OR D.RowHash <> CAST(HASHBYTES('SHA2_256', CONCAT_WS(N'|',
+                  CONVERT(NVARCHAR(40), CAST(S.TaxRate AS DECIMAL(18,4))),
+                  ISNULL(CONVERT(NCHAR(8), S.EffectiveTo, 112), N''))) AS BINARY(32));
+
+        -- Expire old versions of the changed taxes
         UPDATE D
         SET
             D.EndDate   = @Today,
             D.IsCurrent = 0
         FROM Dim.DimTax AS D
-        INNER JOIN StagingDB.Finance.Tax AS S
-            ON D.TaxName = S.TaxName
-           AND D.TaxType = S.TaxType
-           AND D.EffectiveFrom = S.EffectiveFrom
-        WHERE D.IsCurrent = 1
-          AND (D.TaxRate <> S.TaxRate);
+        INNER JOIN #TaxDelta AS X
+            ON D.DimTaxID = X.CurrentDimTaxID;
         SET @RowsExp = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog
@@ -398,22 +395,15 @@ BEGIN
             StartDate, EndDate, IsCurrent
         )
         SELECT
-            S.TaxName,
-            S.TaxRate,
-            S.TaxType,
-            S.EffectiveFrom,
-            S.EffectiveTo,
+            X.TaxName,
+            X.TaxRate,
+            X.TaxType,
+            X.EffectiveFrom,
+            X.EffectiveTo,
             @Today,
             NULL,
             1
-        FROM StagingDB.Finance.Tax AS S
-        LEFT JOIN Dim.DimTax AS D
-            ON D.TaxName = S.TaxName
-           AND D.TaxType = S.TaxType
-           AND D.EffectiveFrom = S.EffectiveFrom
-           AND D.IsCurrent = 1
-        WHERE D.DimTaxID IS NULL
-           OR D.TaxRate <> S.TaxRate;
+        FROM #TaxDelta AS X;
 
         SET @RowsIns = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
@@ -429,9 +419,11 @@ BEGIN
         );
 
         COMMIT;
+        DROP TABLE #TaxDelta;
     END TRY
     BEGIN CATCH
         IF XACT_STATE() <> 0 ROLLBACK;
+        IF OBJECT_ID('tempdb..#TaxDelta') IS NOT NULL DROP TABLE #TaxDelta;
         SET @StepEnd = GETDATE();
         SET @Msg     = ERROR_MESSAGE();
         INSERT INTO dbo.ETLLog
@@ -600,7 +592,8 @@ BEGIN
         @StepStart DATETIME,
         @StepEnd   DATETIME,
         @Msg       NVARCHAR(2000),
-        @Today     DATE = CONVERT(DATE, GETDATE());
+        @Today     DATE = CONVERT(DATE, GETDATE()),
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -641,10 +634,11 @@ BEGIN
         LEFT JOIN Dim.DimContract AS D
             ON S.ContractNumber = D.ContractNumber
         WHERE D.DimContractID IS NULL;
+        SET @RowCount = @@ROWCOUNT;
 
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
-        VALUES(@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Incremental: Inserted ', @@ROWCOUNT, ' new contracts'));
+        VALUES(@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Incremental: Inserted ', @RowCount, ' new contracts'));
 
         COMMIT;
     END TRY
@@ -669,7 +663,8 @@ BEGIN
         @TableName NVARCHAR(128) = 'Dim.DimInvoice',
         @StepStart DATETIME,
         @StepEnd   DATETIME,
-        @Msg       NVARCHAR(2000);
+        @Msg       NVARCHAR(2000),
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -700,10 +695,18 @@ BEGIN
         LEFT JOIN Dim.DimInvoice AS D
             ON S.InvoiceNumber = D.InvoiceNumber
         WHERE D.DimInvoiceID IS NULL;
+        SET @RowCount = @@ROWCOUNT;
 
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
-        VALUES(@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Incremental: Inserted ', @@ROWCOUNT, ' new invoices'));
+        VALUES(@TableName, 'Insert', @StepStart, @StepEnd, CONCAT('Incremental: Inserted ', @RowCount, ' new invoices'));
+
+        -- STEP 3: Refresh the InvoiceID key map (DimInvoiceID + source CustomerID)
+        SET @StepStart = GETDATE();
+        EXEC Dim.RefreshKeyMapInvoice;
+        SET @StepEnd = GETDATE();
+        INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
+        VALUES('Dim.KeyMapInvoice', 'Refresh', @StepStart, @StepEnd, 'Incremental: Refreshed InvoiceID -> DimInvoiceID map');
 
         COMMIT;
     END TRY
@@ -917,6 +920,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Dim.DimLeaveType';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         INSERT INTO Dim.DimLeaveType(LeaveTypeID, LeaveTypeName, IsPaid)
@@ -928,10 +932,11 @@ BEGIN
         WHERE NOT EXISTS (
             SELECT 1 FROM Dim.DimLeaveType d WHERE d.LeaveTypeID = s.LeaveTypeID
         );
+        SET @RowCount = @@ROWCOUNT;
         
         SET @Message = 'DimLeaveType update process completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -954,6 +959,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Dim.DimTerminationReason';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         INSERT INTO Dim.DimTerminationReason(TerminationReason)
@@ -962,10 +968,11 @@ BEGIN
         WHERE s.TerminationReason IS NOT NULL AND NOT EXISTS (
             SELECT 1 FROM Dim.DimTerminationReason d WHERE d.TerminationReason = s.TerminationReason
         );
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'DimTerminationReason update process completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -983,7 +990,8 @@ GO
 
 --------------------------------------------------------------------------------
 -- 2-1) UpdateDimDateIncremental
--- Incremental populate of Dim.DimDate: only new dates from yesterday+1 through today
+-- Incremental extension of Dim.DimDate (no DELETE): adds any dates present in
+-- staging but missing from the calendar, plus the horizon through next year.
 --------------------------------------------------------------------------------
 CREATE OR ALTER PROCEDURE Dim.UpdateDimDateIncremental
 AS
@@ -994,80 +1002,29 @@ BEGIN
         @StepStart DATETIME,
         @StepEnd   DATETIME,
         @Msg       NVARCHAR(2000),
-        @LastDate  DATE,
-        @StartDate DATE,
-        @EndDate   DATE = CONVERT(DATE, GETDATE()),
-        @DayCount  INT;
+        @Inserted  INT,
+        @MinDate   DATE,
+        @MaxDate   DATE;
 
     BEGIN TRY
         BEGIN TRAN;
 
-        -- 1. Find last existing date
-        SELECT @LastDate = MAX(FullDate) FROM Dim.DimDate;
-        IF @LastDate IS NULL
-            SET @LastDate = DATEADD(DAY, -1, @EndDate);
-
-        SET @StartDate = DATEADD(DAY, 1, @LastDate);
-        SET @DayCount  = DATEDIFF(DAY, @StartDate, @EndDate) + 1;
-
-        IF @DayCount > 0
-        BEGIN
-            -- 2. Generate new dates and insert
-            SET @StepStart = GETDATE();
-            ;WITH NewDates AS
-            (
-                SELECT TOP(@DayCount)
-                    DATEADD(DAY, ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1, @StartDate) AS FullDate
-                FROM sys.all_objects a
-                CROSS JOIN sys.all_objects b
-            )
-            INSERT INTO Dim.DimDate
-            (
-                FullDate, [Year], [Quarter], [Month], MonthName,
-                [Day], DayOfWeek, DayName, WeekOfYear, IsWeekend
-            )
-            SELECT
-                d.FullDate,
-                YEAR(d.FullDate),
-                DATEPART(QUARTER, d.FullDate),
-                MONTH(d.FullDate),
-                DATENAME(MONTH, d.FullDate),
-                DAY(d.FullDate),
-                DATEPART(WEEKDAY, d.FullDate),
-                DATENAME(WEEKDAY, d.FullDate),
-                DATEPART(WEEK, d.FullDate),
-                CASE WHEN DATEPART(WEEKDAY, d.FullDate) IN (6,7) THEN 1 ELSE 0 END
-            FROM NewDates AS d
-            ORDER BY d.FullDate;
-
-            SET @StepEnd = GETDATE();
-            INSERT INTO dbo.ETLLog
-            (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES
-            (
-                @TableName,
-                'Insert',
-                @StepStart,
-                @StepEnd,
-                CONCAT('Incremental: Inserted ', @@ROWCOUNT, ' new dates')
-            );
-        END
-        ELSE
-        BEGIN
-            -- nothing to do
-            SET @StepStart = GETDATE();
-            SET @StepEnd   = GETDATE();
-            INSERT INTO dbo.ETLLog
-            (TableName, OperationType, StartTime, EndTime, Message)
-            VALUES
-            (
-                @TableName,
-                'Skip',
-                @StepStart,
-                @StepEnd,
-                'Incremental: No new dates found'
-            );
-        END
+        SET @StepStart = GETDATE();
+        EXEC Dim.ExtendDimDateFromStaging @Inserted = @Inserted OUTPUT, @MinDate = @MinDate OUTPUT, @MaxDate = @MaxDate OUTPUT;
+        SET @StepEnd = GETDATE();
+
+        INSERT INTO dbo.ETLLog
+        (TableName, OperationType, StartTime, EndTime, Message)
+        VALUES
+        (
+            @TableName,
+            CASE WHEN @Inserted > 0 THEN 'Insert' ELSE 'Skip' END,
+            @StepStart,
+            @StepEnd,
+            CASE WHEN @Inserted > 0
+                 THEN CONCAT('Incremental: Inserted ', @Inserted, ' new dates (staging ', @MinDate, ' .. ', @MaxDate, ')')
+                 ELSE 'Incremental: No new dates found' END
+        );
 
         COMMIT;
     END TRY
@@ -0,0 +1,203 @@
+/*====================================================================
+  Benchmark: حل کلیدهای Fact.FactInvoiceLineTransaction
+    BusinessKey : مسیر قبلی — Invoice → Contract → Customer، join رشته‌ای روی
+                  InvoiceNumber / CustomerCode و NOT EXISTS روی کل جدول Fact
+    KeyMap      : مسیر فعلی — Dim.KeyMapInvoice / Dim.KeyMapCustomer (join عددی)
+                  و واترمارک SourceInvoiceLineID
+  برای هر حجم Fact در @Sizes (پیش‌فرض 1M، 10M و 50M) یک منبع مصنوعی با
+  @FactRows + @DeltaRows سطر (روی فاکتورهای واقعی Staging) ساخته می‌شود، @FactRows
+  سطر اول در Bench.FactInvoiceLine قرار می‌گیرد و هر دو روش @DeltaRows سطر جدید را
+  پیدا می‌کنند. زمان، CPU و logical reads هر اجرا در Bench.KeyResolutionBenchmark ثبت می‌شود.
+  پیش‌نیاز: بارگذاری اولیه Dim (و در نتیجه Dim.KeyMap*) انجام شده باشد.
+====================================================================*/
+USE DataWarehouse;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.schemas WHERE name = 'Bench')
+    EXEC('CREATE SCHEMA Bench;');
+GO
+
+IF OBJECT_ID('Bench.KeyResolutionBenchmark', 'U') IS NULL
+CREATE TABLE Bench.KeyResolutionBenchmark (
+    ResultID      INT IDENTITY(1,1) PRIMARY KEY,
+    RunID         UNIQUEIDENTIFIER NOT NULL,
+    Method        NVARCHAR(20)     NOT NULL,   -- 'BusinessKey' | 'KeyMap'
+    FactRows      BIGINT           NOT NULL,
+    DeltaRows     INT              NOT NULL,
+    Iteration     INT              NOT NULL,
+    RowsFound     BIGINT           NOT NULL,
+    ElapsedMs     INT              NOT NULL,
+    CpuMs         INT              NOT NULL,
+    LogicalReads  BIGINT           NOT NULL,
+    RunTime       DATETIME         NOT NULL DEFAULT GETDATE()
+);
+GO
+
+SET NOCOUNT ON;
+
+DECLARE @RunID UNIQUEIDENTIFIER = NEWID(),
+        @DeltaRows INT = 100000,          -- سطرهای جدید هر اجرای افزایشی
+        @Iterations INT = 3,
+        @FactRows BIGINT, @Iteration INT, @Started DATETIME2, @Cpu INT, @Reads BIGINT,
+        @Found BIGINT, @Watermark INT, @InvoiceCount INT, @ServiceCount INT;
+
+DECLARE @Sizes TABLE (FactRows BIGINT PRIMARY KEY);
+INSERT INTO @Sizes VALUES (1000000), (10000000), (50000000);
+
+-- فاکتورها و انواع سرویس واقعی تا هر دو مسیر join کامل داشته باشند
+SELECT ROW_NUMBER() OVER (ORDER BY InvoiceID) - 1 AS rn, InvoiceID
+INTO #Invoices FROM Dim.KeyMapInvoice;
+CREATE UNIQUE CLUSTERED INDEX IX_Invoices ON #Invoices (rn);
+SELECT ROW_NUMBER() OVER (ORDER BY SourceServiceTypeID) - 1 AS rn, SourceServiceTypeID
+INTO #Services FROM Dim.DimServiceType WHERE SourceServiceTypeID IS NOT NULL;
+CREATE UNIQUE CLUSTERED INDEX IX_Services ON #Services (rn);
+SELECT @InvoiceCount = COUNT(*) FROM #Invoices;
+SELECT @ServiceCount = COUNT(*) FROM #Services;
+
+IF @InvoiceCount = 0 OR @ServiceCount = 0
+    THROW 64000, 'Benchmark requires loaded Dim.KeyMapInvoice and Dim.DimServiceType.', 1;
+
+DECLARE size_cursor CURSOR LOCAL FAST_FORWARD FOR SELECT FactRows FROM @Sizes ORDER BY FactRows;
+OPEN size_cursor;
+FETCH NEXT FROM size_cursor INTO @FactRows;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    /*-------------- 1) Test data --------------*/
+    IF OBJECT_ID('Bench.InvoiceLineSource', 'U') IS NOT NULL DROP TABLE Bench.InvoiceLineSource;
+    IF OBJECT_ID('Bench.FactInvoiceLine', 'U') IS NOT NULL DROP TABLE Bench.FactInvoiceLine;
+
+    CREATE TABLE Bench.InvoiceLineSource (
+        InvoiceLineID   INT           NOT NULL PRIMARY KEY,
+        InvoiceID       INT           NOT NULL,
+        ServiceTypeID   INT           NOT NULL,
+        TaxID           INT,
+        Quantity        INT           NOT NULL,
+        UnitPrice       DECIMAL(18,4) NOT NULL,
+        DiscountPercent DECIMAL(6,4),
+        NetAmount       DECIMAL(18,4) NOT NULL,
+        TaxAmount       DECIMAL(18,4) NOT NULL
+    );
+
+    ;WITH n AS (
+        SELECT TOP (@FactRows + @DeltaRows) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+        FROM sys.all_objects a CROSS JOIN sys.all_objects b CROSS JOIN sys.all_objects c
+    )
+    INSERT INTO Bench.InvoiceLineSource WITH (TABLOCK)
+    SELECT n.i, inv.InvoiceID, svc.SourceServiceTypeID, NULL,
+           q.Quantity, q.UnitPrice, q.DiscountPercent,
+           q.Quantity * q.UnitPrice * (1 - q.DiscountPercent),
+           q.Quantity * q.UnitPrice * (1 - q.DiscountPercent) * 0.09
+    FROM n
+    INNER JOIN #Invoices AS inv ON inv.rn = n.i % @InvoiceCount
+    INNER JOIN #Services AS svc ON svc.rn = ABS(CHECKSUM(n.i * 104729)) % @ServiceCount
+    CROSS APPLY (SELECT 1 + ABS(CHECKSUM(NEWID())) % 100                                   AS Quantity,
+                        CAST(10 + ABS(CHECKSUM(NEWID())) % 99000 / 100.0 AS DECIMAL(18,4)) AS UnitPrice,
+                        CAST(ABS(CHECKSUM(NEWID())) % 20 / 100.0 AS DECIMAL(6,4))          AS DiscountPercent) AS q;
+
+    -- مثل Fact.FactInvoiceLineTransaction در 7 - DWTables.sql (heap + ایندکس‌ها)
+    SELECT kmi.DimInvoiceID, kmc.DimCustomerID, dst.DimServiceTypeID, CAST(NULL AS INT) AS DimTaxID,
+           ddate.DimDateID, src.Quantity, src.UnitPrice, src.DiscountPercent, src.NetAmount, src.TaxAmount,
+           src.InvoiceLineID AS SourceInvoiceLineID
+    INTO Bench.FactInvoiceLine
+    FROM Bench.InvoiceLineSource AS src
+    INNER JOIN StagingDB.Finance.Invoice AS inv  ON src.InvoiceID     = inv.InvoiceID
+    INNER JOIN Dim.KeyMapInvoice         AS kmi  ON src.InvoiceID     = kmi.InvoiceID
+    INNER JOIN Dim.KeyMapCustomer        AS kmc  ON kmi.CustomerID    = kmc.CustomerID
+    INNER JOIN Dim.DimServiceType        AS dst  ON src.ServiceTypeID = dst.SourceServiceTypeID
+    INNER JOIN Dim.DimDate               AS ddate ON inv.InvoiceDate  = ddate.FullDate
+    WHERE src.InvoiceLineID <= @FactRows;
+
+    CREATE NONCLUSTERED INDEX IX_Bench_FactInvoiceLine_AllFKs
+    ON Bench.FactInvoiceLine(DimInvoiceID, DimCustomerID, DimServiceTypeID, DimTaxID, DimDateID);
+    CREATE NONCLUSTERED INDEX IX_Bench_FactInvoiceLine_Source
+    ON Bench.FactInvoiceLine(SourceInvoiceLineID);
+
+    /*-------------- 2) Key resolution of the delta --------------*/
+    SET @Iteration = 1;
+    WHILE @Iteration <= @Iterations
+    BEGIN
+        -- BusinessKey: منطق قبلی Fact.UpdateFactInvoiceLineTransactionIncremental
+        SELECT @Cpu = cpu_time, @Reads = logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID;
+        SET @Started = SYSDATETIME();
+
+        SELECT di.DimInvoiceID, dc.DimCustomerID, dst.DimServiceTypeID, ddate.DimDateID,
+               src.Quantity, src.UnitPrice, src.NetAmount
+        INTO #BusinessKeyResult
+        FROM Bench.InvoiceLineSource          AS src
+        INNER JOIN StagingDB.Finance.Invoice  AS inv  ON src.InvoiceID     = inv.InvoiceID
+        INNER JOIN Dim.DimInvoice             AS di   ON inv.InvoiceNumber = di.InvoiceNumber
+        INNER JOIN StagingDB.Finance.Contract AS ctr  ON inv.ContractID    = ctr.ContractID
+        INNER JOIN StagingDB.Finance.Customer AS stc  ON ctr.CustomerID    = stc.CustomerID
+        INNER JOIN Dim.DimCustomer            AS dc   ON stc.CustomerCode  = dc.CustomerCode
+        INNER JOIN Dim.DimServiceType         AS dst  ON src.ServiceTypeID = dst.SourceServiceTypeID
+        INNER JOIN Dim.DimDate                AS ddate ON inv.InvoiceDate  = ddate.FullDate
+        WHERE NOT EXISTS
+        (
+            SELECT 1
+            FROM Bench.FactInvoiceLine AS f
+            WHERE f.DimInvoiceID     = di.DimInvoiceID
+              AND f.DimCustomerID    = dc.DimCustomerID
+              AND f.DimServiceTypeID = dst.DimServiceTypeID
+              AND f.Quantity         = src.Quantity
+              AND f.UnitPrice        = src.UnitPrice
+              AND f.NetAmount        = src.NetAmount
+        );
+        SET @Found = @@ROWCOUNT;
+
+        INSERT INTO Bench.KeyResolutionBenchmark (RunID, Method, FactRows, DeltaRows, Iteration, RowsFound, ElapsedMs, CpuMs, LogicalReads)
+        SELECT @RunID, 'BusinessKey', @FactRows, @DeltaRows, @Iteration, @Found,
+               DATEDIFF(MILLISECOND, @Started, SYSDATETIME()), r.cpu_time - @Cpu, r.logical_reads - @Reads
+        FROM sys.dm_exec_requests AS r WHERE r.session_id = @@SPID;
+        DROP TABLE #BusinessKeyResult;
+
+        -- KeyMap: منطق فعلی (واترمارک + نگاشت عددی)
+        SELECT @Cpu = cpu_time, @Reads = logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID;
+        SET @Started = SYSDATETIME();
+
+        SELECT @Watermark = ISNULL(MAX(SourceInvoiceLineID), 0) FROM Bench.FactInvoiceLine;
+        SELECT kmi.DimInvoiceID, kmc.DimCustomerID, dst.DimServiceTypeID, ddate.DimDateID,
+               src.Quantity, src.UnitPrice, src.NetAmount
+        INTO #KeyMapResult
+        FROM Bench.InvoiceLineSource         AS src
+        INNER JOIN StagingDB.Finance.Invoice AS inv  ON src.InvoiceID     = inv.InvoiceID
+        INNER JOIN Dim.KeyMapInvoice         AS kmi  ON src.InvoiceID     = kmi.InvoiceID
+        INNER JOIN Dim.KeyMapCustomer        AS kmc  ON kmi.CustomerID    = kmc.CustomerID
+        INNER JOIN Dim.DimServiceType        AS dst  ON src.ServiceTypeID = dst.SourceServiceTypeID
+        INNER JOIN Dim.DimDate               AS ddate ON inv.InvoiceDate  = ddate.FullDate
+        WHERE src.InvoiceLineID > @Watermark;
+        SET @Found = @@ROWCOUNT;
+
+        INSERT INTO Bench.KeyResolutionBenchmark (RunID, Method, FactRows, DeltaRows, Iteration, RowsFound, ElapsedMs, CpuMs, LogicalReads)
+        SELECT @RunID, 'KeyMap', @FactRows, @DeltaRows, @Iteration, @Found,
+               DATEDIFF(MILLISECOND, @Started, SYSDATETIME()), r.cpu_time - @Cpu, r.logical_reads - @Reads
+        FROM sys.dm_exec_requests AS r WHERE r.session_id = @@SPID;
+        DROP TABLE #KeyMapResult;
+
+        SET @Iteration += 1;
+    END;
+
+    FETCH NEXT FROM size_cursor INTO @FactRows;
+END;
+CLOSE size_cursor;
+DEALLOCATE size_cursor;
+
+DROP TABLE Bench.InvoiceLineSource;
+DROP TABLE Bench.FactInvoiceLine;
+DROP TABLE #Invoices, #Services;
+
+/*-------------- 3) Report --------------*/
+SELECT FactRows,
+       MAX(DeltaRows) AS DeltaRows,
+       AVG(CASE WHEN Method = 'BusinessKey' THEN ElapsedMs END)    AS BusinessKeyMs,
+       AVG(CASE WHEN Method = 'KeyMap'      THEN ElapsedMs END)    AS KeyMapMs,
+       AVG(CASE WHEN Method = 'BusinessKey' THEN LogicalReads END) AS BusinessKeyReads,
+       AVG(CASE WHEN Method = 'KeyMap'      THEN LogicalReads END) AS KeyMapReads,
+       MAX(CASE WHEN Method = 'BusinessKey' THEN RowsFound END)    AS BusinessKeyRows,
+       MAX(CASE WHEN Method = 'KeyMap'      THEN RowsFound END)    AS KeyMapRows,
+       CAST(AVG(CASE WHEN Method = 'BusinessKey' THEN ElapsedMs * 1.0 END) /
+            NULLIF(AVG(CASE WHEN Method = 'KeyMap' THEN ElapsedMs * 1.0 END), 0) AS DECIMAL(10,1)) AS Speedup
+FROM Bench.KeyResolutionBenchmark
+WHERE RunID = @RunID
+GROUP BY FactRows
+ORDER BY FactRows;
+GO
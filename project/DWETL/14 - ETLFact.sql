@@ -1,6 +1,111 @@
 USE DataWarehouse;
 GO
 
+--------------------------------------------------------------------------------
+-- 0) Fact load targets (partition switch-in)
+--    رویه‌های Fact.Update* سطرهای جدید را در synonym <Fact>_Load درج می‌کنند.
+--    چیدمان rowstore: synonym = خود Fact و این دو رویه کاری انجام نمی‌دهند.
+--    چیدمان columnstore («7 - DWTables Columnstore.sql»): synonym = <Fact>_Switch؛
+--    partitionهای ماهانه جدید با SWITCH (فقط metadata) وارد Fact می‌شوند و
+--    سطرهای ماه‌های موجود با یک INSERT حجیم (TABLOCK) به همان partition اضافه می‌شوند.
+--------------------------------------------------------------------------------
+CREATE OR ALTER PROCEDURE Fact.PrepareFactLoad
+    @FactTable NVARCHAR(256)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @LoadTarget NVARCHAR(1035) =
+                (SELECT base_object_name FROM sys.synonyms WHERE object_id = OBJECT_ID(@FactTable + N'_Load')),
+            @Sql NVARCHAR(MAX), @Seed BIGINT;
+
+    IF @LoadTarget IS NULL OR OBJECT_ID(@LoadTarget) = OBJECT_ID(@FactTable) RETURN;
+
+    -- partition ماه‌های جدید قبل از درج ساخته می‌شود
+    EXEC Dim.ExtendDateKeyPartitions;
+
+    SET @Sql = N'TRUNCATE TABLE ' + @LoadTarget + N';';
+    EXEC sp_executesql @Sql;
+
+    -- کلید IDENTITY جدول switch از ادامه کلیدهای Fact شروع می‌شود
+    IF OBJECTPROPERTY(OBJECT_ID(@FactTable), 'TableHasIdentity') = 1
+    BEGIN
+        SET @Seed = CAST(IDENT_CURRENT(@FactTable) AS BIGINT) + 1;
+        DBCC CHECKIDENT (@LoadTarget, RESEED, @Seed) WITH NO_INFOMSGS;
+    END;
+END;
+GO
+
+CREATE OR ALTER PROCEDURE Fact.SwitchInFactLoad
+    @FactTable NVARCHAR(256),
+    @Switched  INT = NULL OUTPUT,    -- تعداد partitionهای switch شده
+    @Inserted  BIGINT = NULL OUTPUT  -- سطرهای درج‌شده در partitionهای غیرخالی
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @LoadTarget NVARCHAR(1035) =
+                (SELECT base_object_name FROM sys.synonyms WHERE object_id = OBJECT_ID(@FactTable + N'_Load')),
+            @FactId INT = OBJECT_ID(@FactTable),
+            @HasIdentity BIT = OBJECTPROPERTY(OBJECT_ID(@FactTable), 'TableHasIdentity'),
+            @DateKeyColumn SYSNAME, @Columns NVARCHAR(MAX), @Sql NVARCHAR(MAX),
+            @Partition INT, @Rows BIGINT;
+
+    SELECT @Switched = 0, @Inserted = 0;
+    IF @LoadTarget IS NULL OR OBJECT_ID(@LoadTarget) = @FactId RETURN;
+
+    SELECT @DateKeyColumn = c.name
+    FROM sys.index_columns AS ic
+    INNER JOIN sys.columns AS c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+    WHERE ic.object_id = @FactId AND ic.index_id = 1 AND ic.partition_ordinal = 1;
+
+    SELECT @Columns = STRING_AGG(CAST(QUOTENAME(name) AS NVARCHAR(MAX)), N', ') WITHIN GROUP (ORDER BY column_id)
+    FROM sys.columns
+    WHERE object_id = @FactId AND is_computed = 0;
+
+    DECLARE partition_cursor CURSOR LOCAL FAST_FORWARD FOR
+        SELECT partition_number, SUM(row_count)
+        FROM sys.dm_db_partition_stats
+        WHERE object_id = OBJECT_ID(@LoadTarget) AND index_id IN (0, 1)
+        GROUP BY partition_number
+        HAVING SUM(row_count) > 0;
+
+    OPEN partition_cursor;
+    FETCH NEXT FROM partition_cursor INTO @Partition, @Rows;
+    WHILE @@FETCH_STATUS = 0
+    BEGIN
+        IF EXISTS (SELECT 1 FROM sys.dm_db_partition_stats
+                   WHERE object_id = @FactId AND index_id IN (0, 1)
+                     AND partition_number = @Partition AND row_count > 0)
+        BEGIN
+            -- ماه جاری که قبلاً سطر دارد: درج حجیم فقط در همان partition
+            SET @Sql = CASE WHEN @HasIdentity = 1 THEN N'SET IDENTITY_INSERT ' + @FactTable + N' ON; ' ELSE N'' END +
+                       N'INSERT INTO ' + @FactTable + N' WITH (TABLOCK) (' + @Columns + N')
+                         SELECT ' + @Columns + N' FROM ' + @LoadTarget + N'
+                         WHERE $PARTITION.pf_DateKeyMonthly(' + QUOTENAME(@DateKeyColumn) + N') = @Partition; ' +
+                       CASE WHEN @HasIdentity = 1 THEN N'SET IDENTITY_INSERT ' + @FactTable + N' OFF;' ELSE N'' END;
+            EXEC sp_executesql @Sql, N'@Partition INT', @Partition;
+            SET @Inserted += @Rows;
+        END
+        ELSE
+        BEGIN
+            -- partition خالی: فقط metadata
+            SET @Sql = N'ALTER TABLE ' + @LoadTarget + N' SWITCH PARTITION @Partition TO ' + @FactTable + N' PARTITION @Partition;';
+            EXEC sp_executesql @Sql, N'@Partition INT', @Partition;
+            SET @Switched += 1;
+        END;
+        FETCH NEXT FROM partition_cursor INTO @Partition, @Rows;
+    END;
+    CLOSE partition_cursor;
+    DEALLOCATE partition_cursor;
+
+    SET @Sql = N'TRUNCATE TABLE ' + @LoadTarget + N';';
+    EXEC sp_executesql @Sql;
+
+    IF @HasIdentity = 1
+        DBCC CHECKIDENT (@FactTable, RESEED) WITH NO_INFOMSGS;
+END;
+GO
+
+
 --------------------------------------------------------------------------------
 -- 1) UpdateFactInvoiceLineTransactionIncremental
 --    Maintains Fact.FactInvoiceLineTransaction (Transaction Fact)
@@ -14,15 +119,23 @@ BEGIN
         @StepStart DATETIME,
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
-        @Inserted  INT;
+        @Inserted  INT,
+        @Switched  INT,
+        @RollupRows BIGINT,
+        @LastSourceID INT;
+    DECLARE @TouchedDates Agg.DateList;
 
     BEGIN TRY
         BEGIN TRAN;
 
         SET @StepStart = GETDATE();
+        -- واترمارک: بزرگ‌ترین InvoiceLineID بارگذاری‌شده (به جای NOT EXISTS روی کل Fact)
+        SELECT @LastSourceID = ISNULL(MAX(SourceInvoiceLineID), 0) FROM Fact.FactInvoiceLineTransaction;
+
+        EXEC Fact.PrepareFactLoad @FactTable = 'Fact.FactInvoiceLineTransaction';
 
-        -- Insert any invoice‐line rows in staging not yet in the fact
-        INSERT INTO Fact.FactInvoiceLineTransaction
+        -- Insert invoice‐line rows beyond the watermark; keys resolved through the integer key maps
+        INSERT INTO Fact.FactInvoiceLineTransaction_Load
         (
             DimInvoiceID,
             DimCustomerID,
@@ -33,11 +146,12 @@ BEGIN
             UnitPrice,
             DiscountPercent,
             NetAmount,
-            TaxAmount
+            TaxAmount,
+            SourceInvoiceLineID
         )
         SELECT
-            di.DimInvoiceID,
-            dc.DimCustomerID,
+            kmi.DimInvoiceID,
+            kmc.DimCustomerID,
             dst.DimServiceTypeID,
             dtax.DimTaxID,
             ddate.DimDateID,
@@ -45,29 +159,27 @@ BEGIN
             src.UnitPrice,
             ISNULL(src.DiscountPercent, 0),
             src.NetAmount,
-            src.TaxAmount
+            src.TaxAmount,
+            src.InvoiceLineID
         FROM StagingDB.Finance.InvoiceLine AS src
         INNER JOIN StagingDB.Finance.Invoice        AS inv  ON src.InvoiceID     = inv.InvoiceID
-        INNER JOIN Dim.DimInvoice                   AS di   ON inv.InvoiceNumber = di.InvoiceNumber
-        INNER JOIN StagingDB.Finance.Contract       AS ctr  ON inv.ContractID    = ctr.ContractID
-        INNER JOIN StagingDB.Finance.Customer       AS stc  ON ctr.CustomerID    = stc.CustomerID
-        INNER JOIN Dim.DimCustomer                  AS dc   ON stc.CustomerCode  = dc.CustomerCode
+        INNER JOIN Dim.KeyMapInvoice                AS kmi  ON src.InvoiceID     = kmi.InvoiceID
+        INNER JOIN Dim.KeyMapCustomer               AS kmc  ON kmi.CustomerID    = kmc.CustomerID
         INNER JOIN Dim.DimServiceType               AS dst  ON src.ServiceTypeID = dst.SourceServiceTypeID
         LEFT  JOIN Dim.DimTax                       AS dtax ON src.TaxID         = dtax.DimTaxID
         INNER JOIN Dim.DimDate                      AS ddate ON inv.InvoiceDate   = ddate.FullDate
-        WHERE NOT EXISTS
-        (
-            SELECT 1
-            FROM Fact.FactInvoiceLineTransaction AS f
-            WHERE f.DimInvoiceID     = di.DimInvoiceID
-              AND f.DimCustomerID    = dc.DimCustomerID
-              AND f.DimServiceTypeID = dst.DimServiceTypeID
-              AND f.Quantity         = src.Quantity
-              AND f.UnitPrice        = src.UnitPrice
-              AND f.NetAmount        = src.NetAmount
-        );
+        WHERE src.InvoiceLineID > @LastSourceID;
 
         SET @Inserted = @@ROWCOUNT;
+        EXEC Fact.SwitchInFactLoad @FactTable = 'Fact.FactInvoiceLineTransaction', @Switched = @Switched OUTPUT;
+
+        -- دوره‌های Rollup شامل روزهای سطرهای جدید دوباره تجمیع می‌شوند
+        INSERT INTO @TouchedDates (FullDate)
+        SELECT DISTINCT ddate.FullDate
+        FROM Fact.FactInvoiceLineTransaction AS f
+        INNER JOIN Dim.DimDate               AS ddate ON f.DimDateID = ddate.DimDateID
+        WHERE f.SourceInvoiceLineID > @LastSourceID;
+        EXEC Agg.RefreshRollups @FactTable = 'Fact.FactInvoiceLineTransaction', @Dates = @TouchedDates, @RowsWritten = @RollupRows OUTPUT;
         SET @StepEnd  = GETDATE();
 
         -- Log ETL activity
@@ -78,7 +190,7 @@ BEGIN
             'IncrementalInsert',
             @StepStart,
             @StepEnd,
-            CONCAT('Inserted ', @Inserted, ' new invoice‐line rows')
+            CONCAT('Inserted ', @Inserted, ' new invoice‐line rows after InvoiceLineID ', @LastSourceID, ', switched partitions=', @Switched, ', rollup rows=', @RollupRows)
         );
 
         COMMIT;
@@ -116,14 +228,18 @@ BEGIN
         @StepStart DATETIME,
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
-        @Inserted  INT;
+        @Inserted  INT,
+        @RollupRows BIGINT,
+        @LastSourceID INT;
+    DECLARE @TouchedDates Agg.DateList;
 
     BEGIN TRY
         BEGIN TRAN;
 
         SET @StepStart = GETDATE();
+        SELECT @LastSourceID = ISNULL(MAX(SourcePaymentID), 0) FROM Fact.FactCustomerPaymentTransaction;
 
-        -- Insert any payment rows in staging not yet in the fact
+        -- Insert payment rows beyond the watermark; keys resolved through the integer key maps
         INSERT INTO Fact.FactCustomerPaymentTransaction
         (
             DimPaymentMethodID,
@@ -134,37 +250,36 @@ BEGIN
             DaysToPayment,
             RemainingAmount,
             IsFullPayment,
-            PartialPaymentCount
+            PartialPaymentCount,
+            SourcePaymentID
         )
         SELECT
             dpm.DimPaymentMethodID,
-            di.DimInvoiceID,
-            dc.DimCustomerID,
+            kmi.DimInvoiceID,
+            kmc.DimCustomerID,
             ddate.DimDateID,
             src.Amount,
             DATEDIFF(DAY, inv.InvoiceDate, src.PaymentDate),
             inv.TotalAmount - src.Amount,
             CASE WHEN src.Amount >= inv.TotalAmount THEN 1 ELSE 0 END,
-            0
+            0,
+            src.PaymentID
         FROM StagingDB.Finance.Payment     AS src
         INNER JOIN StagingDB.Finance.Invoice AS inv  ON src.InvoiceID = inv.InvoiceID
-        INNER JOIN Dim.DimInvoice            AS di   ON inv.InvoiceNumber = di.InvoiceNumber
-        INNER JOIN StagingDB.Finance.Contract AS ctr ON inv.ContractID    = ctr.ContractID
-        INNER JOIN StagingDB.Finance.Customer AS stc  ON ctr.CustomerID    = stc.CustomerID
-        INNER JOIN Dim.DimCustomer           AS dc   ON stc.CustomerCode  = dc.CustomerCode
+        INNER JOIN Dim.KeyMapInvoice         AS kmi  ON src.InvoiceID = kmi.InvoiceID
+        INNER JOIN Dim.KeyMapCustomer        AS kmc  ON kmi.CustomerID = kmc.CustomerID
         INNER JOIN Dim.DimPaymentMethod      AS dpm  ON src.PaymentMethod = dpm.PaymentMethodName
         INNER JOIN Dim.DimDate               AS ddate ON src.PaymentDate    = ddate.FullDate
-        WHERE NOT EXISTS
-        (
-            SELECT 1
-            FROM Fact.FactCustomerPaymentTransaction AS f
-            WHERE f.DimInvoiceID   = di.DimInvoiceID
-              AND f.DimCustomerID  = dc.DimCustomerID
-              AND f.PaymentAmount  = src.Amount
-              AND f.DimDateID      = ddate.DimDateID
-        );
+        WHERE src.PaymentID > @LastSourceID;
 
         SET @Inserted = @@ROWCOUNT;
+
+        INSERT INTO @TouchedDates (FullDate)
+        SELECT DISTINCT ddate.FullDate
+        FROM Fact.FactCustomerPaymentTransaction AS f
+        INNER JOIN Dim.DimDate                   AS ddate ON f.DimDateID = ddate.DimDateID
+        WHERE f.SourcePaymentID > @LastSourceID;
+        EXEC Agg.RefreshRollups @FactTable = 'Fact.FactCustomerPaymentTransaction', @Dates = @TouchedDates, @RowsWritten = @RollupRows OUTPUT;
         SET @StepEnd  = GETDATE();
 
         -- Log ETL activity
@@ -175,7 +290,7 @@ BEGIN
             'IncrementalInsert',
             @StepStart,
             @StepEnd,
-            CONCAT('Inserted ', @Inserted, ' new payment rows')
+            CONCAT('Inserted ', @Inserted, ' new payment rows after PaymentID ', @LastSourceID, ', rollup rows=', @RollupRows)
         );
 
         COMMIT;
@@ -213,101 +328,180 @@ BEGIN
         @StepStart DATETIME,
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
-        @Inserted  INT;
+        @CurrentMonth  DATE = DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1),
+        @LastLineID    BIGINT,
+        @LastPaymentID BIGINT,
+        @MaxLineID     BIGINT,
+        @MaxPaymentID  BIGINT,
+        @Months    INT,
+        @Inserted  INT,
+        @Updated   INT,
+        @Deleted   INT;
+    DECLARE @Actions TABLE (MergeAction NVARCHAR(10));
 
     BEGIN TRY
         BEGIN TRAN;
 
         SET @StepStart = GETDATE();
 
+        -- 1) Watermarks: only lines/payments that arrived since the last run touch a month.
+        --    The upper bound is fixed up front so rows loaded into staging meanwhile wait for the next run.
+        SELECT
+            @LastLineID    = ISNULL(MAX(CASE WHEN SourceTable = 'Finance.InvoiceLine' THEN LastKey END), 0),
+            @LastPaymentID = ISNULL(MAX(CASE WHEN SourceTable = 'Finance.Payment'     THEN LastKey END), 0)
+        FROM Audit.DW_Watermark
+        WHERE ProcessName = @TableName;
+
+        SELECT @MaxLineID    = ISNULL(MAX(InvoiceLineID), @LastLineID)  FROM StagingDB.Finance.InvoiceLine;
+        SELECT @MaxPaymentID = ISNULL(MAX(PaymentID), @LastPaymentID)   FROM StagingDB.Finance.Payment;
+
+        -- 2) Months touched by new invoice lines, new payments (late payments reopen the invoice month)
+        --    and the open month; closed months without new activity are left alone.
+        SELECT tm.MonthStart, dd.DimDateID
+        INTO #TouchedMonths
+        FROM
+        (
+            SELECT DATEFROMPARTS(YEAR(inv.InvoiceDate), MONTH(inv.InvoiceDate), 1) AS MonthStart
+            FROM StagingDB.Finance.InvoiceLine   AS il
+            INNER JOIN StagingDB.Finance.Invoice AS inv ON il.InvoiceID = inv.InvoiceID
+            WHERE il.InvoiceLineID > @LastLineID AND il.InvoiceLineID <= @MaxLineID
+            UNION
+            SELECT DATEFROMPARTS(YEAR(inv.InvoiceDate), MONTH(inv.InvoiceDate), 1)
+            FROM StagingDB.Finance.Payment       AS pay
+            INNER JOIN StagingDB.Finance.Invoice AS inv ON pay.InvoiceID = inv.InvoiceID
+            WHERE pay.PaymentID > @LastPaymentID AND pay.PaymentID <= @MaxPaymentID
+            UNION
+            SELECT @CurrentMonth
+        ) AS tm
+        INNER JOIN Dim.DimDate AS dd ON dd.FullDate = tm.MonthStart;
+        SET @Months = @@ROWCOUNT;
+        CREATE UNIQUE CLUSTERED INDEX IX_TouchedMonths ON #TouchedMonths (MonthStart);
+
+        -- 3) Re-aggregate the touched months only
         WITH InvoiceAgg AS
         (
             SELECT
                 ctr.CustomerID,
-                DATEFROMPARTS(YEAR(inv.InvoiceDate), MONTH(inv.InvoiceDate), 1) AS SnapshotDate,
+                tm.MonthStart AS SnapshotDate,
                 COUNT(DISTINCT inv.InvoiceID)         AS TotalInvoiceCount,
                 SUM(il.NetAmount)                     AS TotalNetAmount,
                 SUM(il.TaxAmount)                     AS TotalTaxAmount,
                 SUM(il.Quantity * il.UnitPrice * ISNULL(il.DiscountPercent,0)) AS TotalDiscount
-            FROM StagingDB.Finance.InvoiceLine AS il
-            INNER JOIN StagingDB.Finance.Invoice     AS inv ON il.InvoiceID = inv.InvoiceID
+            FROM #TouchedMonths AS tm
+            INNER JOIN StagingDB.Finance.Invoice     AS inv ON inv.InvoiceDate >= tm.MonthStart
+                                                          AND inv.InvoiceDate <  DATEADD(MONTH, 1, tm.MonthStart)
+            INNER JOIN StagingDB.Finance.InvoiceLine AS il  ON il.InvoiceID = inv.InvoiceID
             INNER JOIN StagingDB.Finance.Contract    AS ctr ON inv.ContractID = ctr.ContractID
             GROUP BY
                 ctr.CustomerID,
-                DATEFROMPARTS(YEAR(inv.InvoiceDate), MONTH(inv.InvoiceDate), 1)
+                tm.MonthStart
         ),
         PaymentAgg AS
         (
             SELECT
                 ctr.CustomerID,
-                DATEFROMPARTS(YEAR(inv.InvoiceDate), MONTH(inv.InvoiceDate), 1) AS SnapshotDate,
+                tm.MonthStart AS SnapshotDate,
                 SUM(pay.Amount) AS TotalPaid,
                 AVG(DATEDIFF(DAY, inv.InvoiceDate, pay.PaymentDate)) AS AveragePaymentDelay
-            FROM StagingDB.Finance.Payment AS pay
-            INNER JOIN StagingDB.Finance.Invoice AS inv ON pay.InvoiceID = inv.InvoiceID
+            FROM #TouchedMonths AS tm
+            INNER JOIN StagingDB.Finance.Invoice  AS inv ON inv.InvoiceDate >= tm.MonthStart
+                                                       AND inv.InvoiceDate <  DATEADD(MONTH, 1, tm.MonthStart)
+            INNER JOIN StagingDB.Finance.Payment  AS pay ON pay.InvoiceID = inv.InvoiceID
             INNER JOIN StagingDB.Finance.Contract AS ctr ON inv.ContractID = ctr.ContractID
             GROUP BY
                 ctr.CustomerID,
-                DATEFROMPARTS(YEAR(inv.InvoiceDate), MONTH(inv.InvoiceDate), 1)
+                tm.MonthStart
         ),
-        OutstandingAgg AS
+        CustomerCycle AS
         (
-            SELECT
-                ia.CustomerID,
-                ia.SnapshotDate,
-                MAX(ia.TotalNetAmount + ia.TotalTaxAmount - ISNULL(pa.TotalPaid,0)) AS MaxOutstandingAmount
-            FROM InvoiceAgg AS ia
-            LEFT JOIN PaymentAgg AS pa
-              ON ia.CustomerID   = pa.CustomerID
-             AND ia.SnapshotDate = pa.SnapshotDate
-            GROUP BY
-                ia.CustomerID,
-                ia.SnapshotDate
-        )
-        -- Insert only new month‐snapshots
-        INSERT INTO Fact.FactCustomerBillingMonthlySnapshot
-        (
-            DimCustomerID,
-            DimDateID,
-            DimBillingCycleID,
-            TotalInvoiceCount,
-            TotalNetAmount,
-            TotalTaxAmount,
-            TotalDiscount,
-            TotalPaid,
-            AveragePaymentDelay,
-            MaxOutstandingAmount
+            -- چرخه صورتحساب آخرین قرارداد مشتری (یک سطر برای هر مشتری-ماه)
+            SELECT CustomerID, BillingCycleID
+            FROM
+            (
+                SELECT
+                    ctr.CustomerID,
+                    ctr.BillingCycleID,
+                    ROW_NUMBER() OVER (PARTITION BY ctr.CustomerID ORDER BY ctr.StartDate DESC, ctr.ContractID DESC) AS rn
+                FROM StagingDB.Finance.Contract AS ctr
+            ) AS c
+            WHERE c.rn = 1
         )
         SELECT
-            dc.DimCustomerID,
+            kmc.DimCustomerID,
             dd.DimDateID,
             bc.DimBillingCycleID,
             ia.TotalInvoiceCount,
             ia.TotalNetAmount,
             ia.TotalTaxAmount,
             ia.TotalDiscount,
-            ISNULL(pa.TotalPaid,0),
-            ISNULL(pa.AveragePaymentDelay,0),
-            oa.MaxOutstandingAmount
+            ISNULL(pa.TotalPaid,0)           AS TotalPaid,
+            ISNULL(pa.AveragePaymentDelay,0) AS AveragePaymentDelay,
+            ia.TotalNetAmount + ia.TotalTaxAmount - ISNULL(pa.TotalPaid,0) AS MaxOutstandingAmount
+        INTO #MonthlySnapshot
         FROM InvoiceAgg AS ia
-        INNER JOIN StagingDB.Finance.Contract       AS ctr ON ia.CustomerID = ctr.CustomerID
-        INNER JOIN StagingDB.Finance.Customer       AS stc ON ctr.CustomerID = stc.CustomerID
-        INNER JOIN Dim.DimCustomer                  AS dc  ON stc.CustomerCode = dc.CustomerCode
+        INNER JOIN Dim.KeyMapCustomer               AS kmc ON ia.CustomerID = kmc.CustomerID
         INNER JOIN Dim.DimDate                      AS dd  ON ia.SnapshotDate = dd.FullDate
-        INNER JOIN Dim.DimBillingCycle              AS bc  ON ctr.BillingCycleID = bc.DimBillingCycleID
+        INNER JOIN CustomerCycle                    AS cc  ON ia.CustomerID = cc.CustomerID
+        INNER JOIN Dim.DimBillingCycle              AS bc  ON cc.BillingCycleID = bc.DimBillingCycleID
         LEFT JOIN PaymentAgg                        AS pa  ON ia.CustomerID = pa.CustomerID
-                                                      AND ia.SnapshotDate = pa.SnapshotDate
-        LEFT JOIN OutstandingAgg                    AS oa  ON ia.CustomerID = oa.CustomerID
-                                                      AND ia.SnapshotDate = oa.SnapshotDate
-        WHERE NOT EXISTS
+                                                      AND ia.SnapshotDate = pa.SnapshotDate;
+
+        -- 4) Merge the recomputed months; the target is scoped to the touched months so that
+        --    closed months are never scanned, updated or deleted
+        WITH TouchedSnapshot AS
         (
-            SELECT 1
+            SELECT f.*
             FROM Fact.FactCustomerBillingMonthlySnapshot AS f
-            WHERE f.DimCustomerID = dc.DimCustomerID
-              AND f.DimDateID     = dd.DimDateID
-        );
+            WHERE f.DimDateID IN (SELECT DimDateID FROM #TouchedMonths)
+        )
+        MERGE TouchedSnapshot AS T
+        USING #MonthlySnapshot AS S
+            ON T.DimCustomerID = S.DimCustomerID
+           AND T.DimDateID     = S.DimDateID
+        WHEN MATCHED AND EXISTS
+        (
+            SELECT T.DimBillingCycleID, T.TotalInvoiceCount, T.TotalNetAmount, T.TotalTaxAmount, T.TotalDiscount,
+                   T.TotalPaid, T.AveragePaymentDelay, T.MaxOutstandingAmount
+            EXCEPT
+            SELECT S.DimBillingCycleID, S.TotalInvoiceCount, S.TotalNetAmount, S.TotalTaxAmount, S.TotalDiscount,
+                   S.TotalPaid, S.AveragePaymentDelay, S.MaxOutstandingAmount
+        ) THEN
+            UPDATE SET
+                T.DimBillingCycleID    = S.DimBillingCycleID,
+                T.TotalInvoiceCount    = S.TotalInvoiceCount,
+                T.TotalNetAmount       = S.TotalNetAmount,
+                T.TotalTaxAmount       = S.TotalTaxAmount,
+                T.TotalDiscount        = S.TotalDiscount,
+                T.TotalPaid            = S.TotalPaid,
+                T.AveragePaymentDelay  = S.AveragePaymentDelay,
+                T.MaxOutstandingAmount = S.MaxOutstandingAmount
+        WHEN NOT MATCHED BY TARGET THEN
+            INSERT
+            (
+                DimCustomerID, DimDateID, DimBillingCycleID,
+                TotalInvoiceCount, TotalNetAmount, TotalTaxAmount, TotalDiscount,
+                TotalPaid, AveragePaymentDelay, MaxOutstandingAmount
+            )
+            VALUES
+            (
+                S.DimCustomerID, S.DimDateID, S.DimBillingCycleID,
+                S.TotalInvoiceCount, S.TotalNetAmount, S.TotalTaxAmount, S.TotalDiscount,
+                S.TotalPaid, S.AveragePaymentDelay, S.MaxOutstandingAmount
+            )
+        WHEN NOT MATCHED BY SOURCE THEN
+            DELETE
+        OUTPUT $action INTO @Actions;
+
+        SELECT
+            @Inserted = COUNT(CASE WHEN MergeAction = 'INSERT' THEN 1 END),
+            @Updated  = COUNT(CASE WHEN MergeAction = 'UPDATE' THEN 1 END),
+            @Deleted  = COUNT(CASE WHEN MergeAction = 'DELETE' THEN 1 END)
+        FROM @Actions;
+
+        -- 5) Advance the watermarks
+        EXEC Audit.SetDWWatermark @ProcessName = @TableName, @SourceTable = 'Finance.InvoiceLine', @LastKey = @MaxLineID;
+        EXEC Audit.SetDWWatermark @ProcessName = @TableName, @SourceTable = 'Finance.Payment',     @LastKey = @MaxPaymentID;
 
-        SET @Inserted = @@ROWCOUNT;
         SET @StepEnd  = GETDATE();
 
         -- Log ETL activity
@@ -315,16 +509,21 @@ BEGIN
         VALUES
         (
             @TableName,
-            'IncrementalInsert',
+            'IncrementalMerge',
             @StepStart,
             @StepEnd,
-            CONCAT('Inserted ', @Inserted, ' new monthly snapshots')
+            CONCAT('Merged ', @Inserted + @Updated + @Deleted, ' monthly snapshots (inserted ', @Inserted,
+                   ', updated ', @Updated, ', deleted ', @Deleted, ') over ', @Months, ' month(s)')
         );
 
         COMMIT;
+        DROP TABLE #TouchedMonths;
+        DROP TABLE #MonthlySnapshot;
     END TRY
     BEGIN CATCH
         IF XACT_STATE() <> 0 ROLLBACK;
+        IF OBJECT_ID('tempdb..#TouchedMonths') IS NOT NULL DROP TABLE #TouchedMonths;
+        IF OBJECT_ID('tempdb..#MonthlySnapshot') IS NOT NULL DROP TABLE #MonthlySnapshot;
         SET @StepEnd = GETDATE();
         SET @Message = ERROR_MESSAGE();
 
@@ -619,6 +818,7 @@ BEGIN
     DECLARE @Message NVARCHAR(MAX);
     DECLARE @LastLoadDate DATE = (SELECT LastLoadDate FROM Audit.ETL_Control WHERE ProcessName = 'FactTables');
     DECLARE @EndDate DATE = CONVERT(DATE, GETDATE());
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         -- Step 1: Select only the new records into a temp table for fast processing.
@@ -627,7 +827,14 @@ BEGIN
         FROM StagingDB.HumanResources.Termination
         WHERE TerminationDate > @LastLoadDate AND TerminationDate < @EndDate;
 
-        -- Step 2: Insert into the fact table by joining the small temp table with dimensions.
+        -- Step 2: Employment-history ranges of these employees, indexed for a single range join.
+        SELECT m.*
+        INTO #HistoryMap
+        FROM Dim.fn_EmploymentHistoryRanges() m
+        WHERE m.EmployeeID IN (SELECT EmployeeID FROM #NewTerminations);
+        CREATE CLUSTERED INDEX IX_HistoryMap ON #HistoryMap (EmployeeID, ValidFrom);
+
+        -- Step 3: Insert into the fact table by joining the small temp tables with dimensions.
         INSERT INTO Fact.FactTermination (
             TerminationDateKey, EmployeeKey, DepartmentKey, JobTitleKey,
             TerminationReasonKey, TenureInDays, TenureInMonths, SalaryAtTermination, IsVoluntary
@@ -645,25 +852,25 @@ BEGIN
         FROM #NewTerminations t
         INNER JOIN Dim.DimDate dd ON t.TerminationDate = dd.FullDate
         INNER JOIN Dim.DimEmployee de ON t.EmployeeID = de.EmployeeID AND t.TerminationDate BETWEEN de.StartDate AND ISNULL(de.EndDate, '9999-12-31')
-        OUTER APPLY (
-            SELECT TOP 1 eh.DepartmentID, eh.JobTitleID, eh.Salary
-            FROM StagingDB.HumanResources.EmploymentHistory eh
-            WHERE eh.EmployeeID = t.EmployeeID AND eh.StartDate <= t.TerminationDate
-            ORDER BY eh.StartDate DESC, eh.EmploymentHistoryID DESC
-        ) AS last_eh
+        LEFT JOIN #HistoryMap last_eh
+            ON last_eh.EmployeeID = t.EmployeeID
+           AND t.TerminationDate >= last_eh.ValidFrom AND t.TerminationDate < last_eh.ValidTo
         LEFT JOIN (SELECT EmployeeID, MIN(StartDate) as FirstHireDate FROM StagingDB.HumanResources.EmploymentHistory GROUP BY EmployeeID) efh ON t.EmployeeID = efh.EmployeeID
         LEFT JOIN Dim.DimDepartment d ON last_eh.DepartmentID = d.DepartmentID
         LEFT JOIN Dim.DimJobTitle jt ON last_eh.JobTitleID = jt.JobTitleID
         LEFT JOIN Dim.DimTerminationReason dtr ON t.TerminationReason = dtr.TerminationReason;
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'FactTermination incremental load completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
 
         DROP TABLE #NewTerminations;
+        DROP TABLE #HistoryMap;
     END TRY
     BEGIN CATCH
         IF OBJECT_ID('tempdb..#NewTerminations') IS NOT NULL DROP TABLE #NewTerminations;
+        IF OBJECT_ID('tempdb..#HistoryMap') IS NOT NULL DROP TABLE #HistoryMap;
         SET @Message = ERROR_MESSAGE();
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, Status, [Message])
         VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), 'Failed', @Message);
@@ -683,15 +890,24 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Fact.FactSalaryPayment';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @Inserted INT;
     DECLARE @EmployerContributionRate DECIMAL(5, 2) = 0.23;
     DECLARE @LastLoadDate DATE = (SELECT LastLoadDate FROM Audit.ETL_Control WHERE ProcessName = 'FactTables');
     DECLARE @EndDate DATE = CONVERT(DATE, GETDATE());
+    DECLARE @TouchedDates Agg.DateList;
 
     BEGIN TRY
         SELECT * INTO #NewPayments FROM StagingDB.HumanResources.SalaryPayment
         WHERE PaymentDate > @LastLoadDate AND PaymentDate < @EndDate;
 
-        INSERT INTO Fact.FactSalaryPayment (
+        SELECT m.*
+        INTO #HistoryMap
+        FROM Dim.fn_EmploymentHistoryRanges() m
+        WHERE m.EmployeeID IN (SELECT EmployeeID FROM #NewPayments);
+        CREATE CLUSTERED INDEX IX_HistoryMap ON #HistoryMap (EmployeeID, ValidFrom);
+
+        EXEC Fact.PrepareFactLoad @FactTable = 'Fact.FactSalaryPayment';
+        INSERT INTO Fact.FactSalaryPayment_Load (
             PaymentDateKey, EmployeeKey, DepartmentKey, JobTitleKey,
             GrossPayAmount, BaseAmount, BonusAmount, DeductionsAmount, NetAmount, SalaryCostToCompany
         )
@@ -703,23 +919,27 @@ BEGIN
         FROM #NewPayments sp
         INNER JOIN Dim.DimDate dd ON sp.PaymentDate = dd.FullDate
         INNER JOIN Dim.DimEmployee de ON sp.EmployeeID = de.EmployeeID AND sp.PaymentDate BETWEEN de.StartDate AND ISNULL(de.EndDate, '9999-12-31')
-        OUTER APPLY (
-            SELECT TOP 1 eh.DepartmentID, eh.JobTitleID
-            FROM StagingDB.HumanResources.EmploymentHistory eh
-            WHERE eh.EmployeeID = sp.EmployeeID AND eh.StartDate <= sp.PaymentDate
-            ORDER BY eh.StartDate DESC, eh.EmploymentHistoryID DESC
-        ) AS last_eh
+        LEFT JOIN #HistoryMap last_eh
+            ON last_eh.EmployeeID = sp.EmployeeID
+           AND sp.PaymentDate >= last_eh.ValidFrom AND sp.PaymentDate < last_eh.ValidTo
         LEFT JOIN Dim.DimDepartment d ON last_eh.DepartmentID = d.DepartmentID
         LEFT JOIN Dim.DimJobTitle jt ON last_eh.JobTitleID = jt.JobTitleID;
+        SET @Inserted = @@ROWCOUNT;
+        EXEC Fact.SwitchInFactLoad @FactTable = 'Fact.FactSalaryPayment';
+
+        INSERT INTO @TouchedDates (FullDate) SELECT DISTINCT PaymentDate FROM #NewPayments;
+        EXEC Agg.RefreshRollups @FactTable = @TargetTable, @Dates = @TouchedDates;
 
         SET @Message = 'FactSalaryPayment incremental load completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @Inserted, 'Success', @Message);
 
         DROP TABLE #NewPayments;
+        DROP TABLE #HistoryMap;
     END TRY
     BEGIN CATCH
         IF OBJECT_ID('tempdb..#NewPayments') IS NOT NULL DROP TABLE #NewPayments;
+        IF OBJECT_ID('tempdb..#HistoryMap') IS NOT NULL DROP TABLE #HistoryMap;
         SET @Message = ERROR_MESSAGE();
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, Status, [Message])
         VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), 'Failed', @Message);
@@ -739,32 +959,46 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Fact.FactEmployeeAttendance';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @Inserted INT;
     DECLARE @LastLoadDate DATE = (SELECT LastLoadDate FROM Audit.ETL_Control WHERE ProcessName = 'FactTables');
     DECLARE @EndDate DATE = CONVERT(DATE, GETDATE());
+    DECLARE @TouchedDates Agg.DateList;
 
     BEGIN TRY
         SELECT * INTO #NewAttendance FROM StagingDB.HumanResources.Attendance
         WHERE AttendanceDate > @LastLoadDate AND AttendanceDate < @EndDate;
-        
-        INSERT INTO Fact.FactEmployeeAttendance (AttendanceDateKey, EmployeeKey, AttendanceStatus)
+
+        -- SCD2 key map of these employees: one range join instead of a TOP 1 seek per row
+        SELECT m.*
+        INTO #EmployeeKeyMap
+        FROM Dim.fn_EmployeeKeyRanges() m
+        WHERE m.EmployeeID IN (SELECT EmployeeID FROM #NewAttendance);
+        CREATE CLUSTERED INDEX IX_EmployeeKeyMap ON #EmployeeKeyMap (EmployeeID, ValidFrom);
+
+        EXEC Fact.PrepareFactLoad @FactTable = 'Fact.FactEmployeeAttendance';
+        INSERT INTO Fact.FactEmployeeAttendance_Load (AttendanceDateKey, EmployeeKey, AttendanceStatus)
         SELECT dd.DateKey, ISNULL(last_known_employee.EmployeeKey, -1), a.Status
         FROM #NewAttendance a
         INNER JOIN Dim.DimDate dd ON a.AttendanceDate = dd.FullDate
-        OUTER APPLY (
-            SELECT TOP 1 de.EmployeeKey
-            FROM Dim.DimEmployee de
-            WHERE de.EmployeeID = a.EmployeeID AND de.StartDate <= a.AttendanceDate
-            ORDER BY de.StartDate DESC, de.EmployeeKey DESC
-        ) AS last_known_employee;
+        LEFT JOIN #EmployeeKeyMap last_known_employee
+            ON last_known_employee.EmployeeID = a.EmployeeID
+           AND a.AttendanceDate >= last_known_employee.ValidFrom AND a.AttendanceDate < last_known_employee.ValidTo;
+        SET @Inserted = @@ROWCOUNT;
+        EXEC Fact.SwitchInFactLoad @FactTable = 'Fact.FactEmployeeAttendance';
+
+        INSERT INTO @TouchedDates (FullDate) SELECT DISTINCT AttendanceDate FROM #NewAttendance;
+        EXEC Agg.RefreshRollups @FactTable = @TargetTable, @Dates = @TouchedDates;
 
         SET @Message = 'FactEmployeeAttendance incremental load completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @Inserted, 'Success', @Message);
 
         DROP TABLE #NewAttendance;
+        DROP TABLE #EmployeeKeyMap;
     END TRY
     BEGIN CATCH
         IF OBJECT_ID('tempdb..#NewAttendance') IS NOT NULL DROP TABLE #NewAttendance;
+        IF OBJECT_ID('tempdb..#EmployeeKeyMap') IS NOT NULL DROP TABLE #EmployeeKeyMap;
         SET @Message = ERROR_MESSAGE();
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, Status, [Message])
         VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), 'Failed', @Message);
@@ -785,11 +1019,25 @@ BEGIN
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
     DECLARE @FirstDayOfCurrentMonth DATE = DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         DELETE FROM Fact.FactMonthlyEmployeePerformance
         WHERE MonthDateKey >= (SELECT MIN(DateKey) FROM Dim.DimDate WHERE FullDate >= @FirstDayOfCurrentMonth);
 
+        SELECT DISTINCT EmployeeID
+        INTO #MonthEmployees
+        FROM StagingDB.HumanResources.Attendance
+        WHERE AttendanceDate >= @FirstDayOfCurrentMonth;
+
+        SELECT m.* INTO #EmployeeKeyMap FROM Dim.fn_EmployeeKeyRanges() m
+        WHERE m.EmployeeID IN (SELECT EmployeeID FROM #MonthEmployees);
+        CREATE CLUSTERED INDEX IX_EmployeeKeyMap ON #EmployeeKeyMap (EmployeeID, ValidFrom);
+
+        SELECT m.* INTO #HistoryMap FROM Dim.fn_EmploymentHistoryRanges() m
+        WHERE m.EmployeeID IN (SELECT EmployeeID FROM #MonthEmployees);
+        CREATE CLUSTERED INDEX IX_HistoryMap ON #HistoryMap (EmployeeID, ValidFrom);
+
         ;WITH MonthlyMetrics AS (
             SELECT EOMONTH(a.AttendanceDate) AS MonthEndDate, a.EmployeeID,
                 SUM(ISNULL(a.HoursWorked, 0)) AS TotalHours, AVG(ISNULL(a.HoursWorked, 0)) AS AvgHours,
@@ -812,21 +1060,27 @@ BEGIN
             CASE WHEN m.TotalHours > 0 THEN (m.TotalHours - (m.WorkDays * 8.0)) / m.TotalHours ELSE 0 END
         FROM MonthlyMetrics m
         INNER JOIN Dim.DimDate dd ON m.MonthEndDate = dd.FullDate
-        OUTER APPLY (
-            SELECT TOP 1 de.EmployeeKey FROM Dim.DimEmployee de
-            WHERE de.EmployeeID = m.EmployeeID AND de.StartDate <= m.MonthEndDate ORDER BY de.StartDate DESC
-        ) AS de
-        OUTER APPLY (
-            SELECT TOP 1 eh.DepartmentID FROM StagingDB.HumanResources.EmploymentHistory eh
-            WHERE eh.EmployeeID = m.EmployeeID AND eh.StartDate <= m.MonthEndDate ORDER BY eh.StartDate DESC
-        ) AS last_eh
+        LEFT JOIN #EmployeeKeyMap de
+            ON de.EmployeeID = m.EmployeeID
+           AND m.MonthEndDate >= de.ValidFrom AND m.MonthEndDate < de.ValidTo
+        LEFT JOIN #HistoryMap last_eh
+            ON last_eh.EmployeeID = m.EmployeeID
+           AND m.MonthEndDate >= last_eh.ValidFrom AND m.MonthEndDate < last_eh.ValidTo
         LEFT JOIN Dim.DimDepartment d ON last_eh.DepartmentID = d.DepartmentID;
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'FactMonthlyEmployeePerformance update completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsUpdated, Status, [Message])
-        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
+
+        DROP TABLE #MonthEmployees;
+        DROP TABLE #EmployeeKeyMap;
+        DROP TABLE #HistoryMap;
     END TRY
     BEGIN CATCH
+        IF OBJECT_ID('tempdb..#MonthEmployees') IS NOT NULL DROP TABLE #MonthEmployees;
+        IF OBJECT_ID('tempdb..#EmployeeKeyMap') IS NOT NULL DROP TABLE #EmployeeKeyMap;
+        IF OBJECT_ID('tempdb..#HistoryMap') IS NOT NULL DROP TABLE #HistoryMap;
         SET @Message = ERROR_MESSAGE();
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, Status, [Message])
         VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), 'Failed', @Message);
@@ -859,6 +1113,10 @@ BEGIN
         );
         SET @RecordsInserted = @@ROWCOUNT;
 
+        SELECT m.* INTO #HistoryMap FROM Dim.fn_EmploymentHistoryRanges() m
+        WHERE m.EmployeeID IN (SELECT EmployeeID FROM StagingDB.HumanResources.Termination);
+        CREATE CLUSTERED INDEX IX_HistoryMap ON #HistoryMap (EmployeeID, ValidFrom);
+
         UPDATE fel
         SET 
             fel.TerminationDateKey = ISNULL(dd.DateKey, -1),
@@ -871,10 +1129,9 @@ BEGIN
         JOIN StagingDB.HumanResources.Termination t ON de.EmployeeID = t.EmployeeID
         LEFT JOIN Dim.DimDate dd ON t.TerminationDate = dd.FullDate
         LEFT JOIN Dim.DimTerminationReason dtr ON t.TerminationReason = dtr.TerminationReason
-        OUTER APPLY (
-            SELECT TOP 1 eh.Salary FROM StagingDB.HumanResources.EmploymentHistory eh
-            WHERE eh.EmployeeID = t.EmployeeID AND eh.StartDate <= t.TerminationDate ORDER BY eh.StartDate DESC
-        ) AS last_eh
+        LEFT JOIN #HistoryMap last_eh
+            ON last_eh.EmployeeID = t.EmployeeID
+           AND t.TerminationDate >= last_eh.ValidFrom AND t.TerminationDate < last_eh.ValidTo
         WHERE fel.TerminationDateKey IS NULL;
         SET @RecordsUpdated = @RecordsUpdated + @@ROWCOUNT;
 
@@ -896,8 +1153,11 @@ BEGIN
         SET @Message = 'FactEmployeeLifecycle update completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, RecordsUpdated, Status, [Message])
         VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), @RecordsInserted, @RecordsUpdated, 'Success', @Message);
+
+        DROP TABLE #HistoryMap;
     END TRY
     BEGIN CATCH
+        IF OBJECT_ID('tempdb..#HistoryMap') IS NOT NULL DROP TABLE #HistoryMap;
         SET @Message = ERROR_MESSAGE();
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, Status, [Message])
         VALUES (@ProcessName, 'Incremental Load', @TargetTable, @StartTime, GETDATE(), 'Failed', @Message);
@@ -919,13 +1179,16 @@ BEGIN
     SET NOCOUNT, XACT_ABORT ON;
     DECLARE
       @StepStart DATETIME,
-      @StepEnd   DATETIME;
+      @StepEnd   DATETIME,
+      @Inserted  INT,
+      @Switched  INT;
 
     BEGIN TRY
       BEGIN TRAN;
       SET @StepStart = GETDATE();
+      EXEC Fact.PrepareFactLoad @FactTable = 'Fact.FactCargoOperationTransactional';
 
-      INSERT INTO Fact.FactCargoOperationTransactional
+      INSERT INTO Fact.FactCargoOperationTransactional_Load
       (
         DateKey, FullDate, ShipSK, PortSK, ContainerSK,
         EquipmentSK, EmployeeSK, OperationType,
@@ -965,6 +1228,8 @@ BEGIN
           AND f.PortSK      = dp.PortSK
           AND f.ContainerSK = dc.ContainerSK
       );
+      SET @Inserted = @@ROWCOUNT;
+      EXEC Fact.SwitchInFactLoad @FactTable = 'Fact.FactCargoOperationTransactional', @Switched = @Switched OUTPUT;
 
       SET @StepEnd = GETDATE();
       INSERT INTO dbo.ETLLog
@@ -975,7 +1240,7 @@ BEGIN
         'IncrementalInsert',
         @StepStart,
         @StepEnd,
-        CONCAT('Inserted ', @@ROWCOUNT, ' new cargo‐operations')
+        CONCAT('Inserted ', @Inserted, ' new cargo‐operations', ', switched partitions=', @Switched)
       );
 
       COMMIT;
@@ -1011,7 +1276,8 @@ BEGIN
     DECLARE
       @TableName NVARCHAR(128) = 'Fact.FactEquipmentAssignment',
       @StepStart DATETIME,
-      @StepEnd   DATETIME;
+      @StepEnd   DATETIME,
+      @RowCount  INT;
 
     BEGIN TRY
       BEGIN TRAN;
@@ -1057,6 +1323,7 @@ BEGIN
           AND f.PortSK          = dp.PortSK
           AND f.ContainerTypeID = c.ContainerTypeID
       );
+      SET @RowCount = @@ROWCOUNT;
 
       SET @StepEnd = GETDATE();
       INSERT INTO dbo.ETLLog
@@ -1067,7 +1334,7 @@ BEGIN
         'IncrementalInsert',
         @StepStart,
         @StepEnd,
-        CONCAT('Inserted ', @@ROWCOUNT, ' new equipment‐assignments')
+        CONCAT('Inserted ', @RowCount, ' new equipment‐assignments')
       );
 
       COMMIT;
@@ -1093,37 +1360,141 @@ GO
 
 
 /*------------------------------------------------------------------------------
-  3) UpdateFactContainerMovementsAcc (Aggregate full‐reload)
+  3) UpdateFactContainerMovementsAcc (Aggregate incremental merge)
+     CargoOperationهای جدید (CargoOpID بعد از watermark) به صورت delta جمع‌پذیر با MERGE
+     به جمع‌های (PortSK, ContainerTypeID) اضافه می‌شوند؛ هزینه اجرای شبانه O(delta) است.
+     تغییر سطرهای قدیمی (Quantity، نوع کانتینر، بندر PortCall) و سطرهای دیررس با شناسه
+     کوچک‌تر از watermark در delta دیده نمی‌شوند؛ بازسازی کامل دوره‌ای (@RebuildEveryDays
+     یا @FullRebuild = 1) این drift را اصلاح و تعداد سطرهای اصلاح‌شده را در ETLLog ثبت می‌کند.
 ------------------------------------------------------------------------------*/
 CREATE OR ALTER PROCEDURE Fact.UpdateFactContainerMovementsAcc
+    @FullRebuild      BIT = 0,   -- 1: بازسازی کامل از همه CargoOperationهای staging
+    @RebuildEveryDays INT = 7    -- بازسازی خودکار وقتی آخرین بازسازی قدیمی‌تر باشد (0 = هرگز)
 AS
 BEGIN
     SET NOCOUNT, XACT_ABORT ON;
     DECLARE
-      @TableName NVARCHAR(128) = 'Fact.FactContainerMovementsAcc',
-      @StepStart DATETIME,
-      @StepEnd   DATETIME;
+      @TableName   NVARCHAR(128) = 'Fact.FactContainerMovementsAcc',
+      @StepStart   DATETIME,
+      @StepEnd     DATETIME,
+      @LastOpID    BIGINT,
+      @MaxOpID     BIGINT,
+      @LastRebuild DATETIME,
+      @DeltaOps    INT,
+      @Inserted    INT,
+      @Updated     INT,
+      @Deleted     INT;
+    DECLARE @Actions TABLE (MergeAction NVARCHAR(10));
 
     BEGIN TRY
       BEGIN TRAN;
       SET @StepStart = GETDATE();
 
-      TRUNCATE TABLE Fact.FactContainerMovementsAcc;
+      -- 1) Watermark (آخرین CargoOpID اعمال‌شده) و زمان آخرین بازسازی کامل.
+      --    مرز بالا از ابتدا ثابت می‌شود تا سطرهایی که در این فاصله به staging می‌رسند برای اجرای بعد بمانند.
+      SELECT
+        @LastOpID    = MAX(CASE WHEN SourceTable = 'PortOperations.CargoOperation' THEN LastKey END),
+        @LastRebuild = MAX(CASE WHEN SourceTable = 'FullRebuild' THEN LastRunTime END)
+      FROM Audit.DW_Watermark
+      WHERE ProcessName = @TableName;
+
+      SELECT @MaxOpID = ISNULL(MAX(CargoOpID), ISNULL(@LastOpID, 0)) FROM StagingDB.PortOperations.CargoOperation;
+
+      -- بدون watermark، بعد از خالی شدن جدول (مثلاً Wrapper بارگذاری اولیه Dimها) یا در موعد بازسازی دوره‌ای
+      IF @LastOpID IS NULL
+         OR NOT EXISTS (SELECT 1 FROM Fact.FactContainerMovementsAcc)
+         OR (@RebuildEveryDays > 0 AND (@LastRebuild IS NULL OR @LastRebuild < DATEADD(DAY, -@RebuildEveryDays, GETDATE())))
+        SET @FullRebuild = 1;
+
+      IF @FullRebuild = 1
+      BEGIN
+        -- 2a) بازسازی کامل: جمع همه CargoOperationها تا @MaxOpID
+        SELECT
+          dp.PortSK,
+          cty.ContainerTypeID,
+          SUM(CASE WHEN co.OperationType='LOAD'   THEN co.Quantity ELSE 0 END) AS TotalLoads,
+          SUM(CASE WHEN co.OperationType='UNLOAD' THEN co.Quantity ELSE 0 END) AS TotalUnloads,
+          SUM(co.Quantity)                                                     AS TotalTEU
+        INTO #Full
+        FROM StagingDB.PortOperations.CargoOperation AS co
+        JOIN StagingDB.PortOperations.PortCall       AS pc  ON co.PortCallID = pc.PortCallID
+        JOIN Dim.DimPort                             AS dp  ON pc.PortID = dp.PortID
+        JOIN StagingDB.PortOperations.Container      AS c   ON co.ContainerID = c.ContainerID
+        JOIN StagingDB.PortOperations.ContainerType  AS cty ON c.ContainerTypeID = cty.ContainerTypeID
+        WHERE co.CargoOpID <= @MaxOpID
+        GROUP BY dp.PortSK, cty.ContainerTypeID;
+
+        -- MERGE به جای TRUNCATE تا AggregateSK سطرهای بدون تغییر ثابت بماند؛ تعداد سطرهای
+        -- درج/به‌روزرسانی/حذف‌شده همان drift جدول نسبت به داده staging است
+        MERGE Fact.FactContainerMovementsAcc AS T
+        USING #Full AS S
+          ON T.PortSK = S.PortSK AND T.ContainerTypeID = S.ContainerTypeID
+        WHEN MATCHED AND EXISTS
+        (
+          SELECT T.TotalLoads, T.TotalUnloads, T.TotalTEU
+          EXCEPT
+          SELECT S.TotalLoads, S.TotalUnloads, S.TotalTEU
+        ) THEN
+          UPDATE SET
+            T.TotalLoads   = S.TotalLoads,
+            T.TotalUnloads = S.TotalUnloads,
+            T.TotalTEU     = S.TotalTEU
+        WHEN NOT MATCHED BY TARGET THEN
+          INSERT (PortSK, ContainerTypeID, TotalLoads, TotalUnloads, TotalTEU)
+          VALUES (S.PortSK, S.ContainerTypeID, S.TotalLoads, S.TotalUnloads, S.TotalTEU)
+        WHEN NOT MATCHED BY SOURCE THEN
+          DELETE
+        OUTPUT $action INTO @Actions;
+
+        EXEC Audit.SetDWWatermark @ProcessName = @TableName, @SourceTable = 'FullRebuild', @LastKey = @MaxOpID;
+      END
+      ELSE
+      BEGIN
+        -- 2b) Delta: فقط CargoOperationهای (@LastOpID, @MaxOpID] (seek روی IX_CO_CargoOpID)
+        SELECT
+          dp.PortSK,
+          cty.ContainerTypeID,
+          SUM(CASE WHEN co.OperationType='LOAD'   THEN co.Quantity ELSE 0 END) AS TotalLoads,
+          SUM(CASE WHEN co.OperationType='UNLOAD' THEN co.Quantity ELSE 0 END) AS TotalUnloads,
+          SUM(co.Quantity)                                                     AS TotalTEU,
+          COUNT(*)                                                             AS Ops
+        INTO #Delta
+        FROM StagingDB.PortOperations.CargoOperation AS co
+        JOIN StagingDB.PortOperations.PortCall       AS pc  ON co.PortCallID = pc.PortCallID
+        JOIN Dim.DimPort                             AS dp  ON pc.PortID = dp.PortID
+        JOIN StagingDB.PortOperations.Container      AS c   ON co.ContainerID = c.ContainerID
+        JOIN StagingDB.PortOperations.ContainerType  AS cty ON c.ContainerTypeID = cty.ContainerTypeID
+        WHERE co.CargoOpID > @LastOpID AND co.CargoOpID <= @MaxOpID
+        GROUP BY dp.PortSK, cty.ContainerTypeID;
+
+        SELECT @DeltaOps = ISNULL(SUM(Ops), 0) FROM #Delta;
+
+        -- جمع‌های جمع‌پذیر: مقدار delta به مقدار فعلی اضافه می‌شود (SUM روی مجموعه خالی NULL است)
+        MERGE Fact.FactContainerMovementsAcc AS T
+        USING #Delta AS S
+          ON T.PortSK = S.PortSK AND T.ContainerTypeID = S.ContainerTypeID
+        WHEN MATCHED THEN
+          UPDATE SET
+            T.TotalLoads   = CASE WHEN T.TotalLoads   IS NULL AND S.TotalLoads   IS NULL THEN NULL
+                                  ELSE ISNULL(T.TotalLoads, 0)   + ISNULL(S.TotalLoads, 0)   END,
+            T.TotalUnloads = CASE WHEN T.TotalUnloads IS NULL AND S.TotalUnloads IS NULL THEN NULL
+                                  ELSE ISNULL(T.TotalUnloads, 0) + ISNULL(S.TotalUnloads, 0) END,
+            T.TotalTEU     = CASE WHEN T.TotalTEU     IS NULL AND S.TotalTEU     IS NULL THEN NULL
+                                  ELSE ISNULL(T.TotalTEU, 0)     + ISNULL(S.TotalTEU, 0)     END
+        WHEN NOT MATCHED BY TARGET THEN
+          INSERT (PortSK, ContainerTypeID, TotalLoads, TotalUnloads, TotalTEU)
+          VALUES (S.PortSK, S.ContainerTypeID, S.TotalLoads, S.TotalUnloads, S.TotalTEU)
+        OUTPUT $action INTO @Actions;
+      END;
 
-      INSERT INTO Fact.FactContainerMovementsAcc
-      (PortSK, ContainerTypeID, TotalLoads, TotalUnloads, TotalTEU)
       SELECT
-        dp.PortSK,
-        cty.ContainerTypeID,
-        SUM(CASE WHEN co.OperationType='LOAD'   THEN co.Quantity ELSE 0 END),
-        SUM(CASE WHEN co.OperationType='UNLOAD' THEN co.Quantity ELSE 0 END),
-        SUM(co.Quantity)
-      FROM StagingDB.PortOperations.CargoOperation AS co
-      JOIN StagingDB.PortOperations.PortCall       AS pc  ON co.PortCallID = pc.PortCallID
-      JOIN Dim.DimPort                             AS dp  ON pc.PortID = dp.PortID
-      JOIN StagingDB.PortOperations.Container      AS c   ON co.ContainerID = c.ContainerID
-      JOIN StagingDB.PortOperations.ContainerType  AS cty ON c.ContainerTypeID = cty.ContainerTypeID
-      GROUP BY dp.PortSK, cty.ContainerTypeID;
+        @Inserted = COUNT(CASE WHEN MergeAction = 'INSERT' THEN 1 END),
+        @Updated  = COUNT(CASE WHEN MergeAction = 'UPDATE' THEN 1 END),
+        @Deleted  = COUNT(CASE WHEN MergeAction = 'DELETE' THEN 1 END)
+      FROM @Actions;
+
+      -- 3) پیش بردن watermark
+      EXEC Audit.SetDWWatermark @ProcessName = @TableName, @SourceTable = 'PortOperations.CargoOperation', @LastKey = @MaxOpID;
 
       SET @StepEnd = GETDATE();
       INSERT INTO dbo.ETLLog
@@ -1131,10 +1502,17 @@ BEGIN
       VALUES
       (
         @TableName,
-        'Rebuild',
+        CASE WHEN @FullRebuild = 1 THEN 'Rebuild' ELSE 'IncrementalMerge' END,
         @StepStart,
         @StepEnd,
-        CONCAT('Rebuilt container‐movements aggregate: ', @@ROWCOUNT, ' rows')
+        CASE WHEN @FullRebuild = 1
+             THEN CONCAT('Rebuilt container-movements aggregate: ', @Inserted + @Updated + @Deleted,
+                         ' rows corrected (inserted ', @Inserted, ', updated ', @Updated, ', deleted ', @Deleted,
+                         ') up to CargoOpID ', @MaxOpID)
+             ELSE CONCAT('Merged ', @Inserted + @Updated, ' container-movement aggregates (inserted ', @Inserted,
+                         ', updated ', @Updated, ') from ', @DeltaOps, ' new cargo operations (CargoOpID ',
+                         @LastOpID, ' -> ', @MaxOpID, ')')
+        END
       );
 
       COMMIT;
@@ -1168,7 +1546,8 @@ BEGIN
     DECLARE
       @TableName   NVARCHAR(128) = 'Fact.FactPortCallPeriodicSnapshot',
       @StepStart   DATETIME,
-      @StepEnd     DATETIME;
+      @StepEnd     DATETIME,
+      @RowCount    INT;
 
     BEGIN TRY
       BEGIN TRAN;
@@ -1195,6 +1574,7 @@ BEGIN
       LEFT JOIN StagingDB.PortOperations.CargoOperation     AS co ON pc.PortCallID = co.PortCallID
       WHERE dd.DimDateID > @LastDateKey
       GROUP BY dd.DimDateID, pc.PortCallID, pc.VoyageID, dp.PortSK, pc.Status;
+      SET @RowCount = @@ROWCOUNT;
 
       SET @StepEnd = GETDATE();
       INSERT INTO dbo.ETLLog
@@ -1205,7 +1585,7 @@ BEGIN
         'IncrementalInsert',
         @StepStart,
         @StepEnd,
-        CONCAT('Inserted ', @@ROWCOUNT, ' new port‐call snapshots')
+        CONCAT('Inserted ', @RowCount, ' new port‐call snapshots')
       );
 
       COMMIT;
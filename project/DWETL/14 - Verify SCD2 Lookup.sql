@@ -0,0 +1,134 @@
+USE DataWarehouse;
+GO
+
+--------------------------------------------------------------------------------
+-- بررسی معادل بودن جستجوی SCD2 مبتنی بر بازه (Dim.fn_EmployeeKeyRanges /
+-- Dim.fn_EmploymentHistoryRanges) با منطق قبلی OUTER APPLY TOP 1.
+-- برای هر جستجو، نتیجه هر دو روش روی کل داده‌های Staging محاسبه و با EXCEPT
+-- در هر دو جهت مقایسه می‌شود. همه شمارنده‌های Mismatch باید صفر باشند.
+--------------------------------------------------------------------------------
+SET NOCOUNT ON;
+
+IF OBJECT_ID('tempdb..#VerifyResult') IS NOT NULL DROP TABLE #VerifyResult;
+CREATE TABLE #VerifyResult (
+    Lookup        NVARCHAR(100) NOT NULL,
+    SourceRows    INT NOT NULL,
+    OnlyInApply   INT NOT NULL,
+    OnlyInRange   INT NOT NULL,
+    ApplyTime_ms  INT NOT NULL,
+    RangeTime_ms  INT NOT NULL
+);
+
+DECLARE @t0 DATETIME2, @t1 DATETIME2, @t2 DATETIME2;
+
+--------------------------------------------------------------------------------
+-- 1) Attendance -> EmployeeKey (UpdateFactEmployeeAttendance)
+--------------------------------------------------------------------------------
+SET @t0 = SYSDATETIME();
+SELECT a.AttendanceID, ISNULL(x.EmployeeKey, -1) AS EmployeeKey
+INTO #ApplyAttendance
+FROM StagingDB.HumanResources.Attendance a
+OUTER APPLY (
+    SELECT TOP 1 de.EmployeeKey FROM Dim.DimEmployee de
+    WHERE de.EmployeeID = a.EmployeeID AND de.StartDate <= a.AttendanceDate
+    ORDER BY de.StartDate DESC, de.EmployeeKey DESC
+) AS x;
+
+SET @t1 = SYSDATETIME();
+SELECT m.* INTO #EmployeeKeyMap FROM Dim.fn_EmployeeKeyRanges() m;
+CREATE CLUSTERED INDEX IX_EmployeeKeyMap ON #EmployeeKeyMap (EmployeeID, ValidFrom);
+
+SELECT a.AttendanceID, ISNULL(km.EmployeeKey, -1) AS EmployeeKey
+INTO #RangeAttendance
+FROM StagingDB.HumanResources.Attendance a
+LEFT JOIN #EmployeeKeyMap km
+    ON km.EmployeeID = a.EmployeeID
+   AND a.AttendanceDate >= km.ValidFrom AND a.AttendanceDate < km.ValidTo;
+SET @t2 = SYSDATETIME();
+
+INSERT INTO #VerifyResult
+SELECT 'Attendance -> EmployeeKey',
+       (SELECT COUNT(*) FROM StagingDB.HumanResources.Attendance),
+       (SELECT COUNT(*) FROM (SELECT * FROM #ApplyAttendance EXCEPT SELECT * FROM #RangeAttendance) d),
+       (SELECT COUNT(*) FROM (SELECT * FROM #RangeAttendance EXCEPT SELECT * FROM #ApplyAttendance) d),
+       DATEDIFF(MILLISECOND, @t0, @t1), DATEDIFF(MILLISECOND, @t1, @t2);
+
+--------------------------------------------------------------------------------
+-- 2) SalaryPayment -> DepartmentID, JobTitleID (UpdateFactSalaryPayment / LoadFactSalaryPayment)
+--------------------------------------------------------------------------------
+SET @t0 = SYSDATETIME();
+SELECT sp.SalaryPaymentID, x.DepartmentID, x.JobTitleID
+INTO #ApplySalary
+FROM StagingDB.HumanResources.SalaryPayment sp
+OUTER APPLY (
+    SELECT TOP 1 eh.DepartmentID, eh.JobTitleID
+    FROM StagingDB.HumanResources.EmploymentHistory eh
+    WHERE eh.EmployeeID = sp.EmployeeID AND eh.StartDate <= sp.PaymentDate
+    ORDER BY eh.StartDate DESC, eh.EmploymentHistoryID DESC
+) AS x;
+
+SET @t1 = SYSDATETIME();
+SELECT m.* INTO #HistoryMap FROM Dim.fn_EmploymentHistoryRanges() m;
+CREATE CLUSTERED INDEX IX_HistoryMap ON #HistoryMap (EmployeeID, ValidFrom);
+
+SELECT sp.SalaryPaymentID, hm.DepartmentID, hm.JobTitleID
+INTO #RangeSalary
+FROM StagingDB.HumanResources.SalaryPayment sp
+LEFT JOIN #HistoryMap hm
+    ON hm.EmployeeID = sp.EmployeeID
+   AND sp.PaymentDate >= hm.ValidFrom AND sp.PaymentDate < hm.ValidTo;
+SET @t2 = SYSDATETIME();
+
+INSERT INTO #VerifyResult
+SELECT 'SalaryPayment -> Department/JobTitle',
+       (SELECT COUNT(*) FROM StagingDB.HumanResources.SalaryPayment),
+       (SELECT COUNT(*) FROM (SELECT * FROM #ApplySalary EXCEPT SELECT * FROM #RangeSalary) d),
+       (SELECT COUNT(*) FROM (SELECT * FROM #RangeSalary EXCEPT SELECT * FROM #ApplySalary) d),
+       DATEDIFF(MILLISECOND, @t0, @t1), DATEDIFF(MILLISECOND, @t1, @t2);
+
+--------------------------------------------------------------------------------
+-- 3) Termination -> DepartmentID, JobTitleID, Salary (UpdateFactTermination / UpdateFactEmployeeLifecycle)
+--------------------------------------------------------------------------------
+SET @t0 = SYSDATETIME();
+SELECT t.TerminationID, x.DepartmentID, x.JobTitleID, x.Salary
+INTO #ApplyTermination
+FROM StagingDB.HumanResources.Termination t
+OUTER APPLY (
+    SELECT TOP 1 eh.DepartmentID, eh.JobTitleID, eh.Salary
+    FROM StagingDB.HumanResources.EmploymentHistory eh
+    WHERE eh.EmployeeID = t.EmployeeID AND eh.StartDate <= t.TerminationDate
+    ORDER BY eh.StartDate DESC, eh.EmploymentHistoryID DESC
+) AS x;
+
+SET @t1 = SYSDATETIME();
+SELECT t.TerminationID, hm.DepartmentID, hm.JobTitleID, hm.Salary
+INTO #RangeTermination
+FROM StagingDB.HumanResources.Termination t
+LEFT JOIN #HistoryMap hm
+    ON hm.EmployeeID = t.EmployeeID
+   AND t.TerminationDate >= hm.ValidFrom AND t.TerminationDate < hm.ValidTo;
+SET @t2 = SYSDATETIME();
+
+INSERT INTO #VerifyResult
+SELECT 'Termination -> Department/JobTitle/Salary',
+       (SELECT COUNT(*) FROM StagingDB.HumanResources.Termination),
+       (SELECT COUNT(*) FROM (SELECT * FROM #ApplyTermination EXCEPT SELECT * FROM #RangeTermination) d),
+       (SELECT COUNT(*) FROM (SELECT * FROM #RangeTermination EXCEPT SELECT * FROM #ApplyTermination) d),
+       DATEDIFF(MILLISECOND, @t0, @t1), DATEDIFF(MILLISECOND, @t1, @t2);
+
+--------------------------------------------------------------------------------
+-- گزارش
+--------------------------------------------------------------------------------
+SELECT Lookup, SourceRows, OnlyInApply, OnlyInRange, ApplyTime_ms, RangeTime_ms,
+       CASE WHEN OnlyInApply = 0 AND OnlyInRange = 0 THEN 'OK' ELSE 'MISMATCH' END AS Result
+FROM #VerifyResult;
+
+IF EXISTS (SELECT 1 FROM #VerifyResult WHERE OnlyInApply > 0 OR OnlyInRange > 0)
+    PRINT 'SCD2 lookup verification FAILED.';
+ELSE
+    PRINT 'SCD2 lookup verification passed: range joins match OUTER APPLY row-for-row.';
+
+DROP TABLE #ApplyAttendance, #RangeAttendance, #EmployeeKeyMap,
+           #ApplySalary, #RangeSalary, #HistoryMap,
+           #ApplyTermination, #RangeTermination, #VerifyResult;
+GO
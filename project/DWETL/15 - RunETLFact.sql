@@ -1,6 +1,10 @@
 USE DataWarehouse;
 GO
 
+-- شناسه اجرا برای Audit.ETLStepMetric (در همین session به اشتراک گذاشته می‌شود)
+EXEC StagingDB.Audit.BeginETLRun;
+GO
+
 --------------------------------------------------------------------------------
 -- Fact.ExecuteAllFactUpdates
 -- Executes all incremental update procedures for fact tables with ETL logging
@@ -45,7 +45,7 @@ BEGIN
         SET @StepStart = GETDATE();
         INSERT INTO Fact.FactInvoiceLineTransaction
             (DimInvoiceID,DimCustomerID,DimServiceTypeID,DimTaxID,DimDateID,
-             Quantity,UnitPrice,DiscountPercent,NetAmount,TaxAmount)
+             Quantity,UnitPrice,DiscountPercent,NetAmount,TaxAmount,SourceInvoiceLineID)
         SELECT
             inv.DimInvoiceID,
             cust.DimCustomerID,
@@ -56,13 +56,12 @@ BEGIN
             src.UnitPrice,
             src.DiscountPercent,
             src.NetAmount,
-            src.TaxAmount
+            src.TaxAmount,
+            src.InvoiceLineID
         FROM StagingDB.Finance.InvoiceLine AS src
         INNER JOIN StagingDB.Finance.Invoice       AS i      ON src.InvoiceID     = i.InvoiceID
-        INNER JOIN Dim.DimInvoice                   AS inv    ON i.InvoiceNumber  = inv.InvoiceNumber
-        INNER JOIN StagingDB.Finance.Contract      AS ctr    ON i.ContractID     = ctr.ContractID
-        INNER JOIN StagingDB.Finance.Customer      AS stc    ON ctr.CustomerID   = stc.CustomerID
-        INNER JOIN Dim.DimCustomer                  AS cust   ON stc.CustomerCode = cust.CustomerCode
+        INNER JOIN Dim.KeyMapInvoice                AS inv    ON src.InvoiceID     = inv.InvoiceID
+        INNER JOIN Dim.KeyMapCustomer               AS cust   ON inv.CustomerID    = cust.CustomerID
         INNER JOIN Dim.DimServiceType               AS svc    ON src.ServiceTypeID= svc.SourceServiceTypeID
         LEFT JOIN Dim.DimTax                        AS tax    ON src.TaxID        = tax.DimTaxID
         INNER JOIN Dim.DimDate                      AS dt     ON i.InvoiceDate    = dt.FullDate;
@@ -125,7 +124,7 @@ BEGIN
         VALUES(@TableName, 'Validate', @StepStart, @StepEnd,
                CONCAT('FirstLoad: Found ', @NullCount, ' nulls in staging.Payment'));
 
-        -- STEP 3: Insert into fact, joining through Invoice → Contract → Customer → DimCustomer
+        -- STEP 3: Insert into fact, resolving Invoice / Customer keys through the key maps
         SET @StepStart = GETDATE();
         INSERT INTO Fact.FactCustomerPaymentTransaction
         (
@@ -137,7 +136,8 @@ BEGIN
             DaysToPayment,
             RemainingAmount,
             IsFullPayment,
-            PartialPaymentCount
+            PartialPaymentCount,
+            SourcePaymentID
         )
         SELECT
             pm.DimPaymentMethodID,
@@ -148,24 +148,19 @@ BEGIN
             DATEDIFF(DAY, invHdr.InvoiceDate, src.PaymentDate),
             invHdr.TotalAmount - src.Amount,
             CASE WHEN src.Amount >= invHdr.TotalAmount THEN 1 ELSE 0 END,
-            0  -- no partial-payment count in staging
+            0,  -- no partial-payment count in staging
+            src.PaymentID
         FROM StagingDB.Finance.Payment AS src
 
         -- join to invoice header
         INNER JOIN StagingDB.Finance.Invoice AS invHdr
             ON src.InvoiceID = invHdr.InvoiceID
-        -- surrogate invoice dimension
-        INNER JOIN Dim.DimInvoice AS inv
-            ON invHdr.InvoiceNumber = inv.InvoiceNumber
-        -- contract for this invoice
-        INNER JOIN StagingDB.Finance.Contract AS ctr
-            ON invHdr.ContractID = ctr.ContractID
-        -- customer from contract
-        INNER JOIN StagingDB.Finance.Customer AS stc
-            ON ctr.CustomerID = stc.CustomerID
-        -- surrogate customer dimension
-        INNER JOIN Dim.DimCustomer AS cust
-            ON stc.CustomerCode = cust.CustomerCode
+        -- surrogate invoice key (Invoice → Contract → Customer already resolved in the map)
+        INNER JOIN Dim.KeyMapInvoice AS inv
+            ON src.InvoiceID = inv.InvoiceID
+        -- surrogate customer key (current version)
+        INNER JOIN Dim.KeyMapCustomer AS cust
+            ON inv.CustomerID = cust.CustomerID
         -- payment-method dimension
         INNER JOIN Dim.DimPaymentMethod AS pm
             ON src.PaymentMethod = pm.PaymentMethodName
@@ -208,7 +203,9 @@ BEGIN
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
         @NullCount INT,
-        @RowCount  INT;
+        @RowCount  INT,
+        @MaxLineID    BIGINT,
+        @MaxPaymentID BIGINT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -265,6 +262,20 @@ BEGIN
                 ctr.CustomerID,
                 DATEFROMPARTS(YEAR(inv.InvoiceDate), MONTH(inv.InvoiceDate), 1)
         ),
+        CustomerCycle AS
+        (
+            -- چرخه صورتحساب آخرین قرارداد مشتری (یک سطر برای هر مشتری-ماه)
+            SELECT CustomerID, BillingCycleID
+            FROM
+            (
+                SELECT
+                    ctr.CustomerID,
+                    ctr.BillingCycleID,
+                    ROW_NUMBER() OVER (PARTITION BY ctr.CustomerID ORDER BY ctr.StartDate DESC, ctr.ContractID DESC) AS rn
+                FROM StagingDB.Finance.Contract AS ctr
+            ) AS c
+            WHERE c.rn = 1
+        ),
         OutstandingAgg AS
         (
             SELECT
@@ -306,19 +317,17 @@ BEGIN
             ISNULL(pa.AveragePaymentDelay,0),
             oa.MaxOutstandingAmount
         FROM InvoiceLineAgg AS ila
-        -- map back through Contract → Customer
-        INNER JOIN StagingDB.Finance.Contract AS ctr
-            ON ila.CustomerID = ctr.CustomerID
-        INNER JOIN StagingDB.Finance.Customer AS srcCust
-            ON ctr.CustomerID = srcCust.CustomerID
-        INNER JOIN Dim.DimCustomer AS cust
-            ON srcCust.CustomerCode = cust.CustomerCode
+        -- surrogate customer key (current version)
+        INNER JOIN Dim.KeyMapCustomer AS cust
+            ON ila.CustomerID = cust.CustomerID
         -- snapshot date to date dimension
         INNER JOIN Dim.DimDate AS dt
             ON ila.SnapshotDate = dt.FullDate
-        -- billing cycle from contract
+        -- billing cycle from the customer's latest contract
+        INNER JOIN CustomerCycle AS cc
+            ON ila.CustomerID = cc.CustomerID
         INNER JOIN Dim.DimBillingCycle AS bc
-            ON ctr.BillingCycleID = bc.DimBillingCycleID
+            ON cc.BillingCycleID = bc.DimBillingCycleID
         -- join aggregated payments and outstanding
         LEFT JOIN PaymentAgg    AS pa ON ila.CustomerID = pa.CustomerID
                                     AND ila.SnapshotDate = pa.SnapshotDate
@@ -331,6 +340,12 @@ BEGIN
         VALUES(@TableName, 'Insert', @StepStart, @StepEnd,
                CONCAT('FirstLoad: Inserted ', @RowCount, ' rows'));
 
+        -- STEP 5: Start the incremental refresh after the rows loaded here
+        SELECT @MaxLineID    = ISNULL(MAX(InvoiceLineID), 0) FROM StagingDB.Finance.InvoiceLine;
+        SELECT @MaxPaymentID = ISNULL(MAX(PaymentID), 0)     FROM StagingDB.Finance.Payment;
+        EXEC Audit.SetDWWatermark @ProcessName = @TableName, @SourceTable = 'Finance.InvoiceLine', @LastKey = @MaxLineID;
+        EXEC Audit.SetDWWatermark @ProcessName = @TableName, @SourceTable = 'Finance.Payment',     @LastKey = @MaxPaymentID;
+
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -559,6 +574,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Fact.FactTermination';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         -- Start with a clean table for the initial load.
@@ -608,10 +624,11 @@ BEGIN
             Dim.DimJobTitle jt ON eh.JobTitleID = jt.JobTitleID
         LEFT JOIN 
             Dim.DimTerminationReason dtr ON t.TerminationReason = dtr.TerminationReason;
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'FactTermination initial load completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -624,8 +641,9 @@ GO
 
 --------------------------------------------------------------------------------
 -- 2) LoadFactSalaryPayment (First Load - Final Corrected Version)
--- This procedure uses a robust OUTER APPLY logic to find the last known
--- department and job title, correctly handling gaps in employment history.
+-- The last known department and job title come from the validity ranges of
+-- Dim.fn_EmploymentHistoryRanges (same result as the former OUTER APPLY TOP 1,
+-- but as a single range join), correctly handling gaps in employment history.
 --------------------------------------------------------------------------------
 CREATE OR ALTER PROCEDURE Fact.LoadFactSalaryPayment
 AS
@@ -636,11 +654,16 @@ BEGIN
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
     DECLARE @EmployerContributionRate DECIMAL(5, 2) = 0.23; -- Business rule for employer costs
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         -- Start with a clean table for the initial load.
         TRUNCATE TABLE Fact.FactSalaryPayment;
 
+        -- Employment-history validity ranges, indexed for the range join below.
+        SELECT m.* INTO #HistoryMap FROM Dim.fn_EmploymentHistoryRanges() m;
+        CREATE CLUSTERED INDEX IX_HistoryMap ON #HistoryMap (EmployeeID, ValidFrom);
+
         INSERT INTO Fact.FactSalaryPayment (
             PaymentDateKey, EmployeeKey, DepartmentKey, JobTitleKey,
             GrossPayAmount, BaseAmount, BonusAmount, DeductionsAmount, NetAmount, SalaryCostToCompany
@@ -664,32 +687,27 @@ BEGIN
         INNER JOIN 
             Dim.DimEmployee de ON sp.EmployeeID = de.EmployeeID 
                                AND sp.PaymentDate BETWEEN de.StartDate AND ISNULL(de.EndDate, '9999-12-31')
-        -- CORE FIX: Use OUTER APPLY to find the most recent employment history record
-        -- for each salary payment. This is robust against data gaps.
-        OUTER APPLY (
-            SELECT TOP 1 
-                eh.DepartmentID,
-                eh.JobTitleID
-            FROM 
-                StagingDB.HumanResources.EmploymentHistory eh
-            WHERE 
-                eh.EmployeeID = sp.EmployeeID
-                AND eh.StartDate <= sp.PaymentDate -- Find all history records up to the payment date
-            ORDER BY 
-                eh.StartDate DESC, -- Order by the most recent StartDate
-                eh.EmploymentHistoryID DESC -- Tie-breaker for same-day changes
-        ) AS last_eh
-        -- Now, LEFT JOIN to the dimensions based on the IDs found by OUTER APPLY
+        -- The history record whose validity range contains the payment date is the
+        -- most recent one on or before it. This is robust against data gaps.
+        LEFT JOIN 
+            #HistoryMap last_eh ON last_eh.EmployeeID = sp.EmployeeID
+                                AND sp.PaymentDate >= last_eh.ValidFrom
+                                AND sp.PaymentDate < last_eh.ValidTo
+        -- Now, LEFT JOIN to the dimensions based on the IDs found by the range join
         LEFT JOIN 
             Dim.DimDepartment d ON last_eh.DepartmentID = d.DepartmentID
         LEFT JOIN 
             Dim.DimJobTitle jt ON last_eh.JobTitleID = jt.JobTitleID;
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'FactSalaryPayment initial load completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
+
+        DROP TABLE #HistoryMap;
     END TRY
     BEGIN CATCH
+        IF OBJECT_ID('tempdb..#HistoryMap') IS NOT NULL DROP TABLE #HistoryMap;
         SET @Message = ERROR_MESSAGE();
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, Status, [Message])
         VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), 'Failed', @Message);
@@ -711,6 +729,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Fact.FactEmployeeAttendance';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         TRUNCATE TABLE Fact.FactEmployeeAttendance;
@@ -724,10 +743,11 @@ BEGIN
         JOIN Dim.DimEmployee de ON a.EmployeeID = de.EmployeeID 
         JOIN Dim.DimDate dd ON a.AttendanceDate = dd.FullDate
         WHERE a.AttendanceDate BETWEEN de.StartDate AND ISNULL(de.EndDate, '9999-12-31');
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'FactEmployeeAttendance initial load completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -751,6 +771,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Fact.FactMonthlyEmployeePerformance';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         -- Start with a clean table for the initial load.
@@ -810,10 +831,11 @@ BEGIN
                                                    AND m.MonthEndDate BETWEEN eh.StartDate AND ISNULL(eh.EndDate, '9999-12-31')
         LEFT JOIN 
             Dim.DimDepartment d ON eh.DepartmentID = d.DepartmentID;
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'FactMonthlyEmployeePerformance initial load completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -835,6 +857,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Fact.FactEmployeeLifecycle';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         TRUNCATE TABLE Fact.FactEmployeeLifecycle;
@@ -886,10 +909,11 @@ BEGIN
         LEFT JOIN Dim.DimDate term_date ON term.TerminationDate = term_date.FullDate
         LEFT JOIN Dim.DimTerminationReason dtr ON term.TerminationReason = dtr.TerminationReason
         LEFT JOIN LastKnownSalary lks ON e.EmployeeID = lks.EmployeeID AND lks.rn = 1;
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'FactEmployeeLifecycle initial load completed successfully with full history.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -912,6 +936,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Fact.FactYearlyHeadcount';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT = 0;
 
     BEGIN TRY
         TRUNCATE TABLE Fact.FactYearlyHeadcount;
@@ -958,6 +983,7 @@ BEGIN
             LEFT JOIN StagingDB.HumanResources.Employee e ON edh.EmployeeID = e.EmployeeID
             WHERE d.DepartmentKey <> -1
             GROUP BY d.DepartmentKey, dd.DateKey;
+            SET @RowCount = @RowCount + @@ROWCOUNT;
 
             FETCH NEXT FROM YearCursor INTO @CurrentYear;
         END;
@@ -967,7 +993,7 @@ BEGIN
         
         SET @Message = 'FactYearlyHeadcount initial load completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         IF CURSOR_STATUS('global','YearCursor') >= -1 DEALLOCATE YearCursor;
@@ -999,7 +1025,8 @@ BEGIN
       @StepEnd   DATETIME,
       @Message   NVARCHAR(2000),
       @NullCount INT,
-      @DupCount  INT;
+      @DupCount  INT,
+      @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1081,12 +1108,13 @@ BEGIN
           ON emp.EmployeeID = dem.EmployeeID
         JOIN dim.DimDate                           AS dd
           ON CAST(co.OperationDateTime AS DATE) = dd.FullDate;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog
           (TableName, OperationType, StartTime, EndTime, Message)
         VALUES
           (@TableName,'Insert',@StepStart,@StepEnd,
-           CONCAT('FirstLoad: Inserted ',@@ROWCOUNT,' rows'));
+           CONCAT('FirstLoad: Inserted ',@RowCount,' rows'));
 
         COMMIT;
     END TRY
@@ -1116,7 +1144,8 @@ BEGIN
       @TableName NVARCHAR(128) = 'Fact.FactPortCallPeriodicSnapshot',
       @StepStart DATETIME,
       @StepEnd   DATETIME,
-      @Message   NVARCHAR(2000);
+      @Message   NVARCHAR(2000),
+      @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1161,6 +1190,7 @@ BEGIN
 		  dp.PortSK,
 		  ba.BerthID,
 		  pc.Status;
+		SET @RowCount = @@ROWCOUNT;
 
 		SET @StepEnd = GETDATE();
 
@@ -1168,7 +1198,7 @@ BEGIN
 		  (TableName, OperationType, StartTime, EndTime, Message)
 		VALUES
 		  (@TableName, 'Insert', @StepStart, @StepEnd,
-		   CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows'));
+		   CONCAT('FirstLoad: Inserted ', @RowCount, ' rows'));
 
 
         COMMIT;
@@ -1200,7 +1230,9 @@ BEGIN
         @StepStart  DATETIME,
         @StepEnd    DATETIME,
         @Message    NVARCHAR(2000),
-        @NullCount  INT;
+        @NullCount  INT,
+        @RowCount   INT,
+        @MaxOpID    BIGINT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1242,9 +1274,10 @@ BEGIN
            CONCAT('FirstLoad: Found ', @NullCount, ' nulls in source data'));
 
         --------------------------------------------------------------------
-        -- STEP 3: Insert aggregated metrics
+        -- STEP 3: Insert aggregated metrics (up to a fixed CargoOpID bound)
         --------------------------------------------------------------------
         SET @StepStart = GETDATE();
+        SELECT @MaxOpID = ISNULL(MAX(CargoOpID), 0) FROM StagingDB.PortOperations.CargoOperation;
         INSERT INTO Fact.FactContainerMovementsAcc
           (PortSK, ContainerTypeID, TotalLoads, TotalUnloads, TotalTEU)
         SELECT
@@ -1252,20 +1285,28 @@ BEGIN
           c.ContainerTypeID,
           SUM(CASE WHEN co.OperationType = 'LOAD'   THEN co.Quantity ELSE 0 END) AS TotalLoads,
           SUM(CASE WHEN co.OperationType = 'UNLOAD' THEN co.Quantity ELSE 0 END) AS TotalUnloads,
-          SUM(CASE WHEN co.OperationType = 'LOAD'   THEN co.Quantity ELSE 0 END) AS TotalTEU
+          SUM(co.Quantity)                                                       AS TotalTEU
         FROM StagingDB.PortOperations.CargoOperation AS co
         JOIN StagingDB.PortOperations.PortCall     AS pc  ON co.PortCallID  = pc.PortCallID
         JOIN StagingDB.PortOperations.Container    AS c   ON co.ContainerID = c.ContainerID
         JOIN Dim.DimPort                           AS dp  ON pc.PortID      = dp.PortID
+        WHERE co.CargoOpID <= @MaxOpID
         GROUP BY
           dp.PortSK,
           c.ContainerTypeID;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog
           (TableName, OperationType, StartTime, EndTime, Message)
         VALUES
           (@TableName, 'Insert', @StepStart, @StepEnd,
-           CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows'));
+           CONCAT('FirstLoad: Inserted ', @RowCount, ' rows'));
+
+        --------------------------------------------------------------------
+        -- STEP 4: UpdateFactContainerMovementsAcc continues with the cargo operations after this load
+        --------------------------------------------------------------------
+        EXEC Audit.SetDWWatermark @ProcessName = @TableName, @SourceTable = 'PortOperations.CargoOperation', @LastKey = @MaxOpID;
+        EXEC Audit.SetDWWatermark @ProcessName = @TableName, @SourceTable = 'FullRebuild',                   @LastKey = @MaxOpID;
 
         COMMIT;
     END TRY
@@ -1295,7 +1336,8 @@ BEGIN
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
         @NullCount INT,
-        @DupCount  INT;
+        @DupCount  INT,
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1369,12 +1411,13 @@ BEGIN
           ON pc.PortID = dp.PortID
         JOIN Dim.DimContainer   AS dc
           ON co.ContainerID = dc.ContainerID;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog
           (TableName, OperationType, StartTime, EndTime, Message)
         VALUES
           (@TableName, 'Insert', @StepStart, @StepEnd,
-           CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows'));
+           CONCAT('FirstLoad: Inserted ', @RowCount, ' rows'));
 
         COMMIT;
     END TRY
@@ -1,6 +1,10 @@
 USE DataWarehouse;
 GO
 
+-- شناسه اجرا برای Audit.ETLStepMetric (در همین session به اشتراک گذاشته می‌شود)
+EXEC StagingDB.Audit.BeginETLRun;
+GO
+
 --------------------------------------------------------------------------------
 -- Wrapper: LoadAllFactInitialLoads
 --   1) Disable all FKs referencing Fact schema
@@ -116,6 +120,11 @@ END;
 GO
 
 exec Fact.LoadAllFacts;
+GO
+
+-- ساخت کامل لایه Agg (7 - DWTables.sql، بخش 8) از Factهای Finance و HR بارگذاری‌شده
+EXEC Agg.RefreshRollups @FullRebuild = 1;
+GO
 
 
 USE DataWarehouse;
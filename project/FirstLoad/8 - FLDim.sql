@@ -3,10 +3,14 @@ GO
 
 --------------------------------------------------------------------------------
 -- 1-1) LoadDimDateInitialLoad
--- Full initial populate of Dim.DimDate (from 2025-06-22 to today)
+-- Initial populate of Dim.DimDate: decades of dates generated set-based by
+-- Dim.ExtendDimDate, widened to cover every date present in staging.
+-- No DELETE: existing dates (and their keys) are kept, so the proc is re-runnable.
 --------------------------------------------------------------------------------
 
 CREATE OR ALTER PROCEDURE Dim.LoadDimDateInitialLoad
+    @StartDate DATE = '2000-01-01',
+    @EndDate   DATE = NULL           -- پیش‌فرض: پایان ۱۰ سال بعد
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -15,78 +19,37 @@ BEGIN
         @StepStart DATETIME,
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
-        @StartDate DATE = '2025-06-22',
-        @EndDate   DATE = CONVERT(DATE, GETDATE()),
-        @DayCount  INT;
+        @Inserted  INT,
+        @MinDate   DATE,
+        @MaxDate   DATE;
+
+    SET @EndDate = ISNULL(@EndDate, DATEFROMPARTS(YEAR(GETDATE()) + 10, 12, 31));
 
     BEGIN TRY
         BEGIN TRAN;
 
         --------------------------------------------------------------------
-        -- STEP 1: Delete all existing rows (DELETE + reseed)
+        -- STEP 1: Generate the calendar range in one bulk insert
         --------------------------------------------------------------------
         SET @StepStart = GETDATE();
-
-        DELETE FROM Dim.DimDate;
-        -- Reset identity so next insert starts at 1
-        DBCC CHECKIDENT('Dim.DimDate', RESEED, 0);
+        EXEC Dim.ExtendDimDate @StartDate = @StartDate, @EndDate = @EndDate, @Inserted = @Inserted OUTPUT;
 
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
         VALUES
         (
             @TableName,
-            'Delete',
+            'Insert',
             @StepStart,
             @StepEnd,
-            'FirstLoad: Deleted all rows and reseeded DimDate'
+            CONCAT('FirstLoad: Inserted ', @Inserted, ' rows into Dim.DimDate (', @StartDate, ' .. ', @EndDate, ')')
         );
 
         --------------------------------------------------------------------
-        -- STEP 2: Compute number of days to generate
-        --------------------------------------------------------------------
-        SET @DayCount = DATEDIFF(DAY, @StartDate, @EndDate) + 1;
-
-        --------------------------------------------------------------------
-        -- STEP 3: Generate and Insert date rows
+        -- STEP 2: Cover any staging dates outside that range
         --------------------------------------------------------------------
         SET @StepStart = GETDATE();
-        SET DATEFIRST 1;  -- ensure Monday = 1
-
-        ;WITH DateSeq AS
-        (
-            SELECT TOP (@DayCount)
-                DATEADD(DAY, ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1, @StartDate) AS FullDate
-            FROM sys.all_objects AS s1
-            CROSS JOIN sys.all_objects AS s2
-        )
-        INSERT INTO Dim.DimDate
-        (
-            FullDate,
-            [Year],
-            [Quarter],
-            [Month],
-            MonthName,
-            [Day],
-            DayOfWeek,
-            DayName,
-            WeekOfYear,
-            IsWeekend
-        )
-        SELECT
-            FullDate,
-            YEAR(FullDate),
-            DATEPART(QUARTER, FullDate),
-            MONTH(FullDate),
-            DATENAME(MONTH, FullDate),
-            DAY(FullDate),
-            DATEPART(WEEKDAY, FullDate),
-            DATENAME(WEEKDAY, FullDate),
-            DATEPART(WEEK, FullDate),
-            CASE WHEN DATEPART(WEEKDAY, FullDate) IN (6,7) THEN 1 ELSE 0 END
-        FROM DateSeq
-        ORDER BY FullDate
-        OPTION (MAXDOP 1);  -- محدود کردن موازی‌سازی برای ثبات
+        EXEC Dim.ExtendDimDateFromStaging @Inserted = @Inserted OUTPUT, @MinDate = @MinDate OUTPUT, @MaxDate = @MaxDate OUTPUT;
 
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
@@ -96,7 +59,7 @@ BEGIN
             'Insert',
             @StepStart,
             @StepEnd,
-            CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows into Dim.DimDate')
+            CONCAT('FirstLoad: Inserted ', @Inserted, ' extra dates for staging range ', @MinDate, ' .. ', @MaxDate)
         );
 
         COMMIT;
@@ -134,7 +97,8 @@ BEGIN
         @StepEnd     DATETIME,
         @Message     NVARCHAR(2000),
         @NullCount   INT,
-        @DupCount    INT;
+        @DupCount    INT,
+        @RowCount    INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -221,6 +185,7 @@ BEGIN
             NULL,                      -- no end date on initial load
             1                          -- current flag
         FROM StagingDB.Finance.Customer AS C;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
         VALUES
@@ -229,9 +194,17 @@ BEGIN
             'Insert',
             @StepStart,
             @StepEnd,
-            CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows into Dim.DimCustomer')
+            CONCAT('FirstLoad: Inserted ', @RowCount, ' rows into Dim.DimCustomer')
         );
 
+        -- STEP 4: Rebuild the CustomerID key map used by the Finance fact loads
+        SET @StepStart = GETDATE();
+        DELETE FROM Dim.KeyMapCustomer;
+        EXEC Dim.RefreshKeyMapCustomer;
+        SET @StepEnd = GETDATE();
+        INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
+        VALUES('Dim.KeyMapCustomer', 'Refresh', @StepStart, @StepEnd, 'FirstLoad: Rebuilt CustomerID key map');
+
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -267,7 +240,8 @@ BEGIN
         @StepEnd     DATETIME,
         @Message     NVARCHAR(2000),
         @NullCount   INT,
-        @DupCount    INT;
+        @DupCount    INT,
+        @RowCount    INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -342,6 +316,7 @@ BEGIN
             Taxable,
             IsActive
         FROM StagingDB.Finance.ServiceType;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
 
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
@@ -351,7 +326,7 @@ BEGIN
             'Insert',
             @StepStart,
             @StepEnd,
-            CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows into Dim.DimServiceType')
+            CONCAT('FirstLoad: Inserted ', @RowCount, ' rows into Dim.DimServiceType')
         );
 
         COMMIT;
@@ -391,7 +366,8 @@ BEGIN
         @StepEnd     DATETIME,
         @Message     NVARCHAR(2000),
         @NullCount   INT,
-        @DupCount    INT;
+        @DupCount    INT,
+        @RowCount    INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -471,6 +447,7 @@ BEGIN
             NULL,                     -- no end date on initial load
             1                         -- current flag
         FROM StagingDB.Finance.Tax;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
 
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
@@ -480,7 +457,7 @@ BEGIN
             'Insert',
             @StepStart,
             @StepEnd,
-            CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows into Dim.DimTax')
+            CONCAT('FirstLoad: Inserted ', @RowCount, ' rows into Dim.DimTax')
         );
 
         COMMIT;
@@ -518,7 +495,8 @@ BEGIN
         @StepEnd     DATETIME,
         @Message     NVARCHAR(2000),
         @NullCount   INT,
-        @DupCount    INT;
+        @DupCount    INT,
+        @RowCount    INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -584,6 +562,7 @@ BEGIN
             CycleName,
             CycleLengthInDays
         FROM StagingDB.Finance.BillingCycle;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
 
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
@@ -593,7 +572,7 @@ BEGIN
             'Insert',
             @StepStart,
             @StepEnd,
-            CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows into Dim.DimBillingCycle')
+            CONCAT('FirstLoad: Inserted ', @RowCount, ' rows into Dim.DimBillingCycle')
         );
 
         COMMIT;
@@ -629,7 +608,8 @@ BEGIN
         @StepStart DATETIME,
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
-        @NullCount INT;
+        @NullCount INT,
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -677,6 +657,7 @@ BEGIN
         INSERT INTO Dim.DimPaymentMethod (PaymentMethodName)
         SELECT DISTINCT PaymentMethod
         FROM StagingDB.Finance.Payment;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
         VALUES
@@ -685,7 +666,7 @@ BEGIN
             'Insert',
             @StepStart,
             @StepEnd,
-            CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows into Dim.DimPaymentMethod')
+            CONCAT('FirstLoad: Inserted ', @RowCount, ' rows into Dim.DimPaymentMethod')
         );
 
         COMMIT;
@@ -722,7 +703,8 @@ BEGIN
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
         @NullCount INT,
-        @DupCount  INT;
+        @DupCount  INT,
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -799,6 +781,7 @@ BEGIN
             StartDate,
             EndDate
         FROM StagingDB.Finance.Contract;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
 
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
@@ -808,7 +791,7 @@ BEGIN
             'Insert',
             @StepStart,
             @StepEnd,
-            CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows into Dim.DimContract')
+            CONCAT('FirstLoad: Inserted ', @RowCount, ' rows into Dim.DimContract')
         );
 
         COMMIT;
@@ -848,7 +831,8 @@ BEGIN
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
         @NullCount INT,
-        @DupCount  INT;
+        @DupCount  INT,
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -919,6 +903,7 @@ BEGIN
             CreatedBy,
             CreatedDate
         FROM StagingDB.Finance.Invoice;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
 
         INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
@@ -928,9 +913,17 @@ BEGIN
             'Insert',
             @StepStart,
             @StepEnd,
-            CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows into Dim.DimInvoice')
+            CONCAT('FirstLoad: Inserted ', @RowCount, ' rows into Dim.DimInvoice')
         );
 
+        -- STEP 4: Rebuild the InvoiceID key map used by the Finance fact loads
+        SET @StepStart = GETDATE();
+        DELETE FROM Dim.KeyMapInvoice;
+        EXEC Dim.RefreshKeyMapInvoice;
+        SET @StepEnd = GETDATE();
+        INSERT INTO dbo.ETLLog(TableName, OperationType, StartTime, EndTime, Message)
+        VALUES('Dim.KeyMapInvoice', 'Refresh', @StepStart, @StepEnd, 'FirstLoad: Rebuilt InvoiceID key map');
+
         COMMIT;
     END TRY
     BEGIN CATCH
@@ -961,8 +954,8 @@ GO
 -- This procedure is safe to re-run.
 --------------------------------------------------------------------------------
 CREATE OR ALTER PROCEDURE Dim.LoadDimDate
-    @StartDate DATE = '2015-01-01',
-    @EndDate   DATE = '2030-12-31'
+    @StartDate DATE = '2000-01-01',
+    @EndDate   DATE = '2040-12-31'
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -982,23 +975,13 @@ BEGIN
             SET IDENTITY_INSERT Dim.DimDate OFF;
         END
 
-        -- Step 2: Populate the dimension with the date range
-        DECLARE @CurrentDate DATE = @StartDate;
-        WHILE @CurrentDate <= @EndDate
-        BEGIN
-            IF NOT EXISTS (SELECT 1 FROM Dim.DimDate WHERE FullDate = @CurrentDate)
-            BEGIN
-                INSERT INTO Dim.DimDate (FullDate, [Year], [Quarter], [Month], MonthName, [Day], DayOfWeek, DayName, WeekOfYear, IsWeekend)
-                VALUES (
-                    @CurrentDate, YEAR(@CurrentDate), DATEPART(QUARTER, @CurrentDate), MONTH(@CurrentDate),
-                    FORMAT(@CurrentDate, 'MMMM', 'en-US'), DAY(@CurrentDate), DATEPART(WEEKDAY, @CurrentDate),
-                    FORMAT(@CurrentDate, 'dddd', 'en-US'), DATEPART(WEEK, @CurrentDate),
-                    CASE WHEN DATEPART(WEEKDAY, @CurrentDate) IN (6, 7) THEN 1 ELSE 0 END
-                );
-                SET @RecordsInserted = @RecordsInserted + 1;
-            END
-            SET @CurrentDate = DATEADD(DAY, 1, @CurrentDate);
-        END;
+        -- Step 2: Populate the dimension with the date range (set-based, missing dates only)
+        EXEC Dim.ExtendDimDate @StartDate = @StartDate, @EndDate = @EndDate, @Inserted = @RecordsInserted OUTPUT;
+
+        -- Step 3: Cover staging dates outside the requested range
+        DECLARE @StagingInserted INT = 0;
+        EXEC Dim.ExtendDimDateFromStaging @Inserted = @StagingInserted OUTPUT;
+        SET @RecordsInserted = @RecordsInserted + @StagingInserted;
 
         SET @Message = 'DimDate load process completed.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
@@ -1024,6 +1007,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Dim.DimDepartment';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         IF NOT EXISTS (SELECT 1 FROM Dim.DimDepartment WHERE DepartmentKey = -1)
@@ -1040,10 +1024,11 @@ BEGIN
         FROM StagingDB.HumanResources.Department s
         LEFT JOIN StagingDB.HumanResources.Employee e ON s.ManagerID = e.EmployeeID
         WHERE NOT EXISTS (SELECT 1 FROM Dim.DimDepartment d WHERE d.DepartmentID = s.DepartmentID);
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'DimDepartment load process completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -1065,6 +1050,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Dim.DimJobTitle';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         IF NOT EXISTS (SELECT 1 FROM Dim.DimJobTitle WHERE JobTitleKey = -1)
@@ -1079,10 +1065,11 @@ BEGIN
         SELECT s.JobTitleID, s.JobTitleName, s.JobCategory, NULL
         FROM StagingDB.HumanResources.JobTitle s
         WHERE NOT EXISTS (SELECT 1 FROM Dim.DimJobTitle d WHERE d.JobTitleID = s.JobTitleID);
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'DimJobTitle load process completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -1104,6 +1091,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Dim.DimLeaveType';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         IF NOT EXISTS (SELECT 1 FROM Dim.DimLeaveType WHERE LeaveTypeKey = -1)
@@ -1118,10 +1106,11 @@ BEGIN
         SELECT s.LeaveTypeID, s.LeaveTypeName, s.IsPaid
         FROM StagingDB.HumanResources.LeaveType s
         WHERE NOT EXISTS (SELECT 1 FROM Dim.DimLeaveType d WHERE d.LeaveTypeID = s.LeaveTypeID);
+        SET @RowCount = @@ROWCOUNT;
         
         SET @Message = 'DimLeaveType load process completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -1143,6 +1132,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Dim.DimTerminationReason';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         IF NOT EXISTS (SELECT 1 FROM Dim.DimTerminationReason WHERE TerminationReasonKey = -1)
@@ -1158,10 +1148,11 @@ BEGIN
         FROM StagingDB.HumanResources.Termination s
         WHERE s.TerminationReason IS NOT NULL
         AND NOT EXISTS (SELECT 1 FROM Dim.DimTerminationReason d WHERE d.TerminationReason = s.TerminationReason);
+        SET @RowCount = @@ROWCOUNT;
 
         SET @Message = 'DimTerminationReason load process completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -1183,6 +1174,7 @@ BEGIN
     DECLARE @TargetTable NVARCHAR(128) = 'Dim.DimEmployee';
     DECLARE @StartTime DATETIME = GETDATE();
     DECLARE @Message NVARCHAR(MAX);
+    DECLARE @RowCount INT;
 
     BEGIN TRY
         IF NOT EXISTS (SELECT 1 FROM Dim.DimEmployee WHERE EmployeeKey = -1)
@@ -1199,10 +1191,11 @@ BEGIN
             s.EmploymentStatus, s.HireDate AS StartDate, NULL AS EndDate, 1 AS IsCurrent
         FROM StagingDB.HumanResources.Employee s
         WHERE NOT EXISTS (SELECT 1 FROM Dim.DimEmployee d WHERE d.EmployeeID = s.EmployeeID);
+        SET @RowCount = @@ROWCOUNT;
         
         SET @Message = 'DimEmployee load process completed successfully.';
         INSERT INTO Audit.DW_ETL_Log (ProcessName, OperationType, TargetTable, StartTime, EndTime, RecordsInserted, Status, [Message])
-        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @@ROWCOUNT, 'Success', @Message);
+        VALUES (@ProcessName, 'Initial Load', @TargetTable, @StartTime, GETDATE(), @RowCount, 'Success', @Message);
     END TRY
     BEGIN CATCH
         SET @Message = ERROR_MESSAGE();
@@ -1356,7 +1349,8 @@ BEGIN
         @Message   NVARCHAR(2000),
         @NullCount INT,
         @DupCount  INT,
-        @LoadDate  DATE = CONVERT(DATE, GETDATE());
+        @LoadDate  DATE = CONVERT(DATE, GETDATE()),
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1413,10 +1407,11 @@ BEGIN
            NULL,
            1
         FROM StagingDB.PortOperations.Ship AS s;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName,OperationType,StartTime,EndTime,Message)
         VALUES(@TableName,'Insert',@StepStart,@StepEnd,
-               CONCAT('FirstLoad: Inserted ',@@ROWCOUNT,' rows into DimShip'));
+               CONCAT('FirstLoad: Inserted ',@RowCount,' rows into DimShip'));
 
         COMMIT;
     END TRY
@@ -1445,7 +1440,8 @@ BEGIN
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
         @NullCount INT,
-        @DupCount  INT;
+        @DupCount  INT,
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1493,10 +1489,11 @@ BEGIN
         INSERT INTO Dim.DimPort (PortID, Name, Location)
         SELECT PortID, Name, Location
         FROM StagingDB.PortOperations.Port;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName,OperationType,StartTime,EndTime,Message)
         VALUES(@TableName,'Insert',@StepStart,@StepEnd,
-               CONCAT('FirstLoad: Inserted ',@@ROWCOUNT,' rows into DimPort'));
+               CONCAT('FirstLoad: Inserted ',@RowCount,' rows into DimPort'));
 
         COMMIT;
     END TRY
@@ -1526,7 +1523,8 @@ BEGIN
         @Message    NVARCHAR(2000),
         @NullCount  INT,
         @DupCount   INT,
-        @LoadDate   DATE        = CONVERT(DATE, GETDATE());
+        @LoadDate   DATE        = CONVERT(DATE, GETDATE()),
+        @RowCount   INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1589,13 +1587,14 @@ BEGIN
             @LoadDate,        
             c.OwnerCompany    
         FROM StagingDB.PortOperations.Container AS c;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
 
         INSERT INTO dbo.ETLLog
             (TableName, OperationType, StartTime, EndTime, Message)
         VALUES
             (@TableName, 'Insert', @StepStart, @StepEnd,
-             CONCAT('FirstLoad: Inserted ', @@ROWCOUNT, ' rows into DimContainer'));
+             CONCAT('FirstLoad: Inserted ', @RowCount, ' rows into DimContainer'));
 
         COMMIT;
     END TRY
@@ -1629,7 +1628,8 @@ BEGIN
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
         @NullCount INT,
-        @DupCount  INT;
+        @DupCount  INT,
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1681,10 +1681,11 @@ BEGIN
            e.EquipmentTypeID,
            e.Model
         FROM StagingDB.PortOperations.Equipment AS e;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName,OperationType,StartTime,EndTime,Message)
         VALUES(@TableName,'Insert',@StepStart,@StepEnd,
-               CONCAT('FirstLoad: Inserted ',@@ROWCOUNT,' rows into DimEquipment'));
+               CONCAT('FirstLoad: Inserted ',@RowCount,' rows into DimEquipment'));
 
         COMMIT;
     END TRY
@@ -1714,7 +1715,8 @@ BEGIN
         @Message   NVARCHAR(2000),
         @NullCount INT,
         @DupCount  INT,
-        @LoadDate  DATE = CONVERT(DATE,GETDATE());
+        @LoadDate  DATE = CONVERT(DATE,GETDATE()),
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1768,10 +1770,11 @@ BEGIN
            e.BirthDate, e.Gender, e.MaritalStatus, e.Address, e.Phone, e.Email,
            e.EmploymentStatus, @LoadDate, NULL, 1
         FROM StagingDB.HumanResources.Employee AS e;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName,OperationType,StartTime,EndTime,Message)
         VALUES(@TableName,'Insert',@StepStart,@StepEnd,
-               CONCAT('FirstLoad: Inserted ',@@ROWCOUNT,' rows into DimEmployee'));
+               CONCAT('FirstLoad: Inserted ',@RowCount,' rows into DimEmployee'));
 
         COMMIT;
     END TRY
@@ -1800,7 +1803,8 @@ BEGIN
         @StepEnd   DATETIME,
         @Message   NVARCHAR(2000),
         @NullCount INT,
-        @DupCount  INT;
+        @DupCount  INT,
+        @RowCount  INT;
 
     BEGIN TRY
         BEGIN TRAN;
@@ -1850,10 +1854,11 @@ BEGIN
         SELECT
            ys.YardSlotID, ys.YardID, ys.Block, ys.RowNumber, ys.TierLevel
         FROM StagingDB.PortOperations.YardSlot AS ys;
+        SET @RowCount = @@ROWCOUNT;
         SET @StepEnd = GETDATE();
         INSERT INTO dbo.ETLLog(TableName,OperationType,StartTime,EndTime,Message)
         VALUES(@TableName,'Insert',@StepStart,@StepEnd,
-               CONCAT('FirstLoad: Inserted ',@@ROWCOUNT,' rows into DimYardSlot'));
+               CONCAT('FirstLoad: Inserted ',@RowCount,' rows into DimYardSlot'));
 
         COMMIT;
     END TRY
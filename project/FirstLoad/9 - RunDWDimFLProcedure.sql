@@ -1,6 +1,10 @@
 USE DataWarehouse;
 GO
 
+-- شناسه اجرا برای Audit.ETLStepMetric (در همین session به اشتراک گذاشته می‌شود)
+EXEC StagingDB.Audit.BeginETLRun;
+GO
+
 --------------------------------------------------------------------------------
 -- Wrapper: LoadAllDimInitialLoads
 --   1) Disable FKs → 2) Run each FirstLoad dim proc (with per-proc logging) 